@@ -78,6 +78,22 @@ class DatabaseConfig:
     )
     USE_SQLITE: bool = os.getenv("USE_SQLITE", "true").lower() == "true"
     SQLITE_PATH: str = os.getenv("SQLITE_PATH", "data/trading_bot.db")
+    # Engine tuning (see src/database/engine.py)
+    POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    POOL_RECYCLE: int = 1800  # seconds
+    STATEMENT_CACHE_SIZE: int = 500
+    SQLITE_BUSY_TIMEOUT: float = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+    
+    @property
+    def engine_options(self) -> dict:
+        return dict(
+            pool_size=self.POOL_SIZE,
+            max_overflow=self.MAX_OVERFLOW,
+            pool_recycle=self.POOL_RECYCLE,
+            statement_cache_size=self.STATEMENT_CACHE_SIZE,
+            busy_timeout=self.SQLITE_BUSY_TIMEOUT
+        )
 
 
 @dataclass
@@ -125,6 +141,15 @@ class GateConfig:
     MODEL_AGREEMENT_MIN: float = 0.65
 
 
+@dataclass
+class RecorderConfig:
+    """Raw market data recording (for offline replay)"""
+
+    ENABLED: bool = os.getenv("RECORD_MARKET_DATA", "false").lower() == "true"
+    PATH: str = os.getenv("RECORDING_PATH", "data/recordings")
+    SEGMENT_MINUTES: int = 60  # Rotate segment files hourly
+
+
 class Settings:
     """Main settings container"""
 
@@ -134,6 +159,7 @@ class Settings:
     telegram = TelegramConfig()
     ai = AIConfig()
     gates = GateConfig()
+    recorder = RecorderConfig()
 
     # Timeframes used
     TIMEFRAMES = ["1m", "3m", "5m", "15m"]
@@ -141,8 +167,12 @@ class Settings:
     # Feature count
     TOTAL_FEATURES = 100
 
-    # Loop intervals
-    MAIN_LOOP_INTERVAL: int = 60  # seconds
+    # Closed-bar feature snapshots kept in memory (FeatureStore)
+    FEATURE_STORE_CAPACITY: int = 2000
+
+    # Main loop: the pipeline runs on every close of SIGNAL_TIMEFRAME,
+    # with a heartbeat while waiting
+    SIGNAL_TIMEFRAME: str = "5m"
     HEARTBEAT_INTERVAL: int = 30  # seconds
 
 
@@ -5,6 +5,7 @@ XGBoost (40%) + LightGBM (40%) + Logistic Regression (20%)
 import os
 import pickle
 import logging
+import zlib
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
@@ -93,8 +94,9 @@ class AIModel:
         # Load or initialize models
         self._load_models()
     
-    def _get_feature_names(self) -> List[str]:
-        """Get list of feature names"""
+    @staticmethod
+    def _get_feature_names() -> List[str]:
+        """Get list of feature names (order of AllFeatures.to_feature_vector)"""
         names = []
         
         # Technical (20)
@@ -165,6 +167,14 @@ class AIModel:
         
         return names
     
+    @staticmethod
+    def feature_schema_version() -> int:
+        """
+        Checksum of the feature names in order; changes whenever the vector
+        layout does. Masked to 31 bits so it fits a Postgres INTEGER column.
+        """
+        return zlib.crc32(",".join(AIModel._get_feature_names()).encode()) & 0x7FFFFFFF
+    
     def _load_models(self):
         """Load saved models or initialize new ones"""
         os.makedirs(self.model_path, exist_ok=True)
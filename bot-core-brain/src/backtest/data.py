@@ -0,0 +1,141 @@
+"""
+Backtest Data - Stored market history for replay
+Loads Binance kline/aggTrade/funding dumps and resamples 1m candles
+"""
+from typing import Dict, Iterable
+
+import numpy as np
+
+from ..data.candle_buffer import TIMEFRAME_MS
+
+
+def _header_rows(path: str) -> int:
+    """1 if the CSV starts with a header line (data.binance.vision dumps vary)"""
+    with open(path) as f:
+        first = f.readline().strip()
+    return 0 if first[:1].isdigit() else 1
+
+
+def _to_ms(timestamp: np.ndarray) -> np.ndarray:
+    """Epoch timestamps in ms (newer Binance dumps use microseconds)"""
+    timestamp = timestamp.astype(np.int64)
+    if len(timestamp) and timestamp[0] > 10**14:
+        timestamp = timestamp // 1000
+    return timestamp
+
+
+def load_columns(path: str) -> Dict[str, np.ndarray]:
+    """Column arrays previously saved with np.savez(path, **columns)"""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def load_klines_csv(path: str) -> Dict[str, np.ndarray]:
+    """
+    Binance kline CSV as candle columns.
+
+    Layout: open_time, open, high, low, close, volume, ... (extra columns
+    ignored). Also accepts a .npz of the same columns.
+    """
+    if path.endswith('.npz'):
+        return load_columns(path)
+
+    raw = np.loadtxt(
+        path, delimiter=',', skiprows=_header_rows(path),
+        usecols=(0, 1, 2, 3, 4, 5), ndmin=2
+    )
+    return {
+        'timestamp': _to_ms(raw[:, 0]),
+        'open': raw[:, 1],
+        'high': raw[:, 2],
+        'low': raw[:, 3],
+        'close': raw[:, 4],
+        'volume': raw[:, 5],
+    }
+
+
+def load_agg_trades_csv(path: str) -> Dict[str, np.ndarray]:
+    """
+    Binance aggTrades CSV as trade columns.
+
+    Layout: agg_trade_id, price, quantity, first_trade_id, last_trade_id,
+    transact_time, is_buyer_maker. Also accepts a .npz of the same columns.
+    """
+    if path.endswith('.npz'):
+        return load_columns(path)
+
+    raw = np.loadtxt(
+        path, delimiter=',', skiprows=_header_rows(path),
+        usecols=(1, 2, 5, 6), ndmin=2,
+        converters={6: lambda s: 1.0 if s.strip().lower() in ('true', '1') else 0.0}
+    )
+    return {
+        'timestamp': _to_ms(raw[:, 2]),
+        'price': raw[:, 0],
+        'quantity': raw[:, 1],
+        'is_buyer_maker': raw[:, 3] > 0.5,
+    }
+
+
+def load_funding_csv(path: str) -> Dict[str, np.ndarray]:
+    """
+    Binance fundingRate CSV as funding columns.
+
+    Layout: calc_time, funding_interval_hours, last_funding_rate.
+    """
+    if path.endswith('.npz'):
+        return load_columns(path)
+
+    raw = np.loadtxt(
+        path, delimiter=',', skiprows=_header_rows(path),
+        usecols=(0, 2), ndmin=2
+    )
+    return {
+        'timestamp': _to_ms(raw[:, 0]),
+        'funding_rate': raw[:, 1],
+    }
+
+
+def resample_candles(
+    cols: Dict[str, np.ndarray],
+    timeframe: str,
+    source_timeframe: str = '1m'
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate candle columns to a higher timeframe.
+
+    Buckets are aligned to the timeframe like Binance klines. A trailing
+    bucket the source history does not cover to its close is dropped.
+    """
+    tf_ms = TIMEFRAME_MS[timeframe]
+    timestamp = np.asarray(cols['timestamp'], dtype=np.int64)
+    if len(timestamp) == 0:
+        return {name: np.asarray(cols[name])[:0] for name in cols}
+
+    bucket = timestamp // tf_ms
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(timestamp)] - 1
+
+    out = {
+        'timestamp': bucket[starts] * tf_ms,
+        'open': np.asarray(cols['open'])[starts],
+        'high': np.maximum.reduceat(np.asarray(cols['high']), starts),
+        'low': np.minimum.reduceat(np.asarray(cols['low']), starts),
+        'close': np.asarray(cols['close'])[ends],
+        'volume': np.add.reduceat(np.asarray(cols['volume']), starts),
+    }
+
+    if timestamp[-1] + TIMEFRAME_MS[source_timeframe] < out['timestamp'][-1] + tf_ms:
+        out = {name: values[:-1] for name, values in out.items()}
+    return out
+
+
+def candles_from_1m(
+    cols_1m: Dict[str, np.ndarray],
+    timeframes: Iterable[str] = ('1m', '3m', '5m', '15m')
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Candle columns for every bot timeframe built from one 1m history"""
+    return {
+        tf: cols_1m if tf == '1m' else resample_candles(cols_1m, tf)
+        for tf in timeframes
+    }
@@ -0,0 +1,622 @@
+"""
+Backtest Engine - Replay the Core Brain pipeline on stored history
+Features -> Regime -> Signal -> AI -> 5 Gates, outcomes resolved like Bot 2's SignalTracker
+"""
+import argparse
+import contextlib
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config.settings import settings
+from ..ai.model import AIModel
+from ..data.candle_buffer import TIMEFRAME_MS, candle_column
+from ..features.batch import FUNDING_SLICE
+from ..features.feature_engine import AllFeatures, FeatureEngine
+from ..features.regime import RegimeDetector
+from ..gates.gate_system import DailyState, FiveGateSystem
+from ..signals.signal_generator import Signal, SignalDirection, SignalGenerator
+from .data import candles_from_1m, load_agg_trades_csv, load_funding_csv, load_klines_csv
+
+logger = logging.getLogger(__name__)
+
+# Column of funding.time_to_funding in to_feature_vector()
+TIME_TO_FUNDING_COL = FUNDING_SLICE.start + 6
+FUNDING_PERIOD_MS = 8 * 3600 * 1000
+
+
+@dataclass
+class BacktestData:
+    """Precomputed inputs shared by any number of backtest runs"""
+    close_ms: np.ndarray  # Decision bar close times (ms)
+    price: np.ndarray  # Decision bar close prices (entry price)
+    matrix: np.ndarray  # (n_bars x 100) feature rows
+
+    # Resolution bars (1m), open time in ms
+    bar_ms: np.ndarray
+    bar_interval_ms: int
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+
+@dataclass
+class BacktestTrade:
+    """One approved signal and its outcome"""
+    signal_id: str
+    direction: str
+    strategy: str
+    regime: str
+    entry_time: datetime
+    entry_price: float
+    stop_loss: float
+    take_profit: float
+    confidence: float = 0.0
+    setup_quality: int = 0
+
+    # Outcome (SignalTracker semantics)
+    status: str = "PENDING"  # PENDING, WIN, LOSS, TIMEOUT
+    exit_ms: Optional[int] = None
+    result_price: Optional[float] = None
+    result_pnl: float = 0.0
+    result_reason: str = ""
+    mfe: float = 0.0
+    mae: float = 0.0
+    duration_minutes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'signal_id': self.signal_id,
+            'direction': self.direction,
+            'strategy': self.strategy,
+            'regime': self.regime,
+            'entry_time': self.entry_time.isoformat(),
+            'entry_price': self.entry_price,
+            'stop_loss': self.stop_loss,
+            'take_profit': self.take_profit,
+            'confidence': self.confidence,
+            'setup_quality': self.setup_quality,
+            'status': self.status,
+            'result_price': self.result_price,
+            'result_pnl': self.result_pnl,
+            'result_reason': self.result_reason,
+            'mfe': self.mfe,
+            'mae': self.mae,
+            'duration_minutes': self.duration_minutes
+        }
+
+
+@dataclass
+class BacktestReport:
+    """Aggregate backtest results"""
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    bars: int = 0
+    signals: int = 0  # Potential signals from SignalGenerator
+    gates_passed: int = 0
+    ai_rejected: int = 0  # Passed gates but failed the main loop AI check
+    trades: List[BacktestTrade] = field(default_factory=list)
+    regimes: Counter = field(default_factory=Counter)
+    blocking_gates: Counter = field(default_factory=Counter)
+    gate_stats: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+
+    @property
+    def closed_trades(self) -> List[BacktestTrade]:
+        return [t for t in self.trades if t.status != "PENDING"]
+
+    @property
+    def wins(self) -> int:
+        return sum(1 for t in self.trades if t.status == "WIN")
+
+    @property
+    def losses(self) -> int:
+        return sum(1 for t in self.trades if t.status == "LOSS")
+
+    @property
+    def timeouts(self) -> int:
+        return sum(1 for t in self.trades if t.status == "TIMEOUT")
+
+    @property
+    def total_pnl(self) -> float:
+        return sum(t.result_pnl for t in self.closed_trades)
+
+    @property
+    def win_rate(self) -> float:
+        closed = len(self.closed_trades)
+        return self.wins / closed if closed else 0.0
+
+    @property
+    def max_drawdown(self) -> float:
+        """Largest peak-to-trough drop of cumulative PnL (USD, >= 0)"""
+        equity = np.cumsum([0.0] + [t.result_pnl for t in self.closed_trades])
+        return float(np.max(np.maximum.accumulate(equity) - equity))
+
+    def gate_pass_rates(self) -> Dict[str, float]:
+        """Share of evaluations each gate passed (SKIPPED counts as passed)"""
+        rates = {}
+        for gate_name, counts in sorted(self.gate_stats.items()):
+            evaluated = sum(counts.values())
+            rates[gate_name] = (counts["PASSED"] + counts["SKIPPED"]) / evaluated if evaluated else 0.0
+        return rates
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'start': self.start.isoformat() if self.start else None,
+            'end': self.end.isoformat() if self.end else None,
+            'bars': self.bars,
+            'signals': self.signals,
+            'gates_passed': self.gates_passed,
+            'ai_rejected': self.ai_rejected,
+            'trades': len(self.trades),
+            'wins': self.wins,
+            'losses': self.losses,
+            'timeouts': self.timeouts,
+            'total_pnl': self.total_pnl,
+            'win_rate': self.win_rate,
+            'max_drawdown': self.max_drawdown,
+            'regimes': dict(self.regimes),
+            'blocking_gates': dict(self.blocking_gates),
+            'gate_pass_rates': self.gate_pass_rates()
+        }
+
+    def summary(self) -> str:
+        """Human-readable report"""
+        lines = [
+            f"Backtest {self.start} -> {self.end} ({self.bars} bars)",
+            f"Signals: {self.signals} | Passed gates: {self.gates_passed} | AI rejected: {self.ai_rejected}",
+            f"Trades: {len(self.trades)} | W/L/T: {self.wins}/{self.losses}/{self.timeouts} | "
+            f"Win rate: {self.win_rate:.1%}",
+            f"PnL: ${self.total_pnl:+.2f} | Max drawdown: ${self.max_drawdown:.2f}",
+            "Gate pass rates:"
+        ]
+        for gate_name, rate in self.gate_pass_rates().items():
+            evaluated = sum(self.gate_stats[gate_name].values())
+            lines.append(f"  {gate_name}: {rate:.1%} of {evaluated}")
+        if self.regimes:
+            lines.append("Regimes: " + ", ".join(f"{k} {v}" for k, v in self.regimes.most_common()))
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def _quiet_pipeline_logs(enabled: bool = True):
+    """Silence per-bar INFO/WARNING logs of the replayed components"""
+    if not enabled:
+        yield
+        return
+
+    loggers = [
+        logging.getLogger(cls.__module__)
+        for cls in (RegimeDetector, SignalGenerator, FiveGateSystem, AIModel, FeatureEngine)
+    ]
+    levels = [lg.level for lg in loggers]
+    for lg in loggers:
+        lg.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        for lg, level in zip(loggers, levels):
+            lg.setLevel(level)
+
+
+def prepare_data(
+    candles_by_tf: Dict[str, Any],
+    trades: Optional[Dict[str, np.ndarray]] = None,
+    funding: Optional[Dict[str, np.ndarray]] = None,
+    primary_tf: str = '5m',
+    feature_engine: Optional[FeatureEngine] = None
+) -> BacktestData:
+    """
+    Compute the feature matrix and resolution bars once.
+
+    Args:
+        candles_by_tf: timeframe -> candle columns ('1m', '3m', '5m', '15m');
+            '1m' is also used to resolve TP/SL
+        trades: optional aggTrade columns (microstructure features)
+        funding: optional funding rate columns
+        primary_tf: decision timeframe (signals are evaluated on its closes)
+    """
+    feature_engine = feature_engine or FeatureEngine(use_mock=False)
+    primary = candles_by_tf[primary_tf]
+
+    matrix = feature_engine.calculate_batch(candles_by_tf, trades, funding, primary_tf)
+    close_ms = candle_column(primary, 'timestamp').astype(np.int64) + TIMEFRAME_MS[primary_tf]
+
+    # Live funding comes from markPrice, so minutes to the next 8h funding
+    # are always known; without a funding history, use the schedule
+    if funding is None:
+        next_funding = (close_ms // FUNDING_PERIOD_MS + 1) * FUNDING_PERIOD_MS
+        matrix[:, TIME_TO_FUNDING_COL] = (next_funding - close_ms) // 60000
+
+    resolution_tf = '1m' if candles_by_tf.get('1m') is not None else primary_tf
+    bars = candles_by_tf[resolution_tf]
+
+    return BacktestData(
+        close_ms=close_ms,
+        price=np.asarray(candle_column(primary, 'close'), dtype=np.float64),
+        matrix=matrix,
+        bar_ms=candle_column(bars, 'timestamp').astype(np.int64),
+        bar_interval_ms=TIMEFRAME_MS[resolution_tf],
+        open=np.asarray(candle_column(bars, 'open'), dtype=np.float64),
+        high=np.asarray(candle_column(bars, 'high'), dtype=np.float64),
+        low=np.asarray(candle_column(bars, 'low'), dtype=np.float64),
+        close=np.asarray(candle_column(bars, 'close'), dtype=np.float64)
+    )
+
+
+class BacktestEngine:
+    """
+    Event-driven replay of CoreBrainBot._main_loop on closed bars.
+
+    Each primary bar close is one loop iteration: rebuild AllFeatures from
+    the batch feature row, detect regime, generate a signal, ask the AI and
+    run the 5 gates against a simulated DailyState, with the bar close as
+    the clock. Approved signals are resolved on 1m bars with Bot 2's
+    SignalTracker rules (TP checked before SL, fixed win/loss amounts,
+    timeout at max hold with PnL on notional). Nothing is written to the DB.
+    """
+
+    def __init__(
+        self,
+        regime_detector: Optional[RegimeDetector] = None,
+        signal_generator: Optional[SignalGenerator] = None,
+        gate_system: Optional[FiveGateSystem] = None,
+        ai_model: Optional[AIModel] = None,
+        confidence_threshold: float = 0.65,
+        win_amount: float = 15.0,
+        loss_amount: float = -7.50,
+        max_hold_minutes: int = 240,
+        quiet: bool = True
+    ):
+        self.regime_detector = regime_detector or RegimeDetector()
+        self.signal_generator = signal_generator or SignalGenerator()
+        self.gate_system = gate_system or FiveGateSystem()
+        self.ai_model = ai_model
+        self.confidence_threshold = confidence_threshold
+        self.win_amount = win_amount
+        self.loss_amount = loss_amount
+        self.max_hold_minutes = max_hold_minutes
+        self.quiet = quiet
+
+    @classmethod
+    def from_settings(cls, **params) -> 'BacktestEngine':
+        """
+        Components configured like CoreBrainBot, with optional overrides.
+
+        Keyword arguments named after FiveGateSystem or SignalGenerator
+        constructor parameters override that component's setting; any
+        other keyword is passed to BacktestEngine. Win/loss amounts follow
+        the (possibly overridden) TP/SL and notional.
+        """
+        gate_kwargs = dict(
+            context_min_score=settings.gates.CONTEXT_MIN_SCORE,
+            regime_confidence_min=settings.gates.REGIME_CONFIDENCE_MIN,
+            exhaustion_risk_max=settings.gates.EXHAUSTION_RISK_MAX,
+            structure_quality_min=settings.gates.STRUCTURE_QUALITY_MIN,
+            setup_quality_min=settings.gates.SETUP_QUALITY_MIN,
+            mtf_confluence_min=settings.gates.MTF_CONFLUENCE_MIN,
+            ai_confidence_min=settings.gates.AI_CONFIDENCE_MIN,
+            max_risk_factors=settings.gates.MAX_RISK_FACTORS,
+            daily_target=settings.trading.DAILY_TARGET,
+            daily_stop=settings.trading.DAILY_STOP,
+            max_trades=settings.trading.MAX_TRADES,
+            max_consecutive_losses=settings.trading.MAX_CONSEC_LOSSES,
+            cooldown_minutes=settings.trading.COOLDOWN_MINUTES
+        )
+        signal_kwargs = dict(
+            tp_percent=settings.trading.TP_PERCENT,
+            sl_percent=settings.trading.SL_PERCENT,
+            position_margin=settings.trading.POSITION_MARGIN,
+            leverage=settings.trading.LEVERAGE
+        )
+        engine_kwargs = dict(
+            confidence_threshold=settings.ai.CONFIDENCE_THRESHOLD,
+            max_hold_minutes=settings.trading.MAX_HOLD_MINUTES
+        )
+        for name, value in params.items():
+            if name in gate_kwargs:
+                gate_kwargs[name] = value
+            elif name in signal_kwargs:
+                signal_kwargs[name] = value
+            else:
+                engine_kwargs[name] = value
+
+        notional = signal_kwargs['position_margin'] * signal_kwargs['leverage']
+        engine_kwargs.setdefault('win_amount', notional * signal_kwargs['tp_percent'])
+        engine_kwargs.setdefault('loss_amount', -notional * signal_kwargs['sl_percent'])
+        if 'ai_model' not in engine_kwargs:
+            engine_kwargs['ai_model'] = AIModel(
+                model_path=settings.ai.MODEL_PATH,
+                confidence_threshold=settings.ai.CONFIDENCE_THRESHOLD
+            )
+
+        return cls(
+            signal_generator=SignalGenerator(**signal_kwargs),
+            gate_system=FiveGateSystem(**gate_kwargs),
+            **engine_kwargs
+        )
+
+    def scan(self, data: BacktestData) -> np.ndarray:
+        """
+        Indices of bars where SignalGenerator produces a potential signal.
+
+        Regime and signal existence depend only on the features, not on
+        gate thresholds, TP/SL or daily state, so the result can be reused
+        by run() for any parameter set.
+        """
+        candidates = []
+        prices = data.price.tolist()
+        with _quiet_pipeline_logs(self.quiet):
+            for i, now_ms in enumerate(data.close_ms.tolist()):
+                now = datetime.utcfromtimestamp(now_ms / 1000)
+                features = AllFeatures.from_feature_vector(data.matrix[i], timestamp=now, current_price=prices[i])
+                regime = self.regime_detector.detect(features)
+                if regime.is_tradeable and self.signal_generator.generate(features, regime, now=now):
+                    candidates.append(i)
+        return np.array(candidates, dtype=np.int64)
+
+    def run(self, data: BacktestData, candidates: Optional[np.ndarray] = None) -> BacktestReport:
+        """
+        Replay the decision bars and return the aggregate report.
+
+        With `candidates` from scan(), only those bars are evaluated (same
+        trades, much faster); regime counts then cover candidate bars only.
+        """
+        report = BacktestReport(bars=len(data.close_ms))
+        if report.bars == 0:
+            return report
+
+        report.start = datetime.utcfromtimestamp(data.close_ms[0] / 1000)
+        report.end = datetime.utcfromtimestamp(data.close_ms[-1] / 1000)
+
+        state: Optional[DailyState] = None
+        open_trade: Optional[BacktestTrade] = None
+        close_ms = data.close_ms.tolist()
+        prices = data.price.tolist()
+        indices = range(report.bars) if candidates is None else candidates.tolist()
+
+        with _quiet_pipeline_logs(self.quiet):
+            for i in indices:
+                now_ms = close_ms[i]
+                now = datetime.utcfromtimestamp(now_ms / 1000)
+
+                # Bot 2 settles the outcome on the day it happens
+                if open_trade and open_trade.exit_ms is not None and open_trade.exit_ms <= now_ms:
+                    exit_time = datetime.utcfromtimestamp(open_trade.exit_ms / 1000)
+                    state = self._state_for_day(state, exit_time.date().isoformat(), has_position=True)
+                    self._settle(state, open_trade, exit_time)
+                    open_trade = None
+
+                state = self._state_for_day(state, now.date().isoformat(), has_position=open_trade is not None)
+                if state.should_stop:
+                    continue
+
+                trade = self._step(report, data.matrix[i], now, prices[i], state)
+                if trade:
+                    self._resolve(trade, data, now_ms)
+                    report.trades.append(trade)
+                    state.trade_count += 1
+                    state.has_position = True
+                    open_trade = trade
+
+        return report
+
+    def _step(
+        self,
+        report: BacktestReport,
+        row: np.ndarray,
+        now: datetime,
+        price: float,
+        state: DailyState
+    ) -> Optional[BacktestTrade]:
+        """One main loop iteration; returns the trade if a signal is approved"""
+        features = AllFeatures.from_feature_vector(row, timestamp=now, current_price=price)
+
+        regime = self.regime_detector.detect(features)
+        report.regimes[regime.regime_type.value] += 1
+        if not regime.is_tradeable:
+            return None
+
+        signal = self.signal_generator.generate(features, regime, now=now)
+        if signal is None:
+            return None
+        report.signals += 1
+
+        ai_result = None
+        if self.ai_model is not None:
+            try:
+                ai_result = self.ai_model.predict(features)
+            except Exception as e:
+                logger.error(f"AI prediction failed: {e}")
+
+        gate_result = self.gate_system.evaluate(
+            features=features,
+            regime=regime,
+            signal={
+                'direction': signal.direction.value,
+                'setup_quality': signal.setup_quality
+            },
+            daily_state=state,
+            ai_result=ai_result.to_dict() if ai_result else None,
+            now=now
+        )
+        for gate in gate_result.gate_results:
+            report.gate_stats[gate.gate_name][gate.status.value] += 1
+        if not gate_result.passed:
+            report.blocking_gates[gate_result.blocking_gate] += 1
+            return None
+        report.gates_passed += 1
+
+        # Main loop final check: AI must be confident and agree on direction
+        if self.ai_model is not None:
+            if (not ai_result or ai_result.confidence < self.confidence_threshold
+                    or ai_result.direction != signal.direction.value):
+                report.ai_rejected += 1
+                return None
+            signal.confidence = ai_result.confidence
+
+        return self._open_trade(signal)
+
+    def _open_trade(self, signal: Signal) -> BacktestTrade:
+        return BacktestTrade(
+            signal_id=signal.signal_id,
+            direction=signal.direction.value,
+            strategy=signal.strategy.value,
+            regime=signal.regime,
+            entry_time=signal.created_at,
+            entry_price=signal.entry_price,
+            stop_loss=signal.stop_loss,
+            take_profit=signal.take_profit,
+            confidence=signal.confidence,
+            setup_quality=signal.setup_quality
+        )
+
+    def _resolve(self, trade: BacktestTrade, data: BacktestData, entry_ms: int):
+        """
+        Resolve TP/SL/timeout on the bars after entry.
+
+        SignalTracker checks each polled price against TP first, then SL.
+        Within a bar the path is assumed open -> nearer wick -> farther wick
+        -> close (low first on up bars, high first on down bars), so a bar
+        touching both levels resolves to whichever the path reaches first.
+        Trades the history cannot resolve stay PENDING.
+        """
+        timeout_ms = entry_ms + self.max_hold_minutes * 60000
+        start = int(np.searchsorted(data.bar_ms, entry_ms, side='left'))
+        end = int(np.searchsorted(data.bar_ms, timeout_ms, side='left'))
+
+        highs = data.high[start:end]
+        lows = data.low[start:end]
+        is_long = trade.direction == SignalDirection.LONG.value
+
+        if is_long:
+            tp_hit = highs >= trade.take_profit
+            sl_hit = lows <= trade.stop_loss
+        else:
+            tp_hit = lows <= trade.take_profit
+            sl_hit = highs >= trade.stop_loss
+
+        n = len(highs)
+        first_tp = int(np.argmax(tp_hit)) if tp_hit.any() else n
+        first_sl = int(np.argmax(sl_hit)) if sl_hit.any() else n
+        k = min(first_tp, first_sl)
+
+        if k < n:
+            win = first_tp < first_sl
+            if first_tp == first_sl:
+                win = self._tp_first(trade, data.open[start + k], data.close[start + k], is_long)
+
+            trade.status = "WIN" if win else "LOSS"
+            trade.result_price = trade.take_profit if win else trade.stop_loss
+            trade.result_pnl = self.win_amount if win else self.loss_amount
+            trade.result_reason = "TP_HIT" if win else "SL_HIT"
+            trade.exit_ms = int(data.bar_ms[start + k]) + data.bar_interval_ms
+            max_price = max(float(highs[:k].max()) if k else trade.result_price, trade.result_price)
+            min_price = min(float(lows[:k].min()) if k else trade.result_price, trade.result_price)
+        elif n and data.bar_ms[start + n - 1] + data.bar_interval_ms >= timeout_ms:
+            trade.status = "TIMEOUT"
+            trade.result_price = float(data.close[start + n - 1])
+            trade.result_reason = "TIMEOUT"
+            trade.exit_ms = timeout_ms
+            if is_long:
+                pnl_percent = (trade.result_price - trade.entry_price) / trade.entry_price
+            else:
+                pnl_percent = (trade.entry_price - trade.result_price) / trade.entry_price
+            trade.result_pnl = pnl_percent * self.signal_generator.position_margin * self.signal_generator.leverage
+            max_price = float(highs.max())
+            min_price = float(lows.min())
+        else:
+            return
+
+        trade.duration_minutes = int((trade.exit_ms - entry_ms) / 60000)
+        if is_long:
+            mfe = (max_price - trade.entry_price) / trade.entry_price * 100
+            mae = (trade.entry_price - min_price) / trade.entry_price * 100
+        else:
+            mfe = (trade.entry_price - min_price) / trade.entry_price * 100
+            mae = (max_price - trade.entry_price) / trade.entry_price * 100
+        trade.mfe, trade.mae = max(0, mfe), max(0, mae)
+
+    @staticmethod
+    def _tp_first(trade: BacktestTrade, open_: float, close: float, is_long: bool) -> bool:
+        """Whether TP is reached before SL inside a bar that touches both"""
+        if is_long:
+            if open_ >= trade.take_profit:
+                return True
+            if open_ <= trade.stop_loss:
+                return False
+            return close < open_  # Down bar: high first
+        if open_ <= trade.take_profit:
+            return True
+        if open_ >= trade.stop_loss:
+            return False
+        return close >= open_  # Up bar: low first
+
+    def _state_for_day(self, state: Optional[DailyState], day: str, has_position: bool = False) -> DailyState:
+        """
+        Current daily state, reset on a new UTC day like _check_new_day.
+        A position still open at midnight carries into the new day, so no
+        second trade opens before it settles.
+        """
+        if state is None or state.date != day:
+            return DailyState(date=day, has_position=has_position)
+        return state
+
+    def _settle(self, state: DailyState, trade: BacktestTrade, exit_time: datetime):
+        """Apply a result to the daily state like Bot 2's update_daily_state"""
+        state.pnl += trade.result_pnl
+        if trade.status == "WIN":
+            state.wins += 1
+            state.consecutive_losses = 0
+        else:
+            state.losses += 1
+            state.consecutive_losses += 1
+        state.has_position = False
+        state.last_trade_time = exit_time
+
+        if state.pnl >= self.gate_system.daily_target:
+            state.status = "TARGET_HIT"
+        elif state.pnl <= self.gate_system.daily_stop:
+            state.status = "STOP_HIT"
+        elif state.trade_count >= self.gate_system.max_trades:
+            state.status = "MAX_TRADES"
+
+
+def main():
+    """Run a backtest from stored Binance dumps: python -m src.backtest.engine"""
+    parser = argparse.ArgumentParser(description="Replay the Core Brain pipeline on history")
+    parser.add_argument('--klines', required=True, help="1m kline CSV or .npz")
+    parser.add_argument('--trades', help="aggTrades CSV or .npz (microstructure features)")
+    parser.add_argument('--funding', help="fundingRate CSV or .npz")
+    parser.add_argument('--primary-tf', default='5m', choices=['1m', '3m', '5m', '15m'])
+    parser.add_argument('--trades-out', help="Write the trade list as CSV")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    candles_by_tf = candles_from_1m(load_klines_csv(args.klines))
+    trades = load_agg_trades_csv(args.trades) if args.trades else None
+    funding = load_funding_csv(args.funding) if args.funding else None
+
+    logger.info(f"Computing features for {len(candles_by_tf[args.primary_tf]['close'])} {args.primary_tf} bars...")
+    data = prepare_data(candles_by_tf, trades, funding, args.primary_tf)
+
+    logger.info("Replaying pipeline...")
+    report = BacktestEngine.from_settings().run(data)
+    print(report.summary())
+
+    if args.trades_out and report.trades:
+        import csv
+        with open(args.trades_out, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(report.trades[0].to_dict()))
+            writer.writeheader()
+            for trade in report.trades:
+                writer.writerow(trade.to_dict())
+
+
+if __name__ == "__main__":
+    main()
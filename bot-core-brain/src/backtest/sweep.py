@@ -0,0 +1,267 @@
+"""
+Parameter Sweep - Grid/random search over gate and signal parameters
+Fans backtests over a process pool sharing one precomputed feature matrix
+"""
+import argparse
+import csv
+import itertools
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from ..ai.model import AIModel
+from .data import candles_from_1m, load_agg_trades_csv, load_funding_csv, load_klines_csv
+from .engine import BacktestData, BacktestEngine, prepare_data
+
+logger = logging.getLogger(__name__)
+
+# Search space: name -> list of values (grid/random choice) or (low, high) (random only)
+DEFAULT_SPACE: Dict[str, Any] = {
+    'context_min_score': [0.4, 0.5, 0.6],
+    'regime_confidence_min': [0.55, 0.65, 0.75],
+    'setup_quality_min': [70, 75, 80],
+    'ai_confidence_min': [0.6, 0.65, 0.7],
+    'tp_percent': [0.004, 0.005, 0.006],
+    'sl_percent': [0.002, 0.0025, 0.003],
+}
+
+RESULT_COLUMNS = [
+    'trades', 'wins', 'losses', 'timeouts', 'win_rate',
+    'total_pnl', 'max_drawdown', 'signals', 'gates_passed'
+]
+
+
+# ==================== Parameter sets ====================
+
+def grid_params(space: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every combination of a space of value lists"""
+    names = list(space)
+    for name in names:
+        if isinstance(space[name], tuple):
+            raise ValueError(f"Grid search needs a value list for {name}, got range {space[name]}")
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_params(space: Dict[str, Any], n: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """n random draws: lists are sampled, (low, high) ranges drawn uniformly"""
+    rng = random.Random(seed)
+    draws = []
+    for _ in range(n):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = rng.randint(low, high)
+                else:
+                    params[name] = rng.uniform(low, high)
+            else:
+                params[name] = rng.choice(values)
+        draws.append(params)
+    return draws
+
+
+# ==================== Shared memory ====================
+
+class SharedBacktestData:
+    """
+    BacktestData arrays (and scan candidates) copied once into shared
+    memory. Workers attach to the blocks by name instead of receiving
+    pickled copies or recomputing features.
+    """
+
+    def __init__(self, data: BacktestData, candidates: np.ndarray):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.spec: Dict[str, Any] = {'arrays': {}, 'scalars': {}}
+
+        arrays = {f.name: getattr(data, f.name) for f in fields(BacktestData)}
+        arrays['candidates'] = candidates
+        for name, value in arrays.items():
+            if not isinstance(value, np.ndarray):
+                self.spec['scalars'][name] = value
+                continue
+            value = np.ascontiguousarray(value)
+            block = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+            np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+            self._blocks.append(block)
+            self.spec['arrays'][name] = (block.name, value.shape, value.dtype.str)
+
+    def close(self):
+        """Release and unlink the blocks (owner side)"""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> 'SharedBacktestData':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_shared(spec: Dict[str, Any]) -> Tuple[BacktestData, np.ndarray, list]:
+    """Zero-copy BacktestData views over shared blocks (keep the blocks referenced)"""
+    blocks = []
+    values = dict(spec['scalars'])
+    for name, (block_name, shape, dtype) in spec['arrays'].items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        values[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    candidates = values.pop('candidates')
+    return BacktestData(**values), candidates, blocks
+
+
+# ==================== Workers ====================
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(spec: Dict[str, Any]):
+    """Attach shared data and load the AI model once per worker"""
+    data, candidates, blocks = attach_shared(spec)
+    _worker_state.update(
+        data=data,
+        candidates=candidates,
+        blocks=blocks,
+        ai_model=AIModel(
+            model_path=settings.ai.MODEL_PATH,
+            confidence_threshold=settings.ai.CONFIDENCE_THRESHOLD
+        )
+    )
+
+
+def _run_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Backtest one parameter set on the shared data"""
+    engine = BacktestEngine.from_settings(ai_model=_worker_state['ai_model'], **params)
+    report = engine.run(_worker_state['data'], _worker_state['candidates'])
+    summary = report.to_dict()
+    row = dict(params)
+    row.update({name: summary[name] for name in RESULT_COLUMNS})
+    return row
+
+
+# ==================== Runner ====================
+
+def rank_results(
+    rows: List[Dict[str, Any]],
+    metric: str = 'total_pnl',
+    min_trades: int = 0
+) -> List[Dict[str, Any]]:
+    """Best first by `metric` (ties: lower drawdown); rows under min_trades go last"""
+    return sorted(
+        rows,
+        key=lambda r: (r['trades'] >= min_trades, r[metric], -r['max_drawdown']),
+        reverse=True
+    )
+
+
+def write_results(rows: List[Dict[str, Any]], path: str):
+    """Write ranked rows as CSV with a rank column"""
+    if not rows:
+        return
+    columns = ['rank'] + [c for c in rows[0] if c not in RESULT_COLUMNS] + RESULT_COLUMNS
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for rank, row in enumerate(rows, 1):
+            writer.writerow({'rank': rank, **row})
+
+
+def run_sweep(
+    data: BacktestData,
+    param_sets: Sequence[Dict[str, Any]],
+    workers: Optional[int] = None,
+    metric: str = 'total_pnl',
+    min_trades: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Backtest every parameter set across a process pool.
+
+    Candidate bars are scanned once in the parent (they do not depend on
+    the swept parameters), then data and candidates go to shared memory
+    and each worker only replays the candidate bars per parameter set.
+
+    Returns:
+        Result rows (params + metrics) ranked best first
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.time()
+
+    candidates = BacktestEngine.from_settings().scan(data)
+    logger.info(f"{len(candidates)} candidate bars of {len(data.close_ms)} ({time.time() - started:.1f}s)")
+
+    with SharedBacktestData(data, candidates) as shared:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared.spec,)
+        ) as pool:
+            chunksize = max(1, len(param_sets) // (workers * 4))
+            rows = list(pool.map(_run_params, param_sets, chunksize=chunksize))
+
+    logger.info(f"{len(rows)} backtests on {workers} workers in {time.time() - started:.1f}s")
+    return rank_results(rows, metric, min_trades)
+
+
+def _parse_param(text: str) -> Tuple[str, Any]:
+    """'name=v1,v2,v3' -> value list, 'name=low:high' -> range"""
+    name, _, values = text.partition('=')
+
+    def number(v: str):
+        return int(v) if v.lstrip('-').isdigit() else float(v)
+
+    if ':' in values:
+        low, high = values.split(':')
+        return name, (number(low), number(high))
+    return name, [number(v) for v in values.split(',')]
+
+
+def main():
+    """Run a sweep from stored Binance dumps: python -m src.backtest.sweep"""
+    parser = argparse.ArgumentParser(description="Grid/random search of gate and signal parameters")
+    parser.add_argument('--klines', required=True, help="1m kline CSV or .npz")
+    parser.add_argument('--trades', help="aggTrades CSV or .npz (microstructure features)")
+    parser.add_argument('--funding', help="fundingRate CSV or .npz")
+    parser.add_argument('--primary-tf', default='5m', choices=['1m', '3m', '5m', '15m'])
+    parser.add_argument('--param', action='append', default=[],
+                        help="Override the space: name=v1,v2 or name=low:high (repeatable)")
+    parser.add_argument('--random', type=int, default=0, help="Random search draws (default: full grid)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--metric', default='total_pnl', choices=RESULT_COLUMNS)
+    parser.add_argument('--min-trades', type=int, default=10)
+    parser.add_argument('--output', default='sweep_results.csv')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    space = dict(DEFAULT_SPACE)
+    space.update(_parse_param(p) for p in args.param)
+    param_sets = random_params(space, args.random, args.seed) if args.random else grid_params(space)
+
+    candles_by_tf = candles_from_1m(load_klines_csv(args.klines))
+    trades = load_agg_trades_csv(args.trades) if args.trades else None
+    funding = load_funding_csv(args.funding) if args.funding else None
+    data = prepare_data(candles_by_tf, trades, funding, args.primary_tf)
+
+    rows = run_sweep(data, param_sets, args.workers, args.metric, args.min_trades)
+    write_results(rows, args.output)
+
+    print(f"Top {args.top} of {len(rows)} (by {args.metric}, min {args.min_trades} trades):")
+    for rank, row in enumerate(rows[:args.top], 1):
+        params = ", ".join(f"{k}={row[k]}" for k in space)
+        print(f"{rank:>3}. PnL ${row['total_pnl']:+.2f} | WR {row['win_rate']:.1%} | "
+              f"{row['trades']} trades | DD ${row['max_drawdown']:.2f} | {params}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,6 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Callable, Any
 from dataclasses import dataclass, field
-from collections import deque
 import aiohttp
 import websockets
 from websockets.exceptions import ConnectionClosed
@@ -16,126 +15,37 @@ import hmac
 import hashlib
 import time
 
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class Candle:
-    """OHLCV Candle data"""
-    timestamp: datetime
-    open: float
-    high: float
-    low: float
-    close: float
-    volume: float
-    quote_volume: float
-    trades: int
-    is_closed: bool = False
-    
-    @property
-    def body(self) -> float:
-        return abs(self.close - self.open)
-    
-    @property
-    def range(self) -> float:
-        return self.high - self.low
-    
-    @property
-    def body_percent(self) -> float:
-        if self.range == 0:
-            return 0
-        return self.body / self.range
-    
-    @property
-    def upper_wick(self) -> float:
-        return self.high - max(self.open, self.close)
-    
-    @property
-    def lower_wick(self) -> float:
-        return min(self.open, self.close) - self.low
-    
-    @property
-    def is_bullish(self) -> bool:
-        return self.close > self.open
-
-
-@dataclass
-class Trade:
-    """Trade data"""
-    timestamp: datetime
-    price: float
-    quantity: float
-    is_buyer_maker: bool  # True = sell aggressor, False = buy aggressor
-    
-    @property
-    def is_buy(self) -> bool:
-        return not self.is_buyer_maker
-
-
-@dataclass
-class OrderBookLevel:
-    """Order book level"""
-    price: float
-    quantity: float
-
-
-@dataclass
-class OrderBook:
-    """Order book snapshot"""
-    timestamp: datetime
-    bids: List[OrderBookLevel] = field(default_factory=list)
-    asks: List[OrderBookLevel] = field(default_factory=list)
-    
-    @property
-    def best_bid(self) -> float:
-        return self.bids[0].price if self.bids else 0
-    
-    @property
-    def best_ask(self) -> float:
-        return self.asks[0].price if self.asks else 0
-    
-    @property
-    def mid_price(self) -> float:
-        return (self.best_bid + self.best_ask) / 2
-    
-    @property
-    def spread(self) -> float:
-        return self.best_ask - self.best_bid
-    
-    @property
-    def spread_percent(self) -> float:
-        if self.mid_price == 0:
-            return 0
-        return (self.spread / self.mid_price) * 100
-    
-    def get_imbalance(self, levels: int = 10) -> float:
-        """Calculate order book imbalance"""
-        bid_volume = sum(b.quantity for b in self.bids[:levels])
-        ask_volume = sum(a.quantity for a in self.asks[:levels])
-        total = bid_volume + ask_volume
-        if total == 0:
-            return 0
-        return (bid_volume - ask_volume) / total
+from .models import (
+    Candle, Trade, OrderBookLevel, OrderBook, FundingRate, MarketEvent, MarketEventType
+)
+from .candle_buffer import CandleBuffer
+from .fast_json import get_decoder
+from .order_book import SNAPSHOT_LIMIT, LocalOrderBook
+from .trade_buffer import TradeBuffer
+from .trade_flow import TradeFlow
+from .volume_profile import VolumeProfile
 
+logger = logging.getLogger(__name__)
 
-@dataclass
-class FundingRate:
-    """Funding rate data"""
-    timestamp: datetime
-    funding_rate: float
-    mark_price: float
-    next_funding_time: datetime
+# Trades are published to callbacks in batches spanning at least this long
+TRADE_BATCH_MS = 1000
 
 
 @dataclass
 class MarketData:
     """Container for all market data"""
-    candles: Dict[str, List[Candle]] = field(default_factory=dict)
-    trades: deque = field(default_factory=lambda: deque(maxlen=1000))
-    orderbook: Optional[OrderBook] = None
+    candles: Dict[str, CandleBuffer] = field(default_factory=dict)
+    trades: TradeBuffer = field(default_factory=TradeBuffer)  # Last 15 minutes of aggTrades
+    trade_flow: TradeFlow = field(default_factory=TradeFlow)  # Windowed order flow
+    volume_profile: VolumeProfile = field(default_factory=VolumeProfile)  # Session profile
+    orderbook: LocalOrderBook = field(default_factory=LocalOrderBook)  # Synced from @depth diffs
     funding: Optional[FundingRate] = None
     last_price: float = 0.0
-    last_update: Optional[datetime] = None
+    last_update_ms: int = 0  # Market clock time of the last processed message
+
+    @property
+    def last_update(self) -> Optional[datetime]:
+        return datetime.utcfromtimestamp(self.last_update_ms / 1000) if self.last_update_ms else None
 
 
 class BinanceClient:
@@ -146,7 +56,9 @@ class BinanceClient:
         api_key: str = "",
         api_secret: str = "",
         testnet: bool = True,
-        symbol: str = "BTCUSDT"
+        symbol: str = "BTCUSDT",
+        recorder=None,
+        json_decoder: Optional[str] = None
     ):
         self.api_key = api_key
         self.api_secret = api_secret
@@ -165,35 +77,74 @@ class BinanceClient:
         # Data storage
         self.data = MarketData()
         self.data.candles = {
-            "1m": deque(maxlen=500),
-            "3m": deque(maxlen=500),
-            "5m": deque(maxlen=500),
-            "15m": deque(maxlen=500)
+            "1m": CandleBuffer(500),
+            "3m": CandleBuffer(500),
+            "5m": CandleBuffer(500),
+            "15m": CandleBuffer(500)
         }
         
         # Connection state
         self._ws_connection = None
         self._running = False
         self._callbacks: List[Callable] = []
+        self._trade_batch = 0
+        self._trade_batch_start_ms = 0
+        self._depth_task: Optional[asyncio.Task] = None
+        self._depth_retry_at = 0.0
+        
+        # Optional MarketRecorder: raw messages are archived before processing
+        self.recorder = recorder
+        
+        # Message decoding (fastest installed unless named) and handlers by event type
+        self._decode = get_decoder(json_decoder)
+        self._handlers: Dict[str, Callable] = {
+            "kline": self._handle_kline,
+            "aggTrade": self._handle_trade,
+            "depthUpdate": self._handle_depth,
+            "markPriceUpdate": self._handle_mark_price,
+        }
         
         # Session for REST API
         self._session: Optional[aiohttp.ClientSession] = None
     
     def add_callback(self, callback: Callable):
-        """Add callback for data updates"""
+        """
+        Add callback for market events.
+        
+        Called as callback(event) with a MarketEvent (kline closed per
+        timeframe, trade batch, depth update); read state via get_data().
+        Callbacks run inline on the message path, so keep them short
+        (e.g. put the event on a queue).
+        """
         self._callbacks.append(callback)
     
-    async def _notify_callbacks(self):
+    async def _notify_callbacks(self, event: MarketEvent):
         """Notify all callbacks"""
         for callback in self._callbacks:
             try:
                 if asyncio.iscoroutinefunction(callback):
-                    await callback(self.data)
+                    await callback(event)
                 else:
-                    callback(self.data)
+                    callback(event)
             except Exception as e:
                 logger.error(f"Callback error: {e}")
     
+    def now(self) -> datetime:
+        """Market clock (UTC); ReplayClient returns the replayed time"""
+        return datetime.utcnow()
+    
+    def now_ms(self) -> int:
+        """Market clock in epoch ms (no datetime on the message path)"""
+        return int(time.time() * 1000)
+    
+    async def sleep(self, seconds: float):
+        """Sleep on the market clock; ReplayClient waits for replayed time instead"""
+        await asyncio.sleep(seconds)
+    
+    async def wait_for(self, awaitable, timeout: float):
+        """asyncio.wait_for with the timeout on the market clock"""
+        return await asyncio.wait_for(awaitable, timeout)
+    
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session"""
         if self._session is None or self._session.closed:
@@ -226,6 +177,7 @@ class BinanceClient:
             async with session.get(url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
+                    now_ms = int(time.time() * 1000)
                     candles = []
                     for item in data:
                         candle = Candle(
@@ -237,7 +189,8 @@ class BinanceClient:
                             volume=float(item[5]),
                             quote_volume=float(item[7]),
                             trades=int(item[8]),
-                            is_closed=True
+                            # Last kline is still forming until its close time passes
+                            is_closed=item[6] < now_ms
                         )
                         candles.append(candle)
                     return candles
@@ -262,7 +215,7 @@ class BinanceClient:
                         timestamp=datetime.utcnow(),
                         funding_rate=float(data.get("lastFundingRate", 0)),
                         mark_price=float(data.get("markPrice", 0)),
-                        next_funding_time=datetime.fromtimestamp(
+                        next_funding_time=datetime.utcfromtimestamp(
                             int(data.get("nextFundingTime", 0)) / 1000
                         )
                     )
@@ -271,8 +224,8 @@ class BinanceClient:
             logger.error(f"Error fetching funding rate: {e}")
             return None
     
-    async def fetch_orderbook(self, limit: int = 20) -> Optional[OrderBook]:
-        """Fetch order book snapshot"""
+    async def fetch_depth_snapshot(self, limit: int = SNAPSHOT_LIMIT) -> Optional[Dict]:
+        """Fetch a raw depth snapshot (lastUpdateId, bids, asks)"""
         session = await self._get_session()
         url = f"{self.rest_base_url}/fapi/v1/depth"
         params = {"symbol": self.symbol_upper, "limit": limit}
@@ -280,16 +233,22 @@ class BinanceClient:
         try:
             async with session.get(url, params=params) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    return OrderBook(
-                        timestamp=datetime.utcnow(),
-                        bids=[OrderBookLevel(float(b[0]), float(b[1])) for b in data["bids"]],
-                        asks=[OrderBookLevel(float(a[0]), float(a[1])) for a in data["asks"]]
-                    )
+                    return await response.json()
                 return None
         except Exception as e:
-            logger.error(f"Error fetching orderbook: {e}")
+            logger.error(f"Error fetching depth snapshot: {e}")
+            return None
+    
+    async def fetch_orderbook(self, limit: int = 20) -> Optional[OrderBook]:
+        """Fetch order book snapshot"""
+        data = await self.fetch_depth_snapshot(limit)
+        if data is None:
             return None
+        return OrderBook(
+            timestamp=datetime.utcnow(),
+            bids=[OrderBookLevel(float(b[0]), float(b[1])) for b in data["bids"]],
+            asks=[OrderBookLevel(float(a[0]), float(a[1])) for a in data["asks"]]
+        )
     
     async def get_current_price(self) -> float:
         """Get current price"""
@@ -315,7 +274,7 @@ class BinanceClient:
             f"{self.symbol}@kline_5m",
             f"{self.symbol}@kline_15m",
             f"{self.symbol}@aggTrade",
-            f"{self.symbol}@depth20@100ms",
+            f"{self.symbol}@depth@100ms",
             f"{self.symbol}@markPrice@1s"
         ]
         stream_path = "/".join(streams)
@@ -324,23 +283,14 @@ class BinanceClient:
     async def _process_message(self, message: str):
         """Process incoming WebSocket message"""
         try:
-            data = json.loads(message)
+            data = self._decode(message)
             
-            if "e" not in data:
+            handler = self._handlers.get(data.get("e"))
+            if handler is None:
                 return
+            await handler(data)
             
-            event_type = data["e"]
-            
-            if event_type == "kline":
-                await self._handle_kline(data)
-            elif event_type == "aggTrade":
-                await self._handle_trade(data)
-            elif event_type == "depthUpdate":
-                await self._handle_depth(data)
-            elif event_type == "markPriceUpdate":
-                await self._handle_mark_price(data)
-            
-            self.data.last_update = datetime.utcnow()
+            self.data.last_update_ms = self.now_ms()
             
         except Exception as e:
             logger.error(f"Error processing message: {e}")
@@ -350,62 +300,100 @@ class BinanceClient:
         k = data["k"]
         interval = k["i"]
         
-        candle = Candle(
-            timestamp=datetime.fromtimestamp(k["t"] / 1000),
-            open=float(k["o"]),
-            high=float(k["h"]),
-            low=float(k["l"]),
-            close=float(k["c"]),
-            volume=float(k["v"]),
-            quote_volume=float(k["q"]),
-            trades=k["n"],
-            is_closed=k["x"]
-        )
-        
-        self.data.last_price = candle.close
+        close = float(k["c"])
+        self.data.last_price = close
         
         if interval in self.data.candles:
-            candles = self.data.candles[interval]
-            
-            # Update or append
-            if candles and not candle.is_closed:
-                # Update current candle
-                if candles[-1].timestamp == candle.timestamp:
-                    candles[-1] = candle
-                else:
-                    candles.append(candle)
-            elif candle.is_closed:
-                candles.append(candle)
+            # Forming candle is updated in place; close finalizes it
+            self.data.candles[interval].update(
+                k["t"],
+                float(k["o"]),
+                float(k["h"]),
+                float(k["l"]),
+                close,
+                float(k["v"]),
+                float(k["q"]),
+                k["n"],
+                k["x"]
+            )
+        
+        if k["x"] and self._callbacks:
+            await self._notify_callbacks(MarketEvent(
+                type=MarketEventType.KLINE_CLOSED,
+                timestamp=self.now(),
+                timeframe=interval,
+                open_time_ms=k["t"]
+            ))
     
     async def _handle_trade(self, data: Dict):
         """Handle aggregate trade"""
-        trade = Trade(
-            timestamp=datetime.fromtimestamp(data["T"] / 1000),
-            price=float(data["p"]),
-            quantity=float(data["q"]),
-            is_buyer_maker=data["m"]
-        )
+        price = float(data["p"])
+        quantity = float(data["q"])
+        
+        self.data.trades.add(data["T"], price, quantity, data["m"])
+        self.data.trade_flow.add(data["T"], price, quantity, data["m"])
+        self.data.volume_profile.add(data["T"], price, quantity)
+        self.data.last_price = price
         
-        self.data.trades.append(trade)
-        self.data.last_price = trade.price
+        if self._callbacks:
+            self._trade_batch += 1
+            if data["T"] - self._trade_batch_start_ms >= TRADE_BATCH_MS:
+                count, self._trade_batch = self._trade_batch, 0
+                self._trade_batch_start_ms = data["T"]
+                await self._notify_callbacks(MarketEvent(
+                    type=MarketEventType.TRADES,
+                    timestamp=self.now(),
+                    count=count
+                ))
     
     async def _handle_depth(self, data: Dict):
-        """Handle order book update"""
-        self.data.orderbook = OrderBook(
-            timestamp=datetime.utcnow(),
-            bids=[OrderBookLevel(float(b[0]), float(b[1])) for b in data.get("b", [])],
-            asks=[OrderBookLevel(float(a[0]), float(a[1])) for a in data.get("a", [])]
-        )
+        """Handle a diff depth update (applied to the local order book)"""
+        book = self.data.orderbook
+        applied = book.on_event(data)
+        if book.needs_snapshot:
+            self._request_depth_snapshot()
+        
+        if applied and self._callbacks:
+            await self._notify_callbacks(MarketEvent(
+                type=MarketEventType.DEPTH,
+                timestamp=self.now()
+            ))
+    
+    def _request_depth_snapshot(self):
+        """Start a snapshot fetch unless one is running or a failed one is backing off"""
+        if self._depth_task is not None and not self._depth_task.done():
+            return
+        if time.monotonic() < self._depth_retry_at:
+            return
+        self._depth_task = asyncio.create_task(self._sync_order_book())
+    
+    async def _sync_order_book(self):
+        """Fetch a depth snapshot and apply it with the events buffered meanwhile"""
+        snapshot = await self.fetch_depth_snapshot()
+        if snapshot is None:
+            self._depth_retry_at = time.monotonic() + 5
+            return
+        if self.recorder:
+            self.recorder.record(json.dumps({
+                "e": "depthSnapshot",
+                "E": int(time.time() * 1000),
+                "s": self.symbol_upper,
+                "lastUpdateId": snapshot["lastUpdateId"],
+                "bids": snapshot["bids"],
+                "asks": snapshot["asks"]
+            }))
+        if self.data.orderbook.apply_snapshot(snapshot["lastUpdateId"], snapshot["bids"], snapshot["asks"]):
+            logger.info(f"Order book synced at update {self.data.orderbook.update_id}")
     
     async def _handle_mark_price(self, data: Dict):
         """Handle mark price/funding update"""
         self.data.funding = FundingRate(
-            timestamp=datetime.utcnow(),
+            timestamp=self.now(),
             funding_rate=float(data.get("r", 0)),
             mark_price=float(data.get("p", 0)),
-            next_funding_time=datetime.fromtimestamp(
+            next_funding_time=datetime.utcfromtimestamp(
                 int(data.get("T", 0)) / 1000
-            ) if data.get("T") else datetime.utcnow()
+            ) if data.get("T") else self.now()
         )
     
     async def connect(self):
@@ -415,11 +403,13 @@ class BinanceClient:
         # Load historical data first
         for tf in ["1m", "3m", "5m", "15m"]:
             candles = await self.fetch_historical_candles(tf, 500)
-            self.data.candles[tf] = deque(candles, maxlen=500)
+            self.data.candles[tf].clear()
+            self.data.candles[tf].extend(candles)
             logger.info(f"Loaded {len(candles)} {tf} candles")
+            if self.recorder:
+                self._record_candle_snapshot(tf)
         
-        # Fetch initial orderbook and funding
-        self.data.orderbook = await self.fetch_orderbook()
+        # Fetch initial funding (the order book syncs on the first depth update)
         self.data.funding = await self.fetch_funding_rate()
         
         self._running = True
@@ -437,6 +427,8 @@ class BinanceClient:
                                 ws.recv(),
                                 timeout=30.0
                             )
+                            if self.recorder:
+                                self.recorder.record(message)
                             await self._process_message(message)
                         except asyncio.TimeoutError:
                             # Send ping to keep alive
@@ -450,9 +442,28 @@ class BinanceClient:
                 if self._running:
                     await asyncio.sleep(5)
     
+    def _record_candle_snapshot(self, timeframe: str):
+        """Archive the REST warm-up candles so a replay starts from the same state"""
+        buffer = self.data.candles[timeframe]
+        rows = zip(
+            buffer.timestamps().tolist(), buffer.opens().tolist(), buffer.highs().tolist(),
+            buffer.lows().tolist(), buffer.closes().tolist(), buffer.volumes().tolist(),
+            buffer.column("quote_volume").tolist(), buffer.column("trades").tolist(),
+            buffer.column("is_closed").tolist()
+        )
+        self.recorder.record(json.dumps({
+            "e": "klineSnapshot",
+            "E": int(time.time() * 1000),
+            "s": self.symbol_upper,
+            "i": timeframe,
+            "k": [list(row) for row in rows]
+        }))
+    
     async def disconnect(self):
         """Disconnect from WebSocket"""
         self._running = False
+        if self._depth_task is not None and not self._depth_task.done():
+            self._depth_task.cancel()
         if self._ws_connection:
             await self._ws_connection.close()
         if self._session and not self._session.closed:
@@ -467,7 +478,11 @@ class BinanceClient:
         """Get candles for a specific timeframe"""
         return list(self.data.candles.get(timeframe, []))
     
+    def get_candle_buffer(self, timeframe: str) -> Optional[CandleBuffer]:
+        """Get the columnar candle store for a timeframe"""
+        return self.data.candles.get(timeframe)
+    
     def get_recent_trades(self, count: int = 100) -> List[Trade]:
         """Get recent trades"""
-        return list(self.data.trades)[-count:]
+        return self.data.trades.latest(count)
 
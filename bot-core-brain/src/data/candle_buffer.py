@@ -0,0 +1,232 @@
+"""
+Columnar Candle Ring Buffer
+Fixed-capacity NumPy candle store, one per timeframe
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .models import Candle
+
+
+# Candle duration per timeframe
+TIMEFRAME_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+}
+
+
+class CandleBuffer:
+    """
+    Fixed-capacity ring buffer of OHLCV candles stored as NumPy columns.
+
+    Every column is allocated at twice the capacity and each write lands in
+    both halves, so the most recent `n` candles are always a contiguous
+    slice. Column views are zero-copy and stay valid until the next write.
+
+    The forming candle is updated in place: a kline with the same open time
+    as the last stored candle overwrites it instead of appending.
+
+    Indexing, iteration and len() return Candle objects built on demand so
+    code written against deque[Candle] keeps working.
+    """
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        size = 2 * capacity
+
+        self.timestamp = np.zeros(size, dtype=np.int64)  # Open time, ms
+        self.open = np.zeros(size, dtype=np.float64)
+        self.high = np.zeros(size, dtype=np.float64)
+        self.low = np.zeros(size, dtype=np.float64)
+        self.close = np.zeros(size, dtype=np.float64)
+        self.volume = np.zeros(size, dtype=np.float64)
+        self.quote_volume = np.zeros(size, dtype=np.float64)
+        self.trades = np.zeros(size, dtype=np.int64)
+        self.is_closed = np.zeros(size, dtype=np.bool_)
+
+        self._count = 0  # Total candles ever appended
+
+    # ==================== Writes ====================
+
+    def _write(self, pos: int, open_time_ms: int, open_: float, high: float, low: float,
+               close: float, volume: float, quote_volume: float, trades: int, is_closed: bool):
+        for idx in (pos, pos + self.capacity):
+            self.timestamp[idx] = open_time_ms
+            self.open[idx] = open_
+            self.high[idx] = high
+            self.low[idx] = low
+            self.close[idx] = close
+            self.volume[idx] = volume
+            self.quote_volume[idx] = quote_volume
+            self.trades[idx] = trades
+            self.is_closed[idx] = is_closed
+
+    def update(self, open_time_ms: int, open_: float, high: float, low: float, close: float,
+               volume: float, quote_volume: float, trades: int, is_closed: bool) -> bool:
+        """
+        Apply a kline update.
+
+        Returns True if a new candle was appended, False if the last candle
+        was updated in place (or the update was older than the last candle).
+        """
+        if self._count:
+            last_pos = (self._count - 1) % self.capacity
+            last_ts = self.timestamp[last_pos]
+            if open_time_ms == last_ts:
+                self._write(last_pos, open_time_ms, open_, high, low, close,
+                            volume, quote_volume, trades, is_closed)
+                return False
+            if open_time_ms < last_ts:
+                return False
+
+        self._write(self._count % self.capacity, open_time_ms, open_, high, low, close,
+                    volume, quote_volume, trades, is_closed)
+        self._count += 1
+        return True
+
+    def append(self, candle: Candle) -> bool:
+        """Apply a Candle (legacy interface)"""
+        return self.update(
+            int(candle.timestamp.timestamp() * 1000),
+            candle.open, candle.high, candle.low, candle.close,
+            candle.volume, candle.quote_volume, candle.trades, candle.is_closed
+        )
+
+    def extend(self, candles: Iterable[Candle]):
+        """Apply several Candles oldest first"""
+        for candle in candles:
+            self.append(candle)
+
+    def clear(self):
+        """Drop all candles"""
+        self._count = 0
+
+    # ==================== Zero-copy views ====================
+
+    def _bounds(self, n: Optional[int]) -> tuple:
+        length = len(self)
+        if n is None or n > length:
+            n = length
+        if length == 0:
+            return 0, 0
+        end = (self._count - 1) % self.capacity + 1 + self.capacity
+        return end - n, end
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        """Contiguous view of the last n values of a column (oldest first)"""
+        start, end = self._bounds(n)
+        return getattr(self, name)[start:end]
+
+    def closes(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("close", n)
+
+    def highs(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("high", n)
+
+    def lows(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("low", n)
+
+    def opens(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("open", n)
+
+    def volumes(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("volume", n)
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("timestamp", n)
+
+    def as_dicts(self, n: Optional[int] = None) -> List[Dict[str, float]]:
+        """OHLCV dicts (predictor format) without building Candle objects"""
+        return [
+            {'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for o, h, l, c, v in zip(
+                self.opens(n).tolist(), self.highs(n).tolist(), self.lows(n).tolist(),
+                self.closes(n).tolist(), self.volumes(n).tolist()
+            )
+        ]
+
+    # ==================== Candle-compatible accessors ====================
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def _candle_at(self, idx: int) -> Candle:
+        return Candle(
+            timestamp=datetime.fromtimestamp(int(self.timestamp[idx]) / 1000),
+            open=float(self.open[idx]),
+            high=float(self.high[idx]),
+            low=float(self.low[idx]),
+            close=float(self.close[idx]),
+            volume=float(self.volume[idx]),
+            quote_volume=float(self.quote_volume[idx]),
+            trades=int(self.trades[idx]),
+            is_closed=bool(self.is_closed[idx])
+        )
+
+    def __getitem__(self, key):
+        start, end = self._bounds(None)
+        length = end - start
+
+        if isinstance(key, slice):
+            return [self._candle_at(start + i) for i in range(*key.indices(length))]
+
+        if key < 0:
+            key += length
+        if not 0 <= key < length:
+            raise IndexError("candle index out of range")
+        return self._candle_at(start + key)
+
+    def __iter__(self) -> Iterator[Candle]:
+        start, end = self._bounds(None)
+        for idx in range(start, end):
+            yield self._candle_at(idx)
+
+    def __reversed__(self) -> Iterator[Candle]:
+        start, end = self._bounds(None)
+        for idx in range(end - 1, start - 1, -1):
+            yield self._candle_at(idx)
+
+
+def candle_column(candles, name: str) -> np.ndarray:
+    """
+    One column for a CandleBuffer (zero-copy view), a dict of column arrays
+    or a plain list of Candle objects. Timestamps are open times in ms.
+    """
+    if isinstance(candles, CandleBuffer):
+        return candles.column(name)
+    if isinstance(candles, dict):
+        return np.asarray(candles[name])
+    if name == 'timestamp':
+        return np.array([int(c.timestamp.timestamp() * 1000) for c in candles], dtype=np.int64)
+    return np.array([getattr(c, name) for c in candles], dtype=np.float64)
+
+
+def candle_columns(candles) -> Dict[str, np.ndarray]:
+    """Timestamp and OHLCV columns for any supported candle container"""
+    return {
+        name: candle_column(candles, name)
+        for name in ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+    }
+
+
+def closed_candle_columns(candles) -> Dict[str, np.ndarray]:
+    """candle_columns of the closed candles only (a trailing forming candle is left out)"""
+    columns = candle_columns(candles)
+    if len(columns['close']) == 0:
+        return columns
+    if isinstance(candles, CandleBuffer):
+        forming = not candles.column('is_closed', 1)[-1]
+    elif isinstance(candles, dict):
+        forming = 'is_closed' in candles and not candles['is_closed'][-1]
+    else:
+        forming = not candles[-1].is_closed
+    if forming:
+        return {name: values[:-1] for name, values in columns.items()}
+    return columns
@@ -0,0 +1,43 @@
+"""
+Fast JSON - Pluggable decoder for the WebSocket message path
+orjson or msgspec when installed, the standard library json otherwise
+"""
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
+
+
+# str or bytes message -> dicts/lists/str/int/float (same shapes as json.loads)
+Decoder = Callable[[Union[str, bytes]], Any]
+
+
+def available_decoders() -> Dict[str, Decoder]:
+    """Installed decoders by name, fastest first"""
+    decoders: Dict[str, Decoder] = {}
+    if HAS_ORJSON:
+        decoders["orjson"] = orjson.loads
+    if HAS_MSGSPEC:
+        decoders["msgspec"] = msgspec.json.Decoder().decode
+    decoders["json"] = json.loads
+    return decoders
+
+
+def get_decoder(name: Optional[str] = None) -> Decoder:
+    """Decoder by name ("orjson", "msgspec", "json"); None picks the fastest installed"""
+    decoders = available_decoders()
+    if name is None:
+        return next(iter(decoders.values()))
+    if name not in decoders:
+        raise ValueError(f"JSON decoder {name!r} is not installed (available: {', '.join(decoders)})")
+    return decoders[name]
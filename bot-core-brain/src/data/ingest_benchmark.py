@@ -0,0 +1,216 @@
+"""
+Ingest Benchmark - Recorded WebSocket messages through _process_message
+Throughput and per-message latency for each installed JSON decoder
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .fast_json import available_decoders
+from .recorder import MarketRecorder, read_messages
+from .replay_client import ReplayClient
+
+
+TIMEFRAMES = {"1m": 60_000, "5m": 300_000, "15m": 900_000}
+
+
+# ==================== Data ====================
+
+def write_synthetic_archive(directory: str, seconds: int, trades_per_second: float,
+                            burst_factor: float = 20.0, seed: int = 3) -> int:
+    """
+    Record a synthetic BTCUSDT stream: aggTrades (with a liquidation-style
+    burst over the middle tenth), 100ms depth diffs after a depth snapshot,
+    kline updates every 250ms and mark price every second. Returns the
+    number of messages.
+    """
+    rng = np.random.default_rng(seed)
+    start_ms = 1_700_000_000_000
+    center = 65000.0
+    price = center
+    update_id = 1000
+    candles: Dict[str, list] = {}
+    count = 0
+
+    def emit(recv_ms: int, message: dict):
+        nonlocal count
+        recorder.record(json.dumps(message, separators=(',', ':')), recv_ms)
+        count += 1
+
+    def levels(side: int, n: int, depth: int, snapshot: bool = False) -> list:
+        """Random levels `side` * 0.1..depth/10 from the center (a snapshot: each offset once, none empty)"""
+        if snapshot:
+            offsets = np.arange(1, n + 1) * 0.1
+            quantities = rng.uniform(0.001, 5, n)
+        else:
+            offsets = rng.integers(1, depth, n) * 0.1
+            quantities = np.where(rng.random(n) < 0.3, 0.0, rng.uniform(0.001, 5, n))
+        return [[f"{center + side * offset:.1f}", f"{qty:.3f}"] for offset, qty in zip(offsets, quantities)]
+
+    with MarketRecorder(directory, flush_interval=0.1) as recorder:
+        # Like a live snapshot, it lands inside the first diff (U <= lastUpdateId <= u)
+        emit(start_ms, {
+            "e": "depthSnapshot", "E": start_ms, "s": "BTCUSDT", "lastUpdateId": update_id + 1,
+            "bids": levels(-1, 1000, 1000, True), "asks": levels(1, 1000, 1000, True)
+        })
+        for tick in range(seconds * 10):
+            now_ms = start_ms + tick * 100
+            burst = seconds * 4 <= tick < seconds * 5
+            rate = trades_per_second * (burst_factor if burst else 1.0) / 10
+            for offset in np.sort(rng.integers(0, 100, rng.poisson(rate))).tolist():
+                price = round(price + float(rng.normal(0, 2.0 if burst else 0.5)), 1)
+                trade_ms = now_ms + offset
+                emit(trade_ms, {
+                    "e": "aggTrade", "E": trade_ms, "s": "BTCUSDT", "a": count,
+                    "p": f"{price:.1f}", "q": f"{rng.exponential(0.5 if burst else 0.1):.3f}",
+                    "f": count, "l": count, "T": trade_ms, "m": bool(rng.random() < (0.8 if burst else 0.5))
+                })
+
+            previous = update_id
+            update_id += int(rng.integers(1, 5))
+            size = int(rng.integers(1, 60 if burst else 20))
+            emit(now_ms, {
+                "e": "depthUpdate", "E": now_ms, "T": now_ms, "s": "BTCUSDT",
+                "U": previous + 1, "u": update_id, "pu": previous,
+                "b": levels(-1, size, 500), "a": levels(1, size, 500)
+            })
+
+            if tick % 10 == 0:
+                emit(now_ms, {"e": "markPriceUpdate", "E": now_ms, "s": "BTCUSDT", "p": f"{price:.2f}",
+                              "r": "0.00010000", "T": start_ms + 8 * 3_600_000})
+
+            if tick % 5 == 0:
+                for timeframe, interval_ms in TIMEFRAMES.items():
+                    open_ms = now_ms // interval_ms * interval_ms
+                    candle = candles.get(timeframe)
+                    if candle is not None and candle[0] != open_ms:
+                        emit(now_ms, _kline(now_ms, timeframe, interval_ms, candle, True))
+                        candle = None
+                    if candle is None:
+                        candle = candles[timeframe] = [open_ms, price, price, price, price, 0.0]
+                    candle[2], candle[3], candle[4] = max(candle[2], price), min(candle[3], price), price
+                    candle[5] += float(rng.uniform(0, 20))
+                    emit(now_ms, _kline(now_ms, timeframe, interval_ms, candle, False))
+    return count
+
+
+def _kline(now_ms: int, timeframe: str, interval_ms: int, candle: list, closed: bool) -> dict:
+    open_ms, open_, high, low, close, volume = candle
+    return {"e": "kline", "E": now_ms, "s": "BTCUSDT", "k": {
+        "t": open_ms, "T": open_ms + interval_ms - 1, "s": "BTCUSDT", "i": timeframe,
+        "o": f"{open_:.1f}", "c": f"{close:.1f}", "h": f"{high:.1f}", "l": f"{low:.1f}",
+        "v": f"{volume:.3f}", "n": 100, "x": closed, "q": f"{volume * close:.2f}"
+    }}
+
+
+def load_messages(directory: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                  limit: Optional[int] = None) -> Tuple[List[int], List[bytes]]:
+    """Receive times and raw messages of an archive, in memory so reading is not timed"""
+    times, messages = [], []
+    for recv_ms, raw in read_messages(directory, start_ms, end_ms):
+        times.append(recv_ms)
+        messages.append(raw)
+        if limit is not None and len(messages) >= limit:
+            break
+    return times, messages
+
+
+def event_types(messages: List[bytes]) -> List[str]:
+    return [json.loads(raw).get("e", "?") for raw in messages]
+
+
+# ==================== Run ====================
+
+def state_fingerprint(client: ReplayClient) -> tuple:
+    """Market state after a run (decoders must agree on it)"""
+    data = client.data
+    book = data.orderbook
+    return (
+        data.last_price, len(data.trades), round(data.trade_flow.window(900).cvd, 6),
+        book.update_id, book.best_bid, book.best_ask, round(book.bid_side.total_qty, 6),
+        tuple(float(data.candles[tf].closes()[-1]) if len(data.candles[tf]) else 0.0 for tf in TIMEFRAMES),
+        data.funding.mark_price if data.funding else 0.0
+    )
+
+
+async def replay(directory: str, times: List[int], messages: List[bytes], decoder: str) -> Tuple[np.ndarray, float, tuple]:
+    """Feed every message to _process_message; returns latencies (us), elapsed s and final state"""
+    client = ReplayClient(directory, speed=0, json_decoder=decoder)
+    latencies = np.empty(len(messages))
+    perf_counter = time.perf_counter
+    process = client._process_message
+    started = perf_counter()
+    for i, raw in enumerate(messages):
+        client._clock_ms = times[i]
+        start = perf_counter()
+        await process(raw)
+        latencies[i] = perf_counter() - start
+    elapsed = perf_counter() - started
+    return latencies * 1e6, elapsed, state_fingerprint(client)
+
+
+def main():
+    """python -m src.data.ingest_benchmark"""
+    parser = argparse.ArgumentParser(description="WebSocket ingest throughput and latency per JSON decoder")
+    parser.add_argument('--directory', help="MarketRecorder archive to replay (default: a synthetic one)")
+    parser.add_argument('--start-ms', type=int)
+    parser.add_argument('--end-ms', type=int)
+    parser.add_argument('--limit', type=int, help="Replay at most this many messages")
+    parser.add_argument('--seconds', type=int, default=300, help="Synthetic stream length")
+    parser.add_argument('--trades-per-second', type=float, default=50.0, help="Synthetic aggTrade rate outside the burst")
+    parser.add_argument('--decoders', nargs='+', help="Decoders to compare (default: all installed)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.directory
+        if directory is None:
+            directory = tmp
+            write_synthetic_archive(directory, args.seconds, args.trades_per_second)
+        times, messages = load_messages(directory, args.start_ms, args.end_ms, args.limit)
+        if not messages:
+            print(f"No messages in {directory}")
+            sys.exit(1)
+
+        types = event_types(messages)
+        span_s = (times[-1] - times[0]) / 1000
+        print(f"{len(messages)} messages over {span_s:.0f}s: " +
+              ", ".join(f"{name} {n}" for name, n in Counter(types).most_common()))
+
+        decoders = args.decoders or list(available_decoders())
+        print(f"{'decoder':<8} {'msg/s':>9} {'p50 us':>8} {'p99 us':>8} {'max us':>9}")
+        results = {}
+        for decoder in decoders:
+            latencies, elapsed, state = asyncio.run(replay(directory, times, messages, decoder))
+            results[decoder] = (latencies, state)
+            print(f"{decoder:<8} {len(messages) / elapsed:>9.0f} {np.percentile(latencies, 50):>8.1f} "
+                  f"{np.percentile(latencies, 99):>8.1f} {latencies.max():>9.1f}")
+
+    # Per event type, for the first decoder (the default one)
+    latencies = results[decoders[0]][0]
+    labels = np.array(types)
+    print(f"\n{decoders[0]} by event type")
+    print(f"{'event':<16} {'count':>7} {'mean us':>8} {'p99 us':>8} {'share':>6}")
+    for name, _ in Counter(types).most_common():
+        selected = latencies[labels == name]
+        print(f"{name:<16} {len(selected):>7} {selected.mean():>8.1f} {np.percentile(selected, 99):>8.1f} "
+              f"{selected.sum() / latencies.sum():>6.1%}")
+
+    states = {decoder: state for decoder, (_, state) in results.items()}
+    if len(set(states.values())) > 1:
+        print("Decoders disagree on the final state: " + ", ".join(f"{k}={v}" for k, v in states.items()))
+        sys.exit(1)
+    print("All decoders produced the same market state")
+
+
+if __name__ == "__main__":
+    main()
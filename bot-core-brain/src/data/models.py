@@ -0,0 +1,132 @@
+"""
+Market Data Models
+Candle, trade, order book and funding containers shared by the data layer
+"""
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Candle:
+    """OHLCV Candle data"""
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    quote_volume: float
+    trades: int
+    is_closed: bool = False
+    
+    @property
+    def body(self) -> float:
+        return abs(self.close - self.open)
+    
+    @property
+    def range(self) -> float:
+        return self.high - self.low
+    
+    @property
+    def body_percent(self) -> float:
+        if self.range == 0:
+            return 0
+        return self.body / self.range
+    
+    @property
+    def upper_wick(self) -> float:
+        return self.high - max(self.open, self.close)
+    
+    @property
+    def lower_wick(self) -> float:
+        return min(self.open, self.close) - self.low
+    
+    @property
+    def is_bullish(self) -> bool:
+        return self.close > self.open
+
+
+@dataclass
+class Trade:
+    """Trade data"""
+    timestamp: datetime
+    price: float
+    quantity: float
+    is_buyer_maker: bool  # True = sell aggressor, False = buy aggressor
+    
+    @property
+    def is_buy(self) -> bool:
+        return not self.is_buyer_maker
+
+
+@dataclass
+class OrderBookLevel:
+    """Order book level"""
+    price: float
+    quantity: float
+
+
+@dataclass
+class OrderBook:
+    """Order book snapshot"""
+    timestamp: datetime
+    bids: List[OrderBookLevel] = field(default_factory=list)
+    asks: List[OrderBookLevel] = field(default_factory=list)
+    
+    @property
+    def best_bid(self) -> float:
+        return self.bids[0].price if self.bids else 0
+    
+    @property
+    def best_ask(self) -> float:
+        return self.asks[0].price if self.asks else 0
+    
+    @property
+    def mid_price(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+    
+    @property
+    def spread(self) -> float:
+        return self.best_ask - self.best_bid
+    
+    @property
+    def spread_percent(self) -> float:
+        if self.mid_price == 0:
+            return 0
+        return (self.spread / self.mid_price) * 100
+    
+    def get_imbalance(self, levels: int = 10) -> float:
+        """Calculate order book imbalance"""
+        bid_volume = sum(b.quantity for b in self.bids[:levels])
+        ask_volume = sum(a.quantity for a in self.asks[:levels])
+        total = bid_volume + ask_volume
+        if total == 0:
+            return 0
+        return (bid_volume - ask_volume) / total
+
+
+@dataclass
+class FundingRate:
+    """Funding rate data"""
+    timestamp: datetime
+    funding_rate: float
+    mark_price: float
+    next_funding_time: datetime
+
+
+class MarketEventType(str, Enum):
+    KLINE_CLOSED = "kline_closed"
+    TRADES = "trades"
+    DEPTH = "depth"
+
+
+@dataclass
+class MarketEvent:
+    """Typed event published to BinanceClient callbacks"""
+    type: MarketEventType
+    timestamp: datetime           # Market clock when the event was processed
+    timeframe: Optional[str] = None  # KLINE_CLOSED: candle timeframe
+    open_time_ms: int = 0         # KLINE_CLOSED: candle open time
+    count: int = 0                # TRADES: trades in the batch
@@ -0,0 +1,415 @@
+"""
+Local Order Book - Full-depth book kept in sync from the diff depth stream
+REST snapshot + depthUpdate events sequenced by update IDs, sorted NumPy sides
+"""
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .models import OrderBook, OrderBookLevel
+
+logger = logging.getLogger(__name__)
+
+
+# REST snapshot depth used to (re)build the book
+SNAPSHOT_LIMIT = 1000
+# Levels kept per side; the worst ones are dropped beyond this
+SIDE_CAPACITY = 5000
+# Levels one side of a depthUpdate may add beyond capacity before the trim
+MAX_MESSAGE_LEVELS = 1000
+# Diffs with at most this many levels per side are applied level by level
+SMALL_UPDATE_LEVELS = 16
+# depthUpdate events held while waiting for a snapshot
+MAX_PENDING_EVENTS = 2000
+# Levels returned by the OrderBook-compatible bids/asks lists
+DEFAULT_LEVELS = 20
+# Running totals are re-summed every this many events (float drift)
+RESUM_EVENTS = 10_000
+
+
+def parse_levels(levels: Sequence) -> np.ndarray:
+    """[[price, quantity], ...] (strings or numbers) as an (n, 2) float array"""
+    return np.array([float(x) for level in levels for x in level], dtype=np.float64).reshape(-1, 2)
+
+
+class BookSide:
+    """
+    One side of the book as parallel sorted arrays, best level first.
+
+    Levels are keyed by price * sign (sign -1 for bids), so both sides are
+    ascending from the best price and share the same searchsorted logic.
+    Arrays are allocated once: quantity changes are written in place, and
+    removals/insertions rebuild the side into a spare pair of arrays that
+    is then swapped in. Total quantity and notional are maintained with
+    each change.
+    """
+
+    def __init__(self, sign: int, capacity: int = SIDE_CAPACITY):
+        self.sign = sign
+        self.capacity = capacity
+        # Spare buffers take levels added between rebuilds (up to one message)
+        size = capacity + MAX_MESSAGE_LEVELS
+        self.keys = np.zeros(size, dtype=np.float64)
+        self.qty = np.zeros(size, dtype=np.float64)
+        self._spare_keys = np.zeros(size, dtype=np.float64)
+        self._spare_qty = np.zeros(size, dtype=np.float64)
+        self.n = 0
+        self.total_qty = 0.0
+        self.total_notional = 0.0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def clear(self):
+        self.n = 0
+        self.total_qty = 0.0
+        self.total_notional = 0.0
+
+    def load(self, levels: np.ndarray):
+        """Replace the side with snapshot levels"""
+        levels = levels[levels[:, 1] > 0]
+        keys = levels[:, 0] * self.sign
+        order = np.argsort(keys, kind='stable')[:self.capacity]
+        self.n = len(order)
+        self.keys[:self.n] = keys[order]
+        self.qty[:self.n] = levels[order, 1]
+        self.resum()
+
+    def resum(self):
+        """Recompute the running totals from the levels"""
+        qty = self.qty[:self.n]
+        self.total_qty = float(qty.sum())
+        self.total_notional = float(np.dot(self.keys[:self.n], qty)) * self.sign
+
+    def apply(self, levels: np.ndarray):
+        """Set absolute quantities (0 removes the level)"""
+        if not len(levels):
+            return
+        if len(levels) <= SMALL_UPDATE_LEVELS:
+            self._apply_levels(levels.tolist())
+            return
+        keys = levels[:, 0] * self.sign
+        qtys = levels[:, 1]
+        if len(keys) > 1:
+            order = keys.argsort(kind='stable')
+            keys, qtys = keys[order], qtys[order]
+            # A price listed twice: the later entry wins
+            last = np.empty(len(keys), dtype=bool)
+            last[-1] = True
+            np.not_equal(keys[1:], keys[:-1], out=last[:-1])
+            if not last.all():
+                keys, qtys = keys[last], qtys[last]
+
+        n = self.n
+        idx = self.keys[:n].searchsorted(keys)
+        at = np.minimum(idx, n - 1) if n else idx
+        found = (self.keys[at] == keys) & (idx < n)
+        old = np.where(found, self.qty[at], 0.0)
+        delta = qtys - old
+        self.total_qty += float(delta.sum())
+        self.total_notional += float(keys.dot(delta)) * self.sign
+
+        # Existing levels change in place; removals and new levels rebuild
+        # the side into the spare buffers, which are then swapped in
+        self.qty[at[found]] = qtys[found]
+        added = ~found & (qtys > 0)
+        if not added.any():
+            if (qtys[found] == 0).any():
+                keep = self.qty[:n] > 0
+                self.n = self._rebuild(keep, None, None, None)
+            return
+        keep = self.qty[:n] > 0
+        self.n = self._rebuild(keep, idx[added], keys[added], qtys[added])
+
+    def _apply_levels(self, levels: list):
+        """
+        Per-level path for small diffs (the usual case): a binary search
+        and, for a new or removed level, one in-place shift of the tail.
+        Levels are applied in message order, so the last duplicate wins.
+        """
+        sign = self.sign
+        keys, qty = self.keys, self.qty
+        n = self.n
+        for price, quantity in levels:
+            key = price * sign
+            i = int(keys[:n].searchsorted(key))
+            if i < n and keys[i] == key:
+                old = float(qty[i])
+                if quantity > 0:
+                    qty[i] = quantity
+                else:
+                    keys[i:n - 1] = keys[i + 1:n]
+                    qty[i:n - 1] = qty[i + 1:n]
+                    n -= 1
+            elif quantity > 0:
+                old = 0.0
+                keys[i + 1:n + 1] = keys[i:n]
+                qty[i + 1:n + 1] = qty[i:n]
+                keys[i] = key
+                qty[i] = quantity
+                n += 1
+            else:
+                continue
+            self.total_qty += quantity - old
+            self.total_notional += price * (quantity - old)
+
+        if n > self.capacity:
+            dropped_keys = keys[self.capacity:n]
+            dropped_qty = qty[self.capacity:n]
+            self.total_qty -= float(dropped_qty.sum())
+            self.total_notional -= float(dropped_keys.dot(dropped_qty)) * sign
+            n = self.capacity
+        self.n = n
+
+    def _rebuild(self, keep: np.ndarray, pos: Optional[np.ndarray], new_keys: Optional[np.ndarray],
+                 new_qty: Optional[np.ndarray]) -> int:
+        """
+        Write kept levels plus new ones (inserted before old position `pos`)
+        into the spare buffers and swap them in. Returns the new level count.
+        """
+        if pos is None:
+            size = int(keep.sum())
+            self._spare_keys[:size] = self.keys[:len(keep)][keep]
+            self._spare_qty[:size] = self.qty[:len(keep)][keep]
+        else:
+            # Each new level lands after the kept levels before its position
+            # and after the new levels before it
+            kept_before = np.concatenate(([0], np.cumsum(keep)))
+            dest = kept_before[pos] + np.arange(len(pos))
+            size = int(kept_before[-1]) + len(pos)
+            slots = np.ones(size, dtype=bool)
+            slots[dest] = False
+            target_keys = self._spare_keys[:size]
+            target_qty = self._spare_qty[:size]
+            target_keys[dest] = new_keys
+            target_qty[dest] = new_qty
+            target_keys[slots] = self.keys[:len(keep)][keep]
+            target_qty[slots] = self.qty[:len(keep)][keep]
+        self.keys, self._spare_keys = self._spare_keys, self.keys
+        self.qty, self._spare_qty = self._spare_qty, self.qty
+
+        if size > self.capacity:
+            # The worst levels beyond capacity are dropped
+            dropped_keys = self.keys[self.capacity:size]
+            dropped_qty = self.qty[self.capacity:size]
+            self.total_qty -= float(dropped_qty.sum())
+            self.total_notional -= float(dropped_keys.dot(dropped_qty)) * self.sign
+            size = self.capacity
+        return size
+
+    def best(self) -> float:
+        return float(self.keys[0]) * self.sign if self.n else 0.0
+
+    def prices(self, n: Optional[int] = None) -> np.ndarray:
+        """Prices of the best n levels (a new array)"""
+        return self.keys[:self.n][:n] * self.sign
+
+    def quantities(self, n: Optional[int] = None) -> np.ndarray:
+        """Quantities of the best n levels (zero-copy view)"""
+        return self.qty[:self.n][:n]
+
+    def notional(self, n: int) -> float:
+        """Notional of the best n levels"""
+        n = min(n, self.n)
+        return float(np.dot(self.keys[:n], self.qty[:n])) * self.sign
+
+    def quantity_within(self, limit_price: float) -> float:
+        """Quantity of the levels at or better than limit_price"""
+        end = int(np.searchsorted(self.keys[:self.n], limit_price * self.sign, side='right'))
+        return float(self.qty[:end].sum())
+
+    def levels(self, n: int) -> List[OrderBookLevel]:
+        return [OrderBookLevel(price, qty) for price, qty in
+                zip(self.prices(n).tolist(), self.quantities(n).tolist())]
+
+
+class LocalOrderBook:
+    """
+    Order book maintained from a REST snapshot and the @depth diff stream.
+
+    Sync follows Binance USD-M futures rules:
+    - Events are buffered until a snapshot (lastUpdateId) is applied.
+    - Buffered events with u < lastUpdateId are dropped.
+    - The first event applied must have U <= lastUpdateId <= u.
+    - Every later event must have pu equal to the previous event's u.
+
+    A break in that sequence (missed message, reconnect) or a crossed book
+    clears it, and needs_snapshot is set until the next snapshot. The
+    client fetches one then.
+
+    Reads are O(1) from the running totals, or bounded by the levels they
+    cover (top-n sums, binary search for a price band). bids/asks and the
+    other OrderBook properties keep existing readers working.
+    """
+
+    def __init__(self, capacity: int = SIDE_CAPACITY, max_pending: int = MAX_PENDING_EVENTS):
+        self.bid_side = BookSide(-1, capacity)
+        self.ask_side = BookSide(1, capacity)
+        self._pending: deque = deque(maxlen=max_pending)
+        self.update_id: Optional[int] = None  # u of the last applied event (or the snapshot id)
+        self._first_event = True
+        self.event_time_ms = 0
+        self._events = 0
+
+        # Stats
+        self.resyncs = 0
+        self.dropped = 0
+
+    # ==================== Sync ====================
+
+    @property
+    def needs_snapshot(self) -> bool:
+        return self.update_id is None
+
+    def reset(self):
+        """Clear the book; events are buffered until the next snapshot"""
+        self.bid_side.clear()
+        self.ask_side.clear()
+        self.update_id = None
+        self._first_event = True
+
+    def apply_snapshot(self, last_update_id: int, bids: Sequence, asks: Sequence,
+                       time_ms: Optional[int] = None) -> bool:
+        """
+        Load a REST depth snapshot, then the buffered events that follow
+        it. Returns False if the buffered events do not connect to the
+        snapshot (a newer snapshot is needed).
+        """
+        self.bid_side.load(parse_levels(bids))
+        self.ask_side.load(parse_levels(asks))
+        self.update_id = last_update_id
+        self._first_event = True
+        if time_ms is not None:
+            self.event_time_ms = time_ms
+
+        pending = list(self._pending)
+        self._pending.clear()
+        for data in pending:
+            if self.needs_snapshot:
+                self._pending.append(data)
+            else:
+                self._apply_event(data)
+        return not self.needs_snapshot
+
+    def on_event(self, data: Dict) -> bool:
+        """
+        Handle a depthUpdate message. Returns True if it changed the book,
+        False if it was buffered (no snapshot yet) or older than the book.
+        """
+        if self.needs_snapshot:
+            self._pending.append(data)
+            return False
+        return self._apply_event(data)
+
+    def _resync(self, reason: str, data: Optional[Dict] = None):
+        """Clear the book; `data` (the event that broke the sequence) is kept for the next snapshot"""
+        logger.warning(f"Order book out of sync ({reason}), waiting for a new snapshot")
+        self.resyncs += 1
+        self.reset()
+        self._pending.clear()
+        if data is not None:
+            self._pending.append(data)
+
+    def _apply_event(self, data: Dict) -> bool:
+        if data["u"] < self.update_id:
+            self.dropped += 1
+            return False
+        if self._first_event:
+            if data["U"] > self.update_id:
+                self._resync(f"first event U={data['U']} after snapshot {self.update_id}", data)
+                return False
+        elif data.get("pu") != self.update_id:
+            self._resync(f"pu={data.get('pu')} after u={self.update_id}", data)
+            return False
+
+        self.bid_side.apply(parse_levels(data.get("b", ())))
+        self.ask_side.apply(parse_levels(data.get("a", ())))
+        self.update_id = data["u"]
+        self._first_event = False
+        self.event_time_ms = data.get("E", self.event_time_ms)
+
+        self._events += 1
+        if self._events % RESUM_EVENTS == 0:
+            self.bid_side.resum()
+            self.ask_side.resum()
+
+        if self.bid_side.n and self.ask_side.n and self.bid_side.best() >= self.ask_side.best():
+            self._resync(f"crossed book {self.bid_side.best()} >= {self.ask_side.best()}")
+            return False
+        return True
+
+    # ==================== Reads ====================
+
+    def __bool__(self) -> bool:
+        return not self.needs_snapshot and bool(self.bid_side.n) and bool(self.ask_side.n)
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.utcfromtimestamp(self.event_time_ms / 1000)
+
+    @property
+    def best_bid(self) -> float:
+        return self.bid_side.best()
+
+    @property
+    def best_ask(self) -> float:
+        return self.ask_side.best()
+
+    @property
+    def mid_price(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.best_ask - self.best_bid
+
+    @property
+    def spread_percent(self) -> float:
+        if self.mid_price == 0:
+            return 0
+        return (self.spread / self.mid_price) * 100
+
+    def imbalance(self, levels: Optional[int] = None) -> float:
+        """Notional imbalance (bid - ask) / (bid + ask), whole book or top levels"""
+        if levels is None:
+            bid, ask = self.bid_side.total_notional, self.ask_side.total_notional
+        else:
+            bid, ask = self.bid_side.notional(levels), self.ask_side.notional(levels)
+        total = bid + ask
+        return (bid - ask) / total if total > 0 else 0.0
+
+    def get_imbalance(self, levels: int = 10) -> float:
+        """Quantity imbalance of the top levels (OrderBook.get_imbalance)"""
+        bid = float(self.bid_side.quantities(levels).sum())
+        ask = float(self.ask_side.quantities(levels).sum())
+        total = bid + ask
+        return (bid - ask) / total if total > 0 else 0
+
+    def depth_ratio(self, band_pct: float = 0.001) -> float:
+        """Share of the book's quantity within band_pct of the mid price"""
+        total = self.bid_side.total_qty + self.ask_side.total_qty
+        if not self or total <= 0:
+            return 0.0
+        mid = self.mid_price
+        near = self.bid_side.quantity_within(mid * (1 - band_pct)) + \
+            self.ask_side.quantity_within(mid * (1 + band_pct))
+        return near / total
+
+    @property
+    def bids(self) -> List[OrderBookLevel]:
+        return self.bid_side.levels(DEFAULT_LEVELS)
+
+    @property
+    def asks(self) -> List[OrderBookLevel]:
+        return self.ask_side.levels(DEFAULT_LEVELS)
+
+    def to_order_book(self, limit: int = DEFAULT_LEVELS) -> OrderBook:
+        """Top levels as an OrderBook snapshot"""
+        return OrderBook(
+            timestamp=self.timestamp,
+            bids=self.bid_side.levels(limit),
+            asks=self.ask_side.levels(limit)
+        )
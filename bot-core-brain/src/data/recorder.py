@@ -0,0 +1,323 @@
+"""
+Market Data Recorder - Compressed append-only archive of raw WebSocket messages
+Segments rotate by time/size; a background thread batches and compresses writes
+"""
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+
+# Segment layout: a sequence of independently compressed frames.
+# Frame header: magic, codec, record count, payload size, first/last receive
+# time (ms). Payload: records of (receive time ms, length, raw message).
+FRAME_MAGIC = b"BTCR"
+FRAME_HEADER = struct.Struct("<4sBIIqq")
+RECORD_HEADER = struct.Struct("<qI")
+
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_FILE = "index.jsonl"
+
+
+def _default_codec() -> int:
+    return CODEC_ZSTD if HAS_ZSTD else CODEC_ZLIB
+
+
+def _compress(codec: int, payload: bytes, compressor=None) -> bytes:
+    if codec == CODEC_ZSTD:
+        return (compressor or zstandard.ZstdCompressor(level=3)).compress(payload)
+    return zlib.compress(payload, 6)
+
+
+def _decompress(codec: int, blob: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        if not HAS_ZSTD:
+            raise RuntimeError("Segment is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+class MarketRecorder:
+    """
+    Append raw WebSocket messages to rotating compressed segment files.
+
+    record() only appends to a deque (no lock, no I/O, no compression) so
+    it is safe to call from the event loop on every message. A background
+    thread wakes every `flush_interval`, drains the deque in batches,
+    compresses each batch into one frame and appends it to the current
+    segment. Readers skip a torn final frame, so a crash loses at most the
+    unflushed batch.
+
+    Segments rotate every `segment_minutes` or `max_segment_bytes`; each
+    closed segment is appended to index.jsonl with its time range.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        symbol: str = "BTCUSDT",
+        segment_minutes: int = 60,
+        max_segment_bytes: int = 256 * 1024 * 1024,
+        flush_interval: float = 1.0,
+        max_batch: int = 5000,
+        max_pending: int = 200_000,
+        codec: Optional[int] = None
+    ):
+        self.directory = Path(directory)
+        self.symbol = symbol.upper()
+        self.segment_ms = segment_minutes * 60 * 1000
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.codec = _default_codec() if codec is None else codec
+
+        self.max_pending = max_pending
+        self._pending: deque = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Writer thread state
+        self._file = None
+        self._segment_path: Optional[Path] = None
+        self._segment_start_ms = 0
+        self._segment_first_ms: Optional[int] = None
+        self._segment_last_ms = 0
+        self._segment_records = 0
+        self._compressor = zstandard.ZstdCompressor(level=3) if self.codec == CODEC_ZSTD else None
+
+        # Stats
+        self.recorded = 0
+        self.dropped = 0
+        self.bytes_written = 0
+
+    # ==================== Producer side (event loop) ====================
+
+    def record(self, message: Union[str, bytes], recv_ms: Optional[int] = None):
+        """Queue one raw message; never blocks (drops and counts if the writer is behind)"""
+        if recv_ms is None:
+            recv_ms = int(time.time() * 1000)
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            if self.dropped % 10000 == 1:
+                logger.warning(f"Recorder backlog full, dropped {self.dropped} messages")
+            return
+        self._pending.append((recv_ms, message))
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="market-recorder", daemon=True)
+        self._thread.start()
+        logger.info(f"Market recorder writing to {self.directory}")
+
+    def stop(self, timeout: float = 10.0):
+        """Flush everything queued, close the segment and stop the thread"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info(
+            f"Market recorder stopped: {self.recorded} recorded, {self.dropped} dropped, "
+            f"{self.bytes_written / 1e6:.1f} MB written"
+        )
+
+    def __enter__(self) -> 'MarketRecorder':
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ==================== Writer thread ====================
+
+    def _run(self):
+        try:
+            while True:
+                stopping = self._stop.wait(self.flush_interval)
+                while self._pending:
+                    self._write_batch(self._drain())
+                if stopping:
+                    break
+        except Exception as e:
+            logger.error(f"Recorder writer failed: {e}")
+        finally:
+            self._close_segment()
+
+    def _drain(self) -> List[Tuple[int, Union[str, bytes]]]:
+        """Pop up to max_batch pending messages (deque pops are atomic)"""
+        pending = self._pending
+        batch = []
+        while pending and len(batch) < self.max_batch:
+            batch.append(pending.popleft())
+        return batch
+
+    def _write_batch(self, batch: List[Tuple[int, Union[str, bytes]]]):
+        """Compress a batch into one frame, rotating segments on time boundaries"""
+        start = 0
+        for i in range(1, len(batch) + 1):
+            # Split the batch where it crosses into a new segment window
+            if i < len(batch) and batch[i][0] // self.segment_ms == batch[start][0] // self.segment_ms:
+                continue
+            self._write_frame(batch[start:i])
+            start = i
+
+    def _write_frame(self, records: List[Tuple[int, Union[str, bytes]]]):
+        first_ms = records[0][0]
+        self._ensure_segment(first_ms)
+
+        parts = []
+        for recv_ms, message in records:
+            raw = message.encode("utf-8") if isinstance(message, str) else message
+            parts.append(RECORD_HEADER.pack(recv_ms, len(raw)))
+            parts.append(raw)
+        blob = _compress(self.codec, b"".join(parts), self._compressor)
+
+        last_ms = records[-1][0]
+        header = FRAME_HEADER.pack(FRAME_MAGIC, self.codec, len(records), len(blob), first_ms, last_ms)
+        self._file.write(header + blob)
+        self._file.flush()
+
+        if self._segment_first_ms is None:
+            self._segment_first_ms = first_ms
+        self._segment_last_ms = last_ms
+        self._segment_records += len(records)
+        self.recorded += len(records)
+        self.bytes_written += len(header) + len(blob)
+
+        if self._file.tell() >= self.max_segment_bytes:
+            self._close_segment()
+
+    def _ensure_segment(self, recv_ms: int):
+        """Open a new segment if none is open or the time window changed"""
+        window_start = recv_ms // self.segment_ms * self.segment_ms
+        if self._file and window_start == self._segment_start_ms:
+            return
+        self._close_segment()
+
+        stamp = datetime.utcfromtimestamp(recv_ms / 1000).strftime("%Y%m%d-%H%M%S")
+        path = self.directory / f"{self.symbol}-{stamp}-{recv_ms % 1000:03d}{SEGMENT_SUFFIX}"
+        self._file = open(path, "ab")
+        self._segment_path = path
+        self._segment_start_ms = window_start
+        self._segment_first_ms = None
+        self._segment_records = 0
+
+    def _close_segment(self):
+        """Close the current segment and append it to the time index"""
+        if not self._file:
+            return
+        self._file.close()
+        self._file = None
+
+        if self._segment_records:
+            entry = {
+                'segment': self._segment_path.name,
+                'first_ms': self._segment_first_ms,
+                'last_ms': self._segment_last_ms,
+                'records': self._segment_records,
+                'bytes': self._segment_path.stat().st_size
+            }
+            with open(self.directory / INDEX_FILE, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+# ==================== Reader ====================
+
+def _iter_frames(path: Path, start_ms: Optional[int], end_ms: Optional[int]) -> Iterator[Tuple[int, bytes]]:
+    """Frames of one segment overlapping [start_ms, end_ms], skipping others unread"""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            magic, codec, count, size, first_ms, last_ms = FRAME_HEADER.unpack(header)
+            if magic != FRAME_MAGIC:
+                logger.warning(f"Corrupt frame in {path.name}, stopping segment")
+                return
+            if end_ms is not None and first_ms > end_ms:
+                return
+            if start_ms is not None and last_ms < start_ms:
+                f.seek(size, os.SEEK_CUR)
+                continue
+            blob = f.read(size)
+            if len(blob) < size:
+                return  # Torn final frame (writer crashed mid-write)
+            yield codec, blob
+
+
+def list_segments(
+    directory: str,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None
+) -> List[Path]:
+    """
+    Segment files overlapping a time range, oldest first.
+
+    Closed segments are filtered with index.jsonl; segments missing from
+    the index (the active one, or after a crash) are always included.
+    """
+    directory = Path(directory)
+    ranges = {}
+    index_path = directory / INDEX_FILE
+    if index_path.exists():
+        with open(index_path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    ranges[entry['segment']] = (entry['first_ms'], entry['last_ms'])
+
+    segments = []
+    for path in sorted(directory.glob(f"*{SEGMENT_SUFFIX}")):
+        first_ms, last_ms = ranges.get(path.name, (None, None))
+        if first_ms is not None:
+            if start_ms is not None and last_ms < start_ms:
+                continue
+            if end_ms is not None and first_ms > end_ms:
+                continue
+        segments.append(path)
+    return segments
+
+
+def read_messages(
+    directory: str,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Stream recorded messages in receive order.
+
+    Yields:
+        (receive time in ms, raw message bytes)
+    """
+    for path in list_segments(directory, start_ms, end_ms):
+        for codec, blob in _iter_frames(path, start_ms, end_ms):
+            payload = _decompress(codec, blob)
+            offset = 0
+            while offset < len(payload):
+                recv_ms, length = RECORD_HEADER.unpack_from(payload, offset)
+                offset += RECORD_HEADER.size
+                if (start_ms is None or recv_ms >= start_ms) and (end_ms is None or recv_ms <= end_ms):
+                    yield recv_ms, payload[offset:offset + length]
+                offset += length
@@ -0,0 +1,262 @@
+"""
+Replay Client - Drives the bot from a MarketRecorder archive
+Same interface as BinanceClient, fed from local segments at N x speed
+"""
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from .binance_client import BinanceClient
+from .models import Candle, FundingRate, MarketEvent, OrderBook
+from .recorder import read_messages
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayClient(BinanceClient):
+    """
+    BinanceClient that replays recorded WebSocket messages instead of
+    connecting to Binance. No REST or WebSocket traffic is made.
+
+    The replay owns the market clock: now() is the receive time of the
+    last replayed message and sleep() waits on that clock, so consumers
+    that use client.now()/client.sleep() see the recorded timeline.
+
+    speed > 0 paces messages against the wall clock (1.0 = real time,
+    100.0 = 100x). speed = 0 replays as fast as possible and is demand
+    driven: once a consumer sleeps on the replay clock, messages only
+    advance while it is asleep, and each wake-up (timeout or an event
+    delivered to a wait_for) waits for the consumer to sleep again. A run
+    over the same archive is therefore repeatable.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        speed: float = 1.0,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        symbol: str = "BTCUSDT",
+        json_decoder: Optional[str] = None
+    ):
+        super().__init__(symbol=symbol, json_decoder=json_decoder)
+        self.directory = directory
+        self.speed = speed
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+
+        # Replay clock and sleepers: heap of (due ms, seq, future, awaited task or None)
+        self._clock_ms: Optional[int] = None
+        self._waiters: List[tuple] = []
+        self._waiter_seq = 0
+        self._driven = False
+        self._started = asyncio.Event()
+        self._sleeper_added = asyncio.Event()
+        self.finished = asyncio.Event()
+
+        # Wall clock anchor for paced replay
+        self._wall_start = 0.0
+        self._first_ms = 0
+
+        # Stats
+        self.replayed = 0
+
+    # ==================== Clock ====================
+
+    def now(self) -> datetime:
+        """Replay time (receive time of the last replayed message)"""
+        clock_ms = self._clock_ms if self._clock_ms is not None else self.start_ms
+        if clock_ms is None:
+            return datetime.utcnow()
+        return datetime.utcfromtimestamp(clock_ms / 1000)
+
+    def now_ms(self) -> int:
+        if self._clock_ms is not None:
+            return self._clock_ms
+        return self.start_ms if self.start_ms is not None else super().now_ms()
+
+    async def sleep(self, seconds: float):
+        """Wait until the replay clock has advanced by `seconds`"""
+        await self._wait(seconds)
+
+    async def wait_for(self, awaitable, timeout: float):
+        """Wait for `awaitable` with the timeout on the replay clock"""
+        task = asyncio.ensure_future(awaitable)
+        try:
+            await self._wait(timeout, task)
+        finally:
+            if not task.done():
+                task.cancel()
+        if task.done() and not task.cancelled():
+            return task.result()
+        raise asyncio.TimeoutError()
+
+    async def _wait(self, seconds: float, task: Optional[asyncio.Future] = None):
+        if self.finished.is_set():
+            await asyncio.sleep(0)
+            return
+        self._driven = True
+        if self._clock_ms is None:
+            self._sleeper_added.set()
+            await self._started.wait()
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiter_seq += 1
+        entry = (self._clock_ms + int(seconds * 1000), self._waiter_seq, future, task)
+        heapq.heappush(self._waiters, entry)
+        if task is not None:
+            task.add_done_callback(lambda _: future.done() or future.set_result(None))
+        self._sleeper_added.set()
+        try:
+            await future
+        finally:
+            self._remove_waiter(entry)
+
+    def _remove_waiter(self, entry: tuple):
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def _wake_all(self):
+        while self._waiters:
+            future = heapq.heappop(self._waiters)[2]
+            if not future.done():
+                future.set_result(None)
+
+    async def _wait_for_sleeper(self):
+        """Demand-driven replay: hold messages until a consumer sleeps"""
+        while self._running and not self._waiters:
+            self._sleeper_added.clear()
+            await self._sleeper_added.wait()
+
+    async def _pace(self, target_ms: int):
+        """Hold until target_ms is due on the wall clock (speed > 0)"""
+        if self.speed <= 0:
+            return
+        delay = self._wall_start + (target_ms - self._first_ms) / 1000 / self.speed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _advance_to(self, target_ms: int):
+        """Move the clock to target_ms, waking every sleeper due on the way"""
+        while self._waiters and self._waiters[0][0] <= target_ms:
+            due_ms, _, future, _ = heapq.heappop(self._waiters)
+            await self._pace(due_ms)
+            self._clock_ms = max(self._clock_ms, due_ms)
+            if not future.done():
+                future.set_result(None)
+            if self.speed <= 0:
+                await self._wait_for_sleeper()
+            else:
+                await asyncio.sleep(0)  # Let the sleeper observe its wake-up time
+        await self._pace(target_ms)
+        self._clock_ms = max(self._clock_ms, target_ms)
+
+    # ==================== Replay ====================
+
+    async def connect(self):
+        """Replay the archive into self.data until it ends or disconnect()"""
+        logger.info(f"Replaying {self.directory} at {'max' if self.speed <= 0 else f'{self.speed:g}x'} speed")
+        self._running = True
+        wall_started = time.monotonic()
+
+        try:
+            for recv_ms, raw in read_messages(self.directory, self.start_ms, self.end_ms):
+                if not self._running:
+                    break
+
+                if self._clock_ms is None:
+                    self._clock_ms = self._first_ms = recv_ms
+                    self._wall_start = time.monotonic()
+                    self._started.set()
+                    await asyncio.sleep(0)  # Early sleepers start from the first message
+
+                if self._driven and self.speed <= 0:
+                    await self._wait_for_sleeper()
+                await self._advance_to(recv_ms)
+
+                await self._process_message(raw)
+                self.replayed += 1
+
+                # Let other tasks run between bursts of same-time messages
+                if self.replayed % 100 == 0:
+                    await asyncio.sleep(0)
+        finally:
+            self._running = False
+            self._started.set()
+            self.finished.set()
+            self._wake_all()
+
+        span_s = (self._clock_ms - self._first_ms) / 1000 if self._clock_ms is not None else 0.0
+        wall_s = time.monotonic() - wall_started
+        logger.info(
+            f"Replay finished: {self.replayed} messages, {span_s / 3600:.2f}h of market data "
+            f"in {wall_s:.1f}s ({span_s / max(wall_s, 1e-9):.0f}x)"
+        )
+
+    async def _notify_callbacks(self, event: MarketEvent):
+        """Hold the replay while a consumer handles an event it was waiting for"""
+        await super()._notify_callbacks(event)
+        if not any(entry[3] is not None for entry in self._waiters):
+            return
+
+        # Woken wait_for tasks complete within one loop pass
+        await asyncio.sleep(0)
+        woken = [entry for entry in self._waiters if entry[3] is not None and entry[3].done()]
+        if not woken:
+            return
+        for entry in woken:
+            self._remove_waiter(entry)
+        if self.speed <= 0:
+            await self._wait_for_sleeper()
+        else:
+            await asyncio.sleep(0)
+
+    async def _process_message(self, message):
+        """Recorded REST snapshots reset the candle buffers / sync the order book"""
+        marker = b'Snapshot"' if isinstance(message, bytes) else 'Snapshot"'
+        if marker in message[:40]:
+            data = self._decode(message)
+            if data["e"] == "klineSnapshot":
+                self._load_candle_snapshot(data)
+            elif data["e"] == "depthSnapshot":
+                self.data.orderbook.apply_snapshot(data["lastUpdateId"], data["bids"], data["asks"], data["E"])
+            return
+        await super()._process_message(message)
+
+    def _load_candle_snapshot(self, data: dict):
+        buffer = self.data.candles.get(data["i"])
+        if buffer is None:
+            return
+        buffer.clear()
+        for t, o, h, l, c, v, qv, n, x in data["k"]:
+            buffer.update(t, o, h, l, c, v, qv, n, x)
+        if len(buffer):
+            self.data.last_price = float(buffer.closes(1)[-1])
+
+    async def disconnect(self):
+        """Stop replaying and release sleepers"""
+        self._running = False
+        self._sleeper_added.set()
+        self._wake_all()
+        logger.info("Replay stopped")
+
+    # ==================== REST stand-ins (replayed state) ====================
+
+    async def fetch_historical_candles(self, timeframe: str, limit: int = 500) -> List[Candle]:
+        return self.get_candles(timeframe)[-limit:]
+
+    async def fetch_funding_rate(self) -> Optional[FundingRate]:
+        return self.data.funding
+
+    async def fetch_orderbook(self, limit: int = 20) -> Optional[OrderBook]:
+        return self.data.orderbook.to_order_book(limit) if self.data.orderbook else None
+
+    def _request_depth_snapshot(self):
+        """Depth snapshots come from the archive (recorded when the live client took them)"""
+
+    async def get_current_price(self) -> float:
+        return self.data.last_price
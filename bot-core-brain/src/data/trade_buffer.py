@@ -0,0 +1,204 @@
+"""
+Trade Buffer - Time-bounded aggTrade history in a structured NumPy array
+Fixed allocation, zero-copy views and O(log n) time windows
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .models import Trade
+
+
+# One aggTrade: 25 bytes (packed)
+TRADE_DTYPE = np.dtype([
+    ("timestamp", "<i8"),       # Trade time, ms
+    ("price", "<f8"),
+    ("quantity", "<f8"),
+    ("is_buyer_maker", "?"),    # True = sell aggressor
+])
+
+# Defaults: 15 minutes of history, at most 100k trades (5 MB allocated)
+TRADE_HISTORY_MS = 15 * 60_000
+TRADE_CAPACITY = 100_000
+
+
+class TradeBuffer:
+    """
+    Trades of the last `span_ms` (at most `capacity` of them) in one
+    preallocated structured array.
+
+    Trades are appended after the newest one in an array twice the
+    capacity. When the end is reached, the trades still held (at most
+    `capacity`) are moved to the front, one copy per `capacity` or more
+    appends, so the held trades are always one contiguous slice. Views are
+    zero-copy and stay valid until the next write.
+
+    Trades older than `span_ms` before the newest one are dropped lazily;
+    every read sees only the span. Time lookups are binary searches on the
+    timestamp column, so trades must arrive in time order (as aggTrades
+    do).
+
+    Indexing, iteration and len() return Trade objects built on demand so
+    code written against deque[Trade] keeps working.
+    """
+
+    def __init__(self, span_ms: int = TRADE_HISTORY_MS, capacity: int = TRADE_CAPACITY):
+        self.span_ms = span_ms
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=TRADE_DTYPE)
+        self._timestamps = self._data["timestamp"]
+        self._start = 0
+        self._end = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    # ==================== Writes ====================
+
+    def add(self, time_ms: int, price: float, quantity: float, is_buyer_maker: bool):
+        """Append one trade (newest last)"""
+        if self._end == len(self._data):
+            self._compact()
+        self._data[self._end] = (time_ms, price, quantity, is_buyer_maker)
+        self._end += 1
+
+    def append(self, trade: Trade):
+        """Append a Trade (legacy interface)"""
+        self.add(int(trade.timestamp.timestamp() * 1000), trade.price, trade.quantity,
+                 trade.is_buyer_maker)
+
+    def extend(self, trades: Iterable[Trade]):
+        """Append several Trades oldest first"""
+        for trade in trades:
+            self.append(trade)
+
+    def clear(self):
+        """Drop all trades"""
+        self._start = self._end = 0
+
+    def _trim(self):
+        """Drop trades outside the span or beyond capacity"""
+        if self._end == self._start:
+            return
+        start = max(self._start, self._end - self.capacity)
+        oldest = self._timestamps[self._end - 1] - self.span_ms
+        if self._timestamps[start] < oldest:
+            start += int(np.searchsorted(self._timestamps[start:self._end], oldest, side='left'))
+        self._start = start
+
+    def _compact(self):
+        self._trim()
+        count = self._end - self._start
+        self._data[:count] = self._data[self._start:self._end]
+        self._start, self._end = 0, count
+
+    # ==================== Zero-copy views ====================
+
+    def _bounds(self, n: Optional[int] = None) -> tuple:
+        self._trim()
+        if n is None or n > self._end - self._start:
+            return self._start, self._end
+        return self._end - n, self._end
+
+    def records(self, n: Optional[int] = None) -> np.ndarray:
+        """Contiguous structured view of the last n trades (oldest first)"""
+        start, end = self._bounds(n)
+        return self._data[start:end]
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        """View of the last n values of one field"""
+        start, end = self._bounds(n)
+        return self._data[name][start:end]
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("timestamp", n)
+
+    def prices(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("price", n)
+
+    def quantities(self, n: Optional[int] = None) -> np.ndarray:
+        return self.column("quantity", n)
+
+    def between(self, start_ms: int, end_ms: Optional[int] = None) -> np.ndarray:
+        """Trades with start_ms <= time < end_ms (binary search, zero-copy)"""
+        start, end = self._bounds()
+        times = self._timestamps[start:end]
+        lo = int(np.searchsorted(times, start_ms, side='left'))
+        hi = end - start if end_ms is None else int(np.searchsorted(times, end_ms, side='left'))
+        return self._data[start + lo:start + max(lo, hi)]
+
+    def since(self, time_ms: int) -> np.ndarray:
+        """Trades at or after time_ms"""
+        return self.between(time_ms)
+
+    def window(self, duration_ms: int, now_ms: Optional[int] = None) -> np.ndarray:
+        """Trades of the last `duration_ms` before now_ms (default: after the newest trade)"""
+        if now_ms is None:
+            if not self:
+                return self._data[:0]
+            now_ms = int(self._timestamps[self._end - 1]) + 1
+        return self.between(now_ms - duration_ms, now_ms)
+
+    # ==================== Trade-compatible accessors ====================
+
+    def __len__(self) -> int:
+        start, end = self._bounds()
+        return end - start
+
+    def __bool__(self) -> bool:
+        return self._end > self._start
+
+    def _trade_at(self, idx: int) -> Trade:
+        time_ms, price, quantity, is_buyer_maker = self._data[idx].tolist()
+        return Trade(
+            timestamp=datetime.fromtimestamp(time_ms / 1000),
+            price=price,
+            quantity=quantity,
+            is_buyer_maker=is_buyer_maker
+        )
+
+    def __getitem__(self, key):
+        start, end = self._bounds()
+        length = end - start
+
+        if isinstance(key, slice):
+            return [self._trade_at(start + i) for i in range(*key.indices(length))]
+
+        if key < 0:
+            key += length
+        if not 0 <= key < length:
+            raise IndexError("trade index out of range")
+        return self._trade_at(start + key)
+
+    def __iter__(self) -> Iterator[Trade]:
+        start, end = self._bounds()
+        for idx in range(start, end):
+            yield self._trade_at(idx)
+
+    def latest(self, count: int) -> List[Trade]:
+        """The last `count` trades as Trade objects"""
+        start, end = self._bounds(count)
+        return [self._trade_at(idx) for idx in range(start, end)]
+
+
+def trade_columns(trades) -> Dict[str, np.ndarray]:
+    """
+    Timestamp (ms), price, quantity and is_buyer_maker columns for a
+    TradeBuffer, a structured trade array, a dict of column arrays or a
+    plain list of Trade objects.
+    """
+    if isinstance(trades, TradeBuffer):
+        trades = trades.records()
+    if isinstance(trades, np.ndarray):
+        return {name: trades[name] for name in TRADE_DTYPE.names}
+    if isinstance(trades, dict):
+        return {name: np.asarray(trades[name]) for name in TRADE_DTYPE.names}
+    trades = list(trades)
+    return {
+        'timestamp': np.array([int(t.timestamp.timestamp() * 1000) for t in trades], dtype=np.int64),
+        'price': np.array([t.price for t in trades], dtype=np.float64),
+        'quantity': np.array([t.quantity for t in trades], dtype=np.float64),
+        'is_buyer_maker': np.array([t.is_buyer_maker for t in trades], dtype=bool),
+    }
@@ -0,0 +1,167 @@
+"""
+Trade Flow Aggregator - Time-windowed order flow over the aggTrade stream
+Per-second prefix sums in a fixed ring; any window up to 15m is O(1)
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from .trade_buffer import trade_columns
+
+
+# Windows read by the microstructure features (seconds)
+FLOW_WINDOWS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+}
+
+# A single aggTrade at or above this notional counts as a large order (USD)
+LARGE_TRADE_USD = 100_000
+
+# Prefix columns
+_BUY_NOTIONAL, _SELL_NOTIONAL, _BUYS, _SELLS, _LARGE = range(5)
+
+
+@dataclass
+class FlowWindow:
+    """Order flow over one time window"""
+    seconds: int
+    buy_notional: float = 0.0
+    sell_notional: float = 0.0
+    buy_count: int = 0
+    sell_count: int = 0
+    large_notional: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.buy_count + self.sell_count
+
+    @property
+    def cvd(self) -> float:
+        """Cumulative volume delta: buy minus sell aggressor notional"""
+        return self.buy_notional - self.sell_notional
+
+    @property
+    def aggressor_ratio(self) -> float:
+        """Share of trades with a buy aggressor (0.5 when empty)"""
+        return self.buy_count / self.count if self.count else 0.5
+
+    @property
+    def trades_per_minute(self) -> float:
+        return self.count * 60 / self.seconds
+
+
+class TradeFlow:
+    """
+    Buy/sell notional, trade counts and large-order notional over time.
+
+    Running totals are kept as plain floats, so add() costs a few additions
+    and allocates nothing. When a trade opens a new second, the totals up
+    to the previous second are written to a ring of per-second prefix sums;
+    a window is then the difference of two prefix rows, so reads are O(1)
+    and old seconds are evicted by being overwritten.
+
+    Windows cover whole seconds: with `now_ms`, the `seconds` completed
+    seconds before it (trades in [now - window, now) at second precision,
+    the same as the batch features); without it, up to and including the
+    second of the last trade. Not thread-safe: use it from the event loop.
+    """
+
+    def __init__(self, max_window_s: int = max(FLOW_WINDOWS.values()),
+                 large_threshold: float = LARGE_TRADE_USD):
+        self.size = max_window_s + 2
+        self.large_threshold = large_threshold
+        self._prefix = np.zeros((self.size, 5), dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        """Drop all trades"""
+        self._prefix[:] = 0.0
+        self._first_second: Optional[int] = None
+        self._second: Optional[int] = None  # Second of the newest trade
+        self._buy_notional = 0.0
+        self._sell_notional = 0.0
+        self._buys = 0
+        self._sells = 0
+        self._large = 0.0
+        self.last_time_ms = 0
+
+    def __len__(self) -> int:
+        """Trades added since the last reset"""
+        return self._buys + self._sells
+
+    # ==================== Writes ====================
+
+    def add(self, time_ms: int, price: float, quantity: float, is_buyer_maker: bool):
+        """Add one aggTrade (call in stream order)"""
+        second = time_ms // 1000
+        if second != self._second:
+            if self._second is None:
+                self._first_second = self._second = second
+            elif second > self._second:
+                self._roll(second)
+            # A late trade from an earlier second is counted in the current one
+
+        notional = price * quantity
+        if is_buyer_maker:
+            self._sell_notional += notional
+            self._sells += 1
+        else:
+            self._buy_notional += notional
+            self._buys += 1
+        if notional >= self.large_threshold:
+            self._large += notional
+        self.last_time_ms = time_ms
+
+    def add_many(self, trades):
+        """Add trades in any trade_columns() container (e.g. a backfill), oldest first"""
+        cols = trade_columns(trades)
+        for row in zip(cols['timestamp'].tolist(), cols['price'].tolist(),
+                       cols['quantity'].tolist(), cols['is_buyer_maker'].tolist()):
+            self.add(*row)
+
+    def _roll(self, second: int):
+        """Close the seconds from the current one up to (not including) `second`"""
+        row = (self._buy_notional, self._sell_notional, self._buys, self._sells, self._large)
+        gap = second - self._second
+        if gap == 1:
+            self._prefix[self._second % self.size] = row
+        elif gap >= self.size:
+            self._prefix[:] = row
+        else:
+            self._prefix[np.arange(self._second, second) % self.size] = row
+        self._second = second
+
+    # ==================== Reads ====================
+
+    def _prefix_at(self, second: int) -> tuple:
+        """Totals over trades in seconds <= `second`"""
+        if self._second is None or second < self._first_second:
+            return 0.0, 0.0, 0, 0, 0.0
+        if second >= self._second:
+            return self._buy_notional, self._sell_notional, self._buys, self._sells, self._large
+        # Older than the ring: the window is cut at the oldest stored second
+        second = max(second, self._second - self.size)
+        return tuple(self._prefix[second % self.size].tolist())
+
+    def window(self, seconds: int, now_ms: Optional[int] = None) -> FlowWindow:
+        """Flow over the last `seconds` (at most max_window_s)"""
+        if self._second is None:
+            return FlowWindow(seconds)
+        last = self._second if now_ms is None else now_ms // 1000 - 1
+        hi = self._prefix_at(last)
+        lo = self._prefix_at(last - seconds)
+        return FlowWindow(
+            seconds=seconds,
+            buy_notional=hi[_BUY_NOTIONAL] - lo[_BUY_NOTIONAL],
+            sell_notional=hi[_SELL_NOTIONAL] - lo[_SELL_NOTIONAL],
+            buy_count=int(hi[_BUYS] - lo[_BUYS]),
+            sell_count=int(hi[_SELLS] - lo[_SELLS]),
+            large_notional=hi[_LARGE] - lo[_LARGE]
+        )
+
+    def windows(self, now_ms: Optional[int] = None) -> Dict[str, FlowWindow]:
+        """All FLOW_WINDOWS by name"""
+        return {name: self.window(seconds, now_ms) for name, seconds in FLOW_WINDOWS.items()}
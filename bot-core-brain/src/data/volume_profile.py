@@ -0,0 +1,263 @@
+"""
+Volume Profile - Streaming fixed-bin traded notional by price
+Session (or decaying) histogram with POC, value area and HVN/LVN levels
+"""
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+# BTCUSDT perpetual tick size; bins are whole numbers of ticks
+TICK_SIZE = 0.1
+BIN_TICKS = 100            # $10 bins
+PROFILE_BINS = 4096        # +/- ~$20k around the first price at $10 bins
+SESSION_MS = 86_400_000    # Reset at each UTC day
+VALUE_AREA = 0.70          # Share of notional inside the value area
+
+
+@dataclass
+class ProfileLevels:
+    """Key levels of a volume profile (prices are bin centers, 0 when empty)"""
+    poc: float = 0.0
+    value_area_high: float = 0.0
+    value_area_low: float = 0.0
+    hvn: List[float] = field(default_factory=list)  # High volume nodes, strongest first
+    lvn: List[float] = field(default_factory=list)  # Low volume nodes, thinnest first
+
+
+class VolumeProfile:
+    """
+    Traded notional per price bin, updated one trade at a time.
+
+    Bin k covers prices rounding to k * bin_size (bin_size = tick_size *
+    bin_ticks); the histogram holds `n_bins` consecutive bins and is
+    re-centred (bins shifted, those falling off dropped) when a price
+    leaves that range. add() is O(1): consecutive trades in the same bin
+    are summed in a float and written to the array when the bin changes
+    or the profile is read. The level reads are O(bins).
+
+    The profile restarts at every multiple of `session_ms` (None: never).
+    With `half_life_ms`, older trades decay exponentially instead: each
+    trade is added with a weight growing over time, so nothing is rescaled
+    per trade (the histogram is rebased when the weight gets large).
+    """
+
+    def __init__(
+        self,
+        tick_size: float = TICK_SIZE,
+        bin_ticks: int = BIN_TICKS,
+        n_bins: int = PROFILE_BINS,
+        session_ms: Optional[int] = SESSION_MS,
+        half_life_ms: Optional[int] = None
+    ):
+        self.bin_size = tick_size * bin_ticks
+        self.n_bins = n_bins
+        self.session_ms = session_ms
+        self.half_life_ms = half_life_ms
+        self._inv_bin = 1.0 / self.bin_size
+        self._volume = np.zeros(n_bins, dtype=np.float64)
+        self._base: Optional[int] = None   # Bin key of _volume[0]
+        self._session: Optional[int] = None
+        self._ref_ms = 0                   # Decay weights are 1 at this time
+        self._check_ms = -1                # Next session start / decay rebase
+        self._pending_key: Optional[int] = None  # Bin of the latest trades, not yet in _volume
+        self._pending = 0.0
+        self.last_time_ms = 0
+        self.trade_count = 0
+
+    def reset(self):
+        """Start an empty profile (next trade re-anchors the bins)"""
+        self._volume[:] = 0.0
+        self._pending_key = None
+        self._pending = 0.0
+        self._base = None
+        self.trade_count = 0
+
+    # ==================== Writes ====================
+
+    def _flush(self):
+        """Move the pending notional into its bin"""
+        if self._pending_key is not None:
+            key = self._pending_key
+            if self._base is None or not 0 <= key - self._base < self.n_bins:
+                self._recenter(key)
+            self._volume[key - self._base] += self._pending
+            self._pending_key = None
+            self._pending = 0.0
+
+    def _start(self, time_ms: int):
+        """Session rollover and decay rebasing before adding at time_ms"""
+        self._flush()
+        check = []
+        if self.session_ms:
+            session = time_ms // self.session_ms
+            if session != self._session:
+                self._session = session
+                self.reset()
+                self._ref_ms = time_ms
+            check.append((session + 1) * self.session_ms)
+        if self.half_life_ms:
+            if time_ms - self._ref_ms > 32 * self.half_life_ms:
+                self._volume *= 2.0 ** (-(time_ms - self._ref_ms) / self.half_life_ms)
+                self._ref_ms = time_ms
+            check.append(self._ref_ms + 32 * self.half_life_ms + 1)
+        self._check_ms = min(check) if check else float('inf')
+
+    def _weight(self, time_ms: int) -> float:
+        if not self.half_life_ms:
+            return 1.0
+        return 2.0 ** ((time_ms - self._ref_ms) / self.half_life_ms)
+
+    def _recenter(self, key: int):
+        """Move the window of bins so that `key` is in the middle"""
+        new_base = key - self.n_bins // 2
+        if self._base is not None:
+            shift = new_base - self._base
+            if abs(shift) >= self.n_bins:
+                self._volume[:] = 0.0
+            elif shift > 0:
+                self._volume[:-shift] = self._volume[shift:]
+                self._volume[-shift:] = 0.0
+            elif shift < 0:
+                self._volume[-shift:] = self._volume[:shift]
+                self._volume[:-shift] = 0.0
+        self._base = new_base
+
+    def add(self, time_ms: int, price: float, quantity: float):
+        """Add one trade (stream order)"""
+        if time_ms >= self._check_ms:
+            self._start(time_ms)
+        # Runs of trades in one bin are summed before touching the array
+        key = math.floor(price * self._inv_bin + 0.5)
+        if key != self._pending_key:
+            self._flush()
+            self._pending_key = key
+        notional = price * quantity
+        if self.half_life_ms:
+            notional *= 2.0 ** ((time_ms - self._ref_ms) / self.half_life_ms)
+        self._pending += notional
+        self.last_time_ms = time_ms
+        self.trade_count += 1
+
+    def add_arrays(self, times: np.ndarray, prices: np.ndarray, quantities: np.ndarray):
+        """
+        Add trade columns at once (backfills, batch features). Same result
+        as add() per trade, except that a chunk reaching past the bin range
+        re-centres once on its last price and drops what stays outside.
+        """
+        times = np.asarray(times, dtype=np.int64)
+        if not len(times):
+            return
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+
+        # One pass per session within the chunk
+        if self.session_ms:
+            sessions = times // self.session_ms
+            cuts = (np.flatnonzero(np.diff(sessions)) + 1).tolist()
+        else:
+            cuts = []
+        for lo, hi in zip([0] + cuts, cuts + [len(times)]):
+            self._add_segment(times[lo:hi], prices[lo:hi], quantities[lo:hi])
+
+    def _add_segment(self, times: np.ndarray, prices: np.ndarray, quantities: np.ndarray):
+        self._start(int(times[0]))
+
+        keys = np.floor(prices * self._inv_bin + 0.5).astype(np.int64)
+        if self._base is None or keys.min() < self._base or keys.max() >= self._base + self.n_bins:
+            self._recenter(int(keys[-1]))
+        idx = keys - self._base
+        inside = (idx >= 0) & (idx < self.n_bins)
+
+        notional = prices * quantities
+        if self.half_life_ms:
+            notional = notional * 2.0 ** ((times - self._ref_ms) / self.half_life_ms)
+        self._volume += np.bincount(idx[inside], weights=notional[inside], minlength=self.n_bins)
+        self.last_time_ms = int(times[-1])
+        self.trade_count += len(times)
+
+    # ==================== Reads (O(bins)) ====================
+
+    def _active(self) -> Tuple[int, np.ndarray]:
+        """Offset and values of the span of non-empty bins"""
+        self._flush()
+        nonzero = np.flatnonzero(self._volume)
+        if not len(nonzero):
+            return 0, self._volume[:0]
+        first, last = int(nonzero[0]), int(nonzero[-1])
+        return first, self._volume[first:last + 1]
+
+    def _price(self, offset: int) -> float:
+        return round((self._base + offset) * self.bin_size, 10)
+
+    def histogram(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(bin prices, notional) over the non-empty span, decayed to the last trade"""
+        first, values = self._active()
+        prices = (self._base + first + np.arange(len(values))) * self.bin_size if len(values) else values
+        scale = 1.0 / self._weight(self.last_time_ms) if self.half_life_ms else 1.0
+        return prices, values * scale
+
+    def poc(self) -> float:
+        """Point of control: price of the bin with the most notional (0 when empty)"""
+        self._flush()
+        if self._base is None or not self._volume.any():
+            return 0.0
+        return self._price(int(np.argmax(self._volume)))
+
+    def value_area(self, share: float = VALUE_AREA) -> Tuple[float, float]:
+        """
+        (high, low) of the value area: grown from the POC one bin at a time
+        towards the heavier neighbour until it holds `share` of the notional.
+        """
+        first, values = self._active()
+        if not len(values):
+            return 0.0, 0.0
+        volume = values.tolist()
+        lo = hi = int(np.argmax(values))
+        total = volume[lo]
+        target = share * float(values.sum())
+        last = len(volume) - 1
+        while total < target and (lo > 0 or hi < last):
+            up = volume[hi + 1] if hi < last else -1.0
+            down = volume[lo - 1] if lo > 0 else -1.0
+            if up >= down:
+                hi += 1
+                total += up
+            else:
+                lo -= 1
+                total += down
+        return self._price(first + hi), self._price(first + lo)
+
+    def nodes(self, count: int = 3, smooth: int = 3) -> Tuple[List[float], List[float]]:
+        """
+        High and low volume nodes: local maxima / minima of the histogram
+        smoothed over `smooth` bins, inside the non-empty span. HVNs are
+        ranked by volume (largest first), LVNs by thinness.
+        """
+        first, values = self._active()
+        if len(values) < 3:
+            return [], []
+        smoothed = np.convolve(values, np.ones(smooth) / smooth, mode='same') if smooth > 1 else values
+        mid = smoothed[1:-1]
+        peaks = np.flatnonzero((mid > smoothed[:-2]) & (mid >= smoothed[2:])) + 1
+        troughs = np.flatnonzero((mid < smoothed[:-2]) & (mid <= smoothed[2:])) + 1
+        peaks = peaks[np.argsort(-smoothed[peaks], kind='stable')][:count]
+        troughs = troughs[np.argsort(smoothed[troughs], kind='stable')][:count]
+        return [self._price(first + i) for i in peaks.tolist()], [self._price(first + i) for i in troughs.tolist()]
+
+    def levels(self, share: float = VALUE_AREA, count: int = 3) -> ProfileLevels:
+        """POC, value area and nodes in one call"""
+        self._flush()
+        if self._base is None or not self._volume.any():
+            return ProfileLevels()
+        value_area_high, value_area_low = self.value_area(share)
+        hvn, lvn = self.nodes(count)
+        return ProfileLevels(
+            poc=self.poc(),
+            value_area_high=value_area_high,
+            value_area_low=value_area_low,
+            hvn=hvn,
+            lvn=lvn
+        )
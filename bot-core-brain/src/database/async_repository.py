@@ -0,0 +1,164 @@
+"""
+Async Database Repository - Keeps blocking SQLAlchemy calls off the event loop
+DatabaseRepository calls run in order on one dedicated DB thread
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from .feature_codec import FeatureMatrix
+from .models import DailyState, Signal
+from .repository import DatabaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabaseRepository:
+    """
+    Async facade over DatabaseRepository.
+
+    Every call becomes a job on one bounded queue, executed in order on a
+    single DB thread, so reads always see earlier writes and a slow
+    database only delays the awaiting caller, never WebSocket handling.
+
+    - Reads are awaited for their result.
+    - Writes that must not be lost (signals, daily state) are awaited
+      only while the queue is full (backpressure on the caller).
+    - Heartbeats are fire-and-forget and dropped (counted) when the
+      queue is full, since the next one supersedes them.
+
+    Every `flush_interval` seconds a job flushes the repository's
+    write-behind buffer if it is due, so buffered heartbeats and feature
+    snapshots are written after max_delay even when no new row arrives.
+    """
+
+    def __init__(self, repository: DatabaseRepository, max_pending: int = 1000, flush_interval: float = 5.0):
+        self.repository = repository
+        self.flush_interval = flush_interval
+        self._jobs: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        self._worker: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+        # Stats
+        self.executed = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the job worker and the periodic flush (needs a running event loop)"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self, timeout: float = 10.0):
+        """Flush queued writes, then stop the worker and the DB thread"""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._worker:
+            try:
+                await asyncio.wait_for(self._jobs.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"DB queue not drained on close, {self._jobs.qsize()} jobs lost")
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.repository.flush_writes)
+        self._executor.shutdown(wait=True)
+        logger.info(f"DB worker stopped: {self.executed} jobs, {self.dropped} dropped, {self.errors} errors")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            func, future = await self._jobs.get()
+            try:
+                result = await loop.run_in_executor(self._executor, func)
+                if future is not None and not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self.errors += 1
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                else:
+                    logger.error(f"DB write failed: {e}")
+            finally:
+                self.executed += 1
+                self._jobs.task_done()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.repository.write_buffer.pending:
+                self._write_nowait(self.repository.flush_writes_if_due)
+
+    async def _call(self, method: Callable, *args, **kwargs) -> Any:
+        """Queue a job and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        await self._jobs.put((partial(method, *args, **kwargs), future))
+        return await future
+
+    async def _write(self, method: Callable, *args, **kwargs):
+        """Queue a write without waiting for it (waits only while the queue is full)"""
+        await self._jobs.put((partial(method, *args, **kwargs), None))
+
+    def _write_nowait(self, method: Callable, *args, **kwargs) -> bool:
+        """Queue a write, dropping it if the queue is full"""
+        try:
+            self._jobs.put_nowait((partial(method, *args, **kwargs), None))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"DB queue full, dropped {self.dropped} writes")
+            return False
+
+    # ==================== Daily State ====================
+
+    async def get_daily_state(self, target_date: str = None) -> Optional[DailyState]:
+        return await self._call(self.repository.get_daily_state, target_date)
+
+    async def reset_daily_state(self, target_date: str = None) -> DailyState:
+        return await self._call(self.repository.reset_daily_state, target_date)
+
+    async def increment_trade_count(self):
+        await self._write(self.repository.increment_trade_count)
+
+    # ==================== Signals ====================
+
+    async def save_signal(self, signal: Signal):
+        await self._write(self.repository.save_signal, signal)
+
+    async def get_new_results(self, limit: int = 10) -> List[Signal]:
+        return await self._call(self.repository.get_new_results, limit)
+
+    async def mark_signal_analyzed(self, signal_id: str, lesson_id: str = None):
+        await self._write(self.repository.mark_signal_analyzed, signal_id, lesson_id)
+
+    async def save_features_snapshot(
+        self,
+        signal_id: str,
+        features: Dict[str, Any],
+        vector: List[float] = None,
+        schema_version: int = None
+    ):
+        await self._write(self.repository.save_features_snapshot, signal_id, features, vector, schema_version)
+
+    async def load_feature_matrix(self, schema_version: int, n_features: int) -> FeatureMatrix:
+        return await self._call(self.repository.load_feature_matrix, schema_version, n_features)
+
+    # ==================== Heartbeat ====================
+
+    def ping_heartbeat(self, **kwargs) -> bool:
+        """Fire-and-forget heartbeat (same arguments as DatabaseRepository.ping_heartbeat)"""
+        return self._write_nowait(self.repository.ping_heartbeat, **kwargs)
@@ -0,0 +1,112 @@
+"""
+DB Latency Benchmark - WebSocket message handling under a slow database
+Compares blocking DatabaseRepository calls with AsyncDatabaseRepository
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import event
+
+from ..data.binance_client import BinanceClient
+from .async_repository import AsyncDatabaseRepository
+from .repository import DatabaseRepository
+
+
+def _slow_repository(path: str, delay_ms: float) -> DatabaseRepository:
+    """SQLite repository that sleeps before every statement"""
+    repository = DatabaseRepository(use_sqlite=True, sqlite_path=path)
+
+    @event.listens_for(repository.engine, "before_cursor_execute")
+    def _delay(*args):
+        time.sleep(delay_ms / 1000)
+
+    return repository
+
+
+async def _feed(client: BinanceClient, rate: float, seconds: float) -> np.ndarray:
+    """Deliver aggTrade messages at `rate`/s; returns handling lag per message (ms)"""
+    count = int(rate * seconds)
+    lags = np.empty(count)
+    start = time.perf_counter()
+    for i in range(count):
+        due = start + i / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        message = json.dumps({
+            "e": "aggTrade", "T": int(time.time() * 1000),
+            "p": "65000.0", "q": "0.01", "m": i % 2 == 0
+        })
+        await client._process_message(message)
+        lags[i] = (time.perf_counter() - due) * 1000
+    return lags
+
+
+async def _main_loop_sync(repository: DatabaseRepository, interval: float, stop: asyncio.Event):
+    """Main loop DB traffic as before: blocking calls on the event loop"""
+    while not stop.is_set():
+        repository.get_daily_state()
+        repository.get_new_results()
+        repository.ping_heartbeat(status='running')
+        await asyncio.sleep(interval)
+
+
+async def _main_loop_async(db: AsyncDatabaseRepository, interval: float, stop: asyncio.Event):
+    """Same traffic through AsyncDatabaseRepository"""
+    while not stop.is_set():
+        await db.get_daily_state()
+        await db.get_new_results()
+        db.ping_heartbeat(status='running')
+        await asyncio.sleep(interval)
+
+
+async def run_case(mode: str, delay_ms: float, rate: float, seconds: float, interval: float) -> np.ndarray:
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = _slow_repository(os.path.join(tmp, "bench.db"), delay_ms)
+        client = BinanceClient()
+        stop = asyncio.Event()
+
+        if mode == 'sync':
+            loop_task = asyncio.create_task(_main_loop_sync(repository, interval, stop))
+        else:
+            db = AsyncDatabaseRepository(repository)
+            db.start()
+            loop_task = asyncio.create_task(_main_loop_async(db, interval, stop))
+
+        lags = await _feed(client, rate, seconds)
+        stop.set()
+        await loop_task
+        if mode == 'async':
+            await db.close()
+        repository.engine.dispose()
+        return lags
+
+
+def main():
+    """python -m src.database.benchmark"""
+    parser = argparse.ArgumentParser(description="WebSocket handling latency under a slow database")
+    parser.add_argument('--db-delay-ms', type=float, default=50.0, help="Artificial delay per SQL statement")
+    parser.add_argument('--rate', type=float, default=500.0, help="Messages per second")
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--interval', type=float, default=0.5, help="Main loop DB cycle interval (s)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"{args.rate:.0f} msg/s for {args.seconds:.0f}s, DB +{args.db_delay_ms:.0f}ms per statement, "
+          f"DB cycle every {args.interval}s")
+    print(f"{'mode':<6} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'>10ms':>7}")
+    for mode in ('sync', 'async'):
+        lags = asyncio.run(run_case(mode, args.db_delay_ms, args.rate, args.seconds, args.interval))
+        print(f"{mode:<6} {np.percentile(lags, 50):>8.2f} {np.percentile(lags, 99):>8.2f} "
+              f"{lags.max():>8.2f} {np.mean(lags > 10):>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
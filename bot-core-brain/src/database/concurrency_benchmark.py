@@ -0,0 +1,262 @@
+"""
+DB Concurrency Benchmark - Both bots' write patterns on one database at once
+Compares default engines with the tuned ones from engine.py
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, desc, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from .engine import create_database_engine, writer_engine
+from .models import Base, DailyState, FeatureSnapshot, Heartbeat, PriceTracking, Signal
+
+
+def _engine(url: str, tuned: bool):
+    return create_database_engine(url) if tuned else create_engine(url)
+
+
+def _sessions(engine, tuned: bool) -> tuple:
+    """(read, write) session factories; tuned writes go through writer_engine"""
+    return sessionmaker(bind=engine), sessionmaker(bind=writer_engine(engine) if tuned else engine)
+
+
+def _timed(results: dict, name: str, func):
+    start = time.perf_counter()
+    try:
+        func()
+    except OperationalError as e:
+        results[name + " errors"].append(str(e.orig)[:60])
+        return
+    results[name].append((time.perf_counter() - start) * 1000)
+
+
+def core_brain_pattern(url: str, tuned: bool, seconds: float, interval: float) -> dict:
+    """Bot 1: heartbeats, daily state reads, and now and then a signal with its snapshot"""
+    engine = _engine(url, tuned)
+    Session, WriteSession = _sessions(engine, tuned)
+    results = defaultdict(list)
+    today = datetime.utcnow().date().isoformat()
+
+    def ping():
+        with WriteSession() as session:
+            session.add(Heartbeat(bot_name="core_brain", status="running", signals_today=1))
+            session.commit()
+
+    def read_state():
+        with Session() as session:
+            session.query(DailyState).filter(DailyState.date == today).first()
+
+    def save_signal():
+        signal_id = f"SIG_{os.getpid()}_{time.time_ns()}"
+        with WriteSession() as session:
+            session.add(Signal(
+                signal_id=signal_id, direction="LONG", strategy="TREND_MOMENTUM",
+                entry_price=65000.0, stop_loss=64837.5, take_profit=65325.0,
+                confidence=0.7, setup_quality=80, regime="TRENDING_UP"
+            ))
+            session.add(FeatureSnapshot(signal_id=signal_id, rsi_14=55.0, all_features={"rsi_14": 55.0}))
+            # increment_trade_count: read, then write in the same transaction
+            state = session.query(DailyState).filter(DailyState.date == today).first()
+            if state is None:
+                session.add(DailyState(date=today, trade_count=1))
+            else:
+                state.trade_count = (state.trade_count or 0) + 1
+            session.commit()
+
+    end = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < end:
+        _timed(results, "bot1 heartbeat", ping)
+        _timed(results, "bot1 daily state", read_state)
+        if i % 10 == 0:
+            _timed(results, "bot1 save signal", save_signal)
+        i += 1
+        time.sleep(interval)
+    engine.dispose()
+    return dict(results)
+
+
+def heartbeat_pattern(url: str, tuned: bool, seconds: float, interval: float) -> dict:
+    """Bot 2: pending scan, result updates, price tracking batches, health reads, retention"""
+    engine = _engine(url, tuned)
+    Session, WriteSession = _sessions(engine, tuned)
+    results = defaultdict(list)
+    rng = random.Random(os.getpid())
+
+    def track():
+        with WriteSession() as session:
+            pending = session.query(Signal).filter(Signal.status == "PENDING").all()
+            if pending and rng.random() < 0.5:
+                # update_signal_result: read, then write in the same transaction
+                signal = pending[0]
+                signal.status = "WIN"
+                signal.result_time = datetime.utcnow()
+                signal.result_pnl = 15.0
+                session.commit()
+
+    def price_batch():
+        now = datetime.utcnow()
+        with WriteSession() as session:
+            session.execute(insert(PriceTracking), [
+                {"signal_id": None, "timestamp": now - timedelta(seconds=k), "price": 65000.0 + k}
+                for k in range(50)
+            ])
+            session.commit()
+
+    def health():
+        with Session() as session:
+            session.query(Heartbeat).filter(
+                Heartbeat.bot_name == "core_brain"
+            ).order_by(desc(Heartbeat.timestamp)).first()
+
+    def retention():
+        # RetentionJob batch: read old rows, then delete them in the same transaction
+        with WriteSession() as session:
+            rows = session.query(PriceTracking.id).order_by(PriceTracking.id).limit(2000).all()
+            if rows:
+                session.query(PriceTracking).filter(
+                    PriceTracking.id.in_([row.id for row in rows])
+                ).delete(synchronize_session=False)
+                session.commit()
+
+    end = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < end:
+        _timed(results, "bot2 track signals", track)
+        _timed(results, "bot2 health", health)
+        if i % 5 == 0:
+            _timed(results, "bot2 price batch", price_batch)
+        if i % 100 == 99:
+            _timed(results, "bot2 retention", retention)
+        i += 1
+        time.sleep(interval)
+    engine.dispose()
+    return dict(results)
+
+
+def run_case(url: str, tuned: bool, seconds: float, interval: float) -> dict:
+    """Run both patterns in separate processes against `url`"""
+    engine = _engine(url, tuned)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(2) as pool:
+        jobs = [
+            pool.apply_async(core_brain_pattern, (url, tuned, seconds, interval)),
+            pool.apply_async(heartbeat_pattern, (url, tuned, seconds, interval)),
+        ]
+        merged = {}
+        for job in jobs:
+            merged.update(job.get())
+    return merged
+
+
+def read_during_write(url: str, tuned: bool, hold: float, busy_timeout: float = 5.0) -> dict:
+    """
+    One bot holds a write transaction open for `hold` seconds; meanwhile
+    reads run on the other bot's engine and on the writer's own engine
+    from another thread (e.g. a Telegram command). Under WAL neither
+    should wait for the write.
+    """
+    def engine():
+        if tuned:
+            return create_database_engine(url, busy_timeout=busy_timeout)
+        return create_engine(url, connect_args={"timeout": busy_timeout})
+
+    writer, other = engine(), engine()
+    Base.metadata.create_all(writer)
+    _, WriteSession = _sessions(writer, tuned)
+    ReadSame, _ = _sessions(writer, tuned)
+    ReadOther, _ = _sessions(other, tuned)
+    results = defaultdict(list)
+    holding = threading.Event()
+    done = threading.Event()
+
+    def hold_write():
+        with WriteSession() as session:
+            session.add(Heartbeat(bot_name="core_brain", status="running"))
+            session.flush()
+            holding.set()
+            done.wait(hold)
+            session.commit()
+
+    def reads(name: str, Session):
+        def count():
+            with Session() as session:
+                session.query(Heartbeat).count()
+        while not done.is_set():
+            _timed(results, name, count)
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=hold_write)
+    thread.start()
+    holding.wait()
+    readers = [
+        threading.Thread(target=reads, args=("read, other bot", ReadOther)),
+        threading.Thread(target=reads, args=("read, same bot", ReadSame)),
+    ]
+    for reader in readers:
+        reader.start()
+    time.sleep(hold)
+    done.set()
+    thread.join()
+    for reader in readers:
+        reader.join()
+    writer.dispose()
+    other.dispose()
+    return dict(results)
+
+
+def _print_results(label: str, results: dict):
+    for name in sorted(k for k in results if not k.endswith(" errors")):
+        timings = np.array(results[name])
+        errors = len(results.get(name + " errors", []))
+        if len(timings):
+            print(f"{label:<8} {name:<20} {len(timings):>7} {np.percentile(timings, 50):>8.2f} "
+                  f"{np.percentile(timings, 99):>8.2f} {timings.max():>9.2f} {errors:>7}")
+        else:
+            print(f"{label:<8} {name:<20} {0:>7} {'-':>8} {'-':>8} {'-':>9} {errors:>7}")
+    for name in sorted(k for k in results if k.endswith(" errors") and k[:-7] not in results):
+        print(f"{label:<8} {name[:-7]:<20} {0:>7} {'-':>8} {'-':>8} {'-':>9} {len(results[name]):>7}")
+
+
+def main():
+    """python -m src.database.concurrency_benchmark"""
+    parser = argparse.ArgumentParser(description="Both bots writing to one database at the same time")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--interval', type=float, default=0.002, help="Pause between iterations per bot (s)")
+    parser.add_argument('--database-url', help="Postgres URL to test instead of a temporary SQLite file")
+    parser.add_argument('--dir', help="Directory for the SQLite file (default: system temp; use a real disk)")
+    parser.add_argument('--hold', type=float, default=2.0, help="Write transaction length in the read-during-write case (s)")
+    args = parser.parse_args()
+
+    print(f"Both bots for {args.seconds:.0f}s, {args.interval * 1000:.0f}ms between iterations")
+    header = f"{'engine':<8} {'operation':<20} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>9} {'errors':>7}"
+    print(header)
+    for tuned in (False, True):
+        with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+            url = args.database_url or f"sqlite:///{os.path.join(tmp, 'shared.db')}"
+            results = run_case(url, tuned, args.seconds, args.interval)
+        _print_results("tuned" if tuned else "default", results)
+
+    print(f"\nReads while a write transaction is open for {args.hold:.1f}s")
+    print(header)
+    for tuned in (False, True):
+        with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+            url = args.database_url or f"sqlite:///{os.path.join(tmp, 'shared.db')}"
+            results = read_during_write(url, tuned, args.hold)
+        _print_results("tuned" if tuned else "default", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Database Engine - Pooled Postgres and WAL-mode SQLite engines
+Both bots share one database; engines are tuned for that
+"""
+import logging
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+logger = logging.getLogger(__name__)
+
+
+def create_database_engine(
+    database_url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_recycle: int = 1800,
+    statement_cache_size: int = 500,
+    busy_timeout: float = 30.0
+) -> Engine:
+    """
+    Engine for `database_url`.
+
+    Postgres: a pre-pinged, recycled connection pool, and bulk executemany
+    (write-behind flushes) sent as multi-row VALUES pages through psycopg2
+    execute_values/execute_batch. SQLite: see configure_sqlite().
+    `statement_cache_size` is SQLAlchemy's compiled statement cache.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        engine = create_engine(
+            url, echo=False,
+            query_cache_size=statement_cache_size,
+            connect_args={"timeout": busy_timeout, "check_same_thread": False}
+        )
+        configure_sqlite(engine, busy_timeout)
+        return engine
+
+    options = dict(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True,  # The shared Postgres may restart under us
+        pool_recycle=pool_recycle,
+        query_cache_size=statement_cache_size,
+    )
+    if url.get_driver_name() == "psycopg2":
+        options.update(executemany_mode="values_plus_batch", insertmanyvalues_page_size=1000)
+    return create_engine(url, echo=False, **options)
+
+
+def configure_sqlite(engine: Engine, busy_timeout: float = 30.0):
+    """
+    WAL journal, synchronous=NORMAL and one write transaction at a time.
+
+    WAL lets reads run during a write, in this process and in the other
+    bot's, and NORMAL skips the fsync per commit (still safe for WAL).
+    Reads use SQLite's default deferred BEGIN and take no lock.
+    Transactions on writer_engine(engine) start with BEGIN IMMEDIATE, so
+    they take the write lock up front: a transaction that reads before it
+    writes can no longer fail with "database is locked" when it tries to
+    write. Waiting for the other process is bounded by busy_timeout.
+    Inside a process, write transactions queue on one lock instead of
+    spinning in SQLite's busy handler; a second write transaction opened
+    on a thread that already has one raises at once (it could never get
+    the lock).
+    """
+    writer = threading.Lock()
+    holder = [None]  # Thread id of the open write transaction
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None  # BEGIN is emitted below
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        if not conn.get_execution_options().get("sqlite_writer"):
+            conn.exec_driver_sql("BEGIN")
+            return
+        if holder[0] == threading.get_ident():
+            raise RuntimeError("A SQLite write transaction is already open on this thread")
+        if not writer.acquire(timeout=busy_timeout):
+            raise TimeoutError(f"SQLite writer lock not acquired within {busy_timeout}s")
+        try:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        except Exception:
+            writer.release()
+            raise
+        holder[0] = threading.get_ident()
+        conn.info["sqlite_writer"] = True
+
+    @event.listens_for(engine, "commit")
+    @event.listens_for(engine, "rollback")
+    def _on_end(conn):
+        if conn.info.pop("sqlite_writer", False):
+            holder[0] = None
+            writer.release()
+
+
+def writer_engine(engine: Engine) -> Engine:
+    """
+    `engine` for write transactions (sessions that commit).
+
+    On SQLite they take the process writer lock and BEGIN IMMEDIATE (see
+    configure_sqlite); other databases ignore the option. Shares the
+    connection pool with `engine`.
+    """
+    return engine.execution_options(sqlite_writer=True)
@@ -0,0 +1,61 @@
+"""
+Feature Codec - Packed float32 feature vectors for feature_snapshots
+One 400-byte blob per signal instead of wide columns and JSON
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# Little-endian float32, the same on every machine that reads the table
+VECTOR_DTYPE = np.dtype("<f4")
+
+
+def pack_features(vector: Sequence[Optional[float]]) -> bytes:
+    """AllFeatures.to_feature_vector() as bytes (None becomes NaN)"""
+    values = [np.nan if value is None else value for value in vector]
+    return np.asarray(values, dtype=VECTOR_DTYPE).tobytes()
+
+
+def unpack_features(blob: bytes) -> np.ndarray:
+    """One packed vector back as a float32 array"""
+    return np.frombuffer(blob, dtype=VECTOR_DTYPE)
+
+
+def unpack_matrix(blobs: List[bytes], n_features: int) -> np.ndarray:
+    """Packed vectors of equal length as an (n, n_features) matrix"""
+    if not blobs:
+        return np.empty((0, n_features), dtype=VECTOR_DTYPE)
+    return np.frombuffer(b"".join(blobs), dtype=VECTOR_DTYPE).reshape(len(blobs), n_features)
+
+
+@dataclass
+class FeatureMatrix:
+    """Stored feature vectors with their signals' outcomes, row-aligned"""
+    signal_ids: List[str]
+    X: np.ndarray           # (n, n_features) float32
+    direction: np.ndarray   # LONG / SHORT
+    status: np.ndarray      # PENDING / WIN / LOSS / TIMEOUT
+    pnl: np.ndarray         # result_pnl, NaN while pending
+
+    def __len__(self) -> int:
+        return len(self.signal_ids)
+
+    def labels(self) -> np.ndarray:
+        """AIModel.train labels: the direction for wins (1=LONG, 2=SHORT), else 0=NO_TRADE"""
+        y = np.zeros(len(self), dtype=np.int64)
+        won = self.status == "WIN"
+        y[won & (self.direction == "LONG")] = 1
+        y[won & (self.direction == "SHORT")] = 2
+        return y
+
+    def resolved(self) -> "FeatureMatrix":
+        """Only the rows whose signal has a result"""
+        keep = self.status != "PENDING"
+        return FeatureMatrix(
+            signal_ids=[s for s, k in zip(self.signal_ids, keep) if k],
+            X=self.X[keep],
+            direction=self.direction[keep],
+            status=self.status[keep],
+            pnl=self.pnl[keep]
+        )
@@ -2,29 +2,55 @@
 Database Repository - Bot 1 Operations
 """
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Any, Sequence
+import numpy as np
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import desc
 
 from .models import (
     Signal, FeatureSnapshot, DailyState, Heartbeat, 
     Lesson, init_database, SignalStatus, DailyStatus
 )
+from .engine import writer_engine
+from .write_behind import WriteBehindBuffer
+from .feature_codec import FeatureMatrix, pack_features, unpack_matrix
 
 
 class DatabaseRepository:
     """Database operations for Bot 1"""
     
-    def __init__(self, database_url: str = None, use_sqlite: bool = True, sqlite_path: str = "data/trading_bot.db"):
+    def __init__(
+        self,
+        database_url: str = None,
+        use_sqlite: bool = True,
+        sqlite_path: str = "data/trading_bot.db",
+        **engine_options
+    ):
         self.engine, self.SessionLocal = init_database(
-            database_url or "", 
-            use_sqlite, 
-            sqlite_path
+            database_url or "",
+            use_sqlite,
+            sqlite_path,
+            **engine_options
         )
+        self.WriteSession = sessionmaker(bind=writer_engine(self.engine))
+        # Heartbeats and feature snapshots are written in batches
+        self.write_buffer = WriteBehindBuffer(self.WriteSession)
     
     def get_session(self) -> Session:
         return self.SessionLocal()
     
+    def get_write_session(self) -> Session:
+        """Session for transactions that write (one at a time on SQLite, see writer_engine)"""
+        return self.WriteSession()
+    
+    def flush_writes(self) -> int:
+        """Write buffered heartbeats/snapshots now (call on shutdown)"""
+        return self.write_buffer.flush()
+    
+    def flush_writes_if_due(self) -> int:
+        """Write buffered rows if the buffer is full or its oldest row is max_delay old"""
+        return self.write_buffer.flush_if_due()
+    
     # ==================== Daily State ====================
     
     def get_daily_state(self, target_date: str = None) -> Optional[DailyState]:
@@ -36,9 +62,17 @@ class DatabaseRepository:
             state = session.query(DailyState).filter(
                 DailyState.date == target_date
             ).first()
+            if state is not None:
+                session.expunge(state)
+                return state
+        
+        # Create it under the writer (the other bot may have just done so)
+        with self.get_write_session() as session:
+            state = session.query(DailyState).filter(
+                DailyState.date == target_date
+            ).first()
             
             if state is None:
-                # Create new daily state
                 state = DailyState(date=target_date)
                 session.add(state)
                 session.commit()
@@ -50,7 +84,7 @@ class DatabaseRepository:
     
     def update_daily_state(self, state: DailyState) -> None:
         """Update daily state"""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             existing = session.query(DailyState).filter(
                 DailyState.date == state.date
             ).first()
@@ -76,7 +110,7 @@ class DatabaseRepository:
         if target_date is None:
             target_date = date.today().isoformat()
         
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             state = session.query(DailyState).filter(
                 DailyState.date == target_date
             ).first()
@@ -104,7 +138,7 @@ class DatabaseRepository:
     def increment_trade_count(self) -> None:
         """Increment trade count for today"""
         target_date = date.today().isoformat()
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             state = session.query(DailyState).filter(
                 DailyState.date == target_date
             ).first()
@@ -117,7 +151,7 @@ class DatabaseRepository:
     
     def save_signal(self, signal: Signal) -> None:
         """Save a new trading signal"""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             session.add(signal)
             session.commit()
     
@@ -165,7 +199,7 @@ class DatabaseRepository:
     
     def mark_signal_analyzed(self, signal_id: str, lesson_id: str = None) -> None:
         """Mark signal as analyzed by learning engine"""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             signal = session.query(Signal).filter(
                 Signal.signal_id == signal_id
             ).first()
@@ -176,9 +210,22 @@ class DatabaseRepository:
     
     # ==================== Feature Snapshots ====================
     
-    def save_features_snapshot(self, signal_id: str, features: Dict[str, Any]) -> None:
-        """Save feature snapshot for a signal"""
-        snapshot = FeatureSnapshot(
+    def save_features_snapshot(
+        self,
+        signal_id: str,
+        features: Dict[str, Any],
+        vector: Sequence[float] = None,
+        schema_version: int = None
+    ) -> None:
+        """
+        Queue feature snapshot for a signal (write-behind).
+        
+        `vector` is AllFeatures.to_feature_vector(), stored whole as a
+        packed float32 blob tagged with `schema_version`; the wide columns
+        keep a few features readable from SQL. Without a vector the full
+        dict goes to all_features as before.
+        """
+        self.write_buffer.add(FeatureSnapshot, dict(
             signal_id=signal_id,
             timestamp=datetime.utcnow(),
             rsi_14=features.get('rsi_14'),
@@ -196,12 +243,40 @@ class DatabaseRepository:
             funding_rate=features.get('funding_rate'),
             long_liq_density=features.get('long_liq_density'),
             short_liq_density=features.get('short_liq_density'),
-            all_features=features
-        )
-        
+            all_features=None if vector is not None else features,
+            schema_version=schema_version if vector is not None else None,
+            feature_vector=pack_features(vector) if vector is not None else None
+        ))
+    
+    def load_feature_matrix(self, schema_version: int, n_features: int) -> FeatureMatrix:
+        """
+        Every stored vector of `schema_version` with its signal's outcome,
+        oldest first, in one query. Rows of other layouts are skipped.
+        """
+        self.flush_writes()
         with self.get_session() as session:
-            session.add(snapshot)
-            session.commit()
+            rows = session.query(
+                FeatureSnapshot.signal_id,
+                FeatureSnapshot.feature_vector,
+                Signal.direction,
+                Signal.status,
+                Signal.result_pnl
+            ).join(
+                Signal, Signal.signal_id == FeatureSnapshot.signal_id
+            ).filter(
+                FeatureSnapshot.schema_version == schema_version,
+                FeatureSnapshot.feature_vector.isnot(None)
+            ).order_by(FeatureSnapshot.timestamp).all()
+        
+        row_bytes = n_features * 4
+        rows = [row for row in rows if len(row.feature_vector) == row_bytes]
+        return FeatureMatrix(
+            signal_ids=[row.signal_id for row in rows],
+            X=unpack_matrix([bytes(row.feature_vector) for row in rows], n_features),
+            direction=np.array([row.direction for row in rows], dtype=object),
+            status=np.array([row.status for row in rows], dtype=object),
+            pnl=np.array([np.nan if row.result_pnl is None else row.result_pnl for row in rows], dtype=np.float64)
+        )
     
     # ==================== Heartbeat ====================
     
@@ -213,8 +288,8 @@ class DatabaseRepository:
         daily_pnl: float = 0.0,
         error_message: str = None
     ) -> None:
-        """Send heartbeat ping"""
-        heartbeat = Heartbeat(
+        """Send heartbeat ping (write-behind: only the latest pending ping is kept)"""
+        self.write_buffer.put_latest(Heartbeat, "core_brain", dict(
             bot_name="core_brain",
             timestamp=datetime.utcnow(),
             status=status,
@@ -222,17 +297,13 @@ class DatabaseRepository:
             current_regime=current_regime,
             daily_pnl=daily_pnl,
             error_message=error_message
-        )
-        
-        with self.get_session() as session:
-            session.add(heartbeat)
-            session.commit()
+        ))
     
     # ==================== Lessons ====================
     
     def save_lesson(self, lesson: Lesson) -> None:
         """Save a learning lesson"""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             session.add(lesson)
             session.commit()
     
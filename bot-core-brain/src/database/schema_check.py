@@ -0,0 +1,103 @@
+"""
+Schema Check - Models and computed column values against the Postgres dialect
+SQLite stores what Postgres rejects; this catches it without a Postgres server
+"""
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from ..ai.model import AIModel
+from .models import Base
+
+# Value range of the Postgres integer types
+PG_INTEGER_RANGES = {
+    "SMALLINT": (-2**15, 2**15 - 1),
+    "INTEGER": (-2**31, 2**31 - 1),
+    "BIGINT": (-2**63, 2**63 - 1),
+}
+SQL_TYPE_ALIASES = {"INT": "INTEGER", "INT4": "INTEGER", "INT2": "SMALLINT", "INT8": "BIGINT"}
+
+# Integer values computed by the code rather than counted: (table, column) -> producer
+COMPUTED_VALUES: Dict[Tuple[str, str], Callable[[], int]] = {
+    ("feature_snapshots", "schema_version"): AIModel.feature_schema_version,
+}
+
+DEFAULT_INIT_SQL = Path(__file__).resolve().parents[3] / "init-db.sql"
+
+
+def check_ddl(dialect) -> List[str]:
+    """Every model table compiles as Postgres DDL"""
+    failures = []
+    for table in Base.metadata.sorted_tables:
+        try:
+            CreateTable(table).compile(dialect=dialect)
+        except Exception as e:
+            failures.append(f"{table.name}: DDL does not compile for Postgres ({e})")
+    return failures
+
+
+def check_values(dialect) -> List[str]:
+    """Computed values fit the Postgres type of their column"""
+    failures = []
+    for (table_name, column_name), producer in COMPUTED_VALUES.items():
+        column = Base.metadata.tables[table_name].c[column_name]
+        pg_type = column.type.compile(dialect=dialect)
+        value = producer()
+        low, high = PG_INTEGER_RANGES[pg_type]
+        status = "ok" if low <= value <= high else "OUT OF RANGE"
+        print(f"{table_name}.{column_name:<16} {pg_type:<8} {value:>12}  {status}")
+        if status != "ok":
+            failures.append(f"{table_name}.{column_name}={value} does not fit Postgres {pg_type}")
+    return failures
+
+
+def init_sql_type(sql: str, table_name: str, column_name: str) -> Optional[str]:
+    """Declared type of a column in init-db.sql (None if not found)"""
+    table = re.search(rf"CREATE TABLE IF NOT EXISTS {table_name} \((.*?)\n\);", sql, re.S)
+    if table is None:
+        return None
+    column = re.search(rf"^\s*{column_name}\s+(\w+)", table.group(1), re.M)
+    if column is None:
+        return None
+    declared = column.group(1).upper()
+    return SQL_TYPE_ALIASES.get(declared, declared)
+
+
+def check_init_sql(path: Path, dialect) -> List[str]:
+    """init-db.sql declares the same Postgres types as the models for the computed columns"""
+    failures = []
+    sql = path.read_text()
+    for table_name, column_name in COMPUTED_VALUES:
+        model_type = Base.metadata.tables[table_name].c[column_name].type.compile(dialect=dialect)
+        declared = init_sql_type(sql, table_name, column_name)
+        if declared != model_type:
+            failures.append(f"{table_name}.{column_name}: init-db.sql declares {declared}, the model {model_type}")
+    return failures
+
+
+def main():
+    """python -m src.database.schema_check"""
+    parser = argparse.ArgumentParser(description="Check the models and computed values against Postgres")
+    parser.add_argument('--init-sql', type=Path, default=DEFAULT_INIT_SQL, help="Postgres schema file")
+    args = parser.parse_args()
+
+    dialect = postgresql.dialect()
+    failures = check_ddl(dialect) + check_values(dialect)
+    if args.init_sql.exists():
+        failures += check_init_sql(args.init_sql, dialect)
+    else:
+        print(f"{args.init_sql} not found, skipping the init-db.sql comparison")
+
+    if failures:
+        print("Postgres schema failures:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("Models and computed values are valid for Postgres")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Write-Behind Buffer - Batched inserts for high-frequency rows
+Coalesces and bulk-inserts rows, one transaction per table, on size/age thresholds
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import exc, insert
+
+logger = logging.getLogger(__name__)
+
+# Failures worth retrying later (connection, lock, pool); anything else is
+# taken to be about the rows themselves
+TRANSIENT_ERRORS = (exc.OperationalError, exc.InterfaceError, exc.DisconnectionError, TimeoutError)
+
+# A pending row: its put_latest() key (None for add()) and values
+Entry = Tuple[Optional[Tuple[type, Hashable]], Dict[str, Any]]
+
+
+class WriteBehindBuffer:
+    """
+    Buffer ORM inserts and write them in bulk.
+
+    add() queues a row; put_latest() keeps only the newest row per key
+    (e.g. one heartbeat per bot). Everything pending is written once
+    `max_rows` rows are pending or the oldest is `max_delay` seconds old,
+    as one executemany INSERT per table in its own transaction, so one
+    table's failure does not hold back the others. Call flush() on
+    shutdown.
+
+    A table whose insert fails for a transient reason (connection, lock)
+    keeps its rows for the next flush; a coalesced row is only put back if
+    no newer one for its key arrived meanwhile. Any other error is taken
+    to be about the data: the table's rows are retried one by one and the
+    rows that still fail are logged and dropped.
+    """
+
+    def __init__(self, session_factory: Callable, max_rows: int = 500, max_delay: float = 60.0):
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+
+        self._rows: Dict[type, List[Dict[str, Any]]] = {}
+        self._latest: Dict[Tuple[type, Hashable], Dict[str, Any]] = {}
+        self._pending = 0
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+
+        # Stats
+        self.buffered = 0
+        self.written = 0
+        self.flushes = 0
+        self.dropped = 0
+
+    def add(self, model: type, row: Dict[str, Any]):
+        """Queue one row for insert"""
+        with self._lock:
+            self._rows.setdefault(model, []).append(row)
+            self._mark_pending()
+        self.flush_if_due()
+
+    def put_latest(self, model: type, key: Hashable, row: Dict[str, Any]):
+        """Queue a row replacing any pending row with the same key"""
+        with self._lock:
+            if (model, key) not in self._latest:
+                self._mark_pending()
+            else:
+                self.buffered += 1
+            self._latest[(model, key)] = row
+        self.flush_if_due()
+
+    def _mark_pending(self):
+        self._pending += 1
+        self.buffered += 1
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def due(self) -> bool:
+        return self._pending >= self.max_rows or (
+            self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+        )
+
+    def flush_if_due(self) -> int:
+        return self.flush() if self.due() else 0
+
+    def flush(self) -> int:
+        """Write everything pending; returns rows written"""
+        with self._lock:
+            rows, latest = self._rows, self._latest
+            self._rows, self._latest = {}, {}
+            self._pending, self._oldest = 0, None
+
+        batches: Dict[type, List[Entry]] = {model: [(None, row) for row in r] for model, r in rows.items()}
+        for key, row in latest.items():
+            batches.setdefault(key[0], []).append((key, row))
+
+        written = 0
+        for model, entries in batches.items():
+            if entries:
+                written += self._write_table(model, entries)
+        if written:
+            self.written += written
+            self.flushes += 1
+        return written
+
+    def _insert(self, model: type, rows: List[Dict[str, Any]]):
+        with self.session_factory() as session:
+            session.execute(insert(model), rows)
+            session.commit()
+
+    def _write_table(self, model: type, entries: List[Entry]) -> int:
+        """Insert one table's rows in one transaction; returns rows written"""
+        table = model.__tablename__
+        try:
+            self._insert(model, [row for _, row in entries])
+            return len(entries)
+        except TRANSIENT_ERRORS as e:
+            logger.error(f"Write-behind flush of {len(entries)} {table} rows failed, retrying later: {e}")
+            self._requeue(model, entries)
+            return 0
+        except Exception as e:
+            logger.error(f"Write-behind flush of {len(entries)} {table} rows failed, writing them one by one: {e}")
+
+        written = 0
+        for i, (key, row) in enumerate(entries):
+            try:
+                self._insert(model, [row])
+                written += 1
+            except TRANSIENT_ERRORS as e:
+                logger.error(f"Write-behind insert into {table} failed, retrying later: {e}")
+                self._requeue(model, entries[i:])
+                break
+            except Exception as e:
+                self.dropped += 1
+                logger.error(f"Dropped a {table} row the database rejects: {e}")
+        return written
+
+    def _requeue(self, model: type, entries: List[Entry]):
+        """Put failed rows back ahead of newer ones (bounded to 10x max_rows)"""
+        with self._lock:
+            failed = [row for key, row in entries if key is None]
+            if failed:
+                merged = failed + self._rows.get(model, [])
+                self._rows[model] = merged[-self.max_rows * 10:]
+            for key, row in entries:
+                # A row put for the same key during the flush is newer: it wins
+                if key is not None and key not in self._latest:
+                    self._latest[key] = row
+            self._pending = sum(len(r) for r in self._rows.values()) + len(self._latest)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
@@ -0,0 +1,534 @@
+"""
+Batch Feature Computation
+Vectorized 100-feature matrix over a candle history (backfills / training)
+"""
+from typing import Dict, Optional
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..data.candle_buffer import TIMEFRAME_MS, candle_columns
+from ..data.trade_flow import FLOW_WINDOWS, LARGE_TRADE_USD
+from ..data.volume_profile import VolumeProfile
+from . import indicators
+from .microstructure import FLOW_WINDOW, TAPE_WINDOW
+from .swings import swing_masks
+
+# Column layout of AllFeatures.to_feature_vector()
+TECHNICAL_SLICE = slice(0, 20)
+PRICE_ACTION_SLICE = slice(20, 35)
+MTF_SLICE = slice(35, 50)
+ONCHAIN_SLICE = slice(50, 70)
+LIQUIDATION_SLICE = slice(70, 80)
+FUNDING_SLICE = slice(80, 88)
+MICROSTRUCTURE_SLICE = slice(88, 100)
+
+# Same window sizes as the live buffers
+CANDLE_WINDOW = 500
+ATR_HISTORY = 30 * 24
+FUNDING_HISTORY = 90
+
+
+def _last_true_index(mask: np.ndarray) -> np.ndarray:
+    """For each position, index of the last True at or before it (-1 if none)"""
+    idx = np.where(mask, np.arange(len(mask)), -1)
+    return np.maximum.accumulate(idx) if len(idx) else idx
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the trailing window (NaN where fewer than `window` values)"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return out
+
+
+def _ema_series(prices: np.ndarray, period: int) -> np.ndarray:
+    """EMA seeded with the first price, as calculate_ema"""
+    multiplier = 2 / (period + 1)
+    out = np.empty(len(prices))
+    ema = 0.0
+    for i, price in enumerate(prices.tolist()):
+        ema = price if i == 0 else (price * multiplier) + (ema * (1 - multiplier))
+        out[i] = ema
+    return out
+
+
+def _structure_counts(mask: np.ndarray, values: np.ndarray, first: np.ndarray,
+                      last: np.ndarray) -> tuple:
+    """
+    Rising/falling pair counts over the last (up to 10) swings whose
+    indices lie in [first, last], as analyze_market_structure.
+    `first` must be >= 1.
+    """
+    count = np.cumsum(mask)
+    positions = np.flatnonzero(mask)
+
+    # up[q]: rising pairs among the first q swings (1-based)
+    up = np.zeros(len(positions) + 1, dtype=np.int64)
+    if len(positions) > 1:
+        up[2:] = np.cumsum(values[positions[1:]] > values[positions[:-1]])
+
+    valid = last >= first
+    m = np.where(valid, count[np.maximum(last, 0)], 0)
+    k = np.where(valid, m - count[first - 1], 0)
+    pairs = np.where(k >= 2, np.minimum(10, k) - 1, 0)
+    ups = up[m] - up[m - pairs]
+    return ups, pairs - ups
+
+
+def technical_matrix(cols: Dict[str, np.ndarray], vwap_window: int = CANDLE_WINDOW) -> np.ndarray:
+    """
+    Technical features (1-20) for every bar.
+
+    Same values as the incremental engine after each closed bar, computed
+    with the shared indicator kernel (recursive EMA/Wilder smoothing is
+    solved in closed form, so there is no per-bar Python loop).
+    """
+    n = len(cols['close'])
+    out = np.zeros((n, 20))
+    highs, lows, closes = cols['high'], cols['low'], cols['close']
+
+    macd_line, macd_signal, macd_histogram = indicators.macd(closes)
+    bb_upper, _, bb_lower, bb_position = indicators.bollinger(closes)
+    adx, plus_di, minus_di = indicators.adx(highs, lows, closes)
+    stoch_k, stoch_d = indicators.stochastic(highs, lows, closes)
+    atr = indicators.atr(highs, lows, closes)
+
+    columns = (
+        indicators.rsi(closes, 7), indicators.rsi(closes, 14),
+        indicators.ema(closes, 9), indicators.ema(closes, 21),
+        indicators.ema(closes, 50), indicators.ema(closes, 200),
+        macd_line, macd_signal, macd_histogram,
+        bb_upper, bb_lower, bb_position,
+        atr, np.zeros(n),
+        adx, plus_di, minus_di,
+        stoch_k, stoch_d,
+        indicators.vwap(closes, cols['volume'], vwap_window)
+    )
+    # Row 0 stays zero: TechnicalAnalyzer needs at least two candles
+    for j, column in enumerate(columns):
+        out[1:, j] = column[1:]
+
+    # ATR percentile vs the last ATR_HISTORY per-bar values (including current)
+    if n > 1:
+        padded = np.concatenate([np.full(ATR_HISTORY - 1, np.inf), atr[1:]])
+        lengths = np.minimum(np.arange(1, n), ATR_HISTORY)
+        for start in range(0, n - 1, 4096):
+            stop = min(n - 1, start + 4096)
+            windows = sliding_window_view(padded, ATR_HISTORY)[start:stop]
+            below = (windows < atr[1 + start:1 + stop, None]).sum(axis=1)
+            out[1 + start:1 + stop, 13] = below / lengths[start:stop] * 100
+
+    return out
+
+
+def price_action_matrix(cols: Dict[str, np.ndarray], window: int = CANDLE_WINDOW) -> np.ndarray:
+    """Price action features (21-35) for every bar over a trailing window"""
+    o, h, l, c = cols['open'], cols['high'], cols['low'], cols['close']
+    n = len(c)
+    out = np.zeros((n, 15))
+    if n < 2:
+        return out
+
+    t = np.arange(n)
+    L = np.minimum(t + 1, window)  # Window length
+    s = t - L + 1  # Window start
+    rng = h - l
+    safe_rng = np.where(rng > 0, rng, 1.0)
+    safe_c = np.where(c != 0, c, 1.0)
+
+    # Current candle
+    has_range = rng > 0
+    out[:, 0] = np.where(has_range, np.abs(c - o) / safe_rng, 0.0)
+    out[:, 1] = np.where(has_range, (h - np.maximum(o, c)) / safe_rng, 0.0)
+    out[:, 2] = np.where(has_range, (np.minimum(o, c) - l) / safe_rng, 0.0)
+
+    # Range expansion
+    avg20 = _rolling_mean(rng, 20)
+    avg_range = np.where(L >= 20, avg20, rng)
+    out[:, 3] = np.where(avg_range > 0, rng / np.where(avg_range > 0, avg_range, 1.0), 1.0)
+
+    # Breakout strength vs the previous 19 bars
+    if n >= 20:
+        prev_high = np.full(n, np.nan)
+        prev_low = np.full(n, np.nan)
+        prev_high[19:] = sliding_window_view(h[:-1], 19).max(axis=1)
+        prev_low[19:] = sliding_window_view(l[:-1], 19).min(axis=1)
+        recent_range = prev_high - prev_low
+        ok = (L >= 20) & (recent_range > 0)
+        denom = np.where(ok, recent_range, 1.0)
+        out[:, 4] = np.where(ok & (c > prev_high), (c - prev_high) / denom,
+                             np.where(ok & (c < prev_low), (prev_low - c) / denom, 0.0))
+
+    # Swing points (lookback 5) inside [s + 5, t - 5]
+    sh, sl = swing_masks(h, l, 5)
+    last_bound = t - 5
+    first_bound = s + 5
+    last_sh = np.where(last_bound >= 0, _last_true_index(sh)[np.maximum(last_bound, 0)], -1)
+    last_sl = np.where(last_bound >= 0, _last_true_index(sl)[np.maximum(last_bound, 0)], -1)
+    has_sh = (last_sh >= first_bound) & (last_sh >= 0)
+    has_sl = (last_sl >= first_bound) & (last_sl >= 0)
+    out[:, 5] = np.where(has_sh, (h[np.maximum(last_sh, 0)] - c) / safe_c, 0.0)
+    out[:, 6] = np.where(has_sl, (c - l[np.maximum(last_sl, 0)]) / safe_c, 0.0)
+
+    hh, lh = _structure_counts(sh, h, first_bound, last_bound)
+    hl, ll = _structure_counts(sl, l, first_bound, last_bound)
+    out[:, 7] = hh
+    out[:, 8] = ll
+    out[:, 9] = hl
+    out[:, 10] = lh
+    out[:, 11] = np.where((hh > lh) & (hl > ll), 1, np.where((lh > hh) & (ll > hl), -1, 0))
+
+    # Consolidation bars in the last 10
+    if n >= 10:
+        last10 = sliding_window_view(rng, 10)
+        below = (last10 < last10.mean(axis=1, keepdims=True) * 0.5).sum(axis=1)
+        out[9:, 12] = np.where(L[9:] >= 10, below, 0)
+
+    # Volatility contraction
+    recent10 = _rolling_mean(rng, 10)
+    earlier10 = np.full(n, np.nan)
+    earlier10[10:] = recent10[:-10]
+    if n >= 10:
+        # Windows shorter than 20 compare against their first 10 bars
+        first10 = rng[:10].mean()
+        earlier10 = np.where(L < 20, first10, earlier10)
+    contraction = (L >= 10) & (recent10 < earlier10 * 0.7)
+    out[:, 13] = np.where(contraction, 1.0, 0.0)
+
+    # Key level distance: last 5 swing points (lookback 3) in the last 50 bars
+    sh3, sl3 = swing_masks(h, l, 3)
+    dists = []
+    for mask, values in ((sl3, l), (sh3, h)):
+        count = np.cumsum(mask)
+        positions = np.flatnonzero(mask)
+        hi_bound = np.maximum(t - 3, 0)
+        lo_bound = t - 46
+        m = count[hi_bound] - 1  # Ordinal of the last swing <= t - 3
+        best = np.full(n, np.inf)
+        for back in range(5):
+            ordinal = m - back
+            pos = positions[np.maximum(ordinal, 0)] if len(positions) else np.zeros(n, dtype=np.int64)
+            ok = (ordinal >= 0) & (pos >= lo_bound) & (pos <= t - 3)
+            best = np.where(ok, np.minimum(best, np.abs(values[pos] - c)), best)
+        dists.append(np.where(np.isfinite(best), best / safe_c, 0.0))
+    out[:, 14] = np.where(L >= 50, np.minimum(dists[0], dists[1]), 0.0)
+
+    out[0] = 0.0
+    return out
+
+
+def _tf_series(cols: Dict[str, np.ndarray], window: int = CANDLE_WINDOW) -> Dict[str, np.ndarray]:
+    """Per-bar MTF building blocks for one timeframe"""
+    c, h, l = cols['close'], cols['high'], cols['low']
+    n = len(c)
+    t = np.arange(n)
+    L = np.minimum(t + 1, window)
+    safe_c = np.where(c != 0, c, 1.0)
+
+    # Trend direction/strength (EMA 9/21)
+    ema_s = _ema_series(c, 9)
+    ema_l = _ema_series(c, 21)
+    enough = L >= 21
+    direction = np.where(enough & (ema_s > ema_l) & (c > ema_s), 1,
+                         np.where(enough & (ema_s < ema_l) & (c < ema_s), -1, 0))
+    strength = np.where(enough, np.minimum(1.0, np.abs(ema_s - ema_l) / safe_c * 100), 0.0)
+
+    # Simple RSI(14), as calculate_rsi
+    rsi = np.full(n, 50.0)
+    if n >= 15:
+        deltas = np.diff(c)
+        gains = sliding_window_view(np.where(deltas > 0, deltas, 0), 14).mean(axis=1)
+        losses = sliding_window_view(np.where(deltas < 0, -deltas, 0), 14).mean(axis=1)
+        safe_losses = np.where(losses == 0, 1.0, losses)
+        rsi[14:] = np.where(losses == 0, 100.0, 100 - (100 / (1 + gains / safe_losses)))
+
+    # Momentum (period 10) and acceleration (period 5)
+    momentum = np.zeros(n)
+    if n >= 10:
+        prev = c[:-9]
+        momentum[9:] = np.where(prev != 0, (c[9:] - prev) / np.where(prev != 0, prev, 1.0) * 100, 0.0)
+    acceleration = np.zeros(n)
+    if n >= 10:
+        c5, c10 = c[5:-4], c[:-9]
+        c1 = c[9:]
+        recent = np.where(c5 != 0, (c1 - c5) / np.where(c5 != 0, c5, 1.0) * 100, 0.0)
+        previous = np.where(c10 != 0, (c5 - c10) / np.where(c10 != 0, c10, 1.0) * 100, 0.0)
+        acceleration[9:] = recent - previous
+
+    # Run lengths of rising/falling closes for trend age
+    run_up = np.zeros(n, dtype=np.int64)
+    run_down = np.zeros(n, dtype=np.int64)
+    if n > 1:
+        rising = np.concatenate([[False], c[1:] > c[:-1]])
+        falling = np.concatenate([[False], c[1:] < c[:-1]])
+        run_up = t - _last_true_index(~rising)
+        run_down = t - _last_true_index(~falling)
+    age = np.where(direction == 1, run_up, np.where(direction == -1, run_down, 0))
+    age = np.where(L >= 10, np.minimum(age, L - 1), 0)
+
+    # HTF levels over the last 100 bars
+    support = np.zeros(n)
+    resistance = np.full(n, np.inf)
+    lookback = np.minimum(L, 100)
+    if n >= 100:
+        support[99:] = sliding_window_view(l, 100).min(axis=1)
+        resistance[99:] = sliding_window_view(h, 100).max(axis=1)
+    head = min(n, 99)
+    if head:
+        support[:head] = np.minimum.accumulate(l[:head])
+        resistance[:head] = np.maximum.accumulate(h[:head])
+    short = lookback < 10
+    support = np.where(short, 0.0, support)
+    resistance = np.where(short, np.inf, resistance)
+    with np.errstate(invalid='ignore'):
+        support_dist = np.where(support > 0, (c - support) / safe_c, 0.0)
+        resistance_dist = np.where(resistance > 0, (resistance - c) / safe_c, 0.0)
+
+    return {
+        'direction': direction, 'strength': strength, 'rsi': rsi,
+        'momentum': momentum, 'acceleration': acceleration, 'age': age,
+        'support_dist': support_dist, 'resistance_dist': resistance_dist,
+    }
+
+
+def _closed_index(tf_cols: Optional[Dict[str, np.ndarray]], tf: str, until_ms: np.ndarray) -> np.ndarray:
+    """Index of the last bar of `tf` closed by each time (-1 if none)"""
+    if tf_cols is None or len(tf_cols['close']) == 0:
+        return np.full(len(until_ms), -1)
+    close_ms = tf_cols['timestamp'].astype(np.int64) + TIMEFRAME_MS[tf]
+    return np.searchsorted(close_ms, until_ms, side='right') - 1
+
+
+def mtf_matrix(cols_by_tf: Dict[str, Dict[str, np.ndarray]], until_ms: np.ndarray) -> np.ndarray:
+    """Multi-timeframe features (36-50) as of each time in `until_ms`"""
+    n = len(until_ms)
+    out = np.zeros((n, 15))
+    out[:, 2] = 50.0
+    out[:, 5] = 50.0
+
+    series = {tf: _tf_series(cols) for tf, cols in cols_by_tf.items() if cols is not None and len(cols['close'])}
+    idx = {tf: _closed_index(cols_by_tf.get(tf), tf, until_ms) for tf in ('1m', '3m', '5m', '15m')}
+
+    def pick(tf, key, default):
+        i = idx[tf]
+        if tf not in series:
+            return np.full(n, default)
+        return np.where(i >= 0, series[tf][key][np.maximum(i, 0)], default)
+
+    d15 = pick('15m', 'direction', 0)
+    d5 = pick('5m', 'direction', 0)
+    out[:, 0] = d15
+    out[:, 1] = pick('15m', 'strength', 0.0)
+    out[:, 2] = pick('15m', 'rsi', 50.0)
+    out[:, 3] = d5
+    out[:, 4] = pick('5m', 'strength', 0.0)
+    out[:, 5] = pick('5m', 'rsi', 50.0)
+    m3 = pick('3m', 'momentum', 0.0)
+    out[:, 6] = m3
+    out[:, 7] = pick('1m', 'momentum', 0.0)
+
+    # Alignment / confluence over [15m, 5m] plus 3m momentum when available
+    has_3m = idx['3m'] >= 0
+    d3 = np.where(m3 > 0, 1, np.where(m3 < 0, -1, 0))
+    bullish = (d15 == 1).astype(int) + (d5 == 1) + (has_3m & (d3 == 1))
+    bearish = (d15 == -1).astype(int) + (d5 == -1) + (has_3m & (d3 == -1))
+    total = 2 + has_3m.astype(int)
+    non_neutral = (d15 != 0).astype(int) + (d5 != 0) + (has_3m & (d3 != 0))
+    aligned = np.maximum(bullish, bearish)
+    out[:, 8] = aligned
+    out[:, 9] = np.where(non_neutral > 0, aligned / total * 100, 0.0)
+
+    # Divergence between 15m, 5m and thresholded 3m momentum
+    d3_strict = np.where(m3 > 0.1, 1, np.where(m3 < -0.1, -1, 0))
+    ups = (d15 == 1).astype(int) + (d5 == 1) + (d3_strict == 1)
+    downs = (d15 == -1).astype(int) + (d5 == -1) + (d3_strict == -1)
+    out[:, 12] = ((ups > 0) & (downs > 0)).astype(float)
+
+    out[:, 13] = pick('1m', 'acceleration', 0.0)
+    out[:, 14] = pick('15m', 'age', 0)
+    out[:, 10] = pick('15m', 'support_dist', 0.0)
+    out[:, 11] = pick('15m', 'resistance_dist', 0.0)
+    return out
+
+
+def microstructure_matrix(trades: Optional[Dict[str, np.ndarray]], until_ms: np.ndarray,
+                          prices: np.ndarray, vwap: np.ndarray,
+                          large_threshold: float = LARGE_TRADE_USD) -> np.ndarray:
+    """
+    Trade-derived microstructure features (89-100) as of each time.
+
+    Each row sees the trades of the FLOW_WINDOW (tape speed: TAPE_WINDOW)
+    seconds before `until_ms`, the same whole-second windows TradeFlow
+    reads live. No historical order book is available, so book
+    imbalance, spread and depth stay at their empty-book values.
+    poc_distance uses a VolumeProfile fed with every trade before
+    `until_ms` (times must be ascending), like the client's session profile.
+    """
+    n = len(until_ms)
+    out = np.zeros((n, 12))
+    out[:, 6] = 0.5  # aggressor_ratio
+    out[:, 8] = 0.0  # spread_percentile (empty book history)
+    if n:
+        out[0, 8] = 50.0
+
+    safe_vwap = np.where(vwap != 0, vwap, 1.0)
+    out[:, 10] = np.where(vwap != 0, (prices - vwap) / safe_vwap, 0.0)
+
+    if trades is None or len(trades['price']) == 0:
+        return out
+
+    ts = np.asarray(trades['timestamp'], dtype=np.int64)
+    price = np.asarray(trades['price'], dtype=np.float64)
+    qty = np.asarray(trades['quantity'], dtype=np.float64)
+    is_buy = ~np.asarray(trades['is_buyer_maker'], dtype=bool)
+    notional = price * qty
+
+    def prefix(values):
+        return np.concatenate([[0.0], np.cumsum(values)])
+
+    # Buy and sell notional summed apart, as TradeFlow does (same rounding)
+    p_buy = prefix(np.where(is_buy, notional, 0.0))
+    p_sell = prefix(np.where(is_buy, 0.0, notional))
+    p_large = prefix(np.where(notional >= large_threshold, notional, 0.0))
+    p_buys = prefix(is_buy.astype(np.float64))
+
+    until_s = np.asarray(until_ms, dtype=np.int64) // 1000 * 1000
+    end = np.searchsorted(ts, until_s, side='left')
+    start = np.searchsorted(ts, until_s - FLOW_WINDOWS[FLOW_WINDOW] * 1000, side='left')
+    tape_start = np.searchsorted(ts, until_s - FLOW_WINDOWS[TAPE_WINDOW] * 1000, side='left')
+    count = end - start
+    has = count > 0
+
+    cvd = (p_buy[end] - p_buy[start]) - (p_sell[end] - p_sell[start])
+    out[:, 0] = np.where(has, cvd, 0.0)
+    out[:, 4] = np.where(has, p_large[end] - p_large[start], 0.0)
+    out[:, 5] = (end - tape_start) * 60 / FLOW_WINDOWS[TAPE_WINDOW]
+    out[:, 6] = np.where(has, (p_buys[end] - p_buys[start]) / np.maximum(count, 1), 0.5)
+
+    # CVD trend over the last 10 non-empty evaluations
+    rows = np.flatnonzero(has)
+    history = cvd[rows]
+    trend = np.zeros(len(rows))
+    if len(rows) >= 10:
+        base = history[:-9]
+        trend[9:] = np.where(base != 0, (history[9:] - base) / np.where(base != 0, np.abs(base), 1.0), 0.0)
+    out[rows, 1] = trend
+
+    profile = VolumeProfile()
+    fed = 0
+    for row, stop in enumerate(np.searchsorted(ts, until_ms, side='left').tolist()):
+        profile.add_arrays(ts[fed:stop], price[fed:stop], qty[fed:stop])
+        fed = max(fed, stop)
+        poc = profile.poc()
+        if poc > 0 and prices[row] > 0:
+            out[row, 11] = (prices[row] - poc) / prices[row]
+    return out
+
+
+def funding_matrix(funding: Optional[Dict[str, np.ndarray]], until_ms: np.ndarray,
+                   prices: np.ndarray) -> np.ndarray:
+    """
+    Funding features (81-88) from a funding rate history.
+
+    Each row uses the last update before `until_ms`, with the next funding
+    time of that update (the following 8h boundary). FundingAnalyzer keeps
+    one (rate, price) entry per live call, so percentile and divergence
+    are rebuilt over the rows that have a rate, with `prices` (the bar
+    closes) as the price of each call. The 8h/24h trends have no live
+    input and keep their defaults.
+    """
+    n = len(until_ms)
+    out = np.zeros((n, 8))
+    out[:, 7] = 50.0
+    if funding is None or len(funding['funding_rate']) == 0:
+        return out
+
+    ts = np.asarray(funding['timestamp'], dtype=np.int64)
+    rates = np.asarray(funding['funding_rate'], dtype=np.float64)
+    until_ms = np.asarray(until_ms, dtype=np.int64)
+    i = np.searchsorted(ts, until_ms, side='left') - 1
+    has = i >= 0
+    current = np.where(has, rates[np.maximum(i, 0)], 0.0)
+
+    period_ms = 8 * 3600 * 1000
+    next_funding = (ts[np.maximum(i, 0)] // period_ms + 1) * period_ms
+    # Past the update's funding time FundingAnalyzer counts to the next 8h boundary
+    fallback = (8 - until_ms // 3_600_000 % 8) % 8 * 60 - until_ms // 60000 % 60
+    to_funding = np.where(next_funding > until_ms, np.trunc((next_funding - until_ms) / 60000), fallback)
+
+    out[:, 0] = current
+    out[:, 1] = current
+    out[:, 4] = np.where(has & (np.abs(current) > 0.001), 1.0, 0.0)
+    out[:, 6] = np.where(has, to_funding, 0)
+
+    rows = np.flatnonzero(has)
+    if len(rows) == 0:
+        return out
+    r = current[rows]
+    p = np.asarray(prices, dtype=np.float64)[rows]
+
+    # Percentile vs the last (up to) FUNDING_HISTORY calls, the current one included
+    padded = np.concatenate([np.full(FUNDING_HISTORY - 1, np.inf), r])
+    below = (sliding_window_view(padded, FUNDING_HISTORY) < r[:, None]).sum(axis=1)
+    length = np.minimum(np.arange(1, len(r) + 1), FUNDING_HISTORY)
+    out[rows, 7] = np.where(length > 1, below / length * 100, 50.0)
+
+    # Divergence of the funding and price changes over the last 3 calls
+    if len(r) >= 3:
+        funding_change = r[2:] - r[:-2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = (p[2:] - p[:-2]) / p[:-2]
+        funding_bullish = funding_change > 0
+        divergence = np.abs(funding_change * 1000) + np.abs(price_change * 100)
+        out[rows[2:], 5] = np.where(funding_bullish != (price_change > 0),
+                                    np.where(funding_bullish, divergence, -divergence), 0.0)
+    return out
+
+
+def calculate_feature_matrix(
+    candles_by_tf: Dict[str, object],
+    trades: Optional[Dict[str, np.ndarray]] = None,
+    funding: Optional[Dict[str, np.ndarray]] = None,
+    primary_tf: str = '5m',
+    defaults: Optional[np.ndarray] = None
+) -> tuple:
+    """
+    Compute the 100-feature matrix for every closed bar of `primary_tf`.
+
+    Args:
+        candles_by_tf: timeframe -> CandleBuffer, list of Candle, or dict of
+            columns ('timestamp' open time in ms, open/high/low/close/volume)
+        trades: optional dict of arrays sorted by time: 'timestamp' (ms),
+            'price', 'quantity', 'is_buyer_maker'
+        funding: optional dict of arrays: 'timestamp' (ms), 'funding_rate'
+        defaults: default 100-float row (on-chain/liquidation columns and
+            anything not reconstructible are taken from it)
+
+    Returns:
+        (close_ms, matrix): bar close times and an (n_bars x 100) matrix
+    """
+    cols_by_tf = {
+        tf: candle_columns(candles)
+        for tf, candles in candles_by_tf.items() if candles is not None
+    }
+    primary = cols_by_tf[primary_tf]
+    n = len(primary['close'])
+    until_ms = primary['timestamp'].astype(np.int64) + TIMEFRAME_MS[primary_tf]
+
+    matrix = np.zeros((n, 100))
+    if defaults is not None:
+        matrix[:] = defaults
+    if n == 0:
+        return until_ms, matrix
+
+    technical = technical_matrix(primary)
+    matrix[:, TECHNICAL_SLICE] = technical
+    matrix[:, PRICE_ACTION_SLICE] = price_action_matrix(primary)
+    matrix[:, MTF_SLICE] = mtf_matrix(cols_by_tf, until_ms)
+    matrix[:, FUNDING_SLICE] = funding_matrix(funding, until_ms, primary['close'])
+    matrix[:, MICROSTRUCTURE_SLICE] = microstructure_matrix(
+        trades, until_ms, primary['close'], technical[:, 19]
+    )
+
+    return until_ms, matrix
@@ -0,0 +1,214 @@
+"""
+Batch Feature Parity - calculate_batch against the live per-bar pipeline
+Synthetic klines, aggTrades and mark price through BinanceClient and FeatureEngine
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+from ..ai.model import AIModel
+from ..data.candle_buffer import TIMEFRAME_MS
+from ..data.replay_client import ReplayClient
+from .feature_engine import FeatureEngine
+
+
+TIMEFRAMES = ('1m', '3m', '5m', '15m')
+START_MS = 1_700_006_400_000  # A UTC midnight, so the run crosses session boundaries
+FUNDING_PERIOD_MS = 8 * 3_600_000
+
+
+# ==================== Data ====================
+
+class SyntheticMarket:
+    """
+    A random-walk BTCUSDT market as the Binance stream delivers it: each
+    minute has a markPrice update, aggTrades, forming kline updates for
+    every timeframe half-way and closing klines at its end. The closed
+    candles, trades and funding history are kept as columns for the batch
+    side.
+    """
+
+    def __init__(self, trades_per_minute: float = 30.0, seed: int = 17):
+        self.rng = np.random.default_rng(seed)
+        self.trades_per_minute = trades_per_minute
+        self.price = 65000.0
+        self.funding_rate = 0.0001
+        self.open_candles: Dict[str, list] = {}
+        self.candles: Dict[str, List[list]] = {tf: [] for tf in TIMEFRAMES}
+        self.trades: List[tuple] = []
+        self.funding: List[tuple] = []
+        self.trade_id = 0
+
+    def minute(self, start_ms: int) -> List[dict]:
+        """Messages of the minute starting at start_ms, in stream order"""
+        rng = self.rng
+        messages = []
+
+        # Funding drifts and now and then turns extreme (|rate| > 0.1%)
+        self.funding_rate = float(np.clip(self.funding_rate + rng.normal(0, 0.0002), -0.003, 0.003))
+        self.funding.append((start_ms, self.funding_rate))
+        messages.append({
+            "e": "markPriceUpdate", "E": start_ms, "s": "BTCUSDT", "p": repr(self.price),
+            "r": repr(self.funding_rate), "T": (start_ms // FUNDING_PERIOD_MS + 1) * FUNDING_PERIOD_MS
+        })
+
+        count = max(1, int(rng.poisson(self.trades_per_minute)))
+        offsets = np.sort(rng.integers(0, 60_000, count)).tolist()
+        for i, offset in enumerate(offsets):
+            self.price = round(self.price + float(rng.normal(0, 8.0)), 1)
+            # Mostly small trades, a few above the large-order threshold
+            quantity = round(float(rng.exponential(0.05)) + (2.0 if rng.random() < 0.03 else 0.0), 3)
+            is_buyer_maker = bool(rng.random() < 0.5)
+            trade_ms = start_ms + offset
+            self.trades.append((trade_ms, self.price, quantity, is_buyer_maker))
+            self.trade_id += 1
+            messages.append({
+                "e": "aggTrade", "E": trade_ms, "s": "BTCUSDT", "a": self.trade_id,
+                "p": repr(self.price), "q": repr(quantity), "f": self.trade_id, "l": self.trade_id,
+                "T": trade_ms, "m": is_buyer_maker
+            })
+            self._update_candles(start_ms, self.price, quantity)
+            if i == count // 2:
+                messages.extend(self._kline(start_ms + offset, tf, False) for tf in TIMEFRAMES)
+
+        # Bars ending with this minute close, shortest timeframe first
+        end_ms = start_ms + 60_000
+        for tf in TIMEFRAMES:
+            if end_ms % TIMEFRAME_MS[tf] == 0 and tf in self.open_candles:
+                messages.append(self._kline(end_ms, tf, True))
+                self.candles[tf].append(self.open_candles.pop(tf))
+        return messages
+
+    def _update_candles(self, minute_ms: int, price: float, quantity: float):
+        for tf in TIMEFRAMES:
+            candle = self.open_candles.get(tf)
+            if candle is None:
+                open_ms = minute_ms // TIMEFRAME_MS[tf] * TIMEFRAME_MS[tf]
+                candle = self.open_candles[tf] = [open_ms, price, price, price, price, 0.0, 0.0, 0]
+            candle[2] = max(candle[2], price)
+            candle[3] = min(candle[3], price)
+            candle[4] = price
+            candle[5] += quantity
+            candle[6] += price * quantity
+            candle[7] += 1
+
+    def _kline(self, event_ms: int, tf: str, closed: bool) -> dict:
+        open_ms, open_, high, low, close, volume, quote_volume, trades = self.open_candles[tf]
+        return {"e": "kline", "E": event_ms, "s": "BTCUSDT", "k": {
+            "t": open_ms, "T": open_ms + TIMEFRAME_MS[tf] - 1, "s": "BTCUSDT", "i": tf,
+            "o": repr(open_), "c": repr(close), "h": repr(high), "l": repr(low),
+            "v": repr(volume), "q": repr(quote_volume), "n": trades, "x": closed
+        }}
+
+    def candle_columns(self, tf: str) -> Dict[str, np.ndarray]:
+        rows = np.array(self.candles[tf], dtype=np.float64).reshape(-1, 8)
+        return {
+            'timestamp': rows[:, 0].astype(np.int64),
+            'open': rows[:, 1], 'high': rows[:, 2], 'low': rows[:, 3], 'close': rows[:, 4],
+            'volume': rows[:, 5], 'quote_volume': rows[:, 6], 'trades': rows[:, 7].astype(np.int64),
+        }
+
+    def trade_columns(self) -> Dict[str, np.ndarray]:
+        times, prices, quantities, makers = zip(*self.trades)
+        return {
+            'timestamp': np.array(times, dtype=np.int64),
+            'price': np.array(prices, dtype=np.float64),
+            'quantity': np.array(quantities, dtype=np.float64),
+            'is_buyer_maker': np.array(makers, dtype=bool),
+        }
+
+    def funding_columns(self) -> Dict[str, np.ndarray]:
+        times, rates = zip(*self.funding)
+        return {'timestamp': np.array(times, dtype=np.int64), 'funding_rate': np.array(rates, dtype=np.float64)}
+
+
+# ==================== Live side ====================
+
+async def live_rows(market: SyntheticMarket, bars: int, primary_tf: str = '5m') -> np.ndarray:
+    """
+    Stream `bars` primary bars through _process_message on the market
+    clock and run FeatureEngine.calculate right after each primary bar
+    closes, as the main loop does. Returns one to_feature_vector() row
+    per bar.
+    """
+    engine = FeatureEngine()
+    rows = []
+    minutes = bars * TIMEFRAME_MS[primary_tf] // 60_000
+    with tempfile.TemporaryDirectory() as directory:
+        client = ReplayClient(directory, speed=0)
+        for minute in range(minutes):
+            start_ms = START_MS + minute * 60_000
+            for message in market.minute(start_ms):
+                client._clock_ms = message["E"]
+                await client._process_message(json.dumps(message))
+            end_ms = start_ms + 60_000
+            if end_ms % TIMEFRAME_MS[primary_tf] == 0:
+                features = await engine.calculate(client.data, now=datetime.utcfromtimestamp(end_ms / 1000))
+                rows.append(features.to_feature_vector())
+    await engine.close()
+    return np.array(rows, dtype=np.float64)
+
+
+# ==================== Check ====================
+
+def compare(live: np.ndarray, batch: np.ndarray, rtol: float, atol: float) -> List[str]:
+    """Columns whose rows differ; prints the first mismatch of each"""
+    names = AIModel._get_feature_names()
+    failures = []
+    same = np.isclose(live, batch, rtol=rtol, atol=atol, equal_nan=True)
+    for column in np.flatnonzero(~same.all(axis=0)).tolist():
+        bad = np.flatnonzero(~same[:, column])
+        row = int(bad[0])
+        print(f"{column:>3} {names[column]:<24} {len(bad):>5} rows differ, first at bar {row}: "
+              f"live {live[row, column]!r} batch {batch[row, column]!r}")
+        failures.append(names[column])
+    return failures
+
+
+def main():
+    """python -m src.features.batch_parity"""
+    parser = argparse.ArgumentParser(description="calculate_batch parity with the live per-bar features")
+    parser.add_argument('--bars', type=int, default=700, help="5m bars to stream (past the 500-bar window)")
+    parser.add_argument('--trades-per-minute', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=17)
+    parser.add_argument('--rtol', type=float, default=1e-9)
+    parser.add_argument('--atol', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    market = SyntheticMarket(args.trades_per_minute, args.seed)
+    start = time.perf_counter()
+    live = asyncio.run(live_rows(market, args.bars))
+    live_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = FeatureEngine().calculate_batch(
+        {tf: market.candle_columns(tf) for tf in TIMEFRAMES},
+        trades=market.trade_columns(),
+        funding=market.funding_columns()
+    )
+    batch_s = time.perf_counter() - start
+
+    print(f"{len(live)} bars, {len(market.trades)} trades: live {live_s:.2f}s, batch {batch_s:.2f}s")
+    if batch.shape != live.shape:
+        print(f"Shape mismatch: live {live.shape}, batch {batch.shape}")
+        sys.exit(1)
+
+    failures = compare(live, batch, args.rtol, args.atol)
+    if failures:
+        print(f"Parity failures in {len(failures)} of {live.shape[1]} columns")
+        sys.exit(1)
+    print(f"All {live.shape[1]} columns identical to the live features on every bar")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,11 @@
 Feature Engine - Combines all 100 BTC-specific features
 Bot 1: Core Brain
 """
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 import logging
+import numpy as np
 
 from .technical import TechnicalAnalyzer, TechnicalFeatures
 from .price_action import PriceActionAnalyzer, PriceActionFeatures
@@ -14,9 +15,26 @@ from .onchain import OnchainAnalyzer, OnchainFeatures
 from .liquidation import LiquidationAnalyzer, LiquidationFeatures
 from .funding import FundingAnalyzer, FundingFeatures
 from .microstructure import MicrostructureAnalyzer, MicrostructureFeatures
+from .batch import calculate_feature_matrix
+from .feature_store import FeatureStore
+from .indicators import IndicatorCache
 
 logger = logging.getLogger(__name__)
 
+# Feature groups in to_feature_vector() order (vector order == dataclass field order)
+_VECTOR_LAYOUT = tuple(
+    (name, group_cls, tuple((f.name, f.type) for f in fields(group_cls)))
+    for name, group_cls in (
+        ('technical', TechnicalFeatures),
+        ('price_action', PriceActionFeatures),
+        ('mtf', MTFFeatures),
+        ('onchain', OnchainFeatures),
+        ('liquidation', LiquidationFeatures),
+        ('funding', FundingFeatures),
+        ('microstructure', MicrostructureFeatures),
+    )
+)
+
 
 @dataclass
 class AllFeatures:
@@ -193,6 +211,29 @@ class AllFeatures:
         ])
         
         return features
+    
+    @classmethod
+    def from_feature_vector(
+        cls,
+        vector,
+        timestamp: datetime = None,
+        current_price: float = 0.0
+    ) -> 'AllFeatures':
+        """Rebuild features from a to_feature_vector() row (e.g. calculate_batch output)"""
+        values = iter(vector.tolist() if hasattr(vector, 'tolist') else vector)
+        groups = {}
+        for name, group_cls, group_fields in _VECTOR_LAYOUT:
+            kwargs = {}
+            for field_name, field_type in group_fields:
+                value = next(values)
+                if field_type is bool:
+                    value = value > 0.5
+                elif field_type is int:
+                    value = int(value)
+                kwargs[field_name] = value
+            groups[name] = group_cls(**kwargs)
+        
+        return cls(timestamp=timestamp, current_price=current_price, **groups)
 
 
 class FeatureEngine:
@@ -202,10 +243,16 @@ class FeatureEngine:
         self,
         glassnode_api_key: str = "",
         coinglass_api_key: str = "",
-        use_mock: bool = False
+        use_mock: bool = False,
+        store: Optional[FeatureStore] = None
     ):
         self.use_mock = use_mock
         
+        # Snapshots per closed bar, shared with every reader
+        self.store = store if store is not None else FeatureStore()
+        # Closed-bar indicator values for the predictor (shared kernel)
+        self.indicators = IndicatorCache()
+        
         # Initialize analyzers
         self.technical = TechnicalAnalyzer()
         self.price_action = PriceActionAnalyzer()
@@ -222,26 +269,27 @@ class FeatureEngine:
         await self.onchain.close()
         await self.liquidation.close()
     
-    async def calculate(self, market_data) -> AllFeatures:
+    async def calculate(self, market_data, now: Optional[datetime] = None) -> AllFeatures:
         """
         Calculate all 100 features from market data.
         
         Args:
             market_data: MarketData object from BinanceClient
+            now: Market clock time (defaults to utcnow; replay passes its own)
         
         Returns:
             AllFeatures object with all 100 features
         """
         features = AllFeatures()
-        features.timestamp = datetime.utcnow()
+        features.timestamp = now or datetime.utcnow()
         features.current_price = market_data.last_price
         
         try:
-            # Get candles
-            candles_1m = list(market_data.candles.get('1m', []))
-            candles_3m = list(market_data.candles.get('3m', []))
-            candles_5m = list(market_data.candles.get('5m', []))
-            candles_15m = list(market_data.candles.get('15m', []))
+            # Get candles (CandleBuffer column stores, passed without copying)
+            candles_1m = market_data.candles.get('1m', [])
+            candles_3m = market_data.candles.get('3m', [])
+            candles_5m = market_data.candles.get('5m', [])
+            candles_15m = market_data.candles.get('15m', [])
             
             # Technical features (use 5m as primary)
             if candles_5m:
@@ -277,23 +325,26 @@ class FeatureEngine:
                 features.funding = self.funding.calculate(
                     current_funding=market_data.funding.funding_rate,
                     next_funding_time=market_data.funding.next_funding_time,
-                    current_price=features.current_price
+                    current_price=features.current_price,
+                    now=features.timestamp
                 )
             elif self.use_mock:
                 features.funding = self.funding.get_mock_features(features.current_price)
             
-            # Microstructure features
-            trades = list(market_data.trades)
+            # Microstructure features (trade flow is aggregated as trades arrive)
             vwap = features.technical.vwap if features.technical else 0
             
             if self.use_mock:
                 features.microstructure = self.microstructure.get_mock_features(features.current_price)
             else:
                 features.microstructure = self.microstructure.calculate(
-                    trades=trades,
+                    trades=market_data.trades,
                     orderbook=market_data.orderbook,
                     current_price=features.current_price,
-                    vwap=vwap
+                    vwap=vwap,
+                    flow=market_data.trade_flow,
+                    now_ms=int(features.timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000),
+                    profile=market_data.volume_profile
                 )
             
             self.last_features = features
@@ -305,6 +356,61 @@ class FeatureEngine:
         
         return features
     
+    async def calculate_bar(
+        self,
+        market_data,
+        timeframe: str,
+        bar_close: datetime,
+        now: Optional[datetime] = None
+    ) -> AllFeatures:
+        """
+        Features as of a closed bar, calculated once per bar.
+        
+        The first call for (timeframe, bar_close) calculates and stores
+        them; later calls return the stored snapshot.
+        """
+        record = self.store.get(timeframe, bar_close)
+        if record is not None:
+            return record.features
+        
+        features = await self.calculate(market_data, now=now)
+        self.store.put(timeframe, bar_close, features, computed_at=features.timestamp)
+        # Warm the indicator cache once per bar; predictor runs then hit it
+        self.indicators.get(timeframe, market_data.candles.get(timeframe))
+        return features
+    
+    def calculate_batch(
+        self,
+        candles_by_tf: Dict[str, Any],
+        trades: Optional[Dict[str, np.ndarray]] = None,
+        funding: Optional[Dict[str, np.ndarray]] = None,
+        primary_tf: str = '5m'
+    ) -> np.ndarray:
+        """
+        Calculate the 100-feature vector for every closed bar of a history.
+        
+        Row i matches to_feature_vector() of a live calculate() run right
+        after bar i of `primary_tf` closed, for the features that can be
+        rebuilt from candles, trades and funding history. On-chain and
+        liquidation columns keep their defaults (the live values without
+        API data). python -m src.features.batch_parity checks this.
+        
+        Args:
+            candles_by_tf: timeframe -> CandleBuffer, list of Candle, or dict
+                of columns ('timestamp' open time in ms, OHLCV)
+            trades: optional time-sorted arrays 'timestamp' (ms), 'price',
+                'quantity', 'is_buyer_maker'
+            funding: optional arrays 'timestamp' (ms), 'funding_rate'
+        
+        Returns:
+            (n_bars x 100) feature matrix
+        """
+        defaults = np.array(AllFeatures().to_feature_vector(), dtype=np.float64)
+        _, matrix = calculate_feature_matrix(
+            candles_by_tf, trades, funding, primary_tf, defaults
+        )
+        return matrix
+    
     def get_last_features(self) -> Optional[AllFeatures]:
         """Get last calculated features"""
         return self.last_features
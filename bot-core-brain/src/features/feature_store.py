@@ -0,0 +1,154 @@
+"""
+Online Feature Store - One feature snapshot per (timeframe, bar close)
+FeatureEngine writes each closed bar once; every other component reads
+"""
+import bisect
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeatureRecord:
+    """Features (and the regime detected from them) as of one bar close"""
+    timeframe: str
+    bar_close: datetime
+    features: Any                  # AllFeatures
+    regime: Any = None             # RegimeResult, once detected
+    computed_at: datetime = None   # Market clock when the features were calculated
+    extras: Dict[str, Any] = field(default_factory=dict)  # Other per-bar values readers want to share
+
+
+class FeatureStore:
+    """
+    In-process store of feature snapshots keyed by (timeframe, bar close).
+
+    - get(): exact bar.
+    - latest(): newest bar of a timeframe (what /status, /regime show).
+    - as_of(): newest bar closed at or before a time; a label or backtest
+      reading as_of(signal time) sees only what was known then.
+
+    Holds at most `capacity` records; the least recently used is evicted.
+    Not thread-safe: use it from the event loop.
+    """
+
+    def __init__(self, capacity: int = 2000):
+        self.capacity = capacity
+        self._records: "OrderedDict[Tuple[str, datetime], FeatureRecord]" = OrderedDict()
+        self._closes: Dict[str, List[datetime]] = {}  # Sorted bar closes per timeframe
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: Tuple[str, datetime]) -> bool:
+        return key in self._records
+
+    # ==================== Writes ====================
+
+    def put(
+        self,
+        timeframe: str,
+        bar_close: datetime,
+        features: Any,
+        regime: Any = None,
+        computed_at: Optional[datetime] = None
+    ) -> FeatureRecord:
+        """Store (or replace) the snapshot of a bar"""
+        key = (timeframe, bar_close)
+        record = FeatureRecord(
+            timeframe=timeframe,
+            bar_close=bar_close,
+            features=features,
+            regime=regime,
+            computed_at=computed_at or getattr(features, 'timestamp', None)
+        )
+        if key not in self._records:
+            closes = self._closes.setdefault(timeframe, [])
+            if not closes or bar_close > closes[-1]:
+                closes.append(bar_close)
+            else:
+                bisect.insort(closes, bar_close)
+        self._records[key] = record
+        self._records.move_to_end(key)
+
+        while len(self._records) > self.capacity:
+            self._evict()
+        return record
+
+    def set_regime(self, timeframe: str, bar_close: datetime, regime: Any) -> bool:
+        """Attach the regime detected for a stored bar"""
+        record = self._records.get((timeframe, bar_close))
+        if record is None:
+            return False
+        record.regime = regime
+        return True
+
+    def _evict(self):
+        (timeframe, bar_close), _ = self._records.popitem(last=False)
+        closes = self._closes[timeframe]
+        i = bisect.bisect_left(closes, bar_close)
+        if i < len(closes) and closes[i] == bar_close:
+            del closes[i]
+        if not closes:
+            del self._closes[timeframe]
+
+    # ==================== Reads ====================
+
+    def get(self, timeframe: str, bar_close: datetime) -> Optional[FeatureRecord]:
+        """Snapshot of exactly this bar, if stored"""
+        record = self._records.get((timeframe, bar_close))
+        if record is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._records.move_to_end((timeframe, bar_close))
+        return record
+
+    def latest(self, timeframe: Optional[str] = None) -> Optional[FeatureRecord]:
+        """
+        Newest bar of `timeframe`; without one, the newest bar of any
+        timeframe.
+        """
+        if timeframe is None:
+            newest = [(closes[-1], tf) for tf, closes in self._closes.items()]
+            if not newest:
+                return None
+            bar_close, timeframe = max(newest)
+            return self.get(timeframe, bar_close)
+
+        closes = self._closes.get(timeframe)
+        if not closes:
+            return None
+        return self.get(timeframe, closes[-1])
+
+    def as_of(self, timeframe: str, when: datetime) -> Optional[FeatureRecord]:
+        """Newest bar closed at or before `when` (never a later one)"""
+        closes = self._closes.get(timeframe)
+        if not closes:
+            return None
+        i = bisect.bisect_right(closes, when)
+        if i == 0:
+            return None
+        return self.get(timeframe, closes[i - 1])
+
+    def history(
+        self,
+        timeframe: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[FeatureRecord]:
+        """Stored bars with start <= bar close <= end, oldest first"""
+        closes = self._closes.get(timeframe, [])
+        lo = 0 if start is None else bisect.bisect_left(closes, start)
+        hi = len(closes) if end is None else bisect.bisect_right(closes, end)
+        return [self._records[(timeframe, bar_close)] for bar_close in closes[lo:hi]]
+
+    def timeframes(self) -> List[str]:
+        return sorted(self._closes)
@@ -34,7 +34,8 @@ class FundingAnalyzer:
         next_funding_time: datetime,
         current_price: float,
         funding_history_8h: List[float] = None,
-        funding_history_24h: List[float] = None
+        funding_history_24h: List[float] = None,
+        now: Optional[datetime] = None
     ) -> FundingFeatures:
         """Calculate funding rate features"""
         features = FundingFeatures()
@@ -65,7 +66,7 @@ class FundingAnalyzer:
         features.funding_extreme = abs(current_funding) > 0.001
         
         # Time to next funding
-        now = datetime.utcnow()
+        now = now or datetime.utcnow()
         if next_funding_time > now:
             features.time_to_funding = int((next_funding_time - now).total_seconds() / 60)
         else:
@@ -0,0 +1,326 @@
+"""
+Indicator Kernel - Vectorized technical indicators on NumPy arrays
+Shared by the feature batch path and the BTC direction predictor
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Every series function returns one value per input bar with the same
+# warm-up rules as the streaming indicators (streaming.py), so the value
+# at bar i equals the streaming `current` after committing bars 0..i.
+
+
+def linear_filter(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    y[j] = (1 - alpha) * y[j-1] + alpha * values[j], with y[-1] = initial.
+
+    The recursion behind EMA and Wilder smoothing, solved in closed form
+    per block: y[j] = w^j * (w * y[-1] + alpha * cumsum(values[k] * w^-k)).
+    Blocks are short enough that w^-k stays far from overflow.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    w = 1.0 - alpha
+    if w <= 0.0:
+        out[:] = values
+        return out
+
+    block = max(1, min(n, int(200 / -np.log(w))))
+    inverse_powers = w ** -np.arange(block, dtype=np.float64)
+    previous = float(initial)
+    for start in range(0, n, block):
+        chunk = values[start:start + block]
+        scale = inverse_powers[:len(chunk)]
+        acc = alpha * np.cumsum(chunk * scale) + w * previous
+        out[start:start + len(chunk)] = acc / scale
+        previous = out[start + len(chunk) - 1]
+    return out
+
+
+def ema_series(prices: np.ndarray, period: int) -> np.ndarray:
+    """Raw EMA seeded with the first price (no warm-up rule)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) == 0:
+        return np.empty(0)
+    return linear_filter(prices, 2 / (period + 1), prices[0])
+
+
+def ema(prices: np.ndarray, period: int) -> np.ndarray:
+    """EMA as calculate_ema: the last price until `period` bars are in"""
+    prices = np.asarray(prices, dtype=np.float64)
+    out = ema_series(prices, period)
+    warm = min(period - 1, len(prices))
+    out[:warm] = prices[:warm]
+    return out
+
+
+def _wilder(values: np.ndarray, period: int, first: int) -> np.ndarray:
+    """
+    Wilder average of values[first - period + 1 .. first] seeded at `first`,
+    then smoothed; NaN before `first`.
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) > first:
+        seed = values[first - period + 1:first + 1].mean()
+        out[first] = seed
+        out[first + 1:] = linear_filter(values[first + 1:], 1 / period, seed)
+    return out
+
+
+def rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI as calculate_rsi_wilder (50 until period + 1 prices)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    out = np.full(len(prices), 50.0)
+    if len(prices) < period + 1:
+        return out
+
+    deltas = np.diff(prices, prepend=prices[0])
+    avg_gain = _wilder(np.maximum(deltas, 0.0), period, period)[period:]
+    avg_loss = _wilder(np.maximum(-deltas, 0.0), period, period)[period:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[period:] = np.where(avg_loss == 0, 100.0, values)
+    return out
+
+
+def macd(prices: np.ndarray, fast: int = 12, slow: int = 26,
+         signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal and histogram as StreamingMACD (zeros until `slow` bars)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    line = np.zeros(n)
+    signal_line = np.zeros(n)
+    if n >= slow:
+        raw = ema_series(prices, fast) - ema_series(prices, slow)
+        line[slow - 1:] = raw[slow - 1:]
+        signal_line[slow - 1:] = ema(raw[slow - 1:], signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(prices: np.ndarray, period: int = 20,
+              std_dev: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Upper, middle, lower band and position (0-1) as StreamingBollinger;
+    until `period` prices the bands sit on the price and position is 0.5.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    upper = prices.copy()
+    middle = prices.copy()
+    lower = prices.copy()
+    position = np.full(len(prices), 0.5)
+    if len(prices) >= period:
+        windows = sliding_window_view(prices, period)
+        mean = windows.mean(axis=1)
+        std = windows.std(axis=1)
+        middle[period - 1:] = mean
+        upper[period - 1:] = mean + std * std_dev
+        lower[period - 1:] = mean - std * std_dev
+        width = upper[period - 1:] - lower[period - 1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            raw = (prices[period - 1:] - lower[period - 1:]) / width
+        position[period - 1:] = np.where(width == 0, 0.5, np.clip(raw, 0, 1))
+    return upper, middle, lower, position
+
+
+def true_range(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    """True range per bar (0 for the first bar, which has no previous close)"""
+    tr = np.zeros(len(closes))
+    if len(closes) > 1:
+        prev_close = closes[:-1]
+        tr[1:] = np.maximum(highs[1:] - lows[1:], np.maximum(
+            np.abs(highs[1:] - prev_close), np.abs(lows[1:] - prev_close)
+        ))
+    return tr
+
+
+def atr(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder ATR as calculate_atr_wilder (0 until period + 1 bars)"""
+    tr = true_range(*(np.asarray(a, dtype=np.float64) for a in (highs, lows, closes)))
+    return np.nan_to_num(_wilder(tr, period, period), nan=0.0)
+
+
+def adx(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+        period: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ADX, +DI and -DI as calculate_adx_wilder: zeros until period + 1 bars,
+    raw DX in place of ADX until the first ADX is seeded.
+    """
+    highs, lows, closes = (np.asarray(a, dtype=np.float64) for a in (highs, lows, closes))
+    n = len(closes)
+    p = period
+    adx_out = np.zeros(n)
+    plus_di = np.zeros(n)
+    minus_di = np.zeros(n)
+    if n < p + 1:
+        return adx_out, plus_di, minus_di
+
+    tr = true_range(highs, lows, closes)
+    up_move = np.zeros(n)
+    down_move = np.zeros(n)
+    up_move[1:] = highs[1:] - highs[:-1]
+    down_move[1:] = lows[:-1] - lows[1:]
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+    def smoothed(values):
+        # Wilder sums: plain sum of the first `p` moves, then s - s/p + x
+        return p * _wilder(values, p, p)[p:]
+
+    tr_s, plus_s, minus_s = smoothed(tr), smoothed(plus_dm), smoothed(minus_dm)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pdi = np.where(tr_s != 0, 100 * plus_s / tr_s, 0.0)
+        mdi = np.where(tr_s != 0, 100 * minus_s / tr_s, 0.0)
+        di_sum = pdi + mdi
+        dx = np.where(di_sum != 0, 100 * np.abs(pdi - mdi) / di_sum, 0.0)
+
+    plus_di[p:] = pdi
+    minus_di[p:] = mdi
+    adx_out[p:] = dx
+    if n >= 2 * p:
+        adx_out[2 * p - 1:] = _wilder(dx, p, p - 1)[p - 1:]
+    return adx_out, plus_di, minus_di
+
+
+def stochastic(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+               k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """%K and %D as StreamingStochastic (50 until k_period bars)"""
+    highs, lows, closes = (np.asarray(a, dtype=np.float64) for a in (highs, lows, closes))
+    n = len(closes)
+    k_out = np.full(n, 50.0)
+    d_out = np.full(n, 50.0)
+    if n == 0:
+        return k_out, d_out
+
+    # Windows of up to k_period bars ending at each bar
+    pad = k_period - 1
+    highest = sliding_window_view(np.concatenate([np.full(pad, -np.inf), highs]), k_period).max(axis=1)
+    lowest = sliding_window_view(np.concatenate([np.full(pad, np.inf), lows]), k_period).min(axis=1)
+    span = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(span == 0, 50.0, 100 * (closes - lowest) / span)
+
+    # %D: current %K with up to d_period - 1 previous values
+    counts = np.minimum(np.arange(1, n + 1), d_period)
+    sums = np.cumsum(k)
+    sums[d_period:] = sums[d_period:] - sums[:-d_period]
+    d = sums / counts
+
+    k_out[k_period - 1:] = k[k_period - 1:]
+    d_out[k_period - 1:] = d[k_period - 1:]
+    return k_out, d_out
+
+
+def vwap(closes: np.ndarray, volumes: np.ndarray, window: int = 500) -> np.ndarray:
+    """VWAP over the last `window` bars (the close where there is no volume)"""
+    closes = np.asarray(closes, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    pv = np.cumsum(closes * volumes)
+    vol = np.cumsum(volumes)
+    pv[window:] = pv[window:] - pv[:-window]
+    vol[window:] = vol[window:] - vol[:-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(vol == 0, closes, pv / vol)
+
+
+# ==================== Closed-bar snapshot cache ====================
+
+
+@dataclass
+class ClosedBarIndicators:
+    """Indicator values as of the last closed bar of one timeframe"""
+    bar_open_ms: int
+    close: float
+    rsi_14: float
+    ema_9: float
+    ema_21: float
+    ema_50: float
+    macd_line: float
+    macd_signal: float
+    macd_histogram: float
+    macd_histogram_prev: float
+    bb_upper: float
+    bb_middle: float
+    bb_lower: float
+    atr_14: float
+    adx: float
+    plus_di: float
+    minus_di: float
+
+
+def closed_bar_indicators(bar_open_ms: int, highs: np.ndarray, lows: np.ndarray,
+                          closes: np.ndarray) -> ClosedBarIndicators:
+    """Indicators of the last bar of closed-bar arrays (at least two bars)"""
+    macd_line, macd_signal, histogram = macd(closes)
+    upper, middle, lower, _ = bollinger(closes)
+    adx_values, plus_di, minus_di = adx(highs, lows, closes)
+    return ClosedBarIndicators(
+        bar_open_ms=int(bar_open_ms),
+        close=float(closes[-1]),
+        rsi_14=float(rsi(closes, 14)[-1]),
+        ema_9=float(ema(closes, 9)[-1]),
+        ema_21=float(ema(closes, 21)[-1]),
+        ema_50=float(ema(closes, 50)[-1]),
+        macd_line=float(macd_line[-1]),
+        macd_signal=float(macd_signal[-1]),
+        macd_histogram=float(histogram[-1]),
+        macd_histogram_prev=float(histogram[-2]),
+        bb_upper=float(upper[-1]),
+        bb_middle=float(middle[-1]),
+        bb_lower=float(lower[-1]),
+        atr_14=float(atr(highs, lows, closes, 14)[-1]),
+        adx=float(adx_values[-1]),
+        plus_di=float(plus_di[-1]),
+        minus_di=float(minus_di[-1]),
+    )
+
+
+class IndicatorCache:
+    """
+    ClosedBarIndicators per (timeframe, last closed bar).
+
+    The first reader after a bar closes computes the snapshot from the
+    candle columns; every later reader of the same bar gets it for free.
+    A forming candle at the end of the buffer is ignored.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.capacity = capacity
+        self._entries: "OrderedDict[Tuple[str, int], ClosedBarIndicators]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, timeframe: str, candles) -> Optional[ClosedBarIndicators]:
+        """Snapshot for the newest closed bar of a CandleBuffer (None if under two bars)"""
+        if candles is None or len(candles) == 0:
+            return None
+        closed = len(candles) - (0 if candles.column('is_closed', 1)[-1] else 1)
+        if closed < 2:
+            return None
+
+        timestamps = candles.timestamps()[:closed]
+        key = (timeframe, int(timestamps[-1]))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = closed_bar_indicators(
+            timestamps[-1],
+            candles.highs()[:closed], candles.lows()[:closed], candles.closes()[:closed]
+        )
+        self._entries[key] = entry
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
@@ -7,6 +7,15 @@ from dataclasses import dataclass
 from collections import deque
 import numpy as np
 
+from ..data.order_book import LocalOrderBook
+from ..data.trade_buffer import trade_columns
+from ..data.trade_flow import FLOW_WINDOWS, FlowWindow, TradeFlow
+from ..data.volume_profile import VolumeProfile
+
+# Trade flow windows: CVD, large orders and aggressor ratio; tape speed
+FLOW_WINDOW = "5m"
+TAPE_WINDOW = "1m"
+
 
 @dataclass
 class MicrostructureFeatures:
@@ -16,13 +25,13 @@ class MicrostructureFeatures:
     orderbook_imbalance: float = 0.0  # Bid vs Ask imbalance
     orderbook_imbalance_10: float = 0.0  # Top 10 levels imbalance
     large_order_flow: float = 0.0  # Large orders (>$100k)
-    tape_speed: float = 0.0  # Trades per minute
+    tape_speed: float = 0.0  # Trades per minute (last minute)
     aggressor_ratio: float = 0.5  # Market vs Limit ratio
     spread_current: float = 0.0
     spread_percentile: float = 50.0
     depth_ratio: float = 0.0  # Liquidity near price
     vwap_distance: float = 0.0
-    poc_distance: float = 0.0  # Point of Control distance
+    poc_distance: float = 0.0  # Point of Control distance (session volume profile)
 
 
 class MicrostructureAnalyzer:
@@ -31,23 +40,13 @@ class MicrostructureAnalyzer:
     def __init__(self):
         self.cvd_history: List[float] = []
         self.spread_history: List[float] = []
-        self.volume_profile: dict = {}  # Price level -> volume
     
-    def calculate_cvd(self, trades: List) -> tuple:
-        """Calculate Cumulative Volume Delta and trend"""
-        if not trades:
+    def calculate_cvd(self, window: FlowWindow) -> tuple:
+        """Cumulative Volume Delta over the flow window and its trend"""
+        if not window.count:
             return 0.0, 0.0
         
-        buy_volume = 0.0
-        sell_volume = 0.0
-        
-        for trade in trades:
-            if trade.is_buy:
-                buy_volume += trade.quantity * trade.price
-            else:
-                sell_volume += trade.quantity * trade.price
-        
-        cvd = buy_volume - sell_volume
+        cvd = window.cvd
         
         # Track history
         self.cvd_history.append(cvd)
@@ -65,6 +64,9 @@ class MicrostructureAnalyzer:
     
     def calculate_orderbook_imbalance(self, orderbook) -> tuple:
         """Calculate order book imbalance"""
+        if isinstance(orderbook, LocalOrderBook):
+            # Whole synced book from running totals, top 10 from the sorted levels
+            return (orderbook.imbalance(), orderbook.imbalance(10)) if orderbook else (0.0, 0.0)
         if not orderbook or not orderbook.bids or not orderbook.asks:
             return 0.0, 0.0
         
@@ -84,35 +86,6 @@ class MicrostructureAnalyzer:
         
         return imbalance, imbalance_10
     
-    def calculate_large_order_flow(self, trades: List, threshold: float = 100000) -> float:
-        """Calculate volume from large orders (> threshold USD)"""
-        if not trades:
-            return 0.0
-        
-        large_volume = 0.0
-        for trade in trades:
-            trade_value = trade.quantity * trade.price
-            if trade_value >= threshold:
-                large_volume += trade_value
-        
-        return large_volume
-    
-    def calculate_tape_speed(self, trades: List, window_minutes: int = 1) -> float:
-        """Calculate trades per minute"""
-        if not trades:
-            return 0.0
-        
-        # Simple: return count of trades in the window
-        return len(trades) / window_minutes
-    
-    def calculate_aggressor_ratio(self, trades: List) -> float:
-        """Calculate ratio of buy vs sell aggressors"""
-        if not trades:
-            return 0.5
-        
-        buy_count = sum(1 for t in trades if t.is_buy)
-        return buy_count / len(trades)
-    
     def calculate_spread_percentile(self, current_spread: float) -> float:
         """Calculate spread percentile vs history"""
         self.spread_history.append(current_spread)
@@ -127,6 +100,8 @@ class MicrostructureAnalyzer:
     
     def calculate_depth_ratio(self, orderbook, price_range_pct: float = 0.001) -> float:
         """Calculate liquidity depth near current price"""
+        if isinstance(orderbook, LocalOrderBook):
+            return orderbook.depth_ratio(price_range_pct)
         if not orderbook or not orderbook.bids or not orderbook.asks:
             return 0.0
         
@@ -155,43 +130,36 @@ class MicrostructureAnalyzer:
             return 0.0
         return (current_price - vwap) / vwap
     
-    def update_volume_profile(self, trades: List, num_levels: int = 50):
-        """Update volume profile from trades"""
-        if not trades:
-            return
-        
-        for trade in trades:
-            # Round price to create levels
-            level = round(trade.price, -1)  # Round to nearest 10
-            if level not in self.volume_profile:
-                self.volume_profile[level] = 0.0
-            self.volume_profile[level] += trade.quantity * trade.price
-        
-        # Keep only top N levels by volume
-        if len(self.volume_profile) > num_levels * 2:
-            sorted_levels = sorted(self.volume_profile.items(), key=lambda x: x[1], reverse=True)
-            self.volume_profile = dict(sorted_levels[:num_levels])
-    
-    def find_poc(self) -> float:
-        """Find Point of Control (price level with highest volume)"""
-        if not self.volume_profile:
-            return 0.0
-        
-        poc_level = max(self.volume_profile.items(), key=lambda x: x[1])
-        return poc_level[0]
-    
     def calculate(
         self, 
-        trades: List, 
+        trades, 
         orderbook, 
         current_price: float, 
-        vwap: float
+        vwap: float,
+        flow: Optional[TradeFlow] = None,
+        now_ms: Optional[int] = None,
+        profile: Optional[VolumeProfile] = None
     ) -> MicrostructureFeatures:
-        """Calculate all microstructure features"""
+        """
+        Calculate all microstructure features.
+        
+        Trade flow features are read from `flow` as of `now_ms` and the POC
+        from `profile` (both fed per trade by the client); without them they
+        are built from `trades`.
+        """
         features = MicrostructureFeatures()
         
+        if flow is None:
+            flow = TradeFlow()
+            flow.add_many(trades)
+        if profile is None:
+            cols = trade_columns(trades)
+            profile = VolumeProfile()
+            profile.add_arrays(cols['timestamp'], cols['price'], cols['quantity'])
+        window = flow.window(FLOW_WINDOWS[FLOW_WINDOW], now_ms)
+        
         # CVD
-        features.cvd, features.cvd_trend = self.calculate_cvd(trades)
+        features.cvd, features.cvd_trend = self.calculate_cvd(window)
         
         # Orderbook imbalance
         if orderbook:
@@ -201,9 +169,9 @@ class MicrostructureAnalyzer:
             features.depth_ratio = self.calculate_depth_ratio(orderbook)
         
         # Trade analysis
-        features.large_order_flow = self.calculate_large_order_flow(trades)
-        features.tape_speed = self.calculate_tape_speed(trades)
-        features.aggressor_ratio = self.calculate_aggressor_ratio(trades)
+        features.large_order_flow = window.large_notional
+        features.tape_speed = flow.window(FLOW_WINDOWS[TAPE_WINDOW], now_ms).trades_per_minute
+        features.aggressor_ratio = window.aggressor_ratio
         
         # Spread percentile
         features.spread_percentile = self.calculate_spread_percentile(features.spread_current)
@@ -211,9 +179,8 @@ class MicrostructureAnalyzer:
         # VWAP distance
         features.vwap_distance = self.calculate_vwap_distance(current_price, vwap)
         
-        # Volume profile and POC
-        self.update_volume_profile(trades)
-        poc = self.find_poc()
+        # Volume profile POC
+        poc = profile.poc()
         if poc > 0 and current_price > 0:
             features.poc_distance = (current_price - poc) / current_price
         
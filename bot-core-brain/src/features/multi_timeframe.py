@@ -7,6 +7,7 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 
 from .technical import calculate_ema, calculate_rsi
+from ..data.candle_buffer import candle_column, closed_candle_columns
 
 
 @dataclass
@@ -42,11 +43,10 @@ class MTFFeatures:
 
 def calculate_trend_direction(candles: List, ema_short: int = 9, ema_long: int = 21) -> tuple:
     """Calculate trend direction and strength"""
-    if len(candles) < ema_long:
+    closes = candle_column(candles, 'close').tolist()
+    if len(closes) < ema_long:
         return 0, 0.0
     
-    closes = [c.close for c in candles]
-    
     ema_s = calculate_ema(closes, ema_short)
     ema_l = calculate_ema(closes, ema_long)
     
@@ -69,10 +69,10 @@ def calculate_trend_direction(candles: List, ema_short: int = 9, ema_long: int =
 
 def calculate_momentum(candles: List, period: int = 10) -> float:
     """Calculate price momentum"""
-    if len(candles) < period:
+    closes = candle_column(candles, 'close').tolist()
+    if len(closes) < period:
         return 0.0
     
-    closes = [c.close for c in candles]
     current = closes[-1]
     previous = closes[-period]
     
@@ -85,11 +85,10 @@ def calculate_momentum(candles: List, period: int = 10) -> float:
 
 def calculate_momentum_acceleration(candles: List, period: int = 5) -> float:
     """Calculate rate of change of momentum"""
-    if len(candles) < period * 2:
+    closes = candle_column(candles, 'close').tolist()
+    if len(closes) < period * 2:
         return 0.0
     
-    closes = [c.close for c in candles]
-    
     # Recent momentum
     recent_momentum = ((closes[-1] - closes[-period]) / closes[-period]) * 100 if closes[-period] != 0 else 0
     
@@ -114,10 +113,10 @@ def detect_tf_divergence(tf1_direction: int, tf2_direction: int, tf3_direction:
 
 def calculate_trend_age(candles: List, current_direction: int) -> int:
     """Calculate how many bars the current trend has been active"""
-    if len(candles) < 10 or current_direction == 0:
+    closes = candle_column(candles, 'close').tolist()
+    if len(closes) < 10 or current_direction == 0:
         return 0
     
-    closes = [c.close for c in candles]
     age = 0
     
     # Simple: count bars where price movement aligns with direction
@@ -134,19 +133,20 @@ def calculate_trend_age(candles: List, current_direction: int) -> int:
 
 def find_htf_levels(candles: List, lookback: int = 100) -> tuple:
     """Find higher timeframe support and resistance"""
-    if len(candles) < lookback:
-        lookback = len(candles)
+    highs = candle_column(candles, 'high')
+    lows = candle_column(candles, 'low')
+    if len(highs) < lookback:
+        lookback = len(highs)
     
     if lookback < 10:
         return 0, float('inf')
     
-    recent = candles[-lookback:]
-    highs = [c.high for c in recent]
-    lows = [c.low for c in recent]
+    highs = highs[-lookback:]
+    lows = lows[-lookback:]
     
     # Simple: use highest high and lowest low
-    resistance = max(highs)
-    support = min(lows)
+    resistance = float(highs.max())
+    support = float(lows.min())
     
     return support, resistance
 
@@ -159,37 +159,44 @@ class MTFAnalyzer:
         self.prev_momentum_3m = 0.0
     
     def calculate(self, candles_dict: Dict[str, List]) -> MTFFeatures:
-        """Calculate MTF features from candles of different timeframes"""
+        """
+        Calculate MTF features from candles of different timeframes.
+        
+        Only closed candles are used: a forming higher timeframe candle
+        depends on when its last kline update arrived, so features built
+        on it could not be reproduced from history (see batch.mtf_matrix).
+        """
         features = MTFFeatures()
         
-        candles_15m = candles_dict.get('15m', [])
-        candles_5m = candles_dict.get('5m', [])
-        candles_3m = candles_dict.get('3m', [])
-        candles_1m = candles_dict.get('1m', [])
+        candles_15m = closed_candle_columns(candles_dict.get('15m', []))
+        candles_5m = closed_candle_columns(candles_dict.get('5m', []))
+        candles_3m = closed_candle_columns(candles_dict.get('3m', []))
+        candles_1m = closed_candle_columns(candles_dict.get('1m', []))
+        
+        closes_15m = candles_15m['close']
         
         # 15m analysis
-        if candles_15m:
+        if len(closes_15m):
             features.tf_15m_trend, features.tf_15m_strength = calculate_trend_direction(candles_15m)
-            closes_15m = [c.close for c in candles_15m]
-            features.tf_15m_rsi = calculate_rsi(closes_15m, 14)
+            features.tf_15m_rsi = calculate_rsi(closes_15m.tolist(), 14)
         
         # 5m analysis
-        if candles_5m:
+        if len(candles_5m['close']):
             features.tf_5m_trend, features.tf_5m_strength = calculate_trend_direction(candles_5m)
-            closes_5m = [c.close for c in candles_5m]
-            features.tf_5m_rsi = calculate_rsi(closes_5m, 14)
+            features.tf_5m_rsi = calculate_rsi(candles_5m['close'].tolist(), 14)
         
         # 3m momentum
-        if candles_3m:
+        has_3m = len(candles_3m['close']) > 0
+        if has_3m:
             features.tf_3m_momentum = calculate_momentum(candles_3m, 10)
         
         # 1m momentum
-        if candles_1m:
+        if len(candles_1m['close']):
             features.tf_1m_momentum = calculate_momentum(candles_1m, 10)
         
         # MTF alignment (count how many timeframes agree)
         directions = [features.tf_15m_trend, features.tf_5m_trend]
-        if candles_3m:
+        if has_3m:
             directions.append(1 if features.tf_3m_momentum > 0 else (-1 if features.tf_3m_momentum < 0 else 0))
         
         bullish = sum(1 for d in directions if d == 1)
@@ -210,17 +217,17 @@ class MTFAnalyzer:
         )
         
         # Momentum acceleration
-        if candles_1m:
+        if len(candles_1m['close']):
             features.momentum_acceleration = calculate_momentum_acceleration(candles_1m, 5)
         
         # Trend age (using 15m as reference)
-        if candles_15m:
+        if len(closes_15m):
             features.trend_age_bars = calculate_trend_age(candles_15m, features.tf_15m_trend)
         
         # HTF levels (using 15m)
-        if candles_15m:
+        if len(closes_15m):
             support, resistance = find_htf_levels(candles_15m)
-            current_price = candles_15m[-1].close
+            current_price = float(closes_15m[-1])
             
             features.htf_support_dist = (current_price - support) / current_price if support > 0 else 0
             features.htf_resistance_dist = (resistance - current_price) / current_price if resistance > 0 else 0
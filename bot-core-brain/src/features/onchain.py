@@ -214,6 +214,11 @@ class OnchainAnalyzer:
         await self.client.update_cache()
         cache = self.client.cache.data
         
+        # Nothing fetched (no API key or every request failed): neutral
+        # defaults, rather than a zero flow entered into the history
+        if not cache:
+            return features
+        
         # Exchange flows
         features.exchange_inflow = cache.get('exchange_inflow', 0)
         features.exchange_outflow = cache.get('exchange_outflow', 0)
@@ -6,6 +6,9 @@ import numpy as np
 from typing import List, Optional
 from dataclasses import dataclass
 
+from ..data.candle_buffer import candle_column
+from .swings import IncrementalSwings, structure_counts, swing_points, swing_points_python
+
 
 @dataclass
 class PriceActionFeatures:
@@ -28,45 +31,14 @@ class PriceActionFeatures:
 
 
 def find_swing_points(highs: List[float], lows: List[float], lookback: int = 5) -> tuple:
-    """Find swing highs and lows"""
-    swing_highs = []
-    swing_lows = []
-    
-    for i in range(lookback, len(highs) - lookback):
-        # Swing high: higher than lookback bars on both sides
-        if highs[i] == max(highs[i-lookback:i+lookback+1]):
-            swing_highs.append((i, highs[i]))
-        
-        # Swing low: lower than lookback bars on both sides
-        if lows[i] == min(lows[i-lookback:i+lookback+1]):
-            swing_lows.append((i, lows[i]))
-    
-    return swing_highs, swing_lows
+    """Find swing highs and lows (vectorized, see swings.swing_points)"""
+    return swing_points(highs, lows, lookback)
 
 
 def analyze_market_structure(swing_highs: List[tuple], swing_lows: List[tuple]) -> tuple:
-    """Analyze HH/HL/LH/LL patterns"""
-    hh_count = 0
-    ll_count = 0
-    hl_count = 0
-    lh_count = 0
-    
-    # Count higher highs and lower highs
-    if len(swing_highs) >= 2:
-        for i in range(1, min(10, len(swing_highs))):
-            if swing_highs[-i][1] > swing_highs[-i-1][1]:
-                hh_count += 1
-            else:
-                lh_count += 1
-    
-    # Count higher lows and lower lows
-    if len(swing_lows) >= 2:
-        for i in range(1, min(10, len(swing_lows))):
-            if swing_lows[-i][1] > swing_lows[-i-1][1]:
-                hl_count += 1
-            else:
-                ll_count += 1
-    
+    """Analyze HH/HL/LH/LL patterns over the last 10 swings of each side"""
+    hh_count, lh_count = structure_counts([sh[1] for sh in swing_highs[-10:]])
+    hl_count, ll_count = structure_counts([sl[1] for sl in swing_lows[-10:]])
     return hh_count, ll_count, hl_count, lh_count
 
 
@@ -75,12 +47,11 @@ def calculate_support_resistance(candles: List, lookback: int = 50) -> tuple:
     if len(candles) < lookback:
         return [], []
     
-    recent = candles[-lookback:]
-    highs = [c.high for c in recent]
-    lows = [c.low for c in recent]
+    highs = candle_column(candles, 'high')[-lookback:].tolist()
+    lows = candle_column(candles, 'low')[-lookback:].tolist()
     
-    # Simple approach: use swing points as S/R
-    swing_highs, swing_lows = find_swing_points(highs, lows, 3)
+    # Simple approach: use swing points as S/R (the Python loop is faster on a 50-bar window)
+    swing_highs, swing_lows = swing_points_python(highs, lows, 3)
     
     resistance_levels = [sh[1] for sh in swing_highs[-5:]] if swing_highs else []
     support_levels = [sl[1] for sl in swing_lows[-5:]] if swing_lows else []
@@ -96,7 +67,7 @@ def calculate_volatility_contraction(ranges: List[float], period: int = 10) -> b
     recent = ranges[-period:]
     earlier = ranges[-period*2:-period] if len(ranges) >= period * 2 else ranges[:period]
     
-    if not earlier:
+    if len(earlier) == 0:
         return False
     
     avg_recent = np.mean(recent)
@@ -112,6 +83,10 @@ class PriceActionAnalyzer:
     def __init__(self):
         self.support_levels: List[float] = []
         self.resistance_levels: List[float] = []
+        
+        # Swing points updated as bars close instead of rescanning the window
+        self.swings = IncrementalSwings(5)
+        self.sr_swings = IncrementalSwings(3)
     
     def calculate(self, candles: List) -> PriceActionFeatures:
         """Calculate all price action features"""
@@ -127,17 +102,19 @@ class PriceActionAnalyzer:
             features.upper_wick_ratio = current.upper_wick / current.range
             features.lower_wick_ratio = current.lower_wick / current.range
         
+        # Extract price series (zero-copy views for CandleBuffer)
+        high_arr = candle_column(candles, 'high')
+        low_arr = candle_column(candles, 'low')
+        time_arr = candle_column(candles, 'timestamp')
+        range_arr = high_arr - low_arr
+        closed = len(candles) if current.is_closed else len(candles) - 1
+        
         # Range expansion
-        avg_range = np.mean([c.range for c in candles[-20:]]) if len(candles) >= 20 else current.range
+        avg_range = np.mean(range_arr[-20:]) if len(candles) >= 20 else current.range
         features.range_expansion = current.range / avg_range if avg_range > 0 else 1.0
         
-        # Extract price series
-        closes = [c.close for c in candles]
-        highs = [c.high for c in candles]
-        lows = [c.low for c in candles]
-        
         # Swing points
-        swing_highs, swing_lows = find_swing_points(highs, lows, 5)
+        swing_highs, swing_lows = self.swings.points(time_arr, high_arr, low_arr, closed)
         
         # Distance to swing points
         current_price = current.close
@@ -163,8 +140,8 @@ class PriceActionAnalyzer:
         
         # Breakout strength (how far above/below recent range)
         if len(candles) >= 20:
-            recent_high = max(highs[-20:-1])
-            recent_low = min(lows[-20:-1])
+            recent_high = high_arr[-20:-1].max()
+            recent_low = low_arr[-20:-1].min()
             recent_range = recent_high - recent_low
             
             if recent_range > 0:
@@ -175,17 +152,22 @@ class PriceActionAnalyzer:
         
         # Consolidation bars (bars within a tight range)
         if len(candles) >= 10:
-            ranges = [c.range for c in candles[-10:]]
+            ranges = range_arr[-10:]
             avg_range = np.mean(ranges)
-            consolidation = sum(1 for r in ranges if r < avg_range * 0.5)
-            features.consolidation_bars = consolidation
+            features.consolidation_bars = int(np.count_nonzero(ranges < avg_range * 0.5))
         
         # Volatility contraction
-        ranges = [c.range for c in candles]
-        features.volatility_contraction = calculate_volatility_contraction(ranges)
-        
-        # Key level distance
-        self.support_levels, self.resistance_levels = calculate_support_resistance(candles)
+        features.volatility_contraction = bool(calculate_volatility_contraction(range_arr))
+        
+        # Key level distance: last 5 swing points (lookback 3) of the last 50 bars,
+        # as calculate_support_resistance
+        self.support_levels, self.resistance_levels = [], []
+        if len(candles) >= 50:
+            sr_highs, sr_lows = self.sr_swings.points(
+                time_arr[-50:], high_arr[-50:], low_arr[-50:], closed - (len(candles) - 50)
+            )
+            self.resistance_levels = [sh[1] for sh in sr_highs[-5:]]
+            self.support_levels = [sl[1] for sl in sr_lows[-5:]]
         
         nearest_support = min(self.support_levels, key=lambda x: abs(x - current_price), default=current_price)
         nearest_resistance = min(self.resistance_levels, key=lambda x: abs(x - current_price), default=current_price)
@@ -0,0 +1,481 @@
+"""
+Streaming Indicator Primitives
+O(1) per-bar indicator states used by the incremental technical engine
+"""
+from collections import deque
+from typing import Optional, Tuple
+
+
+class StreamingEMA:
+    """Exponential Moving Average seeded with the first price"""
+    __slots__ = ("period", "multiplier", "count", "value", "last")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.count = 0
+        self.value = 0.0
+        self.last = 0.0
+
+    def step(self, price: float) -> float:
+        """Raw EMA value if price were appended (no commit)"""
+        if self.count == 0:
+            return price
+        return (price * self.multiplier) + (self.value * (1 - self.multiplier))
+
+    def update(self, price: float) -> float:
+        """Commit a closed price"""
+        self.value = self.step(price)
+        self.count += 1
+        self.last = price
+        return self.current
+
+    def peek(self, price: float) -> float:
+        """EMA including an in-progress price"""
+        value = self.step(price)
+        return value if self.count + 1 >= self.period else price
+
+    @property
+    def current(self) -> float:
+        # Same warm-up rule as calculate_ema: last price until `period` bars
+        if self.count >= self.period:
+            return self.value
+        return self.last if self.count else 0.0
+
+
+class WilderRSI:
+    """RSI with Wilder smoothing"""
+    __slots__ = ("period", "count", "prev", "sum_gain", "sum_loss", "avg_gain", "avg_loss")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0  # Prices seen
+        self.prev = 0.0
+        self.sum_gain = 0.0
+        self.sum_loss = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _next(self, price: float) -> Tuple[float, float, float, float]:
+        if self.count == 0:
+            return 0.0, 0.0, 0.0, 0.0
+
+        delta = price - self.prev
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        deltas = self.count  # Deltas after this price
+
+        if deltas < self.period:
+            return self.sum_gain + gain, self.sum_loss + loss, 0.0, 0.0
+        if deltas == self.period:
+            sum_gain = self.sum_gain + gain
+            sum_loss = self.sum_loss + loss
+            return sum_gain, sum_loss, sum_gain / self.period, sum_loss / self.period
+
+        avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+        avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return self.sum_gain, self.sum_loss, avg_gain, avg_loss
+
+    def _value(self, count: int, avg_gain: float, avg_loss: float) -> float:
+        if count < self.period + 1:
+            return 50.0
+        if avg_loss == 0:
+            return 100.0
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def update(self, price: float) -> float:
+        """Commit a closed price"""
+        self.sum_gain, self.sum_loss, self.avg_gain, self.avg_loss = self._next(price)
+        self.count += 1
+        self.prev = price
+        return self.current
+
+    def peek(self, price: float) -> float:
+        """RSI including an in-progress price"""
+        _, _, avg_gain, avg_loss = self._next(price)
+        return self._value(self.count + 1, avg_gain, avg_loss)
+
+    @property
+    def current(self) -> float:
+        return self._value(self.count, self.avg_gain, self.avg_loss)
+
+
+class StreamingMACD:
+    """MACD line, signal and histogram over the full price stream"""
+    __slots__ = ("slow", "fast_ema", "slow_ema", "signal_ema")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.slow = slow
+        self.fast_ema = StreamingEMA(fast)
+        self.slow_ema = StreamingEMA(slow)
+        self.signal_ema = StreamingEMA(signal)
+
+    def _result(self, macd_line: float, macd_signal: float) -> Tuple[float, float, float]:
+        return macd_line, macd_signal, macd_line - macd_signal
+
+    def update(self, price: float) -> Tuple[float, float, float]:
+        """Commit a closed price"""
+        self.fast_ema.update(price)
+        self.slow_ema.update(price)
+        if self.slow_ema.count < self.slow:
+            return 0.0, 0.0, 0.0
+        macd_line = self.fast_ema.value - self.slow_ema.value
+        self.signal_ema.update(macd_line)
+        return self._result(macd_line, self.signal_ema.current)
+
+    def peek(self, price: float) -> Tuple[float, float, float]:
+        """MACD including an in-progress price"""
+        if self.slow_ema.count + 1 < self.slow:
+            return 0.0, 0.0, 0.0
+        macd_line = self.fast_ema.step(price) - self.slow_ema.step(price)
+        return self._result(macd_line, self.signal_ema.peek(macd_line))
+
+    @property
+    def current(self) -> Tuple[float, float, float]:
+        if self.slow_ema.count < self.slow:
+            return 0.0, 0.0, 0.0
+        macd_line = self.fast_ema.value - self.slow_ema.value
+        return self._result(macd_line, self.signal_ema.current)
+
+
+def true_range(high: float, low: float, prev_close: float) -> float:
+    """True range of a bar given the previous close"""
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class WilderATR:
+    """Average True Range with Wilder smoothing"""
+    __slots__ = ("period", "count", "prev_close", "tr_sum", "atr")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0  # Bars seen
+        self.prev_close = 0.0
+        self.tr_sum = 0.0
+        self.atr = 0.0
+
+    def _next(self, high: float, low: float) -> Tuple[float, float]:
+        if self.count == 0:
+            return 0.0, 0.0
+        tr = true_range(high, low, self.prev_close)
+        ranges = self.count  # True ranges after this bar
+        if ranges < self.period:
+            return self.tr_sum + tr, 0.0
+        if ranges == self.period:
+            tr_sum = self.tr_sum + tr
+            return tr_sum, tr_sum / self.period
+        return self.tr_sum, (self.atr * (self.period - 1) + tr) / self.period
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """Commit a closed bar"""
+        self.tr_sum, self.atr = self._next(high, low)
+        self.count += 1
+        self.prev_close = close
+        return self.atr
+
+    def peek(self, high: float, low: float) -> float:
+        """ATR including an in-progress bar"""
+        return self._next(high, low)[1]
+
+    @property
+    def current(self) -> float:
+        return self.atr
+
+
+class WilderADX:
+    """ADX, +DI and -DI with Wilder smoothing"""
+    __slots__ = (
+        "period", "count", "prev_high", "prev_low", "prev_close",
+        "tr_s", "plus_s", "minus_s", "dx_sum", "adx", "last_result"
+    )
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0  # Bars seen
+        self.prev_high = 0.0
+        self.prev_low = 0.0
+        self.prev_close = 0.0
+        self.tr_s = 0.0
+        self.plus_s = 0.0
+        self.minus_s = 0.0
+        self.dx_sum = 0.0
+        self.adx = 0.0
+        self.last_result = (0.0, 0.0, 0.0)
+
+    def _next(self, high: float, low: float) -> Tuple[float, ...]:
+        """Next (tr_s, plus_s, minus_s, dx_sum, adx, plus_di, minus_di, dx)"""
+        p = self.period
+        if self.count == 0:
+            return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+
+        tr = true_range(high, low, self.prev_close)
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+
+        moves = self.count  # Directional moves after this bar
+        if moves <= p:
+            tr_s = self.tr_s + tr
+            plus_s = self.plus_s + plus_dm
+            minus_s = self.minus_s + minus_dm
+        else:
+            tr_s = self.tr_s - self.tr_s / p + tr
+            plus_s = self.plus_s - self.plus_s / p + plus_dm
+            minus_s = self.minus_s - self.minus_s / p + minus_dm
+
+        if moves < p:
+            return tr_s, plus_s, minus_s, self.dx_sum, self.adx, 0.0, 0.0, 0.0
+
+        plus_di = 100 * plus_s / tr_s if tr_s != 0 else 0.0
+        minus_di = 100 * minus_s / tr_s if tr_s != 0 else 0.0
+        di_sum = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum != 0 else 0.0
+
+        # First ADX is the mean of the first `period` DX values
+        dx_count = moves - p + 1
+        dx_sum = self.dx_sum
+        adx = self.adx
+        if dx_count < p:
+            dx_sum += dx
+        elif dx_count == p:
+            dx_sum += dx
+            adx = dx_sum / p
+        else:
+            adx = (self.adx * (p - 1) + dx) / p
+
+        return tr_s, plus_s, minus_s, dx_sum, adx, plus_di, minus_di, dx
+
+    def _result(self, state: Tuple[float, ...], count: int) -> Tuple[float, float, float]:
+        adx, plus_di, minus_di, dx = state[4:]
+        if count < self.period + 1:
+            return 0.0, 0.0, 0.0
+        # Until ADX is seeded, report raw DX
+        if count < 2 * self.period:
+            return dx, plus_di, minus_di
+        return adx, plus_di, minus_di
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float]:
+        """Commit a closed bar"""
+        state = self._next(high, low)
+        self.tr_s, self.plus_s, self.minus_s, self.dx_sum, self.adx = state[:5]
+        self.count += 1
+        self.prev_high = high
+        self.prev_low = low
+        self.prev_close = close
+        self.last_result = self._result(state, self.count)
+        return self.last_result
+
+    def peek(self, high: float, low: float) -> Tuple[float, float, float]:
+        """ADX including an in-progress bar"""
+        return self._result(self._next(high, low), self.count + 1)
+
+    @property
+    def current(self) -> Tuple[float, float, float]:
+        return self.last_result
+
+
+class StreamingStochastic:
+    """Stochastic %K/%D over a fixed k-period window"""
+    __slots__ = ("k_period", "d_period", "highs", "lows", "k_values", "count", "last_result")
+
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        self.k_period = k_period
+        self.d_period = d_period
+        self.highs: deque = deque(maxlen=k_period)
+        self.lows: deque = deque(maxlen=k_period)
+        self.k_values: deque = deque(maxlen=d_period)
+        self.count = 0
+        self.last_result = (50.0, 50.0)
+
+    def _k(self, high: float, low: float, close: float) -> float:
+        # Window is the last k_period - 1 committed bars plus this one
+        highest_high = high
+        lowest_low = low
+        skip = 1 if len(self.highs) == self.k_period else 0
+        for i in range(skip, len(self.highs)):
+            if self.highs[i] > highest_high:
+                highest_high = self.highs[i]
+            if self.lows[i] < lowest_low:
+                lowest_low = self.lows[i]
+        if highest_high - lowest_low == 0:
+            return 50.0
+        return 100 * (close - lowest_low) / (highest_high - lowest_low)
+
+    def _result(self, k: float, count: int, previous_k) -> Tuple[float, float]:
+        if count < self.k_period:
+            return 50.0, 50.0
+        total = k
+        n = 1
+        for value in previous_k:
+            total += value
+            n += 1
+        return k, total / n
+
+    def _previous_k(self):
+        # %D averages the current %K with the last d_period - 1 committed values
+        skip = 1 if len(self.k_values) == self.d_period else 0
+        return [self.k_values[i] for i in range(skip, len(self.k_values))]
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        """Commit a closed bar"""
+        k = self._k(high, low, close)
+        result = self._result(k, self.count + 1, self._previous_k())
+        self.highs.append(high)
+        self.lows.append(low)
+        self.k_values.append(k)
+        self.count += 1
+        self.last_result = result
+        return result
+
+    def peek(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        """Stochastic including an in-progress bar"""
+        return self._result(self._k(high, low, close), self.count + 1, self._previous_k())
+
+    @property
+    def current(self) -> Tuple[float, float]:
+        return self.last_result
+
+
+class RollingSums:
+    """
+    Sum and sum of squares over a fixed-size window.
+    
+    Values are shifted by the first observation to limit cancellation,
+    and the sums are rebuilt from the window every `size` evictions so
+    floating point drift cannot accumulate.
+    """
+    __slots__ = ("size", "window", "shift", "total", "total_sq", "evictions")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.window: deque = deque(maxlen=size)
+        self.shift: Optional[float] = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.evictions = 0
+
+    def _resync(self):
+        self.total = sum(self.window)
+        self.total_sq = sum(x * x for x in self.window)
+        self.evictions = 0
+
+    def update(self, value: float):
+        """Commit a value, evicting the oldest when full"""
+        if self.shift is None:
+            self.shift = value
+        x = value - self.shift
+        if len(self.window) == self.size:
+            old = self.window[0]
+            self.total -= old
+            self.total_sq -= old * old
+            self.evictions += 1
+        self.window.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if self.evictions >= self.size:
+            self._resync()
+
+    def peek(self, value: float) -> Tuple[int, float, float]:
+        """(count, shifted sum, shifted sum of squares) with value appended"""
+        shift = self.shift if self.shift is not None else value
+        x = value - shift
+        n = len(self.window)
+        total = self.total + x
+        total_sq = self.total_sq + x * x
+        if n == self.size:
+            old = self.window[0]
+            total -= old
+            total_sq -= old * old
+        else:
+            n += 1
+        return n, total, total_sq
+
+    def peek_sum(self, value: float) -> float:
+        """Window sum with value appended"""
+        shift = self.shift if self.shift is not None else value
+        n, total, _ = self.peek(value)
+        return total + n * shift
+
+    def peek_mean_std(self, value: float) -> Tuple[int, float, float]:
+        """(count, mean, population std) with value appended"""
+        shift = self.shift if self.shift is not None else value
+        n, total, total_sq = self.peek(value)
+        shifted_mean = total / n
+        variance = max(0.0, total_sq / n - shifted_mean * shifted_mean)
+        return n, shifted_mean + shift, variance ** 0.5
+
+    @property
+    def sum(self) -> float:
+        if self.shift is None:
+            return 0.0
+        return self.total + len(self.window) * self.shift
+
+
+class StreamingBollinger:
+    """Bollinger Bands from rolling sums"""
+    __slots__ = ("period", "std_dev", "sums", "last_result")
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.period = period
+        self.std_dev = std_dev
+        self.sums = RollingSums(period)
+        self.last_result = (0.0, 0.0, 0.5)
+
+    def peek(self, price: float) -> Tuple[float, float, float]:
+        """Bands including an in-progress price"""
+        n, sma, std = self.sums.peek_mean_std(price)
+        if n < self.period:
+            return price, price, 0.5
+
+        upper = sma + (std * self.std_dev)
+        lower = sma - (std * self.std_dev)
+        if upper - lower == 0:
+            position = 0.5
+        else:
+            position = (price - lower) / (upper - lower)
+        return upper, lower, max(0, min(1, position))
+
+    def update(self, price: float) -> Tuple[float, float, float]:
+        """Commit a closed price"""
+        self.last_result = self.peek(price)
+        self.sums.update(price)
+        return self.last_result
+
+    @property
+    def current(self) -> Tuple[float, float, float]:
+        return self.last_result
+
+
+class StreamingVWAP:
+    """Volume weighted average price over a rolling window of bars"""
+    __slots__ = ("window", "pv", "volume", "last_price")
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self.pv = RollingSums(window)
+        self.volume = RollingSums(window)
+        self.last_price = 0.0
+
+    def peek(self, price: float, volume: float) -> float:
+        """VWAP including an in-progress bar"""
+        total_volume = self.volume.peek_sum(volume)
+        if total_volume == 0:
+            return price
+        return self.pv.peek_sum(price * volume) / total_volume
+
+    def update(self, price: float, volume: float) -> float:
+        """Commit a closed bar"""
+        value = self.peek(price, volume)
+        self.pv.update(price * volume)
+        self.volume.update(volume)
+        self.last_price = price
+        return value
+
+    @property
+    def current(self) -> float:
+        total_volume = self.volume.sum
+        if total_volume == 0:
+            return self.last_price
+        return self.pv.sum / total_volume
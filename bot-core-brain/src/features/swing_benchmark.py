@@ -0,0 +1,202 @@
+"""
+Swing Detection Benchmark - Parity and speed against the pure-Python loops
+Checks swing points, market structure and S/R on 500/5,000/50,000 bars
+"""
+import argparse
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+from ..data.candle_buffer import CandleBuffer
+from .price_action import (
+    PriceActionAnalyzer, analyze_market_structure, calculate_support_resistance
+)
+from .swings import HAS_NUMBA, IncrementalSwings, swing_points
+
+
+# ==================== Pure-Python references (previous implementation) ====================
+
+def reference_swing_points(highs: List[float], lows: List[float], lookback: int = 5) -> tuple:
+    swing_highs = []
+    swing_lows = []
+    for i in range(lookback, len(highs) - lookback):
+        if highs[i] == max(highs[i-lookback:i+lookback+1]):
+            swing_highs.append((i, highs[i]))
+        if lows[i] == min(lows[i-lookback:i+lookback+1]):
+            swing_lows.append((i, lows[i]))
+    return swing_highs, swing_lows
+
+
+def reference_market_structure(swing_highs: List[tuple], swing_lows: List[tuple]) -> tuple:
+    hh_count = ll_count = hl_count = lh_count = 0
+    if len(swing_highs) >= 2:
+        for i in range(1, min(10, len(swing_highs))):
+            if swing_highs[-i][1] > swing_highs[-i-1][1]:
+                hh_count += 1
+            else:
+                lh_count += 1
+    if len(swing_lows) >= 2:
+        for i in range(1, min(10, len(swing_lows))):
+            if swing_lows[-i][1] > swing_lows[-i-1][1]:
+                hl_count += 1
+            else:
+                ll_count += 1
+    return hh_count, ll_count, hl_count, lh_count
+
+
+def reference_support_resistance(highs: List[float], lows: List[float], lookback: int = 50) -> tuple:
+    if len(highs) < lookback:
+        return [], []
+    swing_highs, swing_lows = reference_swing_points(highs[-lookback:], lows[-lookback:], 3)
+    return [sl[1] for sl in swing_lows[-5:]], [sh[1] for sh in swing_highs[-5:]]
+
+
+# ==================== Data ====================
+
+def random_bars(n: int, seed: int = 11) -> dict:
+    """Random-walk OHLC rounded to 0.1 (so equal highs/lows occur), with a flat stretch"""
+    rng = np.random.default_rng(seed)
+    close = np.round(65000 + np.cumsum(rng.normal(0, 25, n)), 1)
+    high = np.round(close + rng.exponential(15, n), 1)
+    low = np.round(close - rng.exponential(15, n), 1)
+    flat = slice(n // 3, n // 3 + min(30, n // 10))
+    high[flat] = low[flat] = close[flat] = close[n // 3]
+    return {
+        'timestamp': np.arange(n, dtype=np.int64) * 300_000,
+        'open': close, 'high': high, 'low': low, 'close': close,
+        'volume': rng.uniform(1, 5, n)
+    }
+
+
+def fill_buffer(bars: dict) -> CandleBuffer:
+    n = len(bars['close'])
+    buffer = CandleBuffer(n)
+    for i in range(n):
+        buffer.update(int(bars['timestamp'][i]), bars['open'][i], bars['high'][i], bars['low'][i],
+                      bars['close'][i], bars['volume'][i], 0.0, 0, True)
+    return buffer
+
+
+def best_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+# ==================== Checks ====================
+
+def check_batch(bars: dict, repeat: int) -> List[str]:
+    """Whole-window functions vs the references; returns failures"""
+    failures = []
+    highs, lows = bars['high'], bars['low']
+    highs_list, lows_list = highs.tolist(), lows.tolist()
+    n = len(highs)
+
+    expected = reference_swing_points(highs_list, lows_list, 5)
+    variants = {"numpy": False}
+    if HAS_NUMBA:
+        swing_points(highs, lows, 5, use_numba=True)  # JIT compile outside the timing
+        variants["numba"] = True
+
+    ref_ms = best_ms(lambda: reference_swing_points(highs_list, lows_list, 5), repeat)
+    print(f"{n:>7} {'find_swing_points':<22} {'python':<8} {ref_ms:>9.3f}")
+    for name, use_numba in variants.items():
+        if swing_points(highs, lows, 5, use_numba=use_numba) != expected:
+            failures.append(f"swing points ({name}, {n} bars)")
+        ms = best_ms(lambda: swing_points(highs, lows, 5, use_numba=use_numba), repeat)
+        print(f"{n:>7} {'find_swing_points':<22} {name:<8} {ms:>9.3f}  x{ref_ms / ms:.0f}")
+
+    if analyze_market_structure(*expected) != reference_market_structure(*expected):
+        failures.append(f"market structure ({n} bars)")
+
+    candles = fill_buffer(bars)
+    expected_sr = reference_support_resistance(highs_list, lows_list)
+    if calculate_support_resistance(candles) != expected_sr:
+        failures.append(f"support/resistance ({n} bars)")
+    ref_ms = best_ms(lambda: reference_support_resistance(highs_list, lows_list), repeat)
+    ms = best_ms(lambda: calculate_support_resistance(candles), repeat)
+    print(f"{n:>7} {'support_resistance':<22} {'previous':<8} {ref_ms:>9.3f}")
+    print(f"{n:>7} {'support_resistance':<22} {'current':<8} {ms:>9.3f}  x{ref_ms / ms:.1f}")
+    return failures
+
+
+def check_streaming(bars: dict, window: int) -> List[str]:
+    """
+    IncrementalSwings and PriceActionAnalyzer on a rolling `window`-bar
+    CandleBuffer, bar by bar (each bar first forming, then closed), against
+    the references on the same window.
+    """
+    failures = []
+    n = len(bars['close'])
+    buffer = CandleBuffer(window)
+    tracker = IncrementalSwings(5)
+    analyzer = PriceActionAnalyzer()
+    spent = {"incremental": 0.0, "python": 0.0}
+    checked = 0
+
+    for i in range(n):
+        for is_closed in (False, True):
+            buffer.update(int(bars['timestamp'][i]), bars['open'][i], bars['high'][i], bars['low'][i],
+                          bars['close'][i], bars['volume'][i], 0.0, 0, is_closed)
+            if i < 20:
+                continue
+            times, highs, lows = buffer.timestamps(), buffer.highs(), buffer.lows()
+            closed = len(buffer) - (0 if is_closed else 1)
+
+            start = time.perf_counter()
+            got = tracker.points(times, highs, lows, closed)
+            spent["incremental"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = reference_swing_points(highs.tolist(), lows.tolist(), 5)
+            spent["python"] += time.perf_counter() - start
+            checked += 1
+
+            if got != expected:
+                failures.append(f"incremental swings (bar {i}, closed={is_closed})")
+                return failures
+
+            features = analyzer.calculate(buffer)
+            hh, ll, hl, lh = reference_market_structure(*expected)
+            support, resistance = reference_support_resistance(highs.tolist(), lows.tolist())
+            price = float(buffer.closes()[-1])
+            if (features.hh_count, features.ll_count, features.hl_count, features.lh_count) != (hh, ll, hl, lh) or \
+                    analyzer.support_levels != support or analyzer.resistance_levels != resistance or \
+                    (expected[0] and features.swing_high_dist != (expected[0][-1][1] - price) / price):
+                failures.append(f"PriceActionAnalyzer (bar {i}, closed={is_closed})")
+                return failures
+
+    for name, total in spent.items():
+        print(f"{n:>7} {'rolling swings/update':<22} {name:<8} {total / max(checked, 1) * 1000:>9.3f}")
+    return failures
+
+
+def main():
+    """python -m src.features.swing_benchmark"""
+    parser = argparse.ArgumentParser(description="Swing/S-R detection parity and speed")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 5_000, 50_000])
+    parser.add_argument('--window', type=int, default=500, help="Rolling window for the streaming check")
+    parser.add_argument('--stream-bars', type=int, default=3_000, help="Bars streamed through the window")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Numba: {'yes' if HAS_NUMBA else 'not installed'}")
+    print(f"{'bars':>7} {'function':<22} {'impl':<8} {'ms':>9}")
+    failures = []
+    for size in args.sizes:
+        failures += check_batch(random_bars(size), args.repeat)
+    failures += check_streaming(random_bars(args.stream_bars, seed=5), args.window)
+
+    if failures:
+        print("Parity failures: " + ", ".join(failures))
+        sys.exit(1)
+    print("All results identical to the reference implementation")
+
+
+if __name__ == "__main__":
+    main()
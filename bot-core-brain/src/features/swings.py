@@ -0,0 +1,190 @@
+"""
+Swing Points - Vectorized and incremental swing high/low detection
+Sliding-window max/min, with a Numba kernel when numba is installed
+"""
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# A swing high at bar i: highs[i] is the maximum of bars i - lookback ..
+# i + lookback (ties included); swing lows likewise with the minimum.
+# Only bars with `lookback` bars on both sides inside the window qualify.
+
+
+def _swing_masks_numpy(highs: np.ndarray, lows: np.ndarray, lookback: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(highs)
+    sh = np.zeros(n, dtype=bool)
+    sl = np.zeros(n, dtype=bool)
+    width = 2 * lookback + 1
+    if n >= width:
+        sh[lookback:n - lookback] = highs[lookback:n - lookback] == sliding_window_view(highs, width).max(axis=1)
+        sl[lookback:n - lookback] = lows[lookback:n - lookback] == sliding_window_view(lows, width).min(axis=1)
+    return sh, sl
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _swing_masks_numba(highs, lows, lookback):
+        n = len(highs)
+        sh = np.zeros(n, dtype=np.bool_)
+        sl = np.zeros(n, dtype=np.bool_)
+        for i in range(lookback, n - lookback):
+            is_high = True
+            is_low = True
+            for j in range(i - lookback, i + lookback + 1):
+                if highs[j] > highs[i]:
+                    is_high = False
+                if lows[j] < lows[i]:
+                    is_low = False
+            sh[i] = is_high
+            sl[i] = is_low
+        return sh, sl
+
+
+def swing_masks(highs, lows, lookback: int = 5, use_numba: Optional[bool] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Boolean swing high / swing low masks (Numba if available unless use_numba=False)"""
+    highs = np.ascontiguousarray(highs, dtype=np.float64)
+    lows = np.ascontiguousarray(lows, dtype=np.float64)
+    if use_numba is None:
+        use_numba = HAS_NUMBA
+    if use_numba and HAS_NUMBA:
+        return _swing_masks_numba(highs, lows, lookback)
+    return _swing_masks_numpy(highs, lows, lookback)
+
+
+def swing_points(highs, lows, lookback: int = 5, use_numba: Optional[bool] = None) -> Tuple[List[tuple], List[tuple]]:
+    """Swing highs and lows as (index, value) lists, oldest first"""
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    sh, sl = swing_masks(highs, lows, lookback, use_numba)
+    hi_idx = np.flatnonzero(sh)
+    lo_idx = np.flatnonzero(sl)
+    return (
+        list(zip(hi_idx.tolist(), highs[hi_idx].tolist())),
+        list(zip(lo_idx.tolist(), lows[lo_idx].tolist()))
+    )
+
+
+def swing_points_python(highs: List[float], lows: List[float], lookback: int = 5) -> Tuple[List[tuple], List[tuple]]:
+    """
+    swing_points as a plain loop over lists. On short windows (the 50-bar
+    support/resistance window) it beats the array path, whose fixed
+    per-call overhead outweighs the work.
+    """
+    swing_highs = []
+    swing_lows = []
+    for i in range(lookback, len(highs) - lookback):
+        if highs[i] == max(highs[i - lookback:i + lookback + 1]):
+            swing_highs.append((i, highs[i]))
+        if lows[i] == min(lows[i - lookback:i + lookback + 1]):
+            swing_lows.append((i, lows[i]))
+    return swing_highs, swing_lows
+
+
+def structure_counts(values: List[float]) -> Tuple[int, int]:
+    """(rising, falling) pairs among the last 10 swing values"""
+    recent = np.asarray(values[-10:], dtype=np.float64)
+    if len(recent) < 2:
+        return 0, 0
+    rising = int(np.count_nonzero(np.diff(recent) > 0))
+    return rising, len(recent) - 1 - rising
+
+
+class IncrementalSwings:
+    """
+    Swing points maintained as bars close.
+
+    Each closed bar confirms at most one candidate (the bar `lookback`
+    bars back) in O(lookback); points() then answers for the current
+    window without rescanning it. Results equal swing_points() over the
+    window, including a forming last candle, which is evaluated without
+    being committed.
+    """
+
+    def __init__(self, lookback: int = 5):
+        self.lookback = lookback
+        self.reset()
+
+    def reset(self):
+        """Drop all state (used when history no longer lines up)"""
+        width = 2 * self.lookback + 1
+        self._times: deque = deque(maxlen=width)
+        self._highs: deque = deque(maxlen=width)
+        self._lows: deque = deque(maxlen=width)
+        self.swing_highs: deque = deque()  # (open time ms, value), oldest first
+        self.swing_lows: deque = deque()
+        self.last_timestamp: Optional[int] = None
+
+    def _commit(self, timestamp: int, high: float, low: float):
+        self._times.append(timestamp)
+        self._highs.append(high)
+        self._lows.append(low)
+        self.last_timestamp = timestamp
+        if len(self._times) < self._times.maxlen:
+            return
+        k = self.lookback
+        if self._highs[k] == max(self._highs):
+            self.swing_highs.append((self._times[k], self._highs[k]))
+        if self._lows[k] == min(self._lows):
+            self.swing_lows.append((self._times[k], self._lows[k]))
+
+    def sync(self, timestamps: np.ndarray, highs: np.ndarray, lows: np.ndarray, closed: int) -> int:
+        """
+        Commit the closed bars (the first `closed`) newer than the last
+        committed one. A window that no longer overlaps the committed
+        history (reconnect gap) rebuilds the state. Returns bars committed.
+        """
+        if closed <= 0:
+            return 0
+        if self.last_timestamp is not None and not timestamps[0] <= self.last_timestamp <= timestamps[closed - 1]:
+            self.reset()
+        start = 0
+        if self.last_timestamp is not None:
+            start = int(np.searchsorted(timestamps[:closed], self.last_timestamp, side='right'))
+        for i in range(start, closed):
+            self._commit(int(timestamps[i]), float(highs[i]), float(lows[i]))
+        return closed - start
+
+    def points(self, timestamps: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+               closed: Optional[int] = None) -> Tuple[List[tuple], List[tuple]]:
+        """
+        Swing (index, value) lists for the window, as swing_points() would
+        return them. Commits new closed bars first; bars from `closed` on
+        are forming and only looked at.
+        """
+        n = len(timestamps)
+        closed = n if closed is None else closed
+        self.sync(timestamps, highs, lows, closed)
+        k = self.lookback
+        if n < 2 * k + 1:
+            return [], []
+
+        # Committed swings need their left neighbours inside the window too
+        first = timestamps[k]
+        for swings in (self.swing_highs, self.swing_lows):
+            while swings and swings[0][0] < first:
+                swings.popleft()
+
+        # Committed candidates end at closed - 1 - k; later ones see forming bars
+        last = n - 1 - k
+        extra_highs, extra_lows = [], []
+        for i in range(max(k, closed - k), last + 1):
+            if highs[i] == highs[i - k:i + k + 1].max():
+                extra_highs.append((i, float(highs[i])))
+            if lows[i] == lows[i - k:i + k + 1].min():
+                extra_lows.append((i, float(lows[i])))
+
+        def indexed(swings, extra):
+            times = np.fromiter((t for t, _ in swings), dtype=np.int64, count=len(swings))
+            idx = np.searchsorted(timestamps, times).tolist()
+            return [(i, value) for i, (_, value) in zip(idx, swings) if i <= last] + extra
+
+        return indexed(self.swing_highs, extra_highs), indexed(self.swing_lows, extra_lows)
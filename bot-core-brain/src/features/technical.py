@@ -3,9 +3,14 @@ Technical Indicators Module
 Features 1-20: Technical Indicators
 """
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 from dataclasses import dataclass
 
+from .streaming import (
+    StreamingEMA, WilderRSI, StreamingMACD, WilderATR, WilderADX,
+    StreamingStochastic, StreamingBollinger, StreamingVWAP
+)
+
 
 @dataclass
 class TechnicalFeatures:
@@ -82,27 +87,59 @@ def calculate_rsi(prices: List[float], period: int) -> float:
     return rsi
 
 
+def calculate_rsi_wilder(prices: List[float], period: int = 14) -> float:
+    """Calculate RSI with Wilder smoothing (batch reference)"""
+    if len(prices) < period + 1:
+        return 50.0
+    
+    sum_gain = 0.0
+    sum_loss = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    
+    for i in range(1, len(prices)):
+        delta = prices[i] - prices[i-1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        
+        if i < period:
+            sum_gain += gain
+            sum_loss += loss
+        elif i == period:
+            avg_gain = (sum_gain + gain) / period
+            avg_loss = (sum_loss + loss) / period
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+    
+    if avg_loss == 0:
+        return 100.0
+    
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
 def calculate_macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> tuple:
     """Calculate MACD, Signal, and Histogram"""
     if len(prices) < slow:
         return 0.0, 0.0, 0.0
     
-    ema_fast = calculate_ema(prices, fast)
-    ema_slow = calculate_ema(prices, slow)
-    macd_line = ema_fast - ema_slow
-    
-    # For signal line, we need MACD history
+    # Single pass over the EMA series instead of re-running EMA per prefix
+    fast_mult = 2 / (fast + 1)
+    slow_mult = 2 / (slow + 1)
+    ema_f = prices[0]
+    ema_s = prices[0]
     macd_history = []
-    for i in range(max(slow, len(prices) - 50), len(prices)):
-        ema_f = calculate_ema(prices[:i+1], fast)
-        ema_s = calculate_ema(prices[:i+1], slow)
-        macd_history.append(ema_f - ema_s)
     
-    if len(macd_history) >= signal:
-        macd_signal = calculate_ema(macd_history, signal)
-    else:
-        macd_signal = macd_line
+    for i in range(len(prices)):
+        if i > 0:
+            ema_f = (prices[i] * fast_mult) + (ema_f * (1 - fast_mult))
+            ema_s = (prices[i] * slow_mult) + (ema_s * (1 - slow_mult))
+        if i >= slow - 1:
+            macd_history.append(ema_f - ema_s)
     
+    macd_line = macd_history[-1]
+    macd_signal = calculate_ema(macd_history, signal)
     macd_histogram = macd_line - macd_signal
     
     return macd_line, macd_signal, macd_histogram
@@ -203,6 +240,81 @@ def calculate_adx(highs: List[float], lows: List[float], closes: List[float], pe
     return adx, plus_di, minus_di
 
 
+def calculate_atr_wilder(highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> float:
+    """Calculate ATR with Wilder smoothing (batch reference)"""
+    if len(highs) < period + 1:
+        return 0.0
+    
+    atr = 0.0
+    tr_sum = 0.0
+    for i in range(1, len(highs)):
+        tr = max(
+            highs[i] - lows[i],
+            abs(highs[i] - closes[i-1]),
+            abs(lows[i] - closes[i-1])
+        )
+        if i < period:
+            tr_sum += tr
+        elif i == period:
+            atr = (tr_sum + tr) / period
+        else:
+            atr = (atr * (period - 1) + tr) / period
+    
+    return atr
+
+
+def calculate_adx_wilder(highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> tuple:
+    """Calculate ADX, +DI, -DI with Wilder smoothing (batch reference)"""
+    if len(highs) < period + 1:
+        return 0.0, 0.0, 0.0
+    
+    tr_s = plus_s = minus_s = 0.0
+    dx_sum = adx = dx = 0.0
+    plus_di = minus_di = 0.0
+    
+    for i in range(1, len(highs)):
+        tr = max(
+            highs[i] - lows[i],
+            abs(highs[i] - closes[i-1]),
+            abs(lows[i] - closes[i-1])
+        )
+        up_move = highs[i] - highs[i-1]
+        down_move = lows[i-1] - lows[i]
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+        
+        # Wilder sums: seed with the first `period` moves, then smooth
+        if i <= period:
+            tr_s += tr
+            plus_s += plus_dm
+            minus_s += minus_dm
+        else:
+            tr_s = tr_s - tr_s / period + tr
+            plus_s = plus_s - plus_s / period + plus_dm
+            minus_s = minus_s - minus_s / period + minus_dm
+        
+        if i < period:
+            continue
+        
+        plus_di = 100 * plus_s / tr_s if tr_s != 0 else 0.0
+        minus_di = 100 * minus_s / tr_s if tr_s != 0 else 0.0
+        di_sum = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum != 0 else 0.0
+        
+        # ADX seeds from the mean of the first `period` DX values
+        dx_count = i - period + 1
+        if dx_count < period:
+            dx_sum += dx
+        elif dx_count == period:
+            adx = (dx_sum + dx) / period
+        else:
+            adx = (adx * (period - 1) + dx) / period
+    
+    if len(highs) < 2 * period:
+        return dx, plus_di, minus_di
+    return adx, plus_di, minus_di
+
+
 def calculate_stochastic(highs: List[float], lows: List[float], closes: List[float], 
                          k_period: int = 14, d_period: int = 3) -> tuple:
     """Calculate Stochastic %K and %D"""
@@ -261,56 +373,165 @@ def calculate_atr_percentile(current_atr: float, atr_history: List[float]) -> fl
     return percentile
 
 
-class TechnicalAnalyzer:
-    """Calculate all technical features"""
-    
-    def __init__(self):
-        self.atr_history: List[float] = []
+class IncrementalTechnicalEngine:
+    """
+    Streaming technical indicators.
+    
+    Each closed candle is committed once in O(1); an in-progress candle is
+    evaluated against the committed state without mutating it, so repeated
+    ticks on the forming bar cost the same as a single close.
+    
+    Semantics match the batch references: EMA/Stochastic/Bollinger as
+    calculate_ema/calculate_stochastic/calculate_bollinger_bands,
+    calculate_rsi_wilder, calculate_macd, calculate_atr_wilder,
+    calculate_adx_wilder and calculate_vwap over the last `vwap_window` bars.
+    """
+    
+    def __init__(self, vwap_window: int = 500):
+        self.vwap_window = vwap_window
+        self.reset()
+    
+    def reset(self):
+        """Drop all state (used when history no longer lines up)"""
+        self.rsi_7 = WilderRSI(7)
+        self.rsi_14 = WilderRSI(14)
+        self.ema_9 = StreamingEMA(9)
+        self.ema_21 = StreamingEMA(21)
+        self.ema_50 = StreamingEMA(50)
+        self.ema_200 = StreamingEMA(200)
+        self.macd = StreamingMACD()
+        self.bollinger = StreamingBollinger()
+        self.atr = WilderATR(14)
+        self.adx = WilderADX(14)
+        self.stochastic = StreamingStochastic()
+        self.vwap = StreamingVWAP(self.vwap_window)
+        
+        self.bar_count = 0
+        self.last_timestamp = None
+        self.forming = None
+    
+    def _commit(self, candle):
+        close = candle.close
+        self.rsi_7.update(close)
+        self.rsi_14.update(close)
+        self.ema_9.update(close)
+        self.ema_21.update(close)
+        self.ema_50.update(close)
+        self.ema_200.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.atr.update(candle.high, candle.low, close)
+        self.adx.update(candle.high, candle.low, close)
+        self.stochastic.update(candle.high, candle.low, close)
+        self.vwap.update(close, candle.volume)
+        
+        self.bar_count += 1
+        self.last_timestamp = candle.timestamp
     
-    def calculate(self, candles: List) -> TechnicalFeatures:
-        """Calculate all technical features from candles"""
-        if not candles or len(candles) < 2:
-            return TechnicalFeatures()
+    def update(self, candle) -> bool:
+        """
+        Feed one candle update.
         
-        # Extract price series
-        closes = [c.close for c in candles]
-        highs = [c.high for c in candles]
-        lows = [c.low for c in candles]
-        volumes = [c.volume for c in candles]
+        Returns True if a new bar was committed. Closed candles at or before
+        the last committed bar are ignored, so replays are idempotent.
+        """
+        if self.last_timestamp is not None and candle.timestamp <= self.last_timestamp:
+            return False
         
-        features = TechnicalFeatures()
+        if candle.is_closed:
+            self._commit(candle)
+            self.forming = None
+            return True
         
-        # RSI
-        features.rsi_7 = calculate_rsi(closes, 7)
-        features.rsi_14 = calculate_rsi(closes, 14)
+        self.forming = candle
+        return False
+    
+    def sync(self, candles: Sequence) -> int:
+        """
+        Catch up with a candle window (oldest first).
         
-        # EMA
-        features.ema_9 = calculate_ema(closes, 9)
-        features.ema_21 = calculate_ema(closes, 21)
-        features.ema_50 = calculate_ema(closes, 50)
-        features.ema_200 = calculate_ema(closes, 200)
+        Only candles newer than the last committed bar are visited. If the
+        window no longer overlaps the committed history (e.g. after a
+        reconnect gap) the engine is rebuilt from the window.
         
-        # MACD
-        features.macd_line, features.macd_signal, features.macd_histogram = calculate_macd(closes)
+        Returns the number of newly committed bars.
+        """
+        if not candles:
+            return 0
         
-        # Bollinger Bands
-        features.bb_upper, features.bb_lower, features.bb_position = calculate_bollinger_bands(closes)
+        if self.last_timestamp is not None and candles[0].timestamp > self.last_timestamp:
+            self.reset()
         
-        # ATR
-        features.atr_14 = calculate_atr(highs, lows, closes, 14)
-        self.atr_history.append(features.atr_14)
-        if len(self.atr_history) > 30 * 24:  # Keep ~30 days of hourly ATR
-            self.atr_history = self.atr_history[-30*24:]
-        features.atr_percentile = calculate_atr_percentile(features.atr_14, self.atr_history)
+        # Walk back to the first unseen candle
+        pending = []
+        for candle in reversed(candles):
+            if self.last_timestamp is not None and candle.timestamp <= self.last_timestamp:
+                break
+            pending.append(candle)
         
-        # ADX
-        features.adx, features.plus_di, features.minus_di = calculate_adx(highs, lows, closes)
+        committed = 0
+        self.forming = None
+        for candle in reversed(pending):
+            if self.update(candle):
+                committed += 1
         
-        # Stochastic
-        features.stoch_k, features.stoch_d = calculate_stochastic(highs, lows, closes)
+        return committed
+    
+    def snapshot(self) -> TechnicalFeatures:
+        """Indicator values including the forming candle, if any"""
+        features = TechnicalFeatures()
+        candle = self.forming
         
-        # VWAP
-        features.vwap = calculate_vwap(closes, volumes)
+        if candle is None:
+            features.rsi_7 = self.rsi_7.current
+            features.rsi_14 = self.rsi_14.current
+            features.ema_9 = self.ema_9.current
+            features.ema_21 = self.ema_21.current
+            features.ema_50 = self.ema_50.current
+            features.ema_200 = self.ema_200.current
+            features.macd_line, features.macd_signal, features.macd_histogram = self.macd.current
+            features.bb_upper, features.bb_lower, features.bb_position = self.bollinger.current
+            features.atr_14 = self.atr.current
+            features.adx, features.plus_di, features.minus_di = self.adx.current
+            features.stoch_k, features.stoch_d = self.stochastic.current
+            features.vwap = self.vwap.current
+            return features
         
+        close = candle.close
+        features.rsi_7 = self.rsi_7.peek(close)
+        features.rsi_14 = self.rsi_14.peek(close)
+        features.ema_9 = self.ema_9.peek(close)
+        features.ema_21 = self.ema_21.peek(close)
+        features.ema_50 = self.ema_50.peek(close)
+        features.ema_200 = self.ema_200.peek(close)
+        features.macd_line, features.macd_signal, features.macd_histogram = self.macd.peek(close)
+        features.bb_upper, features.bb_lower, features.bb_position = self.bollinger.peek(close)
+        features.atr_14 = self.atr.peek(candle.high, candle.low)
+        features.adx, features.plus_di, features.minus_di = self.adx.peek(candle.high, candle.low)
+        features.stoch_k, features.stoch_d = self.stochastic.peek(candle.high, candle.low, close)
+        features.vwap = self.vwap.peek(close, candle.volume)
         return features
 
+
+class TechnicalAnalyzer:
+    """Calculate all technical features"""
+    
+    def __init__(self):
+        self.atr_history: List[float] = []
+        self.engine = IncrementalTechnicalEngine()
+    
+    def calculate(self, candles: Sequence) -> TechnicalFeatures:
+        """Calculate all technical features from candles"""
+        if not candles or len(candles) < 2:
+            return TechnicalFeatures()
+        
+        if self.engine.sync(candles):
+            # Track ATR once per closed bar rather than once per call
+            self.atr_history.append(self.engine.atr.current)
+            if len(self.atr_history) > 30 * 24:  # Keep ~30 days of hourly ATR
+                self.atr_history = self.atr_history[-30*24:]
+        
+        features = self.engine.snapshot()
+        features.atr_percentile = calculate_atr_percentile(features.atr_14, self.atr_history)
+        
+        return features
@@ -126,7 +126,8 @@ class FiveGateSystem:
         regime: RegimeResult,
         signal: dict,
         daily_state: DailyState,
-        ai_result: dict = None
+        ai_result: dict = None,
+        now: Optional[datetime] = None
     ) -> GateSystemResult:
         """
         Evaluate all 5 gates.
@@ -137,10 +138,14 @@ class FiveGateSystem:
             signal: Potential signal dict
             daily_state: Current daily state
             ai_result: Optional AI prediction result
+            now: Evaluation time (UTC), defaults to the wall clock; the
+                backtester passes the bar close time
         
         Returns:
             GateSystemResult with pass/fail and details
         """
+        if now is None:
+            now = datetime.utcnow()
         gate_results = []
         
         logger.info("=" * 50)
@@ -149,7 +154,7 @@ class FiveGateSystem:
         logger.info(f"Regime: {regime.regime_type.value} | Confidence: {regime.confidence:.2%}")
         
         # Gate 1: Context
-        gate1 = self._check_gate1_context(features)
+        gate1 = self._check_gate1_context(features, now)
         gate_results.append(gate1)
         logger.info(f"Gate 1 (Context): {gate1.status.value} | Score: {gate1.score:.2f} | {gate1.reason}")
         if gate1.status == GateStatus.FAILED:
@@ -201,7 +206,7 @@ class FiveGateSystem:
             )
         
         # Gate 5: Daily Limits (MOST IMPORTANT)
-        gate5 = self._check_gate5_daily_limits(daily_state)
+        gate5 = self._check_gate5_daily_limits(daily_state, now)
         gate_results.append(gate5)
         logger.info(f"Gate 5 (Daily Limits): {gate5.status.value} | Score: {gate5.score:.2f} | {gate5.reason}")
         if gate5.status == GateStatus.FAILED:
@@ -224,14 +229,13 @@ class FiveGateSystem:
             overall_score=overall_score
         )
     
-    def _check_gate1_context(self, features: AllFeatures) -> GateResult:
+    def _check_gate1_context(self, features: AllFeatures, now: datetime) -> GateResult:
         """
         Gate 1: Context Check
         - Session quality
         - Funding buffer
         - No Dead Zone
         """
-        now = datetime.utcnow()
         score = 0.0
         reasons = []
         
@@ -508,7 +512,7 @@ class FiveGateSystem:
             details={'confidence': confidence, 'risk_factors': risk_factors}
         )
     
-    def _check_gate5_daily_limits(self, daily_state: DailyState) -> GateResult:
+    def _check_gate5_daily_limits(self, daily_state: DailyState, now: datetime) -> GateResult:
         """
         Gate 5: Daily Limits (MOST IMPORTANT)
         - PnL not at target (+$10) or stop (-$15)
@@ -559,7 +563,7 @@ class FiveGateSystem:
         # Check consecutive losses and cooldown
         if daily_state.consecutive_losses >= self.max_consecutive_losses:
             if daily_state.last_trade_time:
-                minutes_since = (datetime.utcnow() - daily_state.last_trade_time).total_seconds() / 60
+                minutes_since = (now - daily_state.last_trade_time).total_seconds() / 60
                 if minutes_since < self.cooldown_minutes:
                     return GateResult(
                         gate_name="Gate 5: Daily Limits",
@@ -2,9 +2,11 @@
 Bot 1: Core Brain - Main Entry Point
 BTC Trading Bot v5.0
 """
+import argparse
 import asyncio
 import logging
-from datetime import datetime, date
+from datetime import datetime, timezone
+from typing import Optional
 import sys
 import signal
 from pathlib import Path
@@ -15,13 +17,19 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import settings
 from config.version import get_full_version, CURRENT_VERSION
 from src.data.binance_client import BinanceClient
+from src.data.candle_buffer import TIMEFRAME_MS
+from src.data.models import MarketEvent, MarketEventType
+from src.data.recorder import MarketRecorder
+from src.data.replay_client import ReplayClient
 from src.features.feature_engine import FeatureEngine
+from src.features.feature_store import FeatureStore
 from src.features.regime import RegimeDetector
 from src.gates.gate_system import FiveGateSystem, DailyState
 from src.signals.signal_generator import SignalGenerator
 from src.ai.model import AIModel
 from src.learning.learning_engine import LearningEngine, TradeResult
 from src.database.repository import DatabaseRepository
+from src.database.async_repository import AsyncDatabaseRepository
 from src.telegram.bot import TelegramBot
 from src.telegram.command_handler import TelegramCommandHandler
 from src.predictor import BTCDirectionPredictor
@@ -51,19 +59,34 @@ class CoreBrainBot:
     - Learn from results
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        binance_client: Optional[BinanceClient] = None,
+        sqlite_path: Optional[str] = None,
+        telegram_enabled: Optional[bool] = None
+    ):
         # Initialize components
-        self.binance = BinanceClient(
+        # A supplied client (e.g. ReplayClient) replaces the live connection and recorder.
+        # sqlite_path / telegram_enabled override the configured database and Telegram.
+        self.recorder = MarketRecorder(
+            directory=settings.recorder.PATH,
+            symbol=settings.trading.SYMBOL,
+            segment_minutes=settings.recorder.SEGMENT_MINUTES
+        ) if settings.recorder.ENABLED and binance_client is None else None
+        
+        self.binance = binance_client or BinanceClient(
             api_key=settings.api.BINANCE_API_KEY,
             api_secret=settings.api.BINANCE_API_SECRET,
             testnet=settings.api.BINANCE_TESTNET,
-            symbol=settings.trading.SYMBOL
+            symbol=settings.trading.SYMBOL,
+            recorder=self.recorder
         )
         
         self.features = FeatureEngine(
             glassnode_api_key=settings.api.GLASSNODE_API_KEY,
             coinglass_api_key=settings.api.COINGLASS_API_KEY,
-            use_mock=True  # Use mock data for on-chain/liquidation
+            use_mock=True,  # Use mock data for on-chain/liquidation
+            store=FeatureStore(capacity=settings.FEATURE_STORE_CAPACITY)
         )
         
         self.regime_detector = RegimeDetector()
@@ -98,16 +121,21 @@ class CoreBrainBot:
         
         self.learning_engine = LearningEngine()
         
-        self.db = DatabaseRepository(
+        self.repository = DatabaseRepository(
             database_url=settings.database.DATABASE_URL,
-            use_sqlite=settings.database.USE_SQLITE,
-            sqlite_path=settings.database.SQLITE_PATH
+            use_sqlite=settings.database.USE_SQLITE or sqlite_path is not None,
+            sqlite_path=sqlite_path or settings.database.SQLITE_PATH,
+            **settings.database.engine_options
         )
+        # Main loop DB access runs on a dedicated thread, off the event loop
+        self.db = AsyncDatabaseRepository(self.repository)
         
+        if telegram_enabled is None:
+            telegram_enabled = settings.telegram.ENABLED
         self.telegram = TelegramBot(
             token=settings.telegram.TOKEN,
             chat_id=settings.telegram.CHAT_ID,
-            enabled=settings.telegram.ENABLED
+            enabled=telegram_enabled
         )
         
         # ★ BTC Direction Predictor (INDEPENDENT module) ★
@@ -117,10 +145,10 @@ class CoreBrainBot:
         self.telegram_commands = TelegramCommandHandler(
             token=settings.telegram.TOKEN,
             chat_id=settings.telegram.CHAT_ID,
-            db_repository=self.db,
+            db_repository=self.repository,
             feature_engine=self.features,
             regime_detector=self.regime_detector,
-            enabled=settings.telegram.ENABLED,
+            enabled=telegram_enabled,
             predictor=self.predictor,  # Pass predictor for /predict commands
             binance_client=self.binance  # Pass binance for market data
         )
@@ -131,6 +159,10 @@ class CoreBrainBot:
         self._current_date = None
         self._command_task = None
         self._predictor_task = None  # Task for periodic predictions
+        
+        # Candle-close events driving the main loop
+        self._close_events: asyncio.Queue = asyncio.Queue()
+        self.binance.add_callback(self._on_market_event)
     
     def _init_predictor(self) -> BTCDirectionPredictor:
         """Initialize the BTC Direction Predictor (independent module)"""
@@ -175,22 +207,11 @@ class CoreBrainBot:
                 logger.warning("No market data available for predictor")
                 return None
             
-            # Convert candles to predictor format
-            # data.candles is Dict[str, deque[Candle]]
-            candles_dict = {}
-            
-            for tf in ['5m', '15m', '1m', '3m']:
-                if tf in data.candles and len(data.candles[tf]) > 0:
-                    candles_dict[tf] = [
-                        {
-                            'open': c.open,
-                            'high': c.high,
-                            'low': c.low,
-                            'close': c.close,
-                            'volume': c.volume
-                        }
-                        for c in data.candles[tf]
-                    ]
+            # CandleBuffers are passed as-is (the predictor reads their columns)
+            candles_dict = {
+                tf: data.candles[tf] for tf in ['5m', '15m', '1m', '3m']
+                if tf in data.candles and len(data.candles[tf]) > 0
+            }
             
             # Get funding rate from FundingRate object
             funding_rate = 0
@@ -200,6 +221,7 @@ class CoreBrainBot:
             return {
                 'current_price': data.last_price,
                 'candles': candles_dict,
+                'indicator_cache': self.features.indicators,
                 'funding_rate': funding_rate,
                 'long_short_ratio': None,
                 'oi_change_pct': None,
@@ -224,6 +246,13 @@ class CoreBrainBot:
         Path("logs").mkdir(exist_ok=True)
         Path("data").mkdir(exist_ok=True)
         
+        # Start the DB worker
+        self.db.start()
+        
+        # Start raw market data recording (background thread)
+        if self.recorder:
+            self.recorder.start()
+        
         # Connect to Binance
         binance_task = asyncio.create_task(self.binance.connect())
         
@@ -242,7 +271,7 @@ class CoreBrainBot:
             logger.info("🔮 Predictor periodic task started (every 15 min)")
         
         # Wait for initial data
-        await asyncio.sleep(5)
+        await self.binance.sleep(5)
         
         # Send startup notification with interactive menu
         await self._send_startup_menu()
@@ -280,6 +309,9 @@ class CoreBrainBot:
             logger.info("🔮 Predictor task stopped")
         
         await self.binance.disconnect()
+        if self.recorder:
+            self.recorder.stop()
+        await self.db.close()
         await self.features.close()
         await self.telegram.close()
         
@@ -291,11 +323,24 @@ class CoreBrainBot:
         
         while self._running:
             try:
+                # Wait for the next signal-timeframe candle close
+                event = await self._next_close_event()
+                
                 # Check for new day
                 await self._check_new_day()
                 
                 # Get daily state
-                daily_state = self._get_daily_state()
+                daily_state = await self._get_daily_state()
+                
+                # No close yet: heartbeat only
+                if event is None:
+                    self.db.ping_heartbeat(
+                        status='daily_limit' if daily_state.should_stop else 'running',
+                        signals_today=daily_state.trade_count,
+                        current_regime=self._last_regime.regime_type.value if self._last_regime else None,
+                        daily_pnl=daily_state.pnl
+                    )
+                    continue
                 
                 # Check if should stop trading today
                 if daily_state.should_stop:
@@ -304,7 +349,6 @@ class CoreBrainBot:
                         signals_today=daily_state.trade_count,
                         daily_pnl=daily_state.pnl
                     )
-                    await asyncio.sleep(60)
                     continue
                 
                 # Get market data
@@ -312,14 +356,18 @@ class CoreBrainBot:
                 
                 if not market_data.last_price:
                     logger.warning("No market data available")
-                    await asyncio.sleep(10)
                     continue
                 
-                # Calculate features
-                features = await self.features.calculate(market_data)
+                # Calculate features (once per closed bar, into the feature store)
+                now = self.binance.now()
+                bar_close = datetime.utcfromtimestamp(
+                    (event.open_time_ms + TIMEFRAME_MS[event.timeframe]) / 1000
+                )
+                features = await self.features.calculate_bar(market_data, event.timeframe, bar_close, now=now)
                 
                 # Detect regime
                 regime = self.regime_detector.detect(features)
+                self.features.store.set_regime(event.timeframe, bar_close, regime)
                 
                 # Check for regime change
                 if self._last_regime and self._last_regime.regime_type != regime.regime_type:
@@ -337,11 +385,10 @@ class CoreBrainBot:
                         status='waiting',
                         current_regime=regime.regime_type.value
                     )
-                    await asyncio.sleep(60)
                     continue
                 
                 # Generate potential signal
-                potential_signal = self.signal_generator.generate(features, regime)
+                potential_signal = self.signal_generator.generate(features, regime, now=now)
                 
                 if potential_signal:
                     logger.info(f"Potential signal: {potential_signal.direction.value}")
@@ -366,7 +413,8 @@ class CoreBrainBot:
                                 'setup_quality': potential_signal.setup_quality
                             },
                             daily_state=daily_state,
-                            ai_result=ai_result.to_dict() if ai_result else None
+                            ai_result=ai_result.to_dict() if ai_result else None,
+                            now=now
                         )
                         logger.info(f"Gate result: passed={gate_result.passed}, blocking_gate={gate_result.blocking_gate}")
                     except Exception as e:
@@ -408,7 +456,7 @@ class CoreBrainBot:
                                 }
                                 
                                 # Save to database
-                                self._save_signal(potential_signal, features)
+                                await self._save_signal(potential_signal, features)
                                 
                                 # Send alert
                                 await self.telegram.send_signal_alert(
@@ -422,9 +470,9 @@ class CoreBrainBot:
                 
                 # Check for new results to learn from
                 logger.debug("Checking for new results to learn from...")
-                new_results = self.db.get_new_results()
+                new_results = await self.db.get_new_results()
                 if new_results:
-                    self._process_learning(new_results)
+                    await self._process_learning(new_results)
                 
                 # Send heartbeat
                 logger.info(f"Sending heartbeat... Regime: {regime.regime_type.value}")
@@ -435,31 +483,54 @@ class CoreBrainBot:
                     daily_pnl=daily_state.pnl
                 )
                 
-                # Wait for next cycle
-                logger.info(f"Cycle complete. Waiting {settings.MAIN_LOOP_INTERVAL}s...")
-                await asyncio.sleep(settings.MAIN_LOOP_INTERVAL)
+                latency_ms = (self.binance.now() - event.timestamp).total_seconds() * 1000
+                logger.info(f"Cycle complete ({event.timeframe} close, {latency_ms:.0f}ms after close)")
                 
             except Exception as e:
                 logger.error(f"Error in main loop: {e}")
                 self.db.ping_heartbeat(status='error', error_message=str(e))
-                await asyncio.sleep(10)
+    
+    def _on_market_event(self, event: MarketEvent):
+        """BinanceClient callback: queue closes of the signal timeframe"""
+        if event.type == MarketEventType.KLINE_CLOSED and event.timeframe == settings.SIGNAL_TIMEFRAME:
+            self._close_events.put_nowait(event)
+    
+    async def _next_close_event(self) -> Optional[MarketEvent]:
+        """
+        Next signal-timeframe close, or None after HEARTBEAT_INTERVAL idle.
+        
+        If the pipeline fell behind, queued closes are coalesced into the
+        latest one (features are computed from the current buffers anyway).
+        """
+        try:
+            event = await self.binance.wait_for(self._close_events.get(), settings.HEARTBEAT_INTERVAL)
+        except asyncio.TimeoutError:
+            return None
+        
+        skipped = 0
+        while not self._close_events.empty():
+            event = self._close_events.get_nowait()
+            skipped += 1
+        if skipped:
+            logger.warning(f"Pipeline behind: coalesced {skipped} stale {event.timeframe} closes")
+        return event
     
     async def _check_new_day(self):
         """Check if it's a new trading day"""
-        today = date.today().isoformat()
+        today = self.binance.now().date().isoformat()
         
         if self._current_date != today:
             logger.info(f"New trading day: {today}")
             self._current_date = today
             
             # Reset daily state
-            self.db.reset_daily_state(today)
+            await self.db.reset_daily_state(today)
             
             # Note: Bot 2 handles new day notifications
     
-    def _get_daily_state(self) -> DailyState:
+    async def _get_daily_state(self) -> DailyState:
         """Get current daily state from database"""
-        db_state = self.db.get_daily_state()
+        db_state = await self.db.get_daily_state(self._current_date)
         
         return DailyState(
             date=db_state.date,
@@ -472,7 +543,7 @@ class CoreBrainBot:
             status=db_state.status
         )
     
-    def _save_signal(self, signal, features):
+    async def _save_signal(self, signal, features):
         """Save signal and features to database"""
         from src.database.models import Signal as DBSignal
         
@@ -497,11 +568,15 @@ class CoreBrainBot:
             gate_5_passed=signal.gate_scores.get('gate_5', 0) > 0
         )
         
-        self.db.save_signal(db_signal)
-        self.db.save_features_snapshot(signal.signal_id, features.to_dict())
-        self.db.increment_trade_count()
+        await self.db.save_signal(db_signal)
+        await self.db.save_features_snapshot(
+            signal.signal_id, features.to_dict(),
+            vector=features.to_feature_vector(),
+            schema_version=self.ai_model.feature_schema_version()
+        )
+        await self.db.increment_trade_count()
     
-    def _process_learning(self, results):
+    async def _process_learning(self, results):
         """Process new results for learning"""
         trade_results = []
         
@@ -534,7 +609,7 @@ class CoreBrainBot:
         
         # Mark as analyzed
         for result in results:
-            self.db.mark_signal_analyzed(result.signal_id)
+            await self.db.mark_signal_analyzed(result.signal_id)
     
     async def _send_startup_menu(self):
         """Send startup message with interactive menu buttons"""
@@ -575,9 +650,58 @@ class CoreBrainBot:
         logger.info(f"Startup menu send result: {result}")
 
 
+def _parse_time_ms(text: Optional[str]) -> Optional[int]:
+    """ISO time (UTC) -> epoch ms"""
+    if not text:
+        return None
+    return int(datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _replay_sqlite_path(archive: str) -> str:
+    """Default replay database: a SQLite file next to the archive directory"""
+    return str(Path(archive).resolve()) + ".replay.db"
+
+
+async def _stop_when_replay_ends(bot: CoreBrainBot, replay: ReplayClient):
+    await replay.finished.wait()
+    logger.info("Replay archive exhausted, stopping")
+    bot._running = False
+
+
 async def main():
     """Main entry point"""
-    bot = CoreBrainBot()
+    parser = argparse.ArgumentParser(description="Core Brain bot")
+    parser.add_argument('--replay', metavar='DIR', help="Run offline from a MarketRecorder archive")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Replay speed multiplier (0 = as fast as possible)")
+    parser.add_argument('--start', help="Replay start time, ISO UTC (e.g. 2024-05-01T00:00)")
+    parser.add_argument('--end', help="Replay end time, ISO UTC")
+    parser.add_argument('--db', metavar='PATH',
+                        help="SQLite file for a replay (default: <archive>.replay.db next to the archive)")
+    parser.add_argument('--shared-db', action='store_true',
+                        help="Replay into the configured database, which bot-heartbeat also tracks")
+    parser.add_argument('--telegram', action='store_true',
+                        help="Send Telegram alerts during a replay (off by default)")
+    args = parser.parse_args()
+    
+    replay = ReplayClient(
+        directory=args.replay,
+        speed=args.speed,
+        start_ms=_parse_time_ms(args.start),
+        end_ms=_parse_time_ms(args.end),
+        symbol=settings.trading.SYMBOL
+    ) if args.replay else None
+    
+    if replay:
+        # Replayed signals must not reach the live database (bot-heartbeat would
+        # resolve them and count them in the daily stats) or the Telegram chat
+        sqlite_path = None if args.shared_db else args.db or _replay_sqlite_path(args.replay)
+        telegram_enabled = settings.telegram.ENABLED and args.telegram
+        logger.info(f"Replay database: {sqlite_path or 'configured (shared)'}, "
+                    f"Telegram: {'on' if telegram_enabled else 'off'}")
+        bot = CoreBrainBot(binance_client=replay, sqlite_path=sqlite_path, telegram_enabled=telegram_enabled)
+    else:
+        bot = CoreBrainBot()
     
     # Handle shutdown signals
     loop = asyncio.get_event_loop()
@@ -585,6 +709,9 @@ async def main():
     for sig in (signal.SIGINT, signal.SIGTERM):
         loop.add_signal_handler(sig, lambda: asyncio.create_task(bot.stop()))
     
+    if replay:
+        asyncio.create_task(_stop_when_replay_ends(bot, replay))
+    
     await bot.start()
 
 
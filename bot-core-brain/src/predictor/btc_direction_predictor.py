@@ -69,7 +69,8 @@ class BTCDirectionPredictor:
         Args:
             market_data: Dictionary containing:
                 - current_price: float
-                - candles: Dict[timeframe, List[candle]]
+                - candles: Dict[timeframe, CandleBuffer or List[candle dict]]
+                - indicator_cache: IndicatorCache (optional)
                 - funding_rate: float (optional)
                 - orderbook: dict (optional)
         
@@ -263,21 +263,29 @@ class StructureAnalyzer:
     # =====================================================
     
     def _extract_closes(self, candles: List) -> np.ndarray:
+        if hasattr(candles, 'column'):  # CandleBuffer: zero-copy view
+            return candles.column('close')
         if isinstance(candles[0], dict):
             return np.array([c.get('close', c.get('c', 0)) for c in candles])
         return np.array(candles)
     
     def _extract_highs(self, candles: List) -> np.ndarray:
+        if hasattr(candles, 'column'):  # CandleBuffer: zero-copy view
+            return candles.column('high')
         if isinstance(candles[0], dict):
             return np.array([c.get('high', c.get('h', 0)) for c in candles])
         return np.array(candles)
     
     def _extract_lows(self, candles: List) -> np.ndarray:
+        if hasattr(candles, 'column'):  # CandleBuffer: zero-copy view
+            return candles.column('low')
         if isinstance(candles[0], dict):
             return np.array([c.get('low', c.get('l', 0)) for c in candles])
         return np.array(candles)
     
     def _extract_volumes(self, candles: List) -> np.ndarray:
+        if hasattr(candles, 'column'):  # CandleBuffer: zero-copy view
+            return candles.column('volume')
         if isinstance(candles[0], dict):
             return np.array([c.get('volume', c.get('v', 0)) for c in candles])
         return np.array([1] * len(candles))  # Default if no volume
@@ -1,6 +1,6 @@
 """
 Technical Analyzer - RSI, MACD, EMA, Bollinger, ADX
-★ INDEPENDENT - Self-contained calculations ★
+★ INDEPENDENT - Own scoring; indicator math from the shared kernel ★
 """
 
 import logging
@@ -8,6 +8,7 @@ import numpy as np
 from typing import Dict, Any, List, Optional
 
 from .. import Direction, IndicatorResult, AnalysisComponent
+from ...features.indicators import ClosedBarIndicators, closed_bar_indicators
 
 logger = logging.getLogger(__name__)
 
@@ -32,59 +33,66 @@ class TechnicalAnalyzer:
             candles = market_data.get('candles', {})
             
             # Try to get timeframe data
+            timeframe = None
             if '5m' in candles:
-                candle_data = candles['5m']
+                timeframe = '5m'
             elif '15m' in candles:
-                candle_data = candles['15m']
+                timeframe = '15m'
             elif '1h' in candles:
-                candle_data = candles['1h']
+                timeframe = '1h'
             elif isinstance(candles, list):
                 candle_data = candles
             else:
                 logger.warning("No suitable candle data found")
                 return None
+            if timeframe:
+                candle_data = candles[timeframe]
             
             if not candle_data or len(candle_data) < 50:
                 logger.warning("Insufficient candle data for analysis")
                 return None
             
-            # Extract price data
-            closes = self._extract_closes(candle_data)
-            highs = self._extract_highs(candle_data)
-            lows = self._extract_lows(candle_data)
-            
-            if len(closes) < 50:
-                return None
+            # Indicators of the last closed bar: from the shared cache when
+            # the main loop already computed them, else from the candles
+            snapshot = None
+            cache = market_data.get('indicator_cache')
+            if cache is not None and timeframe and hasattr(candle_data, 'column'):
+                snapshot = cache.get(timeframe, candle_data)
+            if snapshot is None:
+                closes = self._extract_closes(candle_data)
+                snapshot = closed_bar_indicators(
+                    0, self._extract_highs(candle_data), self._extract_lows(candle_data), closes
+                )
             
             indicators: List[IndicatorResult] = []
             reasoning: List[str] = []
             
             # 1. RSI (20% weight)
-            rsi_result = self._analyze_rsi(closes)
+            rsi_result = self._analyze_rsi(snapshot)
             if rsi_result:
                 indicators.append(rsi_result)
                 reasoning.append(rsi_result.description)
             
             # 2. MACD (20% weight)
-            macd_result = self._analyze_macd(closes)
+            macd_result = self._analyze_macd(snapshot)
             if macd_result:
                 indicators.append(macd_result)
                 reasoning.append(macd_result.description)
             
             # 3. EMA alignment (25% weight)
-            ema_result = self._analyze_ema(closes)
+            ema_result = self._analyze_ema(snapshot)
             if ema_result:
                 indicators.append(ema_result)
                 reasoning.append(ema_result.description)
             
             # 4. Bollinger Bands (20% weight)
-            bb_result = self._analyze_bollinger(closes)
+            bb_result = self._analyze_bollinger(snapshot)
             if bb_result:
                 indicators.append(bb_result)
                 reasoning.append(bb_result.description)
             
             # 5. ADX (15% weight)
-            adx_result = self._analyze_adx(highs, lows, closes)
+            adx_result = self._analyze_adx(snapshot)
             if adx_result:
                 indicators.append(adx_result)
                 reasoning.append(adx_result.description)
@@ -109,18 +117,24 @@ class TechnicalAnalyzer:
     
     def _extract_closes(self, candles: List) -> np.ndarray:
         """Extract close prices from candles"""
+        if hasattr(candles, 'column'):  # CandleBuffer: zero-copy view
+            return candles.column('close')
         if isinstance(candles[0], dict):
             return np.array([c.get('close', c.get('c', 0)) for c in candles])
         return np.array(candles)
     
     def _extract_highs(self, candles: List) -> np.ndarray:
         """Extract high prices from candles"""
+        if hasattr(candles, 'column'):  # CandleBuffer: zero-copy view
+            return candles.column('high')
         if isinstance(candles[0], dict):
             return np.array([c.get('high', c.get('h', 0)) for c in candles])
         return np.array(candles)
     
     def _extract_lows(self, candles: List) -> np.ndarray:
         """Extract low prices from candles"""
+        if hasattr(candles, 'column'):  # CandleBuffer: zero-copy view
+            return candles.column('low')
         if isinstance(candles[0], dict):
             return np.array([c.get('low', c.get('l', 0)) for c in candles])
         return np.array(candles)
@@ -129,10 +143,10 @@ class TechnicalAnalyzer:
     # RSI Analysis
     # =====================================================
     
-    def _analyze_rsi(self, closes: np.ndarray) -> Optional[IndicatorResult]:
-        """Calculate and analyze RSI"""
+    def _analyze_rsi(self, snapshot: ClosedBarIndicators) -> Optional[IndicatorResult]:
+        """Analyze RSI (14, Wilder)"""
         try:
-            rsi = self._calc_rsi(closes, 14)
+            rsi = snapshot.rsi_14
             
             if rsi < 30:
                 signal = Direction.LONG
@@ -160,38 +174,20 @@ class TechnicalAnalyzer:
         except:
             return None
     
-    def _calc_rsi(self, closes: np.ndarray, period: int = 14) -> float:
-        """Calculate RSI"""
-        deltas = np.diff(closes)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-    
     # =====================================================
     # MACD Analysis
     # =====================================================
     
-    def _analyze_macd(self, closes: np.ndarray) -> Optional[IndicatorResult]:
-        """Calculate and analyze MACD"""
+    def _analyze_macd(self, snapshot: ClosedBarIndicators) -> Optional[IndicatorResult]:
+        """Analyze MACD (12/26/9)"""
         try:
-            macd_line, signal_line, histogram = self._calc_macd(closes)
+            current_hist = snapshot.macd_histogram
+            prev_hist = snapshot.macd_histogram_prev
             
-            current_hist = histogram[-1]
-            prev_hist = histogram[-2]
-            
-            if current_hist > prev_hist and macd_line[-1] > signal_line[-1]:
+            if current_hist > prev_hist and snapshot.macd_line > snapshot.macd_signal:
                 signal = Direction.LONG
                 desc = "MACD bullish crossover"
-            elif current_hist < prev_hist and macd_line[-1] < signal_line[-1]:
+            elif current_hist < prev_hist and snapshot.macd_line < snapshot.macd_signal:
                 signal = Direction.SHORT
                 desc = "MACD bearish crossover"
             elif current_hist > 0:
@@ -214,27 +210,18 @@ class TechnicalAnalyzer:
         except:
             return None
     
-    def _calc_macd(self, closes: np.ndarray):
-        """Calculate MACD"""
-        ema12 = self._calc_ema_array(closes, 12)
-        ema26 = self._calc_ema_array(closes, 26)
-        macd_line = ema12 - ema26
-        signal_line = self._calc_ema_array(macd_line, 9)
-        histogram = macd_line - signal_line
-        return macd_line, signal_line, histogram
-    
     # =====================================================
     # EMA Analysis
     # =====================================================
     
-    def _analyze_ema(self, closes: np.ndarray) -> Optional[IndicatorResult]:
+    def _analyze_ema(self, snapshot: ClosedBarIndicators) -> Optional[IndicatorResult]:
         """Analyze EMA alignment"""
         try:
-            ema9 = self._calc_ema(closes, 9)
-            ema21 = self._calc_ema(closes, 21)
-            ema50 = self._calc_ema(closes, 50)
+            ema9 = snapshot.ema_9
+            ema21 = snapshot.ema_21
+            ema50 = snapshot.ema_50
             
-            current_price = closes[-1]
+            current_price = snapshot.close
             
             if ema9 > ema21 > ema50 and current_price > ema9:
                 signal = Direction.LONG
@@ -262,30 +249,15 @@ class TechnicalAnalyzer:
         except:
             return None
     
-    def _calc_ema(self, closes: np.ndarray, period: int) -> float:
-        """Calculate single EMA value"""
-        return self._calc_ema_array(closes, period)[-1]
-    
-    def _calc_ema_array(self, data: np.ndarray, period: int) -> np.ndarray:
-        """Calculate EMA array"""
-        multiplier = 2 / (period + 1)
-        ema = np.zeros_like(data)
-        ema[0] = data[0]
-        
-        for i in range(1, len(data)):
-            ema[i] = (data[i] * multiplier) + (ema[i-1] * (1 - multiplier))
-        
-        return ema
-    
     # =====================================================
     # Bollinger Bands Analysis
     # =====================================================
     
-    def _analyze_bollinger(self, closes: np.ndarray) -> Optional[IndicatorResult]:
+    def _analyze_bollinger(self, snapshot: ClosedBarIndicators) -> Optional[IndicatorResult]:
         """Analyze Bollinger Bands position"""
         try:
-            upper, middle, lower = self._calc_bollinger(closes)
-            current_price = closes[-1]
+            upper, lower = snapshot.bb_upper, snapshot.bb_lower
+            current_price = snapshot.close
             
             bb_position = (current_price - lower) / (upper - lower) if (upper - lower) > 0 else 0.5
             
@@ -315,29 +287,18 @@ class TechnicalAnalyzer:
         except:
             return None
     
-    def _calc_bollinger(self, closes: np.ndarray, period: int = 20, std_dev: float = 2.0):
-        """Calculate Bollinger Bands"""
-        middle = np.mean(closes[-period:])
-        std = np.std(closes[-period:])
-        upper = middle + (std * std_dev)
-        lower = middle - (std * std_dev)
-        return upper, middle, lower
-    
     # =====================================================
     # ADX Analysis
     # =====================================================
     
-    def _analyze_adx(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> Optional[IndicatorResult]:
+    def _analyze_adx(self, snapshot: ClosedBarIndicators) -> Optional[IndicatorResult]:
         """Analyze ADX trend strength"""
         try:
-            adx = self._calc_adx(highs, lows, closes)
+            adx = snapshot.adx
             
             if adx > 40:
                 # Strong trend - follow the direction
-                ema9 = self._calc_ema(closes, 9)
-                ema21 = self._calc_ema(closes, 21)
-                
-                if ema9 > ema21:
+                if snapshot.ema_9 > snapshot.ema_21:
                     signal = Direction.LONG
                     desc = f"ADX strong trend ({adx:.1f}) - Bullish"
                 else:
@@ -360,33 +321,6 @@ class TechnicalAnalyzer:
         except:
             return None
     
-    def _calc_adx(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> float:
-        """Calculate ADX"""
-        try:
-            # True Range
-            high_low = highs - lows
-            high_close = np.abs(highs - np.roll(closes, 1))
-            low_close = np.abs(lows - np.roll(closes, 1))
-            
-            tr = np.maximum(high_low, np.maximum(high_close, low_close))
-            atr = np.mean(tr[-period:])
-            
-            # Directional Movement
-            up_move = highs - np.roll(highs, 1)
-            down_move = np.roll(lows, 1) - lows
-            
-            plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-            minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
-            
-            plus_di = 100 * np.mean(plus_dm[-period:]) / atr if atr > 0 else 0
-            minus_di = 100 * np.mean(minus_dm[-period:]) / atr if atr > 0 else 0
-            
-            dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di) if (plus_di + minus_di) > 0 else 0
-            
-            return dx
-        except:
-            return 25  # Default moderate
-    
     # =====================================================
     # Scoring
     # =====================================================
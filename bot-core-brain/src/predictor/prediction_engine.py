@@ -51,7 +51,8 @@ class PredictionEngine:
         Args:
             market_data: Dictionary containing:
                 - current_price: float
-                - candles: Dict[timeframe, List[candle]]
+                - candles: Dict[timeframe, CandleBuffer or List[candle dict]]
+                - indicator_cache: IndicatorCache (optional)
                 - funding_rate: float (optional)
                 - volume_24h: float (optional)
         
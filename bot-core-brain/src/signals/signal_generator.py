@@ -124,7 +124,8 @@ class SignalGenerator:
     def generate(
         self, 
         features: AllFeatures, 
-        regime: RegimeResult
+        regime: RegimeResult,
+        now: Optional[datetime] = None
     ) -> Optional[Signal]:
         """
         Generate a potential signal based on current conditions.
@@ -132,6 +133,7 @@ class SignalGenerator:
         Args:
             features: Current market features
             regime: Current regime detection result
+            now: Signal time (UTC), defaults to the wall clock
         
         Returns:
             Signal if conditions met, None otherwise
@@ -167,9 +169,11 @@ class SignalGenerator:
         stop_loss, take_profit = self._calculate_prices(entry_price, direction)
         
         # Generate signal
+        if now is None:
+            now = datetime.utcnow()
         signal = Signal(
-            signal_id=self._generate_id(),
-            created_at=datetime.utcnow(),
+            signal_id=self._generate_id(now),
+            created_at=now,
             direction=direction,
             strategy=strategy,
             entry_price=entry_price,
@@ -559,9 +563,9 @@ class SignalGenerator:
         
         return stop_loss, take_profit
     
-    def _generate_id(self) -> str:
+    def _generate_id(self, now: Optional[datetime] = None) -> str:
         """Generate unique signal ID"""
-        date_str = datetime.utcnow().strftime("%Y%m%d")
+        date_str = (now or datetime.utcnow()).strftime("%Y%m%d")
         unique = uuid.uuid4().hex[:6].upper()
         return f"SIG_{date_str}_{unique}"
     
@@ -44,6 +44,11 @@ class TelegramCommandHandler:
         self._last_update_id = 0
         self._running = False
     
+    def _latest_features(self):
+        """FeatureRecord of the newest closed bar, or None before the first one"""
+        store = getattr(self.feature_engine, 'store', None)
+        return store.latest() if store is not None else None
+    
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
             self._session = aiohttp.ClientSession()
@@ -247,14 +252,15 @@ class TelegramCommandHandler:
             daily_state = self.db.get_daily_state()
             signals_today = self.db.get_signals_today()
             
-            # Get current price from feature engine
+            # Price and regime of the last closed bar (feature store)
             price = 0
             regime = "Unknown"
             try:
-                if self.feature_engine and self.feature_engine.latest_features:
-                    price = self.feature_engine.latest_features.get('close', 0)
-                if self.regime_detector and self.regime_detector.current_regime:
-                    regime = self.regime_detector.current_regime.regime_type
+                record = self._latest_features()
+                if record:
+                    price = record.features.current_price
+                    if record.regime:
+                        regime = record.regime.regime_type.value
             except:
                 pass
             
@@ -369,12 +375,13 @@ class TelegramCommandHandler:
             trend = "N/A"
             volatility = "N/A"
             
-            if self.regime_detector and self.regime_detector.current_regime:
-                regime = self.regime_detector.current_regime
-                regime_info = regime.regime_type
+            record = self._latest_features()
+            if record and record.regime:
+                regime = record.regime
+                regime_info = regime.regime_type.value
                 confidence = regime.confidence
-                trend = regime.details.get('trend', 'N/A')
-                volatility = regime.details.get('volatility', 'N/A')
+                trend = {1: "Up", -1: "Down"}.get(record.features.price_action.trend_structure, "Sideways")
+                volatility = f"ATR percentile {record.features.technical.atr_percentile:.0f}"
             
             regime_emoji = {
                 "BULL_TRENDING": "🐂",
@@ -650,22 +657,12 @@ class TelegramCommandHandler:
                 logger.info(f"Binance data: last_price={data.last_price if data else 'None'}")
                 
                 if data and data.last_price:
-                    # Convert candles to predictor format
-                    # data.candles is Dict[str, deque[Candle]]
+                    # CandleBuffers are passed as-is (the predictor reads their columns)
                     candles_dict = {}
                     
                     for tf in ['5m', '15m', '1m']:
                         if tf in data.candles and len(data.candles[tf]) > 0:
-                            candles_dict[tf] = [
-                                {
-                                    'open': c.open,
-                                    'high': c.high,
-                                    'low': c.low,
-                                    'close': c.close,
-                                    'volume': c.volume
-                                }
-                                for c in data.candles[tf]
-                            ]
+                            candles_dict[tf] = data.candles[tf]
                             logger.info(f"Got {len(candles_dict[tf])} candles for {tf}")
                     
                     # Get funding rate
@@ -676,20 +673,22 @@ class TelegramCommandHandler:
                     return {
                         'current_price': data.last_price,
                         'candles': candles_dict,
+                        'indicator_cache': getattr(self.feature_engine, 'indicators', None),
                         'funding_rate': funding_rate,
                         'long_short_ratio': None,  # Not available from basic binance data
                         'oi_change_pct': None,
                         'price_change_pct': None
                     }
             
-            # Fallback: use feature engine
-            if self.feature_engine and hasattr(self.feature_engine, 'latest_features') and self.feature_engine.latest_features:
-                features = self.feature_engine.latest_features
-                logger.info("Using feature engine for predictor data")
+            # Fallback: last closed bar from the feature store
+            record = self._latest_features()
+            if record:
+                features = record.features
+                logger.info("Using feature store for predictor data")
                 return {
-                    'current_price': features.get('close', 0),
+                    'current_price': features.current_price,
                     'candles': {},
-                    'funding_rate': features.get('funding_rate', 0)
+                    'funding_rate': features.funding.funding_current
                 }
             
             logger.warning("No data source available for predictor")
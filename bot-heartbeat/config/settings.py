@@ -18,6 +18,22 @@ class DatabaseConfig:
     )
     USE_SQLITE: bool = os.getenv("USE_SQLITE", "true").lower() == "true"
     SQLITE_PATH: str = os.getenv("SQLITE_PATH", "../bot-core-brain/data/trading_bot.db")
+    # Engine tuning (see src/database/engine.py)
+    POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    POOL_RECYCLE: int = 1800  # seconds
+    STATEMENT_CACHE_SIZE: int = 500
+    SQLITE_BUSY_TIMEOUT: float = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+    
+    @property
+    def engine_options(self) -> dict:
+        return dict(
+            pool_size=self.POOL_SIZE,
+            max_overflow=self.MAX_OVERFLOW,
+            pool_recycle=self.POOL_RECYCLE,
+            statement_cache_size=self.STATEMENT_CACHE_SIZE,
+            busy_timeout=self.SQLITE_BUSY_TIMEOUT
+        )
 
 
 @dataclass
@@ -33,12 +49,18 @@ class PriceConfig:
     """Price API configuration"""
     BINANCE_REST_URL: str = "https://fapi.binance.com"
     BINANCE_TESTNET_REST_URL: str = "https://testnet.binancefuture.com"
+    BINANCE_WS_URL: str = "wss://fstream.binance.com/ws"
+    BINANCE_TESTNET_WS_URL: str = "wss://stream.binancefuture.com/ws"
     USE_TESTNET: bool = os.getenv("BINANCE_TESTNET", "true").lower() == "true"
     SYMBOL: str = "BTCUSDT"
     
     @property
     def rest_url(self) -> str:
         return self.BINANCE_TESTNET_REST_URL if self.USE_TESTNET else self.BINANCE_REST_URL
+    
+    @property
+    def ws_url(self) -> str:
+        return self.BINANCE_TESTNET_WS_URL if self.USE_TESTNET else self.BINANCE_WS_URL
 
 
 @dataclass
@@ -52,6 +74,12 @@ class MonitoringConfig:
     # Signal tracking
     SIGNAL_CHECK_INTERVAL: int = 30  # seconds
     MAX_HOLD_MINUTES: int = 240  # 4 hours timeout
+    # "poll": REST price each check; "stream": TP/SL per aggTrade tick
+    TRACKING_MODE: str = os.getenv("TRACKING_MODE", "poll")
+    # Checks further apart than this (and the first one) replay missed 1m klines
+    RECOVERY_GAP: int = 120  # seconds
+    # Stream mode keeps this much aggTrade history to replay for signals synced after creation
+    STREAM_HISTORY_MINUTES: int = 5
     
     # Daily limits
     DAILY_TARGET: float = 10.0  # +$10
@@ -79,6 +107,16 @@ class IQConfig:
     IQ_CHECK_TRADES: int = 10  # Check last N trades
 
 
+@dataclass
+class RetentionConfig:
+    """Heartbeat rollup and price tracking downsampling"""
+    INTERVAL: int = 900  # seconds between runs
+    HEARTBEAT_KEEP_HOURS: int = 48  # Raw heartbeats kept, older ones rolled up per hour
+    OHLC_MINUTES: int = 5  # Bucket size for resolved signals' price tracking
+    BATCH_SIZE: int = 5000  # Rows per transaction
+    MAX_BATCHES: int = 20  # Per table per run
+
+
 @dataclass
 class ReportConfig:
     """Report generation settings"""
@@ -94,6 +132,7 @@ class Settings:
     monitoring = MonitoringConfig()
     iq = IQConfig()
     report = ReportConfig()
+    retention = RetentionConfig()
 
 
 settings = Settings()
@@ -0,0 +1,189 @@
+"""
+Query Benchmark - Hot repository queries against a large signals table
+Seeds a SQLite database, prints query plans and checks latency budgets
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import desc, insert, text
+
+from .models import Base, PriceTracking, Signal
+from .repository import DatabaseRepository
+
+# Budget per query in ms (median of repeated runs)
+BUDGETS_MS = {
+    "get_pending_signals": 20.0,
+    "get_new_results": 20.0,
+    "get_recent_signals": 30.0,
+    "get_signals_for_period (1 day)": 100.0,
+    "get_price_history": 20.0,
+    "get_last_heartbeat": 10.0,
+}
+
+
+def seed(repository: DatabaseRepository, signals: int, pending: int, unanalyzed: int, ticks: int, batch: int = 50000):
+    """
+    Bulk-insert `signals` signals, one every 5 minutes up to now.
+
+    The newest `pending` are PENDING, the `unanalyzed` before them are
+    results not yet analyzed by Bot 1, the rest analyzed results. The
+    newest 1000 signals get `ticks` price tracking rows each.
+    """
+    rng = np.random.default_rng(7)
+    now = datetime.utcnow()
+    first = now - timedelta(minutes=5 * signals)
+    statuses = np.array(["WIN", "LOSS", "TIMEOUT"])
+
+    with repository.engine.begin() as conn:
+        for start in range(0, signals, batch):
+            rows = []
+            for i in range(start, min(start + batch, signals)):
+                created_at = first + timedelta(minutes=5 * i)
+                is_pending = i >= signals - pending
+                rows.append({
+                    "signal_id": f"SIG_{i:08d}",
+                    "created_at": created_at,
+                    "direction": "LONG" if i % 2 else "SHORT",
+                    "strategy": "TREND_MOMENTUM",
+                    "entry_price": 65000.0,
+                    "stop_loss": 64837.5,
+                    "take_profit": 65325.0,
+                    "position_margin": 150.0,
+                    "leverage": 20,
+                    "confidence": 0.7,
+                    "setup_quality": 80,
+                    "regime": "TRENDING_UP",
+                    "status": "PENDING" if is_pending else str(statuses[rng.integers(3)]),
+                    "result_time": None if is_pending else created_at + timedelta(minutes=int(rng.integers(1, 240))),
+                    "result_analyzed": not is_pending and i < signals - pending - unanalyzed,
+                })
+            conn.execute(insert(Signal), rows)
+
+        tick_rows = [
+            {"signal_id": f"SIG_{i:08d}", "timestamp": first + timedelta(minutes=5 * i, seconds=30 * k), "price": 65000.0}
+            for i in range(max(0, signals - 1000), signals)
+            for k in range(ticks)
+        ]
+        for start in range(0, len(tick_rows), batch):
+            conn.execute(insert(PriceTracking), tick_rows[start:start + batch])
+
+        conn.execute(text(
+            "INSERT INTO heartbeat (bot_name, timestamp, status) "
+            "VALUES ('core_brain', :ts, 'running')"
+        ), [{"ts": now - timedelta(seconds=30 * k)} for k in range(10000)])
+
+
+def get_new_results(repository: DatabaseRepository, limit: int = 10):
+    """Bot 1's DatabaseRepository.get_new_results (same filter and order)"""
+    with repository.get_session() as session:
+        return session.query(Signal).filter(
+            Signal.status.in_(["WIN", "LOSS", "TIMEOUT"]),
+            Signal.result_analyzed == False
+        ).order_by(desc(Signal.result_time)).limit(limit).all()
+
+
+def drop_indexes(repository: DatabaseRepository):
+    """Remove the signal/price tracking indexes to compare against a bare table"""
+    with repository.engine.begin() as conn:
+        for table in (Signal.__table__, PriceTracking.__table__):
+            for index in table.indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+def explain(repository: DatabaseRepository, query) -> str:
+    """SQLite query plan for an ORM query"""
+    statement = query.statement.compile(repository.engine, compile_kwargs={"literal_binds": True})
+    with repository.engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {statement}")).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+
+def measure(func, repeat: int) -> float:
+    """Median wall time of `func` in ms"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    """python -m src.database.query_benchmark"""
+    parser = argparse.ArgumentParser(description="Latency of the hot signal queries on a large database")
+    parser.add_argument('--signals', type=int, default=1_000_000)
+    parser.add_argument('--pending', type=int, default=3)
+    parser.add_argument('--unanalyzed', type=int, default=20)
+    parser.add_argument('--ticks', type=int, default=480, help="Price tracking rows per recent signal")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--no-indexes', action='store_true', help="Drop the indexes first (baseline)")
+    parser.add_argument('--db', help="Reuse/keep this SQLite file instead of a temporary one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "bench.db")
+        fresh = not os.path.exists(path)
+        repository = DatabaseRepository(use_sqlite=True, sqlite_path=path)
+        if fresh:
+            start = time.perf_counter()
+            seed(repository, args.signals, args.pending, args.unanalyzed, args.ticks)
+            print(f"Seeded {args.signals:,} signals in {time.perf_counter() - start:.1f}s")
+        if args.no_indexes:
+            drop_indexes(repository)
+        with repository.engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+        day_start = datetime.utcnow() - timedelta(days=3)
+        tracked_id = f"SIG_{args.signals - 1:08d}"
+        cases = {
+            "get_pending_signals": repository.get_pending_signals,
+            "get_new_results": lambda: get_new_results(repository),
+            "get_recent_signals": repository.get_recent_signals,
+            "get_signals_for_period (1 day)": lambda: repository.get_signals_for_period(
+                day_start, day_start + timedelta(days=1)),
+            "get_price_history": lambda: repository.get_price_history(tracked_id),
+            "get_last_heartbeat": repository.get_last_heartbeat,
+        }
+        with repository.get_session() as session:
+            plans = {
+                "get_pending_signals": session.query(Signal).filter(Signal.status == "PENDING").order_by(Signal.created_at),
+                "get_new_results": session.query(Signal).filter(
+                    Signal.status.in_(["WIN", "LOSS", "TIMEOUT"]), Signal.result_analyzed == False
+                ).order_by(desc(Signal.result_time)).limit(10),
+                "get_recent_signals": session.query(Signal).filter(
+                    Signal.status.in_(["WIN", "LOSS", "TIMEOUT"])
+                ).order_by(desc(Signal.result_time)).limit(50),
+                "get_signals_for_period (1 day)": session.query(Signal).filter(
+                    Signal.created_at >= day_start, Signal.created_at <= day_start + timedelta(days=1)
+                ).order_by(Signal.created_at),
+                "get_price_history": session.query(PriceTracking).filter(
+                    PriceTracking.signal_id == tracked_id
+                ).order_by(PriceTracking.timestamp),
+            }
+
+        failed = []
+        print(f"{'query':<32} {'median ms':>10} {'budget':>8}  plan")
+        for name, func in cases.items():
+            elapsed = measure(func, args.repeat)
+            budget = BUDGETS_MS[name]
+            plan = explain(repository, plans[name]) if name in plans else ""
+            flag = "" if elapsed <= budget else "  OVER BUDGET"
+            print(f"{name:<32} {elapsed:>10.2f} {budget:>8.0f}  {plan}{flag}")
+            if elapsed > budget:
+                failed.append(name)
+
+        repository.engine.dispose()
+
+    if failed:
+        print(f"Over budget: {', '.join(failed)}")
+        sys.exit(1)
+    print("All queries within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,23 +14,45 @@ Base = declarative_base()
 # Import shared models (will be created as copies for independence)
 from .models import (
     Signal, DailyState, Heartbeat, DailyStats, PriceTracking,
-    init_database
+    HeartbeatHourly, PriceTrackingOHLC, SignalStatsDaily, init_database
 )
+from .engine import writer_engine
+from .write_behind import WriteBehindBuffer
+
+RESOLVED_STATUSES = ("WIN", "LOSS", "TIMEOUT")
 
 
 class DatabaseRepository:
     """Database operations for Bot 2 (Heartbeat Monitor)"""
     
-    def __init__(self, database_url: str = None, use_sqlite: bool = True, sqlite_path: str = "data/trading_bot.db"):
+    def __init__(
+        self,
+        database_url: str = None,
+        use_sqlite: bool = True,
+        sqlite_path: str = "data/trading_bot.db",
+        **engine_options
+    ):
         self.engine, self.SessionLocal = init_database(
             database_url or "",
             use_sqlite,
-            sqlite_path
+            sqlite_path,
+            **engine_options
         )
+        self.WriteSession = sessionmaker(bind=writer_engine(self.engine))
+        # Price tracking rows are written in batches
+        self.write_buffer = WriteBehindBuffer(self.WriteSession)
     
     def get_session(self) -> Session:
         return self.SessionLocal()
     
+    def get_write_session(self) -> Session:
+        """Session for transactions that write (one at a time on SQLite, see writer_engine)"""
+        return self.WriteSession()
+    
+    def flush_writes(self) -> int:
+        """Write buffered price tracking rows now (call on shutdown)"""
+        return self.write_buffer.flush()
+    
     # ==================== Health Monitoring ====================
     
     def get_last_heartbeat(self, bot_name: str = "core_brain") -> Optional[Heartbeat]:
@@ -44,6 +66,19 @@ class DatabaseRepository:
                 session.expunge(heartbeat)
             return heartbeat
     
+    def get_heartbeat_hourly(self, bot_name: str = "core_brain", hours: int = 168) -> List[HeartbeatHourly]:
+        """Hourly heartbeat summaries (older than the raw retention window)"""
+        since = datetime.utcnow() - timedelta(hours=hours)
+        with self.get_session() as session:
+            summaries = session.query(HeartbeatHourly).filter(
+                HeartbeatHourly.bot_name == bot_name,
+                HeartbeatHourly.hour >= since
+            ).order_by(HeartbeatHourly.hour).all()
+            
+            for s in summaries:
+                session.expunge(s)
+            return summaries
+    
     def check_heartbeat_status(self, timeout_minutes: int = 3, critical_minutes: int = 10) -> Dict[str, Any]:
         """Check Bot 1 health status"""
         heartbeat = self.get_last_heartbeat()
@@ -104,13 +139,15 @@ class DatabaseRepository:
         duration_minutes: int = 0,
         trade_iq: int = 0
     ):
-        """Update signal with result"""
-        with self.get_session() as session:
+        """Update signal with result (and its signal_stats_daily totals)"""
+        with self.get_write_session() as session:
             signal = session.query(Signal).filter(
                 Signal.signal_id == signal_id
             ).first()
             
             if signal:
+                # Replace any earlier contribution (results are updated again with the IQ)
+                self._apply_signal_stats(session, signal, -1)
                 signal.status = status
                 signal.result_price = result_price
                 signal.result_time = datetime.utcnow()
@@ -121,23 +158,21 @@ class DatabaseRepository:
                 signal.duration_minutes = duration_minutes
                 signal.trade_iq = trade_iq
                 signal.updated_at = datetime.utcnow()
+                self._apply_signal_stats(session, signal, 1)
                 
                 session.commit()
     
     def add_price_tracking(self, signal_id: str, price: float):
-        """Add price tracking entry for MFE/MAE calculation"""
-        tracking = PriceTracking(
+        """Queue price tracking entry for MFE/MAE calculation (write-behind)"""
+        self.write_buffer.add(PriceTracking, dict(
             signal_id=signal_id,
             timestamp=datetime.utcnow(),
             price=price
-        )
-        
-        with self.get_session() as session:
-            session.add(tracking)
-            session.commit()
+        ))
     
     def get_price_history(self, signal_id: str) -> List[PriceTracking]:
         """Get price history for a signal"""
+        self.write_buffer.flush()
         with self.get_session() as session:
             history = session.query(PriceTracking).filter(
                 PriceTracking.signal_id == signal_id
@@ -147,6 +182,17 @@ class DatabaseRepository:
                 session.expunge(h)
             return history
     
+    def get_price_ohlc(self, signal_id: str) -> List[PriceTrackingOHLC]:
+        """Downsampled price history of a resolved signal (after retention)"""
+        with self.get_session() as session:
+            candles = session.query(PriceTrackingOHLC).filter(
+                PriceTrackingOHLC.signal_id == signal_id
+            ).order_by(PriceTrackingOHLC.bucket).all()
+            
+            for c in candles:
+                session.expunge(c)
+            return candles
+    
     # ==================== Daily State ====================
     
     def get_daily_state(self, target_date: str = None) -> Optional[DailyState]:
@@ -158,6 +204,15 @@ class DatabaseRepository:
             state = session.query(DailyState).filter(
                 DailyState.date == target_date
             ).first()
+            if state is not None:
+                session.expunge(state)
+                return state
+        
+        # Create it under the writer (the other bot may have just done so)
+        with self.get_write_session() as session:
+            state = session.query(DailyState).filter(
+                DailyState.date == target_date
+            ).first()
             
             if state is None:
                 state = DailyState(date=target_date)
@@ -165,6 +220,7 @@ class DatabaseRepository:
                 session.commit()
                 session.refresh(state)
             
+            # Detach from session
             session.expunge(state)
             return state
     
@@ -177,7 +233,7 @@ class DatabaseRepository:
         """Update daily state with trade result"""
         target_date = date.today().isoformat()
         
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             state = session.query(DailyState).filter(
                 DailyState.date == target_date
             ).first()
@@ -218,7 +274,7 @@ class DatabaseRepository:
         if target_date is None:
             target_date = date.today().isoformat()
         
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             state = session.query(DailyState).filter(
                 DailyState.date == target_date
             ).first()
@@ -247,7 +303,7 @@ class DatabaseRepository:
     
     def save_daily_stats(self, stats: DailyStats):
         """Save daily statistics"""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             existing = session.query(DailyStats).filter(
                 DailyStats.date == stats.date
             ).first()
@@ -261,6 +317,93 @@ class DatabaseRepository:
             
             session.commit()
     
+    @staticmethod
+    def _fold_signal_stats(stats: SignalStatsDaily, status: str, pnl: float, trade_iq: int, sign: int):
+        stats.resolved += sign
+        if status == "WIN":
+            stats.wins += sign
+        elif status == "LOSS":
+            stats.losses += sign
+        else:
+            stats.timeouts += sign
+        stats.pnl_sum += sign * (pnl or 0.0)
+        if trade_iq:
+            stats.iq_sum += sign * trade_iq
+            stats.iq_count += sign
+    
+    @staticmethod
+    def _empty_signal_stats(day: str, strategy: str, regime: str) -> SignalStatsDaily:
+        return SignalStatsDaily(
+            date=day, strategy=strategy, regime=regime,
+            resolved=0, wins=0, losses=0, timeouts=0, pnl_sum=0.0, iq_sum=0, iq_count=0
+        )
+    
+    def _apply_signal_stats(self, session: Session, signal: Signal, sign: int):
+        """Add (sign=1) or remove (sign=-1) a resolved signal's totals"""
+        if signal.status not in RESOLVED_STATUSES:
+            return
+        key = (signal.created_at.date().isoformat(), signal.strategy, signal.regime)
+        stats = session.get(SignalStatsDaily, key)
+        if stats is None:
+            stats = self._empty_signal_stats(*key)
+            session.add(stats)
+        self._fold_signal_stats(stats, signal.status, signal.result_pnl, signal.trade_iq, sign)
+        session.flush()
+    
+    def rebuild_signal_stats(self) -> int:
+        """Recompute signal_stats_daily from all resolved signals; returns rows written"""
+        with self.get_write_session() as session:
+            totals: Dict[tuple, SignalStatsDaily] = {}
+            rows = session.query(
+                Signal.created_at, Signal.strategy, Signal.regime,
+                Signal.status, Signal.result_pnl, Signal.trade_iq
+            ).filter(Signal.status.in_(RESOLVED_STATUSES)).yield_per(10000)
+            
+            for created_at, strategy, regime, status, pnl, trade_iq in rows:
+                key = (created_at.date().isoformat(), strategy, regime)
+                if key not in totals:
+                    totals[key] = self._empty_signal_stats(*key)
+                self._fold_signal_stats(totals[key], status, pnl, trade_iq, 1)
+            
+            session.query(SignalStatsDaily).delete()
+            session.add_all(totals.values())
+            session.commit()
+            return len(totals)
+    
+    def has_signal_stats(self) -> bool:
+        with self.get_session() as session:
+            return session.query(SignalStatsDaily.date).first() is not None
+    
+    def get_signal_stats(self, start_date: str, end_date: str = None) -> List[SignalStatsDaily]:
+        """Per day/strategy/regime totals for start_date <= date < end_date (one day if end_date is None)"""
+        if end_date is None:
+            end_date = (date.fromisoformat(start_date) + timedelta(days=1)).isoformat()
+        
+        with self.get_session() as session:
+            stats = session.query(SignalStatsDaily).filter(
+                SignalStatsDaily.date >= start_date,
+                SignalStatsDaily.date < end_date
+            ).order_by(SignalStatsDaily.date).all()
+            
+            for s in stats:
+                session.expunge(s)
+            return stats
+    
+    def get_extreme_results(self, start: datetime, end: datetime) -> tuple:
+        """(best, worst) resolved signal by PnL created in [start, end)"""
+        with self.get_session() as session:
+            period = session.query(Signal).filter(
+                Signal.status.in_(RESOLVED_STATUSES),
+                Signal.created_at >= start,
+                Signal.created_at < end
+            )
+            best = period.order_by(desc(Signal.result_pnl)).first()
+            worst = period.order_by(Signal.result_pnl).first()
+            
+            for s in {best, worst} - {None}:
+                session.expunge(s)
+            return best, worst
+    
     def get_recent_signals(self, limit: int = 50) -> List[Signal]:
         """Get recent signals for analysis"""
         with self.get_session() as session:
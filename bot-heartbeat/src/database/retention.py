@@ -0,0 +1,180 @@
+"""
+Retention Job - Roll up old heartbeats and downsample resolved price tracking
+Works in small bounded batches so it never holds long locks
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func
+
+from .models import Heartbeat, HeartbeatHourly, PriceTracking, PriceTrackingOHLC, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionJob:
+    """
+    Keep the heartbeat and price_tracking tables small.
+
+    - Heartbeats older than `heartbeat_keep_hours` become one
+      heartbeat_hourly row per bot and hour; the newest heartbeat of each
+      bot is always kept for the health check.
+    - price_tracking rows of signals resolved more than `resolved_grace`
+      ago become price_tracking_ohlc rows of `ohlc_minutes` buckets.
+
+    Each batch (at most `batch_size` rows) is one short transaction that
+    writes the rollup and deletes the raw rows together. run_once() is
+    blocking; run it in an executor, not on the event loop.
+    """
+
+    def __init__(
+        self,
+        repository,
+        heartbeat_keep_hours: int = 48,
+        ohlc_minutes: int = 5,
+        resolved_grace: timedelta = timedelta(hours=1),
+        batch_size: int = 5000,
+        max_batches: int = 20,
+        pause: float = 0.1
+    ):
+        self.repository = repository
+        self.heartbeat_keep = timedelta(hours=heartbeat_keep_hours)
+        self.ohlc_minutes = ohlc_minutes
+        self.resolved_grace = resolved_grace
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.pause = pause
+
+    def run_once(self) -> Dict[str, int]:
+        """Compact up to max_batches batches of each table; returns rows removed"""
+        # Buffered price rows must be in the table before it is compacted
+        self.repository.flush_writes()
+
+        removed = {"heartbeat": 0, "price_tracking": 0}
+        for key, step in (("heartbeat", self.compact_heartbeats), ("price_tracking", self.compact_price_tracking)):
+            for _ in range(self.max_batches):
+                count = step()
+                removed[key] += count
+                if count == 0:
+                    break
+                time.sleep(self.pause)  # Let other writers in between batches
+
+        if any(removed.values()):
+            logger.info(
+                f"Retention: {removed['heartbeat']} heartbeats rolled up, "
+                f"{removed['price_tracking']} price rows downsampled"
+            )
+        return removed
+
+    # ==================== Heartbeats ====================
+
+    def compact_heartbeats(self) -> int:
+        """Roll up one batch of old heartbeats; returns rows removed"""
+        now = datetime.utcnow()
+        cutoff = self._floor(now - self.heartbeat_keep, 60)  # Whole hours only
+
+        with self.repository.get_write_session() as session:
+            newest = session.query(func.max(Heartbeat.id)).group_by(Heartbeat.bot_name)
+            rows = session.query(Heartbeat).filter(
+                Heartbeat.timestamp < cutoff,
+                Heartbeat.id.notin_(newest)
+            ).order_by(Heartbeat.timestamp).limit(self.batch_size).all()
+            if not rows:
+                return 0
+
+            groups: Dict[tuple, List[Heartbeat]] = {}
+            for row in rows:
+                groups.setdefault((row.bot_name, self._floor(row.timestamp, 60)), []).append(row)
+
+            for (bot_name, hour), pings in groups.items():
+                summary = session.get(HeartbeatHourly, (bot_name, hour))
+                if summary is None:
+                    summary = HeartbeatHourly(bot_name=bot_name, hour=hour, pings=0, error_count=0)
+                    session.add(summary)
+                self._fold_heartbeats(summary, pings)
+
+            session.query(Heartbeat).filter(
+                Heartbeat.id.in_([row.id for row in rows])
+            ).delete(synchronize_session=False)
+            session.commit()
+            return len(rows)
+
+    @staticmethod
+    def _fold_heartbeats(summary: HeartbeatHourly, pings: List[Heartbeat]):
+        """Merge time-ordered pings into an hourly summary"""
+        previous = summary.last_seen
+        max_gap = summary.max_gap_seconds or 0.0
+        for ping in pings:
+            if previous is not None:
+                max_gap = max(max_gap, (ping.timestamp - previous).total_seconds())
+            previous = ping.timestamp
+            if ping.status == "error" or ping.error_message:
+                summary.error_count += 1
+                summary.last_error = ping.error_message or summary.last_error
+
+        last = pings[-1]
+        summary.pings += len(pings)
+        summary.first_seen = min(summary.first_seen or pings[0].timestamp, pings[0].timestamp)
+        summary.last_seen = max(summary.last_seen or last.timestamp, last.timestamp)
+        summary.max_gap_seconds = max_gap
+        summary.last_status = last.status
+        summary.signals_today = last.signals_today
+        summary.daily_pnl = last.daily_pnl
+
+    # ==================== Price Tracking ====================
+
+    def compact_price_tracking(self) -> int:
+        """Downsample the price rows of a batch of resolved signals; returns rows removed"""
+        resolved_before = datetime.utcnow() - self.resolved_grace
+        # A signal has at most max-hold / check-interval rows (480 by default)
+        signal_limit = max(1, self.batch_size // 500)
+
+        with self.repository.get_write_session() as session:
+            signal_ids = [row[0] for row in session.query(PriceTracking.signal_id).join(
+                Signal, Signal.signal_id == PriceTracking.signal_id
+            ).filter(
+                Signal.status != "PENDING",
+                Signal.result_time < resolved_before
+            ).distinct().limit(signal_limit).all()]
+            if not signal_ids:
+                return 0
+
+            rows = session.query(PriceTracking).filter(
+                PriceTracking.signal_id.in_(signal_ids)
+            ).order_by(PriceTracking.signal_id, PriceTracking.timestamp).all()
+
+            buckets: Dict[tuple, List[float]] = {}
+            for row in rows:
+                buckets.setdefault((row.signal_id, self._floor(row.timestamp, self.ohlc_minutes)), []).append(row.price)
+
+            for (signal_id, bucket), prices in buckets.items():
+                candle = session.get(PriceTrackingOHLC, (signal_id, bucket))
+                if candle is None:
+                    session.add(PriceTrackingOHLC(
+                        signal_id=signal_id, bucket=bucket,
+                        open=prices[0], high=max(prices), low=min(prices), close=prices[-1],
+                        samples=len(prices)
+                    ))
+                else:
+                    # Late rows for an already downsampled bucket
+                    candle.high = max(candle.high, max(prices))
+                    candle.low = min(candle.low, min(prices))
+                    candle.close = prices[-1]
+                    candle.samples += len(prices)
+
+            session.query(PriceTracking).filter(
+                PriceTracking.id.in_([row.id for row in rows])
+            ).delete(synchronize_session=False)
+            session.commit()
+            return len(rows)
+
+    @staticmethod
+    def _floor(timestamp: datetime, minutes: int) -> datetime:
+        """Start of the `minutes` bucket containing timestamp (minutes divides 60)"""
+        return timestamp.replace(
+            minute=timestamp.minute - timestamp.minute % minutes if minutes < 60 else 0,
+            second=0,
+            microsecond=0
+        )
@@ -15,8 +15,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.settings import settings
 from src.database.repository import DatabaseRepository
+from src.database.retention import RetentionJob
 from src.health.monitor import HealthMonitor
 from src.tracking.signal_tracker import SignalTracker
+from src.tracking.stream_tracker import AggTradeStream, StreamingTracker
 from src.daily.manager import DailyStateManager
 from src.iq.calculator import BotIQCalculator
 from src.reports.generator import ReportGenerator
@@ -51,6 +53,7 @@ class HeartbeatBot:
             database_url=settings.database.DATABASE_URL,
             use_sqlite=settings.database.USE_SQLITE,
             sqlite_path=settings.database.SQLITE_PATH,
+            **settings.database.engine_options,
         )
 
         # Initialize components
@@ -60,6 +63,22 @@ class HeartbeatBot:
             critical_timeout=settings.monitoring.HEARTBEAT_CRITICAL,
         )
 
+        # Stream mode: TP/SL resolved on every aggTrade instead of per poll
+        self.stream_tracker = None
+        self.trade_stream = None
+        if settings.monitoring.TRACKING_MODE == "stream":
+            self.stream_tracker = StreamingTracker(
+                win_amount=settings.monitoring.WIN_AMOUNT,
+                loss_amount=settings.monitoring.LOSS_AMOUNT,
+                max_hold_minutes=settings.monitoring.MAX_HOLD_MINUTES,
+                history_minutes=settings.monitoring.STREAM_HISTORY_MINUTES,
+            )
+            self.trade_stream = AggTradeStream(
+                ws_url=settings.price.ws_url,
+                symbol=settings.price.SYMBOL,
+                on_batch=self.stream_tracker.process_trades,
+            )
+
         self.signal_tracker = SignalTracker(
             db_repository=self.db,
             price_api_url=settings.price.rest_url,
@@ -67,6 +86,8 @@ class HeartbeatBot:
             win_amount=settings.monitoring.WIN_AMOUNT,
             loss_amount=settings.monitoring.LOSS_AMOUNT,
             max_hold_minutes=settings.monitoring.MAX_HOLD_MINUTES,
+            stream_tracker=self.stream_tracker,
+            recovery_gap_seconds=settings.monitoring.RECOVERY_GAP,
         )
 
         self.daily_manager = DailyStateManager(
@@ -76,6 +97,15 @@ class HeartbeatBot:
             max_trades=settings.monitoring.MAX_TRADES,
         )
 
+        # Heartbeat rollup and price tracking downsampling
+        self.retention = RetentionJob(
+            self.db,
+            heartbeat_keep_hours=settings.retention.HEARTBEAT_KEEP_HOURS,
+            ohlc_minutes=settings.retention.OHLC_MINUTES,
+            batch_size=settings.retention.BATCH_SIZE,
+            max_batches=settings.retention.MAX_BATCHES,
+        )
+
         self.iq_calculator = BotIQCalculator(
             decision_weight=settings.iq.DECISION_WEIGHT,
             execution_weight=settings.iq.EXECUTION_WEIGHT,
@@ -105,6 +135,8 @@ class HeartbeatBot:
         self._last_report_date = None
         self._last_weekly_report = None
         self._command_task = None
+        self._stream_task = None
+        self._retention_task = None
 
     async def start(self):
         """Start the bot"""
@@ -114,10 +146,23 @@ class HeartbeatBot:
         # Ensure logs directory exists
         Path("logs").mkdir(exist_ok=True)
 
+        # Backfill the report aggregates on databases that predate them
+        if not self.db.has_signal_stats():
+            rows = self.db.rebuild_signal_stats()
+            logger.info(f"signal_stats_daily rebuilt: {rows} rows")
+
         # Start Telegram command handler
         self._command_task = asyncio.create_task(self.telegram_commands.start_polling())
         logger.info("✅ Telegram command handler started")
 
+        # Start aggTrade stream for tick-accurate tracking
+        if self.trade_stream:
+            self._stream_task = asyncio.create_task(self.trade_stream.run())
+            logger.info("📈 aggTrade stream started (stream tracking mode)")
+
+        # Compact old heartbeats / price tracking in the background
+        self._retention_task = asyncio.create_task(self._retention_loop())
+
         # Send startup notification with interactive menu
         await self._send_startup_menu()
 
@@ -144,8 +189,26 @@ class HeartbeatBot:
             except asyncio.CancelledError:
                 pass
 
+        # Stop trade stream
+        if self._stream_task:
+            self.trade_stream.stop()
+            self._stream_task.cancel()
+            try:
+                await self._stream_task
+            except asyncio.CancelledError:
+                pass
+
+        # Stop retention job (a batch already running finishes in its thread)
+        if self._retention_task:
+            self._retention_task.cancel()
+            try:
+                await self._retention_task
+            except asyncio.CancelledError:
+                pass
+
         await self.signal_tracker.close()
         await self.telegram.close()
+        self.db.flush_writes()
 
         logger.info("Heartbeat Monitor Bot stopped")
 
@@ -190,6 +253,9 @@ class HeartbeatBot:
                 # 4. Check for scheduled reports
                 await self._check_scheduled_reports()
 
+                # Flush batched price tracking rows once they are old enough
+                self.db.write_buffer.flush_if_due()
+
                 # 5. Wait for next cycle
                 logger.info(
                     f"Cycle complete. Waiting {settings.monitoring.SIGNAL_CHECK_INTERVAL}s..."
@@ -200,6 +266,16 @@ class HeartbeatBot:
                 logger.error(f"Error in main loop: {e}")
                 await asyncio.sleep(10)
 
+    async def _retention_loop(self):
+        """Run the retention job periodically in a worker thread"""
+        loop = asyncio.get_running_loop()
+        while self._running:
+            try:
+                await loop.run_in_executor(None, self.retention.run_once)
+            except Exception as e:
+                logger.error(f"Retention job failed: {e}")
+            await asyncio.sleep(settings.retention.INTERVAL)
+
     async def _handle_new_day(self):
         """Handle new trading day"""
         logger.info("New trading day detected")
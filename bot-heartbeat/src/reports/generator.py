@@ -63,31 +63,25 @@ class ReportGenerator:
             # Yesterday's report
             target_date = (date.today() - timedelta(days=1)).isoformat()
         
-        # Get signals for the day
+        # Day totals from the pre-aggregated stats
         start = datetime.strptime(target_date, "%Y-%m-%d")
         end = start + timedelta(days=1)
-        signals = self.db.get_signals_for_period(start, end)
+        totals = self.summarize(self.db.get_signal_stats(target_date))
         
         # Get daily state
         daily_state = self.db.get_daily_state(target_date)
         
-        # Calculate metrics
-        wins = sum(1 for s in signals if s.status == "WIN")
-        losses = sum(1 for s in signals if s.status == "LOSS")
+        wins = totals['wins']
+        losses = totals['losses']
         total = wins + losses
         
         win_rate = wins / total if total > 0 else 0
-        total_pnl = sum(s.result_pnl or 0 for s in signals)
-        
-        # Calculate average IQ
-        iqs = [s.trade_iq for s in signals if s.trade_iq]
-        avg_iq = sum(iqs) / len(iqs) if iqs else 0
+        total_pnl = totals['pnl']
+        avg_iq = totals['avg_iq']
         
         # Find best/worst trades
-        if signals:
-            best = max(signals, key=lambda s: s.result_pnl or 0)
-            worst = min(signals, key=lambda s: s.result_pnl or 0)
-            
+        best, worst = self.db.get_extreme_results(start, end)
+        if best:
             best_trade = {
                 'signal_id': best.signal_id,
                 'pnl': best.result_pnl,
@@ -136,20 +130,16 @@ class ReportGenerator:
         start = end - timedelta(days=7)
         start_date = start.strftime("%Y-%m-%d")
         
-        # Get all signals for the week
-        signals = self.db.get_signals_for_period(start, end)
+        # Week totals from the pre-aggregated stats (O(days), not O(signals))
+        totals = self.summarize(self.db.get_signal_stats(start_date, end_date))
         
-        # Calculate metrics
-        wins = sum(1 for s in signals if s.status == "WIN")
-        losses = sum(1 for s in signals if s.status == "LOSS")
+        wins = totals['wins']
+        losses = totals['losses']
         total = wins + losses
         
         win_rate = wins / total if total > 0 else 0
-        total_pnl = sum(s.result_pnl or 0 for s in signals)
-        
-        # Calculate average IQ
-        iqs = [s.trade_iq for s in signals if s.trade_iq]
-        avg_iq = sum(iqs) / len(iqs) if iqs else 0
+        total_pnl = totals['pnl']
+        avg_iq = totals['avg_iq']
         
         # Get daily stats
         daily_stats = self.db.get_stats_for_period(start_date, end_date)
@@ -196,6 +186,30 @@ class ReportGenerator:
             stop_hit_days=stop_hit_days
         )
     
+    @staticmethod
+    def summarize(stats: List, key: str = None) -> Dict[str, Any]:
+        """
+        Combine signal_stats_daily rows.
+        
+        Returns overall totals, or totals per `key` ('strategy', 'regime'
+        or 'date') when given.
+        """
+        if key is not None:
+            groups: Dict[str, List] = {}
+            for row in stats:
+                groups.setdefault(getattr(row, key), []).append(row)
+            return {name: ReportGenerator.summarize(rows) for name, rows in groups.items()}
+        
+        iq_count = sum(row.iq_count for row in stats)
+        return {
+            'resolved': sum(row.resolved for row in stats),
+            'wins': sum(row.wins for row in stats),
+            'losses': sum(row.losses for row in stats),
+            'timeouts': sum(row.timeouts for row in stats),
+            'pnl': sum(row.pnl_sum for row in stats),
+            'avg_iq': sum(row.iq_sum for row in stats) / iq_count if iq_count else 0
+        }
+    
     def save_daily_stats(self, report: DailyReport):
         """Save daily stats to database"""
         from ..database.models import DailyStats
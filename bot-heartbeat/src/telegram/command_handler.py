@@ -11,6 +11,7 @@ from typing import Optional, Dict, Any
 import aiohttp
 
 from config.version import get_version, get_full_version, CURRENT_VERSION
+from src.reports.generator import ReportGenerator
 
 logger = logging.getLogger(__name__)
 
@@ -266,15 +267,18 @@ class TelegramCommandHandler:
         try:
             daily_state = self.db.get_daily_state()
 
-            # Get signals for today
-            today_start = datetime.combine(date.today(), datetime.min.time())
-            signals = self.db.get_signals_for_period(today_start)
-
-            # Count by status
-            wins = sum(1 for s in signals if s.status == "WIN")
-            losses = sum(1 for s in signals if s.status == "LOSS")
-            timeouts = sum(1 for s in signals if s.status == "TIMEOUT")
-            pending = sum(1 for s in signals if s.status == "PENDING")
+            # Today's totals from the pre-aggregated stats
+            today = date.today().isoformat()
+            totals = ReportGenerator.summarize(self.db.get_signal_stats(today))
+            wins = totals["wins"]
+            losses = totals["losses"]
+            timeouts = totals["timeouts"]
+            avg_iq = totals["avg_iq"]
+            pending = sum(
+                1
+                for s in self.db.get_pending_signals()
+                if s.created_at.date().isoformat() == today
+            )
 
             win_rate = (
                 (wins / daily_state.trade_count * 100)
@@ -282,17 +286,12 @@ class TelegramCommandHandler:
                 else 0
             )
 
-            # Calculate average trade IQ
+            # Last 3 resolved trades of today, oldest first
             completed_signals = [
                 s
-                for s in signals
-                if s.trade_iq and s.status in ["WIN", "LOSS", "TIMEOUT"]
+                for s in reversed(self.db.get_recent_signals(3))
+                if s.trade_iq and s.created_at.date().isoformat() == today
             ]
-            avg_iq = (
-                sum(s.trade_iq for s in completed_signals) / len(completed_signals)
-                if completed_signals
-                else 0
-            )
 
             status_emoji = {
                 "ACTIVE": "🟢",
@@ -0,0 +1,187 @@
+"""
+Kline Recovery - Resolve signal outcomes missed between checks from 1m klines
+One bulk kline download replaces per-signal price checks after a restart
+"""
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BAR_MS = 60 * 1000
+MAX_KLINES_PER_REQUEST = 1500  # Binance futures limit
+
+
+@dataclass
+class Klines:
+    """1m klines as parallel arrays, ordered by open time"""
+    open_time: np.ndarray  # int64 ms
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "Klines":
+        return cls(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_rows(cls, rows: list) -> "Klines":
+        """From Binance /klines rows: [open_time, open, high, low, close, ...]"""
+        if not rows:
+            return cls.empty()
+        values = np.array([row[1:5] for row in rows], dtype=np.float64)
+        return cls(
+            open_time=np.array([row[0] for row in rows], dtype=np.int64),
+            open=values[:, 0],
+            high=values[:, 1],
+            low=values[:, 2],
+            close=values[:, 3]
+        )
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    @property
+    def start_ms(self) -> int:
+        return int(self.open_time[0]) if len(self) else 0
+
+    @property
+    def end_ms(self) -> int:
+        """Close time of the last bar (0 when empty)"""
+        return int(self.open_time[-1]) + BAR_MS if len(self) else 0
+
+    def since(self, start_ms: int) -> "Klines":
+        i = int(np.searchsorted(self.open_time, start_ms, side='left'))
+        return Klines(self.open_time[i:], self.open[i:], self.high[i:], self.low[i:], self.close[i:])
+
+    def extend(self, other: "Klines") -> "Klines":
+        """Append newer bars, skipping any already present"""
+        if not len(self):
+            return other
+        newer = other.since(self.end_ms)
+        return Klines(
+            np.concatenate([self.open_time, newer.open_time]),
+            np.concatenate([self.open, newer.open]),
+            np.concatenate([self.high, newer.high]),
+            np.concatenate([self.low, newer.low]),
+            np.concatenate([self.close, newer.close])
+        )
+
+
+async def fetch_klines(
+    session: aiohttp.ClientSession,
+    api_url: str,
+    symbol: str,
+    start_ms: int,
+    end_ms: int
+) -> Optional[Klines]:
+    """Closed 1m klines with open time in [start_ms, end_ms), paged 1500 at a time"""
+    url = f"{api_url}/fapi/v1/klines"
+    rows = []
+    cursor = start_ms
+    while cursor < end_ms:
+        params = {
+            "symbol": symbol,
+            "interval": "1m",
+            "startTime": cursor,
+            "endTime": end_ms - 1,
+            "limit": MAX_KLINES_PER_REQUEST
+        }
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    logger.error(f"Kline fetch failed: HTTP {response.status}")
+                    return None
+                page = await response.json()
+        except Exception as e:
+            logger.error(f"Error fetching klines: {e}")
+            return None
+        if not page:
+            break
+        rows.extend(page)
+        cursor = int(page[-1][0]) + BAR_MS
+        if len(page) < MAX_KLINES_PER_REQUEST:
+            break
+    return Klines.from_rows(rows)
+
+
+@dataclass
+class KlineOutcome:
+    """What a signal did over the recovered bars"""
+    status: str  # PENDING, WIN, LOSS, TIMEOUT
+    exit_ms: int
+    result_price: float
+    high: float
+    low: float
+
+
+def resolve_from_klines(
+    klines: Klines,
+    direction: str,
+    take_profit: float,
+    stop_loss: float,
+    start_ms: int,
+    deadline_ms: int
+) -> Optional[KlineOutcome]:
+    """
+    Replay one signal over the bars opening in [start_ms, deadline_ms).
+
+    The first bar whose high/low reaches TP or SL resolves it; a bar
+    touching both is ordered by its open and direction, as in the
+    backtest engine. Excursions stop at the resolving bar, capped at the
+    exit price. Returns None when no bar has closed since start_ms.
+    """
+    lo = int(np.searchsorted(klines.open_time, start_ms, side='left'))
+    hi = int(np.searchsorted(klines.open_time, deadline_ms, side='left'))
+    if hi <= lo:
+        return None
+
+    highs = klines.high[lo:hi]
+    lows = klines.low[lo:hi]
+    is_long = direction == "LONG"
+    if is_long:
+        tp_hit = highs >= take_profit
+        sl_hit = lows <= stop_loss
+    else:
+        tp_hit = lows <= take_profit
+        sl_hit = highs >= stop_loss
+
+    touched = tp_hit | sl_hit
+    if touched.any():
+        k = int(touched.argmax())
+        if tp_hit[k] and sl_hit[k]:
+            win = _tp_first(klines.open[lo + k], klines.close[lo + k], take_profit, stop_loss, is_long)
+        else:
+            win = bool(tp_hit[k])
+        price = take_profit if win else stop_loss
+        return KlineOutcome(
+            status="WIN" if win else "LOSS",
+            exit_ms=int(klines.open_time[lo + k]) + BAR_MS,
+            result_price=price,
+            high=max(float(highs[:k].max()) if k else price, price),
+            low=min(float(lows[:k].min()) if k else price, price)
+        )
+
+    high, low = float(highs.max()), float(lows.min())
+    if klines.open_time[hi - 1] + BAR_MS >= deadline_ms:
+        return KlineOutcome("TIMEOUT", deadline_ms, float(klines.close[hi - 1]), high, low)
+    return KlineOutcome("PENDING", int(klines.open_time[hi - 1]) + BAR_MS, float(klines.close[hi - 1]), high, low)
+
+
+def _tp_first(open_: float, close: float, take_profit: float, stop_loss: float, is_long: bool) -> bool:
+    """Whether TP is reached before SL inside a bar that touches both"""
+    if is_long:
+        if open_ >= take_profit:
+            return True
+        if open_ <= stop_loss:
+            return False
+        return close < open_  # Down bar: high first
+    if open_ <= take_profit:
+        return True
+    if open_ >= stop_loss:
+        return False
+    return close >= open_  # Up bar: low first
@@ -1,15 +1,23 @@
 """
 Signal Tracker - Track signal outcomes and calculate MFE/MAE
 """
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import logging
+import time
 import aiohttp
 
+from .kline_recovery import BAR_MS, Klines, fetch_klines, resolve_from_klines
+
 logger = logging.getLogger(__name__)
 
 
+def signal_notional(signal) -> float:
+    """Position size of a signal in USD (margin x leverage), for TIMEOUT PnL"""
+    return signal.position_margin * signal.leverage
+
+
 @dataclass
 class TrackingResult:
     """Result of tracking a signal"""
@@ -35,8 +43,12 @@ class SignalTracker:
     - Track MFE/MAE
     - Handle timeouts
     - Calculate PnL
+    - Recover outcomes missed while not checking (restart, stalls)
     """
     
+    # Stream mode falls back to a REST price after this long without trades
+    STREAM_STALE_MS = 60 * 1000
+    
     def __init__(
         self,
         db_repository,
@@ -44,7 +56,9 @@ class SignalTracker:
         symbol: str = "BTCUSDT",
         win_amount: float = 15.0,
         loss_amount: float = -7.50,
-        max_hold_minutes: int = 240
+        max_hold_minutes: int = 240,
+        stream_tracker=None,
+        recovery_gap_seconds: float = 120
     ):
         self.db = db_repository
         self.price_api_url = price_api_url
@@ -57,6 +71,15 @@ class SignalTracker:
         
         # Track max/min prices for MFE/MAE
         self.price_extremes: Dict[str, Dict[str, float]] = {}
+        
+        # Optional StreamingTracker: resolves TP/SL per trade instead of per poll
+        self.stream = stream_tracker
+        
+        # A check this long after the previous one (or the first check)
+        # replays 1m klines first, so TP/SL touched in between is not lost
+        self.recovery_gap_seconds = recovery_gap_seconds
+        self._last_check: Optional[float] = None
+        self._klines = Klines.empty()  # 1m candle cache for recovery
     
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
@@ -85,7 +108,14 @@ class SignalTracker:
     
     async def check_signals(self) -> List[TrackingResult]:
         """Check all pending signals and return results"""
-        results = []
+        now = time.monotonic()
+        recover = self._last_check is None or now - self._last_check > self.recovery_gap_seconds
+        self._last_check = now
+        
+        if self.stream is not None:
+            return await self._check_signals_stream(recover)
+        
+        results = await self.recover() if recover else []
         
         # Get current price
         current_price = await self.get_current_price()
@@ -116,6 +146,200 @@ class SignalTracker:
         
         return results
     
+    async def _check_signals_stream(self, recover: bool = False) -> List[TrackingResult]:
+        """Persist results the trade stream resolved and sync the pending set"""
+        now_ms = int(time.time() * 1000)
+        
+        # Stream stalled: feed the REST price so timeouts and hits still resolve
+        if now_ms - self.stream.last_trade_ms > self.STREAM_STALE_MS:
+            current_price = await self.get_current_price()
+            if current_price:
+                logger.warning("Trade stream stale, using REST price")
+                self.stream.on_trade(now_ms, current_price)
+        self.stream.check_timeouts(now_ms)
+        
+        results = self._save_stream_results()
+        
+        # After the stream's own results, so nothing is resolved twice
+        if recover:
+            results += await self.recover()
+        
+        # Resolved signals are no longer PENDING, so sync only adds new ones.
+        # New ones are replayed over the trades since their creation, and
+        # those resolved by that are saved now (before the next sync re-adds them)
+        pending_signals = self.db.get_pending_signals()
+        self.stream.sync(pending_signals)
+        results += self._save_stream_results()
+        
+        current_price = self.stream.last_price
+        for signal in pending_signals:
+            if signal.signal_id not in self.stream:
+                continue
+            mfe, mae = self.stream.excursions(signal.signal_id)
+            if current_price:
+                self.db.add_price_tracking(signal.signal_id, current_price)
+            results.append(TrackingResult(
+                signal_id=signal.signal_id,
+                status="PENDING",
+                entry_price=signal.entry_price,
+                current_price=current_price,
+                mfe=mfe,
+                mae=mae,
+                duration_minutes=int((datetime.utcnow() - signal.created_at).total_seconds() / 60)
+            ))
+        
+        return results
+    
+    def _save_stream_results(self) -> List[TrackingResult]:
+        """Persist the results the stream tracker resolved since the last call"""
+        results = self.stream.drain_resolved()
+        for result in results:
+            self.db.update_signal_result(
+                signal_id=result.signal_id,
+                status=result.status,
+                result_price=result.result_price,
+                result_pnl=result.result_pnl,
+                result_reason=result.result_reason,
+                mfe=result.mfe,
+                mae=result.mae,
+                duration_minutes=result.duration_minutes
+            )
+        return results
+    
+    async def recover(self) -> List[TrackingResult]:
+        """
+        Resolve pending signals from the 1m klines since their creation.
+        
+        All pending signals share one bulk kline download (cached, so a
+        later recovery fetches only new bars). Each signal is replayed over
+        the high/low arrays: first TP/SL touch, timeout and MFE/MAE. The
+        in-memory extremes of signals still pending are seeded from the
+        bars, so MFE/MAE survive a restart. Only closed bars are used; the
+        regular check covers the forming one.
+        """
+        pending_signals = self.db.get_pending_signals()
+        if not pending_signals:
+            return []
+        
+        now_ms = int(time.time() * 1000)
+        end_ms = now_ms // BAR_MS * BAR_MS
+        starts = {s.signal_id: self._first_bar_ms(s.created_at) for s in pending_signals}
+        start_ms = min(starts.values())
+        if start_ms >= end_ms:
+            return []
+        
+        klines = await self._get_klines(start_ms, end_ms)
+        if klines is None:
+            logger.warning("Kline recovery skipped: fetch failed")
+            return []
+        
+        results = []
+        max_hold_ms = self.max_hold_minutes * 60 * 1000
+        for signal in pending_signals:
+            signal_id = signal.signal_id
+            created_ms = self._to_ms(signal.created_at)
+            outcome = resolve_from_klines(
+                klines, signal.direction, signal.take_profit, signal.stop_loss,
+                starts[signal_id], created_ms + max_hold_ms
+            )
+            if outcome is None:
+                continue
+            
+            if self.stream is not None:
+                if signal_id not in self.stream:
+                    self.stream.add(
+                        signal_id, signal.direction, signal.entry_price,
+                        signal.take_profit, signal.stop_loss, signal.created_at,
+                        signal_notional(signal)
+                    )
+                    if signal_id not in self.stream:
+                        continue  # Resolved from the kept trades, saved with the stream's results
+                self.stream.seed_extremes(signal_id, outcome.high, outcome.low)
+                if outcome.status == "PENDING":
+                    continue
+                mfe, mae = self.stream.excursions(signal_id)
+                self.stream.remove(signal_id)
+            else:
+                self._update_extremes(signal_id, outcome.high)
+                self._update_extremes(signal_id, outcome.low)
+                if outcome.status == "PENDING":
+                    continue
+                mfe, mae = self._calculate_mfe_mae(signal_id, signal.entry_price, signal.direction)
+                del self.price_extremes[signal_id]
+            
+            if outcome.status == "TIMEOUT":
+                if signal.direction == "LONG":
+                    pnl_percent = (outcome.result_price - signal.entry_price) / signal.entry_price
+                else:
+                    pnl_percent = (signal.entry_price - outcome.result_price) / signal.entry_price
+                result_pnl = pnl_percent * signal_notional(signal)
+                result_reason = "TIMEOUT"
+            elif outcome.status == "WIN":
+                result_pnl, result_reason = self.win_amount, "TP_HIT"
+            else:
+                result_pnl, result_reason = self.loss_amount, "SL_HIT"
+            
+            result = TrackingResult(
+                signal_id=signal_id,
+                status=outcome.status,
+                entry_price=signal.entry_price,
+                current_price=outcome.result_price,
+                result_price=outcome.result_price,
+                result_pnl=result_pnl,
+                result_reason=result_reason,
+                mfe=mfe,
+                mae=mae,
+                duration_minutes=int((outcome.exit_ms - created_ms) / 60000),
+                changed=True
+            )
+            self.db.update_signal_result(
+                signal_id=result.signal_id,
+                status=result.status,
+                result_price=result.result_price,
+                result_pnl=result.result_pnl,
+                result_reason=result.result_reason,
+                mfe=result.mfe,
+                mae=result.mae,
+                duration_minutes=result.duration_minutes
+            )
+            results.append(result)
+        
+        logger.info(
+            f"Kline recovery: {len(klines)} bars, {len(results)} of "
+            f"{len(pending_signals)} pending signals resolved"
+        )
+        return results
+    
+    async def _get_klines(self, start_ms: int, end_ms: int) -> Optional[Klines]:
+        """Closed 1m klines in [start_ms, end_ms), fetching only what the cache lacks"""
+        cached = self._klines
+        if len(cached) and cached.start_ms <= start_ms:
+            fetch_from = max(start_ms, cached.end_ms)
+        else:
+            cached, fetch_from = Klines.empty(), start_ms
+        
+        if fetch_from < end_ms:
+            session = await self._get_session()
+            fetched = await fetch_klines(session, self.price_api_url, self.symbol, fetch_from, end_ms)
+            if fetched is None:
+                return None
+            cached = cached.extend(fetched)
+        
+        # Keep only bars a pending signal can still need
+        self._klines = cached.since(start_ms)
+        return self._klines
+    
+    @staticmethod
+    def _to_ms(created_at: datetime) -> int:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)  # DB times are naive UTC
+        return int(created_at.timestamp() * 1000)
+    
+    @classmethod
+    def _first_bar_ms(cls, created_at: datetime) -> int:
+        """Open time of the first 1m bar starting at or after creation"""
+        return -(-cls._to_ms(created_at) // BAR_MS) * BAR_MS
+    
     async def _check_signal(self, signal, current_price: float) -> TrackingResult:
         """Check a single signal"""
         signal_id = signal.signal_id
@@ -188,8 +412,7 @@ class SignalTracker:
             else:
                 pnl_percent = (entry_price - current_price) / entry_price
             
-            # Notional value: $3000 (150 * 20)
-            result.result_pnl = pnl_percent * 3000
+            result.result_pnl = pnl_percent * signal_notional(signal)
         
         # Clean up extremes if signal resolved
         if result.changed and signal_id in self.price_extremes:
@@ -0,0 +1,433 @@
+"""
+Streaming Signal Tracker - Tick-accurate TP/SL and MFE/MAE from aggTrades
+Pending signals are indexed by their TP/SL price bands
+"""
+import asyncio
+import json
+import logging
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import numpy as np
+
+from .signal_tracker import TrackingResult, signal_notional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _TrackedSignal:
+    signal_id: str
+    direction: str
+    entry_price: float
+    take_profit: float
+    stop_loss: float
+    created_ms: int
+    deadline_ms: int
+    notional: float  # USD position size, for TIMEOUT PnL
+    upper: float  # Resolves when price >= upper
+    lower: float  # Resolves when price <= lower
+    high: float
+    low: float
+
+
+class StreamingTracker:
+    """
+    Resolve pending signals on every trade.
+
+    Each signal resolves when price leaves its band [lower, upper] (TP and
+    SL, ordered by direction). Uppers and lowers are kept sorted, so a
+    tick only compares against the nearest band edge on each side and
+    touches just the signals it crossed. Excursions are tracked as one
+    running high/low shared by all pending signals, folded into each
+    signal only when the set of signals changes, so cost per trade does
+    not grow with the number of pending signals.
+
+    process_trades() takes batches as arrays and scans them vectorized up
+    to the next crossing or timeout. The batches of the last
+    `history_minutes` are kept, so a signal added after it was created
+    (the DB is synced periodically) is first replayed over the trades
+    since its creation: a TP/SL touch in between resolves it at once and
+    its excursions start from those trades, not from the current price.
+    Signals older than the kept trades are left to kline recovery.
+    """
+
+    def __init__(
+        self,
+        win_amount: float = 15.0,
+        loss_amount: float = -7.50,
+        max_hold_minutes: int = 240,
+        history_minutes: float = 5
+    ):
+        self.win_amount = win_amount
+        self.loss_amount = loss_amount
+        self.max_hold_ms = max_hold_minutes * 60 * 1000
+        self.history_ms = int(history_minutes * 60 * 1000)
+
+        self._signals: Dict[str, _TrackedSignal] = {}
+
+        # Band index: sorted edges with parallel signal ids
+        self._upper_prices: List[float] = []
+        self._upper_ids: List[str] = []
+        self._lower_prices: List[float] = []
+        self._lower_ids: List[str] = []
+        self._deadlines: List[tuple] = []  # sorted (deadline_ms, signal_id)
+
+        # Price range since the last fold into per-signal extremes
+        self._window_high = -np.inf
+        self._window_low = np.inf
+
+        # Recent trade batches (timestamps_ms, prices) for backfilling new signals
+        self._history: Deque[Tuple[np.ndarray, np.ndarray]] = deque()
+
+        self.last_price = 0.0
+        self.last_trade_ms = 0
+        self.trades_processed = 0
+        self._resolved: List[TrackingResult] = []
+
+    # ==================== Pending set ====================
+
+    def __contains__(self, signal_id: str) -> bool:
+        return signal_id in self._signals
+
+    def __len__(self) -> int:
+        return len(self._signals)
+
+    def add(
+        self,
+        signal_id: str,
+        direction: str,
+        entry_price: float,
+        take_profit: float,
+        stop_loss: float,
+        created_at: datetime,
+        notional: float
+    ):
+        """
+        Start tracking a pending signal.
+
+        Trades already processed since `created_at` are replayed first; if
+        one of them reached TP/SL or the deadline, the signal is resolved
+        right away (see drain_resolved) instead of being tracked.
+        """
+        if signal_id in self._signals:
+            return
+        self._fold()
+
+        if direction == "LONG":
+            upper, lower = take_profit, stop_loss
+        else:
+            upper, lower = stop_loss, take_profit
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)  # DB times are naive UTC
+        created_ms = int(created_at.timestamp() * 1000)
+
+        tracked = _TrackedSignal(
+            signal_id=signal_id,
+            direction=direction,
+            entry_price=entry_price,
+            take_profit=take_profit,
+            stop_loss=stop_loss,
+            created_ms=created_ms,
+            deadline_ms=created_ms + self.max_hold_ms,
+            notional=notional,
+            upper=upper,
+            lower=lower,
+            high=self.last_price or entry_price,
+            low=self.last_price or entry_price
+        )
+        # Only with trades from creation on; older gaps are left to kline recovery
+        if self._history and self.history_start_ms <= created_ms <= self.last_trade_ms and self._backfill(tracked):
+            return
+        self._signals[signal_id] = tracked
+
+        i = bisect_right(self._upper_prices, upper)
+        self._upper_prices.insert(i, upper)
+        self._upper_ids.insert(i, signal_id)
+        i = bisect_left(self._lower_prices, lower)
+        self._lower_prices.insert(i, lower)
+        self._lower_ids.insert(i, signal_id)
+        insort(self._deadlines, (tracked.deadline_ms, signal_id))
+
+    def remove(self, signal_id: str) -> Optional[_TrackedSignal]:
+        """Stop tracking a signal (resolved here or elsewhere)"""
+        tracked = self._signals.pop(signal_id, None)
+        if tracked is None:
+            return None
+        self._fold_into(tracked)
+
+        i = self._upper_ids.index(signal_id)
+        del self._upper_prices[i], self._upper_ids[i]
+        i = self._lower_ids.index(signal_id)
+        del self._lower_prices[i], self._lower_ids[i]
+        self._deadlines.remove((tracked.deadline_ms, signal_id))
+        return tracked
+
+    def _backfill(self, tracked: _TrackedSignal) -> bool:
+        """Replay the kept trades since creation; True if the signal resolved"""
+        timestamps, prices = self.trades_since(tracked.created_ms)
+        if len(prices) == 0:
+            return False
+        hit = (prices >= tracked.upper) | (prices <= tracked.lower) | (timestamps >= tracked.deadline_ms)
+        if not hit.any():
+            tracked.high = float(prices.max())
+            tracked.low = float(prices.min())
+            return False
+        k = int(hit.argmax())
+        tracked.high = float(prices[:k + 1].max())
+        tracked.low = float(prices[:k + 1].min())
+        self._resolved.append(self._result(tracked, int(timestamps[k]), float(prices[k])))
+        return True
+
+    def trades_since(self, start_ms: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Kept trades at or after `start_ms` (timestamps_ms, prices)"""
+        batches = [(t, p) for t, p in self._history if len(t) and t[-1] >= start_ms]
+        if not batches:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        timestamps = np.concatenate([t for t, _ in batches])
+        prices = np.concatenate([p for _, p in batches])
+        keep = timestamps >= start_ms  # A stale-stream REST tick can be newer than later batches
+        return timestamps[keep], prices[keep]
+
+    @property
+    def history_start_ms(self) -> int:
+        """Time of the oldest kept trade (0 when none)"""
+        return int(self._history[0][0][0]) if self._history else 0
+
+    def sync(self, pending_signals: Sequence) -> None:
+        """Match the tracked set to the DB's pending signals"""
+        pending_ids = {s.signal_id for s in pending_signals}
+        for signal_id in [sid for sid in self._signals if sid not in pending_ids]:
+            self.remove(signal_id)
+        for s in pending_signals:
+            if s.signal_id not in self._signals:
+                self.add(s.signal_id, s.direction, s.entry_price, s.take_profit, s.stop_loss, s.created_at,
+                         signal_notional(s))
+
+    # ==================== Excursions ====================
+
+    def _fold_into(self, tracked: _TrackedSignal):
+        if self._window_high > tracked.high:
+            tracked.high = self._window_high
+        if self._window_low < tracked.low:
+            tracked.low = self._window_low
+
+    def _fold(self):
+        """Apply the running window to every signal and start a new one"""
+        if self._window_high == -np.inf:
+            return
+        for tracked in self._signals.values():
+            self._fold_into(tracked)
+        self._window_high = -np.inf
+        self._window_low = np.inf
+
+    def excursions(self, signal_id: str) -> tuple:
+        """(MFE %, MAE %) so far for a pending signal"""
+        tracked = self._signals[signal_id]
+        self._fold_into(tracked)
+        return self._mfe_mae(tracked)
+
+    def seed_extremes(self, signal_id: str, high: float, low: float):
+        """Widen a signal's excursion range with prices seen elsewhere (kline recovery)"""
+        tracked = self._signals[signal_id]
+        tracked.high = max(tracked.high, high)
+        tracked.low = min(tracked.low, low)
+
+    @staticmethod
+    def _mfe_mae(tracked: _TrackedSignal) -> tuple:
+        entry = tracked.entry_price
+        if tracked.direction == "LONG":
+            mfe = (tracked.high - entry) / entry * 100
+            mae = (entry - tracked.low) / entry * 100
+        else:
+            mfe = (entry - tracked.low) / entry * 100
+            mae = (tracked.high - entry) / entry * 100
+        return max(0, mfe), max(0, mae)
+
+    # ==================== Ticks ====================
+
+    def on_trade(self, timestamp_ms: int, price: float):
+        """Single trade (prefer process_trades for batches)"""
+        self.process_trades(np.array([timestamp_ms], dtype=np.int64), np.array([price]))
+
+    def process_trades(self, timestamps_ms: np.ndarray, prices: np.ndarray):
+        """Apply a time-ordered batch of trades"""
+        n = len(prices)
+        if n == 0:
+            return
+        self._remember(timestamps_ms, prices)
+        start = 0
+        while start < n:
+            seg_prices = prices[start:]
+            upper = self._upper_prices[0] if self._upper_prices else np.inf
+            lower = self._lower_prices[-1] if self._lower_prices else -np.inf
+
+            # First trade crossing a band edge or reaching a deadline
+            event = n - start
+            crossed = (seg_prices >= upper) | (seg_prices <= lower)
+            if crossed.any():
+                event = int(crossed.argmax())
+            if self._deadlines:
+                due = int(np.searchsorted(timestamps_ms[start:], self._deadlines[0][0], side='left'))
+                event = min(event, due)
+
+            end = start + event + 1 if event < n - start else n
+            window = prices[start:end]
+            high, low = float(window.max()), float(window.min())
+            if high > self._window_high:
+                self._window_high = high
+            if low < self._window_low:
+                self._window_low = low
+
+            self.last_price = float(prices[end - 1])
+            self.last_trade_ms = int(timestamps_ms[end - 1])
+            if event < n - start:
+                self._resolve_at(self.last_trade_ms, self.last_price)
+            start = end
+
+        self.trades_processed += n
+
+    def _remember(self, timestamps_ms: np.ndarray, prices: np.ndarray):
+        """Keep a batch for backfills and drop batches older than history_ms"""
+        self._history.append((np.asarray(timestamps_ms, dtype=np.int64), np.asarray(prices, dtype=np.float64)))
+        cutoff = int(timestamps_ms[-1]) - self.history_ms
+        while len(self._history) > 1 and self._history[0][0][-1] < cutoff:
+            self._history.popleft()
+
+    def check_timeouts(self, now_ms: int):
+        """Expire signals past max hold when no trade has arrived to do it"""
+        if self._deadlines and self._deadlines[0][0] <= now_ms and self.last_price:
+            self._resolve_at(now_ms, self.last_price)
+
+    def _resolve_at(self, timestamp_ms: int, price: float):
+        """Resolve every signal crossed by `price` or due at `timestamp_ms`"""
+        hit_ids = self._upper_ids[:bisect_right(self._upper_prices, price)]
+        hit_ids += self._lower_ids[bisect_left(self._lower_prices, price):]
+        hit_ids += [sid for deadline, sid in self._deadlines if deadline <= timestamp_ms]
+
+        for signal_id in dict.fromkeys(hit_ids):
+            tracked = self.remove(signal_id)
+            if tracked is not None:
+                self._resolved.append(self._result(tracked, timestamp_ms, price))
+
+    def _result(self, tracked: _TrackedSignal, timestamp_ms: int, price: float) -> TrackingResult:
+        mfe, mae = self._mfe_mae(tracked)
+        result = TrackingResult(
+            signal_id=tracked.signal_id,
+            status="PENDING",
+            entry_price=tracked.entry_price,
+            current_price=price,
+            mfe=mfe,
+            mae=mae,
+            duration_minutes=int((timestamp_ms - tracked.created_ms) / 60000),
+            changed=True
+        )
+        if price >= tracked.upper or price <= tracked.lower:
+            is_win = (price >= tracked.upper) == (tracked.direction == "LONG")
+            result.status = "WIN" if is_win else "LOSS"
+            result.result_price = tracked.take_profit if is_win else tracked.stop_loss
+            result.result_pnl = self.win_amount if is_win else self.loss_amount
+            result.result_reason = "TP_HIT" if is_win else "SL_HIT"
+        else:
+            if tracked.direction == "LONG":
+                pnl_percent = (price - tracked.entry_price) / tracked.entry_price
+            else:
+                pnl_percent = (tracked.entry_price - price) / tracked.entry_price
+            result.status = "TIMEOUT"
+            result.result_price = price
+            result.result_pnl = pnl_percent * tracked.notional
+            result.result_reason = "TIMEOUT"
+        return result
+
+    def drain_resolved(self) -> List[TrackingResult]:
+        """Results resolved since the last call"""
+        resolved, self._resolved = self._resolved, []
+        return resolved
+
+
+class AggTradeStream:
+    """
+    Binance aggTrade WebSocket feed delivering trades in batches.
+
+    Trades are parsed into arrays and handed to `on_batch(timestamps_ms,
+    prices)` every `batch_ms` or `max_batch` trades, so the per-trade work
+    is just JSON decoding.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        symbol: str,
+        on_batch: Callable[[np.ndarray, np.ndarray], None],
+        batch_ms: int = 100,
+        max_batch: int = 2000
+    ):
+        self.url = f"{ws_url}/{symbol.lower()}@aggTrade"
+        self.on_batch = on_batch
+        self.batch_ms = batch_ms
+        self.max_batch = max_batch
+        self._running = False
+
+        # Stats
+        self.received = 0
+
+    async def run(self):
+        """Receive until stop(); reconnects after errors"""
+        self._running = True
+        while self._running:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(self.url, heartbeat=30) as ws:
+                        logger.info(f"aggTrade stream connected: {self.url}")
+                        await self._receive(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"aggTrade stream error: {e}")
+            if self._running:
+                await asyncio.sleep(5)
+
+    async def _receive(self, ws):
+        timestamps: List[int] = []
+        prices: List[float] = []
+        flushed = time.monotonic()
+        while self._running:
+            # A partial batch waits at most batch_ms, even when no further
+            # trade arrives to trigger the flush
+            timeout = None
+            if prices:
+                timeout = max(0.0, self.batch_ms / 1000 - (time.monotonic() - flushed))
+            try:
+                msg = await ws.receive(timeout=timeout)
+            except asyncio.TimeoutError:
+                msg = None
+
+            if msg is not None:
+                if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING,
+                                aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                if not prices:
+                    flushed = time.monotonic()
+                timestamps.append(data["T"])
+                prices.append(float(data["p"]))
+                self.received += 1
+
+            now = time.monotonic()
+            if prices and (len(prices) >= self.max_batch or (now - flushed) * 1000 >= self.batch_ms):
+                self.on_batch(np.array(timestamps, dtype=np.int64), np.array(prices))
+                timestamps, prices = [], []
+                flushed = now
+
+        if prices:
+            self.on_batch(np.array(timestamps, dtype=np.int64), np.array(prices))
+
+    def stop(self):
+        self._running = False
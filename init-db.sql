@@ -79,8 +79,12 @@ CREATE TABLE IF NOT EXISTS feature_snapshots (
     long_liq_density DECIMAL(10, 4),
     short_liq_density DECIMAL(10, 4),
     
-    -- All features as JSON
-    all_features JSONB
+    -- All features as JSON (rows written before feature_vector)
+    all_features JSONB,
+    
+    -- Full feature vector as packed little-endian float32
+    schema_version INTEGER,
+    feature_vector BYTEA
 );
 
 -- Daily state table
@@ -113,6 +117,22 @@ CREATE TABLE IF NOT EXISTS heartbeat (
 
 CREATE INDEX IF NOT EXISTS idx_heartbeat_bot_time ON heartbeat(bot_name, timestamp DESC);
 
+-- Heartbeats rolled up per hour (Bot 2 retention job)
+CREATE TABLE IF NOT EXISTS heartbeat_hourly (
+    bot_name VARCHAR(50) NOT NULL,
+    hour TIMESTAMP NOT NULL,
+    pings INT NOT NULL DEFAULT 0,
+    first_seen TIMESTAMP,
+    last_seen TIMESTAMP,
+    max_gap_seconds DECIMAL(10, 1),
+    error_count INT DEFAULT 0,
+    last_status VARCHAR(20),
+    last_error TEXT,
+    signals_today INT,
+    daily_pnl DECIMAL(10, 2),
+    PRIMARY KEY (bot_name, hour)
+);
+
 -- Price tracking table
 CREATE TABLE IF NOT EXISTS price_tracking (
     id SERIAL PRIMARY KEY,
@@ -121,6 +141,20 @@ CREATE TABLE IF NOT EXISTS price_tracking (
     price DECIMAL(20, 8) NOT NULL
 );
 
+CREATE INDEX IF NOT EXISTS idx_price_tracking_signal_time ON price_tracking(signal_id, timestamp);
+
+-- Price tracking of resolved signals downsampled to OHLC (Bot 2 retention job)
+CREATE TABLE IF NOT EXISTS price_tracking_ohlc (
+    signal_id VARCHAR(50) REFERENCES signals(signal_id),
+    bucket TIMESTAMP NOT NULL,
+    open DECIMAL(20, 8) NOT NULL,
+    high DECIMAL(20, 8) NOT NULL,
+    low DECIMAL(20, 8) NOT NULL,
+    close DECIMAL(20, 8) NOT NULL,
+    samples INT NOT NULL,
+    PRIMARY KEY (signal_id, bucket)
+);
+
 -- Lessons table
 CREATE TABLE IF NOT EXISTS lessons (
     lesson_id VARCHAR(50) PRIMARY KEY,
@@ -150,8 +184,26 @@ CREATE TABLE IF NOT EXISTS daily_stats (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Resolved signal totals per day/strategy/regime (maintained by Bot 2 on each result)
+CREATE TABLE IF NOT EXISTS signal_stats_daily (
+    date VARCHAR(10) NOT NULL,
+    strategy VARCHAR(50) NOT NULL,
+    regime VARCHAR(50) NOT NULL,
+    resolved INT NOT NULL DEFAULT 0,
+    wins INT NOT NULL DEFAULT 0,
+    losses INT NOT NULL DEFAULT 0,
+    timeouts INT NOT NULL DEFAULT 0,
+    pnl_sum DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    iq_sum INT NOT NULL DEFAULT 0,
+    iq_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date, strategy, regime)
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_signals_created ON signals(created_at);
-CREATE INDEX IF NOT EXISTS idx_signals_status ON signals(status);
+CREATE INDEX IF NOT EXISTS idx_signals_pending ON signals(created_at) WHERE status = 'PENDING';
+CREATE INDEX IF NOT EXISTS idx_signals_analyzed_status ON signals(result_analyzed, status);
+CREATE INDEX IF NOT EXISTS idx_signals_result_time ON signals(result_time);
 CREATE INDEX IF NOT EXISTS idx_daily_state_date ON daily_state(date);
 